@@ -0,0 +1,189 @@
+/**
+ * Session resume benchmark
+ *
+ * Measures how long resuming a FilesystemStorage session takes as its event
+ * log grows to 1k, 10k and 50k events. Resuming means what the builder does
+ * for an existing session: recoverSession() followed by recoverTodos().
+ *
+ * - full replay: checkpoints disabled, every event is replayed and sanitized
+ * - checkpoint: the session was checkpointed and TAIL_EVENTS more events were
+ *   logged since, so only those are replayed. The checkpoint's messages are
+ *   parsed when the recovered list is first read past its tail, which is not
+ *   timed here; with a fixed tail this column should stay flat as the log grows
+ *
+ * Each round logs what a tool-using agent does: a system note, the user
+ * message, a tool call and its result, the reply, and a TodoWrite call every
+ * tenth round.
+ *
+ * Run with: npm run bench:resume -w @nielspeter/agent-orchestration-core
+ */
+import * as fs from 'fs/promises';
+import * as os from 'node:os';
+import * as path from 'node:path';
+import { FilesystemStorage } from '@/session/filesystem.storage';
+import { SimpleSessionManager } from '@/session/manager';
+
+const SIZES = [1_000, 10_000, 50_000];
+const TAIL_EVENTS = 200;
+const RUNS = 5;
+const WARMUP_RUNS = 5;
+
+const SYSTEM_NOTE = `Loaded tools: ${Array.from({ length: 40 }, (_, i) => `tool_${i}`).join(', ')}`;
+const RESULT_PAYLOAD = 'claim record field '.repeat(50);
+
+const todoWrite = (round: number) => ({
+  id: `todo-${round}`,
+  tool: 'todowrite',
+  params: {
+    todos: [
+      {
+        id: `${round}`,
+        content: `Review claim ${round}`,
+        status: 'pending',
+        priority: 'high',
+        activeForm: `Reviewing claim ${round}`,
+      },
+    ],
+  },
+});
+
+/**
+ * Events logged in one round of the conversation
+ */
+function roundEvents(round: number): unknown[] {
+  const timestamp = Date.now();
+  const events: unknown[] = [
+    {
+      type: 'assistant',
+      timestamp,
+      data: { role: 'assistant', content: SYSTEM_NOTE, agent: 'system' },
+    },
+    { type: 'user', timestamp, data: { role: 'user', content: `Check claim ${round}` } },
+    {
+      type: 'tool_call',
+      timestamp,
+      data: { id: `call-${round}`, tool: 'read', params: { claim: round }, agent: 'default' },
+    },
+    {
+      type: 'tool_result',
+      timestamp,
+      data: { toolCallId: `call-${round}`, result: { claim: round, text: RESULT_PAYLOAD } },
+    },
+  ];
+  if (round % 10 === 0) {
+    events.push(
+      { type: 'tool_call', timestamp, data: todoWrite(round) },
+      { type: 'tool_result', timestamp, data: { toolCallId: `todo-${round}`, result: 'ok' } }
+    );
+  }
+  events.push({
+    type: 'assistant',
+    timestamp,
+    data: { role: 'assistant', content: `Claim ${round} looks fine`, agent: 'default' },
+  });
+  return events;
+}
+
+/**
+ * Log whole rounds, starting at firstRound, until at least `count` events are written
+ *
+ * @returns The next round number
+ */
+async function logRounds(
+  storage: FilesystemStorage,
+  sessionId: string,
+  firstRound: number,
+  count: number
+): Promise<number> {
+  let round = firstRound;
+  for (let logged = 0; logged < count; round++) {
+    const events = roundEvents(round);
+    await Promise.all(events.map((event) => storage.appendEvent(sessionId, event)));
+    logged += events.length;
+  }
+  return round;
+}
+
+async function median(run: () => Promise<void>): Promise<number> {
+  // Untimed runs first, so JIT warm-up does not land in the first size's timings
+  for (let i = 0; i < WARMUP_RUNS; i++) {
+    await run();
+  }
+  const times: number[] = [];
+  for (let i = 0; i < RUNS; i++) {
+    const start = process.hrtime.bigint();
+    await run();
+    times.push(Number(process.hrtime.bigint() - start) / 1e6);
+  }
+  times.sort((a, b) => a - b);
+  return times[Math.floor(times.length / 2)];
+}
+
+async function main(): Promise<void> {
+  const root = await fs.mkdtemp(path.join(os.tmpdir(), 'session-resume-'));
+  const rows: Record<string, string | number>[] = [];
+
+  try {
+    for (const size of SIZES) {
+      const sessionId = `session-${size}`;
+      const storage = new FilesystemStorage(root);
+      const nextRound = await logRounds(storage, sessionId, 0, size - TAIL_EVENTS);
+
+      // Checkpoint, then keep logging so the resume has a tail to replay
+      const checkpointed = new SimpleSessionManager(storage);
+      const checkpoint = await checkpointed.checkpoint(sessionId);
+      await logRounds(storage, sessionId, nextRound, TAIL_EVENTS);
+      await storage.flush(sessionId);
+
+      const replayAll = new SimpleSessionManager(storage, { checkpointInterval: 0 });
+      // Readers build the offset index on first use; keep that out of the timings
+      await replayAll.recoverTodos(sessionId);
+
+      let messages = 0;
+      const full = await median(async () => {
+        messages = (await replayAll.recoverSession(sessionId)).length;
+        await replayAll.recoverTodos(sessionId);
+      });
+
+      // checkpointInterval above the tail keeps recovery from writing a new checkpoint
+      const fromCheckpoint = new SimpleSessionManager(storage, {
+        checkpointInterval: TAIL_EVENTS * 10,
+      });
+      let resumed = 0;
+      const fast = await median(async () => {
+        resumed = (await fromCheckpoint.recoverSession(sessionId)).length;
+        await fromCheckpoint.recoverTodos(sessionId);
+      });
+      if (resumed !== messages) {
+        throw new Error(`Checkpoint resume returned ${resumed} messages, full replay ${messages}`);
+      }
+      // Outside the timings: reading the resumed list parses the checkpoint's messages
+      const expected = JSON.stringify(await replayAll.recoverSession(sessionId));
+      if (JSON.stringify(await fromCheckpoint.recoverSession(sessionId)) !== expected) {
+        throw new Error('Checkpoint resume returned different messages than full replay');
+      }
+
+      const { size: eventsBytes } = await fs.stat(path.join(root, sessionId, 'events.jsonl'));
+      await storage.close();
+      rows.push({
+        events: size,
+        messages,
+        'log (MB)': +(eventsBytes / 1e6).toFixed(1),
+        'checkpoint seq': checkpoint?.seq ?? '-',
+        'full replay (ms)': +full.toFixed(1),
+        'checkpoint (ms)': +fast.toFixed(1),
+        speedup: `${(full / fast).toFixed(1)}x`,
+      });
+    }
+  } finally {
+    await fs.rm(root, { recursive: true, force: true });
+  }
+
+  console.log(`Session resume, median of ${RUNS} runs, ${TAIL_EVENTS} events after a checkpoint`);
+  console.table(rows);
+}
+
+main().catch((error) => {
+  console.error(error);
+  process.exit(1);
+});
@@ -0,0 +1,164 @@
+/**
+ * Session storage size benchmark
+ *
+ * Writes the recorded sessions in tests/integration/{suite}/fixtures through
+ * FilesystemStorage and SegmentedStorage and compares what ends up on disk,
+ * how long appending takes and how long reading everything back takes.
+ *
+ * - fixtures: every fixture session, as recorded
+ * - long session: all fixtures appended LONG_REPEAT times to one session, so
+ *   the segmented log rotates through several sealed segments
+ *
+ * Appends are fire-and-forget per session, the way EventLogger issues them.
+ * Append time covers the appends only; the seal that close() performs is
+ * reported separately, since it runs at cleanup and not while the agent works.
+ *
+ * Run with: npm run bench:storage -w @nielspeter/agent-orchestration-core
+ */
+import * as fs from 'fs/promises';
+import * as os from 'node:os';
+import * as path from 'node:path';
+import { fileURLToPath } from 'node:url';
+import { FilesystemStorage } from '@/session/filesystem.storage';
+import { SegmentedStorage } from '@/session/segmented.storage';
+import { SessionStorage } from '@/session/types';
+
+const __dirname = path.dirname(fileURLToPath(import.meta.url));
+const INTEGRATION_DIR = path.resolve(__dirname, '../tests/integration');
+const LONG_REPEAT = 25;
+const RUNS = 5;
+
+type Sessions = Map<string, unknown[]>;
+
+async function loadFixtures(): Promise<Sessions> {
+  const sessions: Sessions = new Map();
+  for (const suite of await fs.readdir(INTEGRATION_DIR)) {
+    const fixtures = path.join(INTEGRATION_DIR, suite, 'fixtures');
+    const entries = await fs.readdir(fixtures).catch(() => []);
+    for (const session of entries) {
+      const file = path.join(fixtures, session, 'events.jsonl');
+      const content = await fs.readFile(file, 'utf-8').catch(() => undefined);
+      if (content !== undefined) {
+        const events = content
+          .split('\n')
+          .filter((line) => line.trim())
+          .map((line) => JSON.parse(line) as unknown);
+        sessions.set(`${suite}-${session}`, events);
+      }
+    }
+  }
+  return sessions;
+}
+
+async function diskBytes(dir: string): Promise<number> {
+  let total = 0;
+  for (const entry of await fs.readdir(dir, { withFileTypes: true })) {
+    const file = path.join(dir, entry.name);
+    total += entry.isDirectory() ? await diskBytes(file) : (await fs.stat(file)).size;
+  }
+  return total;
+}
+
+interface Run {
+  appendMs: number;
+  closeMs: number;
+  readMs: number;
+  bytes: number;
+}
+
+async function run(
+  sessions: Sessions,
+  createStorage: (dir: string) => SessionStorage & { close(): Promise<void> }
+): Promise<Run> {
+  const dir = await fs.mkdtemp(path.join(os.tmpdir(), 'session-storage-'));
+  try {
+    const storage = createStorage(dir);
+    let start = process.hrtime.bigint();
+    await Promise.all(
+      [...sessions].map(([sessionId, events]) =>
+        Promise.all(events.map((event) => storage.appendEvent(sessionId, event)))
+      )
+    );
+    const appendMs = Number(process.hrtime.bigint() - start) / 1e6;
+
+    start = process.hrtime.bigint();
+    await storage.close();
+    const closeMs = Number(process.hrtime.bigint() - start) / 1e6;
+
+    start = process.hrtime.bigint();
+    for (const [sessionId, events] of sessions) {
+      const read = await storage.readEvents(sessionId);
+      if (read.length !== events.length) {
+        throw new Error(`${sessionId}: read ${read.length} of ${events.length} events`);
+      }
+    }
+    const readMs = Number(process.hrtime.bigint() - start) / 1e6;
+
+    await storage.close();
+    return { appendMs, closeMs, readMs, bytes: await diskBytes(dir) };
+  } finally {
+    await fs.rm(dir, { recursive: true, force: true });
+  }
+}
+
+/**
+ * Run RUNS times and keep the median of each timing
+ */
+async function measure(
+  sessions: Sessions,
+  createStorage: (dir: string) => SessionStorage & { close(): Promise<void> }
+): Promise<Run> {
+  const runs: Run[] = [];
+  for (let i = 0; i < RUNS; i++) {
+    runs.push(await run(sessions, createStorage));
+  }
+  const median = (key: keyof Run) =>
+    runs.map((r) => r[key]).sort((a, b) => a - b)[Math.floor(RUNS / 2)];
+  return {
+    appendMs: median('appendMs'),
+    closeMs: median('closeMs'),
+    readMs: median('readMs'),
+    bytes: median('bytes'),
+  };
+}
+
+async function main(): Promise<void> {
+  const fixtures = await loadFixtures();
+  const long: Sessions = new Map([
+    ['long', Array.from({ length: LONG_REPEAT }, () => [...fixtures.values()].flat()).flat()],
+  ]);
+
+  const rows: Record<string, string | number>[] = [];
+  for (const [workload, sessions] of [
+    ['fixtures', fixtures],
+    ['long session', long],
+  ] as const) {
+    const events = [...sessions.values()].reduce((total, list) => total + list.length, 0);
+    const plain = await measure(sessions, (dir) => new FilesystemStorage(dir));
+    const segmented = await measure(sessions, (dir) => new SegmentedStorage(dir));
+    for (const [storage, result] of [
+      ['filesystem', plain],
+      ['segmented', segmented],
+    ] as const) {
+      rows.push({
+        workload,
+        storage,
+        sessions: sessions.size,
+        events,
+        'disk (KB)': Math.round(result.bytes / 1024),
+        reduction: `${(plain.bytes / result.bytes).toFixed(1)}x`,
+        'append (ms)': +result.appendMs.toFixed(1),
+        'close (ms)': +result.closeMs.toFixed(1),
+        'read (ms)': +result.readMs.toFixed(1),
+      });
+    }
+  }
+
+  console.log(`Session storage, median of ${RUNS} runs`);
+  console.table(rows);
+}
+
+main().catch((error) => {
+  console.error(error);
+  process.exit(1);
+});
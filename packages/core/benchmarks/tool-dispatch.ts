@@ -0,0 +1,353 @@
+/**
+ * Tool dispatch benchmark
+ *
+ * Measures end-to-end latency and throughput of
+ * `toolRegistry.getTool(name).execute()` for every Python tool shipped in
+ * packages/examples, at concurrency 1, 10 and 100, for three dispatch paths:
+ *
+ * - exec: `echo '<json>' | python3 <script>` through the shell tool, the
+ *   command string script tools were originally run with (baseline)
+ * - direct: the loader's default path, which spawns one interpreter per call
+ * - warm: every tool switched to `execution: resident` and served by a warmed-up
+ *   PythonWorkerPool (tools without a function to call are skipped)
+ * - fork: every tool switched to `execution: fork` and run in a child forked
+ *   from the PythonForkServer's zygote (same tools skipped)
+ *
+ * The scheduler and result cache sit in the executor, not in execute(), so
+ * neither limits nor short-circuits the calls measured here.
+ *
+ * The results are written as a JSON report. With --baseline <report>, every
+ * case whose median latency regressed by more than --threshold (default 0.25)
+ * is listed and the process exits with code 1.
+ *
+ * Run with: npm run bench:dispatch -w @nielspeter/agent-orchestration-core -- [options]
+ *   --calls <n>       calls per case, at least 2x the concurrency (default: 50)
+ *   --output <file>   report path (default: tool-dispatch-report.json)
+ *   --baseline <file> report to compare against
+ *   --threshold <x>   allowed median regression as a fraction (default: 0.25)
+ */
+import * as fs from 'fs/promises';
+import * as os from 'node:os';
+import * as path from 'node:path';
+import { fileURLToPath } from 'node:url';
+import { parseArgs } from 'node:util';
+import { BaseTool, ToolResult } from '@/base-types';
+import { ToolLoader } from '@/tools/registry/loader';
+import { PythonForkServer } from '@/tools/registry/python-fork-server';
+import { PythonWorkerPool } from '@/tools/registry/python-worker-pool';
+import { ToolRegistry } from '@/tools/registry/registry';
+import { createShellTool } from '@/tools/shell.tool';
+
+const __dirname = path.dirname(fileURLToPath(import.meta.url));
+const EXAMPLES_DIR = path.resolve(__dirname, '../../examples');
+// critical-illness-claim-structured ships identical copies of the claim tools
+const TOOL_DIRS = ['critical-illness-claim/tools', 'script-tools/tools', 'werewolf-game/tools'];
+const MODES = ['exec', 'direct', 'warm', 'fork'] as const;
+const CONCURRENCY = [1, 10, 100];
+
+type Mode = (typeof MODES)[number];
+
+/** Representative arguments for each shipped tool */
+const SAMPLE_ARGS: Record<string, Record<string, unknown>> = {
+  check_fraud_indicators: {
+    claim_id: 'CI-20240115-AB12',
+    policy_number: 'POL-12345',
+    amount: 5000,
+  },
+  claim_id_generator: {
+    policy_number: 'POL-12345',
+    timestamp: '2024-01-15T10:30:00',
+    claim_type: 'CI',
+  },
+  get_policy_details: { policy_number: 'POL-12345' },
+  process_payment: {
+    claim_id: 'CI-20240115-AB12',
+    amount: 5000,
+    account_name: 'Jane Doe',
+    account_number: '12345678',
+    bank_name: 'First Bank',
+  },
+  send_notification: {
+    recipient_email: 'jane@example.com',
+    recipient_phone: '+4512345678',
+    message_type: 'claim_received',
+    content: 'Your claim has been received.',
+  },
+  timestamp_generator: { operation: 'generate' },
+  validate_bank_account: { account_number: '12345678', account_name: 'Jane Doe' },
+  word_counter: { text: 'The quick brown fox jumps over the lazy dog' },
+  random_roles: { players: ['Alice', 'Bob', 'Carol'] },
+};
+
+/**
+ * Calls the entry point of a tool for the exec path; scripts without one are
+ * run as before, with the arguments on stdin
+ */
+const EXEC_CALLER = `import json, os, runpy, sys
+sys.path[0] = os.path.dirname(os.path.abspath(sys.argv[1]))
+module = runpy.run_path(sys.argv[1])
+print(json.dumps(module[sys.argv[2]](**json.load(sys.stdin))))
+`;
+
+interface ShippedTool {
+  name: string;
+  scriptPath: string;
+  source: string;
+  /** Function the entry point shim and the worker pool call, if the script has one */
+  functionName?: string;
+}
+
+interface CaseResult {
+  tool: string;
+  mode: Mode;
+  concurrency: number;
+  calls?: number;
+  errors?: number;
+  meanMs?: number;
+  p50Ms?: number;
+  p95Ms?: number;
+  p99Ms?: number;
+  throughputPerSec?: number;
+  skipped?: string;
+}
+
+interface DispatchReport {
+  createdAt: string;
+  node: string;
+  platform: string;
+  cpus: number;
+  results: CaseResult[];
+}
+
+async function findShippedTools(): Promise<ShippedTool[]> {
+  const tools: ShippedTool[] = [];
+  for (const dir of TOOL_DIRS) {
+    for (const file of (await fs.readdir(path.join(EXAMPLES_DIR, dir))).sort()) {
+      if (!file.endsWith('.py')) continue;
+      const name = path.basename(file, '.py');
+      const scriptPath = path.join(EXAMPLES_DIR, dir, file);
+      const source = await fs.readFile(scriptPath, 'utf8');
+      const entrypoint = /^\s*entrypoint:\s*(\w+)/m.exec(source)?.[1];
+      const ownFunction = new RegExp(`^def ${name}\\(`, 'm').test(source) ? name : undefined;
+      tools.push({ name, scriptPath, source, functionName: entrypoint ?? ownFunction });
+    }
+  }
+  return tools;
+}
+
+/**
+ * Wrap a loaded tool so each call runs through the shell tool
+ */
+function execTool(tool: BaseTool, shipped: ShippedTool, callerPath: string): BaseTool {
+  const shellTool = createShellTool();
+  const target = shipped.functionName
+    ? `"${callerPath}" "${shipped.scriptPath}" ${shipped.functionName}`
+    : `"${shipped.scriptPath}"`;
+
+  return {
+    ...tool,
+    execute: (args: Record<string, unknown>): Promise<ToolResult> => {
+      const json = JSON.stringify(args).replace(/'/g, "'\\''");
+      return shellTool.execute({ command: `echo '${json}' | python3 ${target}`, parseJson: true });
+    },
+  };
+}
+
+/**
+ * Copy a tool into `dir` with the given execution mode in its header
+ */
+async function writeModeCopy(
+  shipped: ShippedTool,
+  dir: string,
+  execution: 'resident' | 'fork'
+): Promise<void> {
+  const source = shipped.source
+    .replace(/^execution:.*\n/m, '')
+    .replace(/^name:.*$/m, (line) => `${line}\nexecution: ${execution}`);
+  await fs.writeFile(path.join(dir, `${shipped.name}.py`), source);
+}
+
+async function buildRegistries(
+  shipped: ShippedTool[],
+  root: string,
+  workerPool: PythonWorkerPool,
+  forkServer: PythonForkServer
+): Promise<Record<Mode, ToolRegistry>> {
+  const callerPath = path.join(root, 'exec_caller.py');
+  await fs.writeFile(callerPath, EXEC_CALLER);
+  const residentDir = path.join(root, 'resident');
+  const forkDir = path.join(root, 'fork');
+  await fs.mkdir(residentDir);
+  await fs.mkdir(forkDir);
+
+  const registries = {
+    exec: new ToolRegistry(),
+    direct: new ToolRegistry(),
+    warm: new ToolRegistry(),
+    fork: new ToolRegistry(),
+  };
+  for (const tool of shipped) {
+    const loaded = await new ToolLoader(path.dirname(tool.scriptPath)).loadTool(tool.name);
+    registries.direct.register(loaded);
+    registries.exec.register(execTool(loaded, tool, callerPath));
+
+    if (tool.functionName) {
+      await writeModeCopy(tool, residentDir, 'resident');
+      registries.warm.register(
+        await new ToolLoader(residentDir, undefined, { workerPool }).loadTool(tool.name)
+      );
+      await writeModeCopy(tool, forkDir, 'fork');
+      registries.fork.register(
+        await new ToolLoader(forkDir, undefined, { forkServer }).loadTool(tool.name)
+      );
+    }
+  }
+  return registries;
+}
+
+function percentile(sorted: number[], p: number): number {
+  return sorted[Math.min(sorted.length - 1, Math.ceil((p / 100) * sorted.length) - 1)];
+}
+
+const round = (ms: number) => Math.round(ms * 100) / 100;
+
+async function runCase(
+  tool: BaseTool,
+  args: Record<string, unknown>,
+  concurrency: number,
+  calls: number
+): Promise<Omit<CaseResult, 'tool' | 'mode' | 'concurrency'>> {
+  const latencies: number[] = [];
+  let errors = 0;
+  let started = 0;
+
+  const start = performance.now();
+  await Promise.all(
+    Array.from({ length: concurrency }, async () => {
+      while (started < calls) {
+        started++;
+        const callStart = performance.now();
+        const result = await tool.execute(args);
+        latencies.push(performance.now() - callStart);
+        if (result.error) errors++;
+      }
+    })
+  );
+  const elapsedMs = performance.now() - start;
+
+  latencies.sort((a, b) => a - b);
+  return {
+    calls,
+    errors,
+    meanMs: round(latencies.reduce((sum, ms) => sum + ms, 0) / calls),
+    p50Ms: round(percentile(latencies, 50)),
+    p95Ms: round(percentile(latencies, 95)),
+    p99Ms: round(percentile(latencies, 99)),
+    throughputPerSec: round((calls / elapsedMs) * 1000),
+  };
+}
+
+/**
+ * List cases whose median latency grew by more than `threshold` since the baseline
+ */
+function findRegressions(
+  report: DispatchReport,
+  baseline: DispatchReport,
+  threshold: number
+): string[] {
+  const key = (r: CaseResult) => `${r.tool}/${r.mode}/c${r.concurrency}`;
+  const previous = new Map(baseline.results.map((r) => [key(r), r]));
+
+  return report.results.flatMap((result) => {
+    const before = previous.get(key(result));
+    if (!result.p50Ms || !before?.p50Ms || result.p50Ms <= before.p50Ms * (1 + threshold)) {
+      return [];
+    }
+    return [`${key(result)}: p50 ${before.p50Ms}ms -> ${result.p50Ms}ms`];
+  });
+}
+
+async function main(): Promise<void> {
+  const { values } = parseArgs({
+    options: {
+      calls: { type: 'string', default: '50' },
+      output: { type: 'string', default: 'tool-dispatch-report.json' },
+      baseline: { type: 'string' },
+      threshold: { type: 'string', default: '0.25' },
+    },
+  });
+  const calls = Number(values.calls);
+
+  const root = await fs.mkdtemp(path.join(os.tmpdir(), 'tool-dispatch-'));
+  const workerPool = new PythonWorkerPool();
+  const forkServer = new PythonForkServer();
+  const report: DispatchReport = {
+    createdAt: new Date().toISOString(),
+    node: process.version,
+    platform: `${process.platform}-${process.arch}`,
+    cpus: os.availableParallelism(),
+    results: [],
+  };
+
+  try {
+    const shipped = await findShippedTools();
+    const registries = await buildRegistries(shipped, root, workerPool, forkServer);
+
+    for (const { name } of shipped) {
+      const args = SAMPLE_ARGS[name] ?? {};
+      for (const mode of MODES) {
+        const tool = registries[mode].getTool(name);
+        if (!tool) {
+          for (const concurrency of CONCURRENCY) {
+            report.results.push({ tool: name, mode, concurrency, skipped: 'no function to call' });
+          }
+          continue;
+        }
+
+        // Warm up interpreters, workers and the OS file cache
+        const warmup = await tool.execute(args);
+        for (const concurrency of CONCURRENCY) {
+          if (warmup.error) {
+            report.results.push({ tool: name, mode, concurrency, skipped: warmup.error });
+            continue;
+          }
+          const stats = await runCase(tool, args, concurrency, Math.max(calls, concurrency * 2));
+          report.results.push({ tool: name, mode, concurrency, ...stats });
+        }
+      }
+    }
+  } finally {
+    await workerPool.shutdown();
+    await forkServer.shutdown();
+    await fs.rm(root, { recursive: true, force: true });
+  }
+
+  await fs.writeFile(values.output, JSON.stringify(report, null, 2) + '\n');
+  console.log(`Tool dispatch, ${calls}+ calls per case (report: ${values.output})`);
+  console.table(
+    report.results.map((r) => ({
+      tool: r.tool,
+      mode: r.mode,
+      concurrency: r.concurrency,
+      'p50 (ms)': r.p50Ms ?? '-',
+      'p95 (ms)': r.p95Ms ?? '-',
+      'calls/s': r.throughputPerSec ?? '-',
+      errors: r.errors ?? r.skipped,
+    }))
+  );
+
+  if (values.baseline) {
+    const baseline = JSON.parse(await fs.readFile(values.baseline, 'utf8')) as DispatchReport;
+    const regressions = findRegressions(report, baseline, Number(values.threshold));
+    if (regressions.length > 0) {
+      console.error(`Dispatch latency regressed in ${regressions.length} case(s):`);
+      regressions.forEach((line) => console.error(`  ${line}`));
+      process.exit(1);
+    }
+  }
+}
+
+main().catch((error) => {
+  console.error(error);
+  process.exit(1);
+});
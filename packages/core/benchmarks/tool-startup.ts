@@ -0,0 +1,113 @@
+/**
+ * Tool startup benchmark
+ *
+ * Measures how long it takes to load a directory of 10, 100 and 1000 Python
+ * script tools, the phase of AgentSystemBuilder.build() that grows with the
+ * number of tools:
+ *
+ * - sequential: listTools() + loadTool() per tool (the previous build path)
+ * - cold: loadTools() with an empty metadata index (first start)
+ * - warm: loadTools() with the index saved by a previous start
+ *
+ * Run with: npm run bench:startup -w @nielspeter/agent-orchestration-core
+ */
+import * as fs from 'fs/promises';
+import * as os from 'node:os';
+import * as path from 'node:path';
+import { ToolLoader } from '@/tools/registry/loader';
+import { ToolMetadataIndex } from '@/tools/registry/metadata-index';
+
+const SIZES = [10, 100, 1000];
+const RUNS = 5;
+
+const toolScript = (i: number) => `#!/usr/bin/env python3
+"""
+name: tool_${i}
+description: Benchmark tool ${i} that validates and scores a claim record
+entrypoint: run
+execution: resident
+cache: ttl=300
+parameters:
+  claim_id: string - Claim identifier
+  policy_number: string - Policy number
+  amount: number - Claimed amount
+  currency?: string - ISO currency code
+  tags?: array<string> - Free-form tags
+"""
+${'# filler to give the script a realistic size\n'.repeat(40)}
+
+def run(claim_id, policy_number, amount, currency="EUR", tags=None):
+    return {"claim_id": claim_id, "score": ${i} % 100 / 100}
+`;
+
+async function createToolDir(root: string, count: number): Promise<string> {
+  const dir = path.join(root, `tools-${count}`);
+  await fs.mkdir(dir, { recursive: true });
+  await Promise.all(
+    Array.from({ length: count }, (_, i) =>
+      fs.writeFile(path.join(dir, `tool_${i}.py`), toolScript(i))
+    )
+  );
+  return dir;
+}
+
+async function median(run: () => Promise<void>): Promise<number> {
+  const times: number[] = [];
+  for (let i = 0; i < RUNS; i++) {
+    const start = process.hrtime.bigint();
+    await run();
+    times.push(Number(process.hrtime.bigint() - start) / 1e6);
+  }
+  times.sort((a, b) => a - b);
+  return times[Math.floor(times.length / 2)];
+}
+
+async function main(): Promise<void> {
+  const root = await fs.mkdtemp(path.join(os.tmpdir(), 'tool-startup-'));
+  const rows: Record<string, string | number>[] = [];
+
+  try {
+    for (const size of SIZES) {
+      const dir = await createToolDir(root, size);
+      const indexPath = path.join(root, `index-${size}.json`);
+
+      const sequential = await median(async () => {
+        const loader = new ToolLoader(dir);
+        for (const name of await loader.listTools()) {
+          await loader.loadTool(name);
+        }
+      });
+
+      const cold = await median(async () => {
+        await fs.rm(indexPath, { force: true });
+        const metadataIndex = await ToolMetadataIndex.open(indexPath);
+        await new ToolLoader(dir, undefined, { metadataIndex }).loadTools();
+        await metadataIndex.save();
+      });
+
+      const warm = await median(async () => {
+        const metadataIndex = await ToolMetadataIndex.open(indexPath);
+        await new ToolLoader(dir, undefined, { metadataIndex }).loadTools();
+        await metadataIndex.save();
+      });
+
+      rows.push({
+        tools: size,
+        'sequential (ms)': +sequential.toFixed(2),
+        'cold index (ms)': +cold.toFixed(2),
+        'warm index (ms)': +warm.toFixed(2),
+        speedup: `${(sequential / warm).toFixed(1)}x`,
+      });
+    }
+  } finally {
+    await fs.rm(root, { recursive: true, force: true });
+  }
+
+  console.log(`Tool startup, median of ${RUNS} runs`);
+  console.table(rows);
+}
+
+main().catch((error) => {
+  console.error(error);
+  process.exit(1);
+});
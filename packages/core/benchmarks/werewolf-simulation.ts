@@ -0,0 +1,429 @@
+/**
+ * Werewolf game simulation benchmark
+ *
+ * Plays thousands of werewolf games (packages/examples/werewolf-game) through
+ * the real executor without calling an LLM. Every game replays one of the
+ * recorded games in tests/integration/werewolf-game/fixtures: each game-master
+ * turn and each delegated agent's answer is queued, in order, on a
+ * MockLLMProvider of its own. Tools run for real, `random_roles` with the game
+ * number as its seed, so runs deal the same roles every time.
+ *
+ * Games run on one shared executor, --concurrency at a time. The JSON report
+ * holds games per second, per-agent latency and, per tool, the dispatch
+ * overhead: the time from a tool call being logged to its result being logged,
+ * less the tool's own wall time and, for delegate, the delegated agent's run.
+ *
+ * Run with: npm run bench:werewolf -w @nielspeter/agent-orchestration-core -- [options]
+ *   --games <n>        games to play (default: 1000)
+ *   --concurrency <n>  games in flight at once (default: 1)
+ *   --output <file>    report path (default: werewolf-simulation-report.json)
+ */
+import { AsyncLocalStorage } from 'node:async_hooks';
+import * as fs from 'fs/promises';
+import * as os from 'node:os';
+import * as path from 'node:path';
+import { fileURLToPath } from 'node:url';
+import { parseArgs } from 'node:util';
+import { Message, ToolCall } from '@/base-types';
+import { AgentSystemBuilder } from '@/config/system-builder';
+import { AgentLogger } from '@/logging';
+import { ILLMProvider } from '@/providers/llm-provider.interface';
+import { ToolExecutionMetrics } from '@/session/types';
+import { MockLLMProvider } from '../tests/mocks/mock-llm-provider';
+
+const __dirname = path.dirname(fileURLToPath(import.meta.url));
+const GAME_DIR = path.resolve(__dirname, '../../examples/werewolf-game');
+const FIXTURES_DIR = path.resolve(__dirname, '../tests/integration/werewolf-game/fixtures');
+const GAME_MASTER = 'game-master';
+
+interface FixtureEvent {
+  type: string;
+  data: Record<string, any>;
+}
+
+/** LLM responses of one recorded game, in the order the executor asks for them */
+interface GameScript {
+  fixture: string;
+  responses: Partial<Message>[];
+}
+
+interface OpenToolCall {
+  tool: string;
+  start: number;
+  /** Time spent in agents this call delegated to */
+  nestedMs: number;
+}
+
+/** Per-game state, reached from the shared provider and logger */
+interface GameState {
+  provider: MockLLMProvider;
+  agentStarts: number[];
+  openCalls: Map<string, OpenToolCall>;
+  /** Open delegate calls, innermost last; delegations run one at a time */
+  delegations: string[];
+}
+
+interface LatencyStats {
+  count: number;
+  meanMs: number;
+  p50Ms: number;
+  p95Ms: number;
+  p99Ms: number;
+}
+
+interface ToolStats {
+  calls: number;
+  errors: number;
+  meanMs: number;
+  meanToolMs: number;
+  meanOverheadMs: number;
+  p95OverheadMs: number;
+}
+
+interface SimulationReport {
+  createdAt: string;
+  node: string;
+  platform: string;
+  cpus: number;
+  fixtures: string[];
+  games: number;
+  concurrency: number;
+  elapsedMs: number;
+  gamesPerSec: number;
+  /** Games that ended before, or asked for more than, their recorded responses */
+  divergedGames: number;
+  llmCalls: number;
+  gameLatency: LatencyStats;
+  agents: Record<string, LatencyStats>;
+  tools: Record<string, ToolStats>;
+}
+
+/**
+ * Turn a recorded event stream into the LLM responses that replay it
+ *
+ * Recordings made before the delegate tool was renamed call it `task` with a
+ * `subagent_type`; those calls are replayed as `delegate`.
+ */
+function scriptFromEvents(fixture: string, events: FixtureEvent[]): GameScript {
+  const results = new Map<string, unknown>();
+  for (const { type, data } of events) {
+    if (type === 'tool_result') results.set(data.toolCallId, data.result?.content);
+  }
+
+  const turns: { content: string; toolCalls: ToolCall[] }[] = [];
+  for (const { type, data } of events) {
+    if (type === 'agent_iteration' && data.agent === GAME_MASTER) {
+      turns.push({ content: '', toolCalls: [] });
+    } else if (type === 'assistant' && data.agent === GAME_MASTER && turns.length > 0) {
+      turns[turns.length - 1].content += data.content;
+    } else if (type === 'tool_call' && data.agent === GAME_MASTER && turns.length > 0) {
+      let name = data.tool;
+      let args = data.params;
+      if (name === 'task') {
+        const { subagent_type, ...params } = args;
+        name = 'delegate';
+        args = { agent: subagent_type, ...params };
+      }
+      turns[turns.length - 1].toolCalls.push({
+        id: data.id,
+        type: 'function',
+        function: { name, arguments: JSON.stringify(args) },
+      });
+    }
+  }
+
+  const responses: Partial<Message>[] = [];
+  for (const { content, toolCalls } of turns) {
+    responses.push({ content, tool_calls: toolCalls.length > 0 ? toolCalls : undefined });
+    // Each delegated agent answers once, in the order the game master delegated
+    for (const call of toolCalls) {
+      if (call.function.name !== 'delegate') continue;
+      const answer = results.get(call.id);
+      responses.push({ content: typeof answer === 'string' ? answer : JSON.stringify(answer) });
+    }
+  }
+  return { fixture, responses };
+}
+
+/**
+ * One provider for the shared executor that answers from the current game's mock
+ */
+function gameProvider(games: AsyncLocalStorage<GameState>): ILLMProvider {
+  const current = (): MockLLMProvider => {
+    const game = games.getStore();
+    if (!game) throw new Error('LLM call outside a simulated game');
+    return game.provider;
+  };
+  return {
+    complete: (messages, tools, config) => current().complete(messages, tools, config),
+    getModelName: () => current().getModelName(),
+    getProviderName: () => current().getProviderName(),
+    supportsStreaming: () => current().supportsStreaming(),
+    getLastUsageMetrics: () => current().getLastUsageMetrics(),
+    getLastStopReason: () => current().getLastStopReason(),
+  };
+}
+
+async function loadScripts(): Promise<GameScript[]> {
+  const scripts: GameScript[] = [];
+  for (const fixture of (await fs.readdir(FIXTURES_DIR)).sort()) {
+    const file = path.join(FIXTURES_DIR, fixture, 'events.jsonl');
+    const lines = (await fs.readFile(file, 'utf8')).split('\n').filter((line) => line.trim());
+    scripts.push(scriptFromEvents(fixture, lines.map((line) => JSON.parse(line) as FixtureEvent)));
+  }
+  return scripts;
+}
+
+/**
+ * Queue a game's responses on a fresh provider, seeding random_roles with the
+ * game number
+ */
+function providerFor(script: GameScript, game: number): MockLLMProvider {
+  const provider = new MockLLMProvider();
+  for (const response of script.responses) {
+    const toolCalls = response.tool_calls?.map((call) =>
+      call.function.name === 'random_roles'
+        ? {
+            ...call,
+            function: {
+              ...call.function,
+              arguments: JSON.stringify({ ...JSON.parse(call.function.arguments), seed: game }),
+            },
+          }
+        : call
+    );
+    provider.mockResponse({ ...response, tool_calls: toolCalls });
+  }
+  return provider;
+}
+
+function percentile(sorted: number[], p: number): number {
+  return sorted[Math.min(sorted.length - 1, Math.ceil((p / 100) * sorted.length) - 1)];
+}
+
+const round = (ms: number) => Math.round(ms * 100) / 100;
+
+function latencyStats(samples: number[]): LatencyStats {
+  const sorted = [...samples].sort((a, b) => a - b);
+  return {
+    count: sorted.length,
+    meanMs: round(sorted.reduce((sum, ms) => sum + ms, 0) / sorted.length),
+    p50Ms: round(percentile(sorted, 50)),
+    p95Ms: round(percentile(sorted, 95)),
+    p99Ms: round(percentile(sorted, 99)),
+  };
+}
+
+/**
+ * Collects per-agent latencies and per-tool dispatch times from the logger
+ *
+ * The executor calls its logger from within each game's async context, so the
+ * hooks find the game they belong to through `games`.
+ */
+class SimulationRecorder {
+  readonly agentLatencies = new Map<string, number[]>();
+  readonly toolSamples = new Map<
+    string,
+    { totalMs: number[]; toolMs: number[]; overheadMs: number[]; errors: number }
+  >();
+
+  constructor(private readonly games: AsyncLocalStorage<GameState>) {}
+
+  attach(logger: AgentLogger): void {
+    const { logAgentStart, logAgentComplete, logToolCall, logToolResult } = logger;
+
+    logger.logAgentStart = (agent, depth, task) => {
+      this.games.getStore()?.agentStarts.push(performance.now());
+      logAgentStart.call(logger, agent, depth, task);
+    };
+    logger.logAgentComplete = (agent, duration) => {
+      const game = this.games.getStore();
+      const start = game?.agentStarts.pop();
+      if (game && start !== undefined) {
+        const elapsed = performance.now() - start;
+        this.push(this.agentLatencies, agent, elapsed);
+        const parentCall = game.openCalls.get(game.delegations[game.delegations.length - 1]);
+        if (parentCall) parentCall.nestedMs += elapsed;
+      }
+      logAgentComplete.call(logger, agent, duration);
+    };
+    logger.logToolCall = (agent, tool, toolId, params, metadata) => {
+      const game = this.games.getStore();
+      game?.openCalls.set(toolId, { tool, start: performance.now(), nestedMs: 0 });
+      if (tool === 'delegate') game?.delegations.push(toolId);
+      logToolCall.call(logger, agent, tool, toolId, params, metadata);
+    };
+    logger.logToolResult = (agent, tool, toolId, result, metrics) => {
+      const game = this.games.getStore();
+      const call = game?.openCalls.get(toolId);
+      if (game && call) {
+        game.openCalls.delete(toolId);
+        if (call.tool === 'delegate') game.delegations.pop();
+        this.recordTool(call, result, metrics);
+      }
+      logToolResult.call(logger, agent, tool, toolId, result, metrics);
+    };
+  }
+
+  private recordTool(call: OpenToolCall, result: unknown, metrics?: ToolExecutionMetrics): void {
+    const totalMs = performance.now() - call.start;
+    const toolMs = call.nestedMs + (metrics?.wallTimeMs ?? 0) + (metrics?.queueWaitMs ?? 0);
+    let samples = this.toolSamples.get(call.tool);
+    if (!samples) {
+      samples = { totalMs: [], toolMs: [], overheadMs: [], errors: 0 };
+      this.toolSamples.set(call.tool, samples);
+    }
+    samples.totalMs.push(totalMs);
+    samples.toolMs.push(toolMs);
+    samples.overheadMs.push(Math.max(0, totalMs - toolMs));
+    if ((result as { error?: unknown } | undefined)?.error) samples.errors++;
+  }
+
+  private push(map: Map<string, number[]>, key: string, value: number): void {
+    const values = map.get(key);
+    if (values) values.push(value);
+    else map.set(key, [value]);
+  }
+
+  reset(): void {
+    this.agentLatencies.clear();
+    this.toolSamples.clear();
+  }
+
+  toolStats(): Record<string, ToolStats> {
+    const mean = (values: number[]) => values.reduce((sum, ms) => sum + ms, 0) / values.length;
+    return Object.fromEntries(
+      [...this.toolSamples].map(([tool, samples]) => [
+        tool,
+        {
+          calls: samples.totalMs.length,
+          errors: samples.errors,
+          meanMs: round(mean(samples.totalMs)),
+          meanToolMs: round(mean(samples.toolMs)),
+          meanOverheadMs: round(mean(samples.overheadMs)),
+          p95OverheadMs: round(percentile([...samples.overheadMs].sort((a, b) => a - b), 95)),
+        },
+      ])
+    );
+  }
+}
+
+async function main(): Promise<void> {
+  const { values } = parseArgs({
+    options: {
+      games: { type: 'string', default: '1000' },
+      concurrency: { type: 'string', default: '1' },
+      output: { type: 'string', default: 'werewolf-simulation-report.json' },
+    },
+  });
+  const gameCount = Number(values.games);
+  const concurrency = Number(values.concurrency);
+
+  const scripts = await loadScripts();
+  const games = new AsyncLocalStorage<GameState>();
+
+  const system = await AgentSystemBuilder.default()
+    .withModel('test-model')
+    .withProvider(gameProvider(games))
+    .withAgentsFrom(path.join(GAME_DIR, 'agents'))
+    .withToolsFrom(path.join(GAME_DIR, 'tools'))
+    .withConsole(false)
+    .withStorage({ type: 'none' })
+    .withSafetyLimits({
+      maxIterations: 50,
+      maxDepth: 10,
+      warnAtIteration: 30,
+      maxTokensEstimate: 100000,
+    })
+    .build();
+  const recorder = new SimulationRecorder(games);
+  recorder.attach(system.logger);
+
+  let divergedGames = 0;
+  let llmCalls = 0;
+  const gameLatencies: number[] = [];
+
+  const play = async (game: number): Promise<void> => {
+    const script = scripts[game % scripts.length];
+    const state: GameState = {
+      provider: providerFor(script, game),
+      agentStarts: [],
+      openCalls: new Map(),
+      delegations: [],
+    };
+    const start = performance.now();
+    await games.run(state, () =>
+      system.executor.execute(GAME_MASTER, 'Start a werewolf game and play it to completion.')
+    );
+    gameLatencies.push(performance.now() - start);
+    llmCalls += state.provider.getCallCount();
+    if (state.provider.getCallCount() !== script.responses.length) divergedGames++;
+  };
+
+  const runGames = async (count: number): Promise<number> => {
+    let started = 0;
+    const start = performance.now();
+    await Promise.all(
+      Array.from({ length: Math.min(concurrency, count) }, async () => {
+        while (started < count) await play(started++);
+      })
+    );
+    return performance.now() - start;
+  };
+
+  try {
+    // Warm up module loading, the Python interpreter and the OS file cache
+    await runGames(scripts.length);
+    recorder.reset();
+    gameLatencies.length = 0;
+    divergedGames = 0;
+    llmCalls = 0;
+
+    const elapsedMs = await runGames(gameCount);
+    const report: SimulationReport = {
+      createdAt: new Date().toISOString(),
+      node: process.version,
+      platform: `${process.platform}-${process.arch}`,
+      cpus: os.availableParallelism(),
+      fixtures: scripts.map((script) => script.fixture),
+      games: gameCount,
+      concurrency,
+      elapsedMs: round(elapsedMs),
+      gamesPerSec: round((gameCount / elapsedMs) * 1000),
+      divergedGames,
+      llmCalls,
+      gameLatency: latencyStats(gameLatencies),
+      agents: Object.fromEntries(
+        [...recorder.agentLatencies].map(([agent, samples]) => [agent, latencyStats(samples)])
+      ),
+      tools: recorder.toolStats(),
+    };
+
+    await fs.writeFile(values.output, JSON.stringify(report, null, 2) + '\n');
+    console.log(
+      `Werewolf simulation: ${gameCount} games at concurrency ${concurrency}, ` +
+        `${report.gamesPerSec} games/s (report: ${values.output})`
+    );
+    console.table(
+      Object.entries(report.tools).map(([tool, stats]) => ({
+        tool,
+        calls: stats.calls,
+        'mean (ms)': stats.meanMs,
+        'overhead (ms)': stats.meanOverheadMs,
+        'p95 overhead (ms)': stats.p95OverheadMs,
+        errors: stats.errors,
+      }))
+    );
+    if (divergedGames > 0) {
+      console.error(`${divergedGames} game(s) did not follow their recording`);
+      process.exitCode = 1;
+    }
+  } finally {
+    await system.cleanup();
+  }
+}
+
+main().catch((error) => {
+  console.error(error);
+  process.exit(1);
+});
@@ -2,6 +2,7 @@ import { AgentLoader } from './loader';
 import { ToolRegistry } from '@/tools/registry/registry';
 import { ExecutionContext, Message } from '@/base-types';
 import { AgentLogger, LoggerFactory } from '@/logging';
+import { ILLMProvider } from '@/providers/llm-provider.interface';
 import { ResolvedSystemConfig } from '@/config/types';
 import { MiddlewarePipeline } from '@/middleware/pipeline';
 import { MiddlewareContext } from '@/middleware/middleware-types';
@@ -46,6 +47,7 @@ export class AgentExecutor {
    * @param logger - Optional custom logger (creates default if not provided)
    * @param sessionId - Optional session ID for conversation tracking
    * @param sessionManager - Optional session manager for automatic recovery
+   * @param provider - Optional provider used for every agent instead of one per model
    */
   constructor(
     private readonly agentLoader: AgentLoader,
@@ -54,7 +56,8 @@ export class AgentExecutor {
     modelName?: string,
     logger?: AgentLogger,
     sessionId?: string,
-    private readonly sessionManager?: SimpleSessionManager
+    private readonly sessionManager?: SimpleSessionManager,
+    private readonly provider?: ILLMProvider
   ) {
     this.sessionId = sessionId;
     this.logger = logger || LoggerFactory.createCombinedLogger(sessionId);
@@ -91,7 +94,8 @@ export class AgentExecutor {
           this.config.defaultBehavior,
           this.logger,
           this.config.providersConfig,
-          this.config.apiKeys
+          this.config.apiKeys,
+          this.provider
         )
       )
       .use(createSafetyChecksMiddleware(this.config.safety))
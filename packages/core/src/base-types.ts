@@ -2,6 +2,8 @@
  * Core type definitions for the agent orchestration system
  */
 
+import type { ToolExecutionMetrics } from '@/session/types';
+
 export interface ToolParameter {
   type: string;
   description: string;
@@ -28,14 +30,30 @@ export interface BaseTool {
   description: string;
   parameters: ToolSchema;
   execute: (args: Record<string, unknown>) => Promise<ToolResult>;
+  // Optional: run several calls at once, returning one result per args object in order
+  executeBatch?: (argsList: Record<string, unknown>[]) => Promise<ToolResult[]>;
+  // Optional: yield partial records as they are produced, returning the final result
+  executeStream?: (args: Record<string, unknown>) => AsyncGenerator<unknown, ToolResult, undefined>;
   isConcurrencySafe: () => boolean;
   category?: string;
   metadata?: {
     tags?: string[];
+    cache?: ToolCachePolicy;
+    schedule?: ToolSchedulePolicy;
     [key: string]: unknown;
   };
 }
 
+// Opt-in result caching for tools whose output depends only on their arguments
+export interface ToolCachePolicy {
+  ttlMs?: number; // Omit for deterministic tools (no expiry)
+}
+
+// Opt-in scheduling for tools that spawn processes, run under the registry's ToolScheduler
+export interface ToolSchedulePolicy {
+  maxConcurrency?: number; // Per-tool limit on top of the global budget
+}
+
 // Generic tool interface for typed implementations
 export interface Tool<T = Record<string, unknown>> extends Omit<BaseTool, 'execute'> {
   execute: (args: T) => Promise<ToolResult>;
@@ -44,6 +62,8 @@ export interface Tool<T = Record<string, unknown>> extends Omit<BaseTool, 'execu
 export interface ToolResult {
   content: unknown;
   error?: string;
+  // Resource usage of the execution; logged with the result, never sent to the LLM
+  metrics?: ToolExecutionMetrics;
 }
 
 // Alternative output format used by tool executor
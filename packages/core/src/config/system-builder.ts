@@ -8,12 +8,18 @@
 
 import * as fs from 'fs/promises';
 import * as fsSync from 'node:fs';
+import * as path from 'node:path';
+import { createHash } from 'node:crypto';
 import { v4 as uuidv4 } from 'uuid';
 import { Client } from '@modelcontextprotocol/sdk/client/index.js';
 import { StdioClientTransport } from '@modelcontextprotocol/sdk/client/stdio.js';
 import { AgentLoader } from '@/agents/loader';
 import { ToolRegistry } from '@/tools/registry/registry';
 import { ToolLoader } from '@/tools/registry/loader';
+import { PythonForkServer } from '@/tools/registry/python-fork-server';
+import { PythonWorkerPool } from '@/tools/registry/python-worker-pool';
+import { ToolMetadataIndex } from '@/tools/registry/metadata-index';
+import { ToolScheduler } from '@/tools/registry/tool-scheduler';
 import { AgentExecutor } from '@/agents/executor';
 import { TodoManager } from '@/todos/manager';
 import { createListTool, createReadTool, createWriteTool } from '@/tools/file.tool';
@@ -33,6 +39,7 @@ import {
   resolveConfig,
   ResolvedSystemConfig,
   SafetyConfig,
+  ScriptToolConfig,
   SessionConfig,
   StorageConfig,
   SystemConfig,
@@ -42,12 +49,14 @@ import {
 import { SessionStorage } from '@/session/types';
 import { InMemoryStorage } from '@/session/memory.storage';
 import { FilesystemStorage } from '@/session/filesystem.storage';
+import { SegmentedStorage } from '@/session/segmented.storage';
 import { NoOpStorage } from '@/session/noop.storage';
 import { EventLogger } from '@/logging/event.logger';
 import { AgentLogger, ConsoleConfig, NoOpLogger } from '@/logging';
 import { ConsoleLogger } from '@/logging/console.logger';
 import { CompositeLogger } from '@/logging/composite.logger';
 import { SimpleSessionManager } from '@/session/manager';
+import { ILLMProvider } from '@/providers/llm-provider.interface';
 
 /**
  * MCP Client wrapper for managing connections
@@ -82,6 +91,7 @@ interface FileConfig {
   };
   tools?: {
     builtin?: string[];
+    scripts?: ScriptToolConfig;
   };
   mcpServers?: Record<string, MCPConfig['servers'][string]>;
   console?:
@@ -116,6 +126,7 @@ export class AgentSystemBuilder {
   protected mcpClients: MCPClientWrapper[] = [];
   protected toolDirectories: string[] = [];
   protected storageInstance?: SessionStorage;
+  protected providerInstance?: ILLMProvider;
 
   constructor(initialConfig: Partial<SystemConfig> = {}) {
     this.config = { ...initialConfig };
@@ -145,6 +156,16 @@ export class AgentSystemBuilder {
     return this.with({ apiKeys: keys });
   }
 
+  /**
+   * Use one provider instance for every agent
+   * Skips provider creation from providers config, e.g. for mocks in tests and benchmarks
+   */
+  withProvider(provider: ILLMProvider): AgentSystemBuilder {
+    const newBuilder = this.with({});
+    newBuilder.providerInstance = provider;
+    return newBuilder;
+  }
+
   /**
    * Set agent directories
    */
@@ -238,6 +259,18 @@ export class AgentSystemBuilder {
     return this;
   }
 
+  /**
+   * Configure the runtime for script tools (e.g. the resident Python worker pool)
+   */
+  withScriptTools(config: ScriptToolConfig): AgentSystemBuilder {
+    return this.with({
+      tools: {
+        ...this.config.tools,
+        scripts: { ...this.config.tools?.scripts, ...config },
+      },
+    });
+  }
+
   /**
    * Configure safety limits
    */
@@ -298,10 +331,10 @@ export class AgentSystemBuilder {
   /**
    * Configure storage for session persistence
    */
-  withStorage(type: 'memory' | 'filesystem', path?: string): AgentSystemBuilder;
+  withStorage(type: 'memory' | 'filesystem' | 'segmented', path?: string): AgentSystemBuilder;
   withStorage(storage: StorageConfig | SessionStorage): AgentSystemBuilder;
   withStorage(
-    storageOrType: StorageConfig | SessionStorage | 'memory' | 'filesystem',
+    storageOrType: StorageConfig | SessionStorage | 'memory' | 'filesystem' | 'segmented',
     path?: string
   ): AgentSystemBuilder {
     // If it's a string type, create a StorageConfig
@@ -322,13 +355,16 @@ export class AgentSystemBuilder {
       newBuilder.mcpClients = [...this.mcpClients];
       newBuilder.toolDirectories = [...this.toolDirectories];
       newBuilder.storageInstance = storage;
+      newBuilder.providerInstance = this.providerInstance;
 
       // Also set the storage type in config based on the instance type
-      // This ensures EventLogger is created for InMemoryStorage/FilesystemStorage
+      // This ensures EventLogger is created for InMemoryStorage/FilesystemStorage/SegmentedStorage
       if (storage instanceof InMemoryStorage) {
         newBuilder.config.storage = { type: 'memory' };
       } else if (storage instanceof FilesystemStorage) {
         newBuilder.config.storage = { type: 'filesystem' };
+      } else if (storage instanceof SegmentedStorage) {
+        newBuilder.config.storage = { type: 'segmented' };
       }
       // NoOpStorage keeps the default 'none' type
 
@@ -359,6 +395,7 @@ export class AgentSystemBuilder {
     newBuilder.mcpClients = [...this.mcpClients];
     newBuilder.toolDirectories = [...this.toolDirectories];
     newBuilder.storageInstance = this.storageInstance;
+    newBuilder.providerInstance = this.providerInstance;
     return newBuilder;
   }
 
@@ -447,7 +484,7 @@ export class AgentSystemBuilder {
 
     // Create storage based on config
     const storageConfig = config.storage;
-    const validStorageTypes = ['none', 'memory', 'filesystem'] as const;
+    const validStorageTypes = ['none', 'memory', 'filesystem', 'segmented'] as const;
     type ValidStorageType = (typeof validStorageTypes)[number];
 
     // Validate storage type to prevent silent data loss
@@ -468,8 +505,14 @@ export class AgentSystemBuilder {
         return new NoOpStorage();
       case 'memory':
         return new InMemoryStorage();
-      case 'filesystem':
-        return new FilesystemStorage(storageConfig.options?.path);
+      case 'filesystem': {
+        const { path: storagePath, ...writeOptions } = storageConfig.options ?? {};
+        return new FilesystemStorage(storagePath, writeOptions);
+      }
+      case 'segmented': {
+        const { path: storagePath, ...segmentOptions } = storageConfig.options ?? {};
+        return new SegmentedStorage(storagePath, segmentOptions);
+      }
       default:
         // This should never be reached due to validation above
         // But TypeScript doesn't know that, so we need this for exhaustiveness
@@ -500,8 +543,11 @@ export class AgentSystemBuilder {
     const eventLogger = new EventLogger(storage, sessionId);
     loggers.push(eventLogger);
 
-    // Always create session manager with the storage
-    const sessionManager = new SimpleSessionManager(storage);
+    // Always create session manager with the storage, checkpointing as events are logged
+    const sessionManager = new SimpleSessionManager(storage, {
+      checkpointInterval: config.session.checkpointInterval,
+    });
+    sessionManager.checkpointPeriodically(eventLogger, sessionId);
 
     // Console logger is EXPLICIT (now top-level)
     if (config.console) {
@@ -644,7 +690,10 @@ export class AgentSystemBuilder {
    */
   private async registerCustomTools(
     toolRegistry: ToolRegistry,
-    logger: AgentLogger
+    logger: AgentLogger,
+    workerPool?: PythonWorkerPool,
+    forkServer?: PythonForkServer,
+    metadataCacheDir?: string
   ): Promise<void> {
     // Register custom tools
     for (const tool of this.customTools) {
@@ -654,22 +703,45 @@ export class AgentSystemBuilder {
     // Load tools from directories
     for (const directory of this.toolDirectories) {
       logger.logSystemMessage(`Loading tools from directory: ${directory}`);
-      const toolLoader = new ToolLoader(directory, logger);
-      const toolNames = await toolLoader.listTools();
-      logger.logSystemMessage(`Found ${toolNames.length} tool(s): ${toolNames.join(', ')}`);
+      const metadataIndex = metadataCacheDir
+        ? await ToolMetadataIndex.open(this.getMetadataIndexPath(metadataCacheDir, directory))
+        : undefined;
+      const toolLoader = new ToolLoader(directory, logger, {
+        workerPool,
+        forkServer,
+        metadataIndex,
+      });
+      const { tools, failures } = await toolLoader.loadTools();
+      logger.logSystemMessage(
+        `Found ${tools.length + failures.length} tool(s): ${tools.map((t) => t.name).join(', ')}`
+      );
 
-      for (const toolName of toolNames) {
-        try {
-          const tool = await toolLoader.loadTool(toolName);
-          toolRegistry.register(tool);
-          logger.logSystemMessage(`✓ Loaded tool: ${toolName} from ${directory}`);
-        } catch (error) {
-          logger.logSystemMessage(`ERROR: Failed to load tool ${toolName}: ${error}`);
-        }
+      for (const tool of tools) {
+        toolRegistry.register(tool);
+        logger.logSystemMessage(`✓ Loaded tool: ${tool.name} from ${directory}`);
+      }
+      for (const { name, error } of failures) {
+        logger.logSystemMessage(`ERROR: Failed to load tool ${name}: ${error}`);
+      }
+
+      if (metadataIndex) {
+        const { hits, misses } = metadataIndex.getStats();
+        logger.logSystemMessage(`Tool metadata index: ${hits} hit(s), ${misses} parsed`);
+        await metadataIndex.save().catch((error) => {
+          logger.logSystemMessage(`WARNING: Failed to save tool metadata index: ${error}`);
+        });
       }
     }
   }
 
+  /**
+   * Index file for a tool directory, named after a hash of its absolute path
+   */
+  private getMetadataIndexPath(cacheDir: string, directory: string): string {
+    const key = createHash('sha1').update(path.resolve(directory)).digest('hex').slice(0, 16);
+    return path.join(cacheDir, 'tools', `${key}.json`);
+  }
+
   /**
    * Initialize MCP servers and register their tools
    */
@@ -833,10 +905,22 @@ export class AgentSystemBuilder {
   }
 
   /**
-   * Create cleanup function for MCP clients
+   * Create cleanup function for MCP clients and script tool workers
    */
-  private createCleanupFunction(): () => Promise<void> {
+  private createCleanupFunction(
+    storage: SessionStorage,
+    workerPool?: PythonWorkerPool,
+    forkServer?: PythonForkServer
+  ): () => Promise<void> {
     return async () => {
+      // Stop resident Python workers and the fork server's zygote
+      if (workerPool) {
+        await workerPool.shutdown();
+      }
+      if (forkServer) {
+        await forkServer.shutdown();
+      }
+
       // Cleanup MCP clients
       for (const wrapper of this.mcpClients) {
         try {
@@ -847,6 +931,13 @@ export class AgentSystemBuilder {
           console.error(`Error closing MCP client ${wrapper.serverName}:`, error);
         }
       }
+
+      // Write out buffered session events and close their files
+      try {
+        await storage.close?.();
+      } catch (error) {
+        console.error('Error closing session storage:', error);
+      }
     };
   }
 
@@ -892,9 +983,36 @@ export class AgentSystemBuilder {
     }
 
     // Setup tools
-    const toolRegistry = new ToolRegistry();
+    const maxConcurrentProcesses = resolvedConfig.tools.scripts?.maxConcurrentProcesses;
+    const toolRegistry = new ToolRegistry(
+      undefined,
+      maxConcurrentProcesses
+        ? new ToolScheduler({ maxConcurrent: maxConcurrentProcesses })
+        : undefined
+    );
     const todoManager = await this.registerBuiltinTools(toolRegistry, resolvedConfig, agentLoader);
-    await this.registerCustomTools(toolRegistry, logger);
+    // Workers are spawned lazily, only when a resident tool is first called
+    const workerPool =
+      this.toolDirectories.length > 0
+        ? new PythonWorkerPool(resolvedConfig.tools.scripts?.workerPool)
+        : undefined;
+    // The zygote starts on the first call of a fork tool; fork() is POSIX-only
+    const forkServer =
+      this.toolDirectories.length > 0 && process.platform !== 'win32'
+        ? new PythonForkServer(resolvedConfig.tools.scripts?.forkServer)
+        : undefined;
+    const metadataCacheDir =
+      resolvedConfig.tools.scripts?.metadataCacheDir ??
+      (storage instanceof FilesystemStorage || storage instanceof SegmentedStorage
+        ? storage.getCacheDir()
+        : undefined);
+    await this.registerCustomTools(
+      toolRegistry,
+      logger,
+      workerPool,
+      forkServer,
+      metadataCacheDir
+    );
 
     // Initialize MCP if configured
     await this.initializeMCPServers(toolRegistry, resolvedConfig, logger);
@@ -919,7 +1037,8 @@ export class AgentSystemBuilder {
       resolvedConfig.model,
       logger,
       resolvedConfig.session.sessionId,
-      sessionManager // Pass session manager for automatic recovery
+      sessionManager, // Pass session manager for automatic recovery
+      this.providerInstance
     );
 
     // Session recovery is handled automatically by the executor.
@@ -942,7 +1061,7 @@ export class AgentSystemBuilder {
       storage,
       logger,
       eventLogger,
-      cleanup: this.createCleanupFunction(),
+      cleanup: this.createCleanupFunction(storage, workerPool, forkServer),
     };
   }
 
@@ -988,6 +1107,7 @@ export class AgentSystemBuilder {
     if (config.builtinTools || config.tools) {
       systemConfig.tools = {
         builtin: config.builtinTools?.tools || config.tools?.builtin || [],
+        ...(config.tools?.scripts && { scripts: config.tools.scripts }),
       };
     }
 
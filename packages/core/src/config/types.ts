@@ -11,6 +11,10 @@
 
 import { BaseTool } from '@/base-types';
 import type { ConsoleConfig } from '@/logging';
+import type { FilesystemStorageOptions } from '@/session/filesystem.storage';
+import type { SegmentedStorageOptions } from '@/session/segmented.storage';
+import type { PythonForkServerOptions } from '@/tools/registry/python-fork-server';
+import type { PythonWorkerPoolOptions } from '@/tools/registry/python-worker-pool';
 import { DEFAULTS } from './defaults';
 
 /**
@@ -152,6 +156,26 @@ export interface TestAgentConfig {
   prompt: string;
 }
 
+/**
+ * Script tool runtime configuration
+ */
+export interface ScriptToolConfig {
+  /** Warm worker pool for Python tools declaring `execution: resident` */
+  workerPool?: PythonWorkerPoolOptions;
+  /** Fork server for Python tools declaring `execution: fork` (not available on Windows) */
+  forkServer?: PythonForkServerOptions;
+  /**
+   * Directory for the persistent tool metadata index (default: `.cache` under
+   * the filesystem or segmented storage path; no index is kept with other storage types)
+   */
+  metadataCacheDir?: string;
+  /**
+   * Maximum script tool processes running at once across all agents of the
+   * system (default: the process-wide scheduler, sized to the CPU core count)
+   */
+  maxConcurrentProcesses?: number;
+}
+
 /**
  * Tool configuration
  */
@@ -164,6 +188,8 @@ export interface ToolConfig {
   defaultTimeoutMs?: number;
   /** Maximum concurrent tool executions */
   maxConcurrentTools?: number;
+  /** Runtime settings for script tools loaded from directories */
+  scripts?: ScriptToolConfig;
 }
 
 /**
@@ -233,6 +259,8 @@ export interface SessionConfig {
   sessionId?: string;
   /** Session timeout in ms */
   timeout?: number;
+  /** Events between recovery checkpoints; 0 disables checkpoints (default: 1000) */
+  checkpointInterval?: number;
 }
 
 /**
@@ -249,13 +277,13 @@ export interface TodoConfig {
  * Storage configuration for session persistence
  */
 export interface StorageConfig {
-  /** Storage type: 'none' | 'memory' | 'filesystem' */
-  type: 'none' | 'memory' | 'filesystem';
+  /** Storage type: 'none' | 'memory' | 'filesystem' | 'segmented' */
+  type: 'none' | 'memory' | 'filesystem' | 'segmented';
   /** Storage-specific options */
   options?: {
-    /** Path for filesystem storage */
+    /** Path for filesystem and segmented storage */
     path?: string;
-  };
+  } & FilesystemStorageOptions & SegmentedStorageOptions;
 }
 
 /**
@@ -333,6 +361,7 @@ export const DEFAULT_SYSTEM_CONFIG: ResolvedSystemConfig = {
     custom: [],
     defaultTimeoutMs: 30000,
     maxConcurrentTools: 5,
+    scripts: {},
   },
 
   safety: {
@@ -40,5 +40,19 @@ export {
   formatSanitizationIssues,
 } from './session/message-sanitizer';
 export type { SanitizationResult, SanitizationIssue } from './session/message-sanitizer';
-export { InMemoryStorage, FilesystemStorage, NoOpStorage } from './session';
-export type { SessionStorage, SessionEvent, AnySessionEvent } from './session/types';
+export { InMemoryStorage, FilesystemStorage, SegmentedStorage, NoOpStorage } from './session';
+export type {
+  SessionStorage,
+  SessionEvent,
+  AnySessionEvent,
+  ReadEventsOptions,
+  SessionCheckpoint,
+  SessionEventRecord,
+} from './session/types';
+export type {
+  FilesystemStorageOptions,
+  FsyncPolicy,
+  SegmentedStorageOptions,
+  SegmentRetentionPolicy,
+  RetentionResult,
+} from './session';
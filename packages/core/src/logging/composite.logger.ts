@@ -1,5 +1,5 @@
 import { AgentLogger } from './types';
-import { LLMMetadata } from '@/session/types';
+import { LLMMetadata, ToolExecutionMetrics } from '@/session/types';
 
 export class CompositeLogger implements AgentLogger {
   private readonly loggers: AgentLogger[];
@@ -64,9 +64,15 @@ export class CompositeLogger implements AgentLogger {
     );
   }
 
-  logToolResult(agent: string, tool: string, toolId: string, result: unknown): void {
+  logToolResult(
+    agent: string,
+    tool: string,
+    toolId: string,
+    result: unknown,
+    metrics?: ToolExecutionMetrics
+  ): void {
     this.executeWithErrorIsolation(
-      (logger) => logger.logToolResult(agent, tool, toolId, result),
+      (logger) => logger.logToolResult(agent, tool, toolId, result, metrics),
       'logToolResult'
     );
   }
@@ -117,6 +123,20 @@ export class CompositeLogger implements AgentLogger {
     this.executeWithErrorIsolation((logger) => logger.logAgentError(agent, error), 'logAgentError');
   }
 
+  logToolProgress(
+    agent: string,
+    tool: string,
+    toolId: string,
+    record: unknown,
+    index: number
+  ): void {
+    this.executeWithErrorIsolation((logger) => {
+      if (logger.logToolProgress) {
+        logger.logToolProgress(agent, tool, toolId, record, index);
+      }
+    }, 'logToolProgress');
+  }
+
   logTodoUpdate(todos: Array<{ content: string; status: string; activeForm?: string }>): void {
     this.executeWithErrorIsolation((logger) => {
       if (logger.logTodoUpdate) {
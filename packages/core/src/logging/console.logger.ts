@@ -241,6 +241,24 @@ export class ConsoleLogger implements AgentLogger {
     console.log(`${indent}${timestamp}${this.color('  ✓', 'green')} ${resultStr}`);
   }
 
+  logToolProgress(
+    agent: string,
+    _tool: string,
+    _toolId: string,
+    record: unknown,
+    index: number
+  ): void {
+    if (this.verbosity !== 'verbose') return;
+
+    const indent = this.getIndent(agent);
+    const timestamp = this.formatTimestamp();
+    let recordStr = JSON.stringify(record) ?? String(record);
+    if (recordStr.length > 200) {
+      recordStr = recordStr.substring(0, 200) + '...';
+    }
+    console.log(`${indent}${timestamp}${this.color(`  … #${index + 1}`, 'dim')} ${recordStr}`);
+  }
+
   logToolError(agent: string, tool: string, _toolId: string, error: Error): void {
     const indent = this.getIndent(agent);
     const timestamp = this.formatTimestamp();
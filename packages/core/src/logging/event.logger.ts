@@ -6,6 +6,7 @@ import {
   LLMMetadata,
   SessionStorage,
   ToolCallEvent,
+  ToolExecutionMetrics,
   ToolResultEvent,
   UserMessageEvent,
 } from '@/session/types';
@@ -149,7 +150,13 @@ export class EventLogger implements AgentLogger {
     // Actual execution is already tracked by tool_call event
   }
 
-  logToolResult(_agent: string, _tool: string, toolId: string, result: unknown): void {
+  logToolResult(
+    _agent: string,
+    _tool: string,
+    toolId: string,
+    result: unknown,
+    metrics?: ToolExecutionMetrics
+  ): void {
     // Calculate size for token estimation with circular reference protection
     let resultStr: string;
     let resultSizeBytes: number;
@@ -174,6 +181,7 @@ export class EventLogger implements AgentLogger {
         result,
         resultSizeBytes,
         estimatedTokens,
+        ...(metrics && { metrics }),
       },
     };
 
@@ -190,6 +198,30 @@ export class EventLogger implements AgentLogger {
     });
   }
 
+  logToolProgress(
+    agent: string,
+    tool: string,
+    toolId: string,
+    record: unknown,
+    index: number
+  ): void {
+    const event = {
+      type: 'tool_progress',
+      timestamp: Date.now(),
+      data: {
+        agent,
+        tool,
+        toolId,
+        index,
+        record,
+      },
+    };
+
+    // Only forwarded to subscribers of 'tool:progress', not persisted: a stream can
+    // produce many records and the final tool_result already carries its summary
+    this.emitter.emit('tool:progress', event);
+  }
+
   logDelegation(parent: string, child: string, task: string): void {
     // Delegation is tracked through tool calls to the Delegate tool
     // This is additional metadata that could be stored if needed
@@ -357,8 +389,10 @@ export class EventLogger implements AgentLogger {
 
   async getSessionEvents(): Promise<AnySessionEvent[]> {
     // Return events from storage, properly typed
-    const events = await this.storage.readEvents(this.sessionId);
-    // Filter to only return properly typed session events
+    // Only properly typed session events are returned; storage skips the rest unparsed
+    const events = await this.storage.readEvents(this.sessionId, {
+      types: ['user', 'assistant', 'tool_call', 'tool_result'],
+    });
     return events.filter(
       (e): e is AnySessionEvent =>
         typeof e === 'object' &&
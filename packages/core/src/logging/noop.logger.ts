@@ -18,6 +18,13 @@ export class NoOpLogger implements AgentLogger {
   logToolExecution(_agent: string, _tool: string, _toolId: string): void {}
   logToolResult(_agent: string, _tool: string, _toolId: string, _result: unknown): void {}
   logToolError(_agent: string, _tool: string, _toolId: string, _error: Error): void {}
+  logToolProgress(
+    _agent: string,
+    _tool: string,
+    _toolId: string,
+    _record: unknown,
+    _index: number
+  ): void {}
   logDelegation(_parent: string, _child: string, _task: string): void {}
   logDelegationComplete(_parent: string, _child: string, _result: string): void {}
   logAgentStart(_agent: string, _depth: number, _task?: string): void {}
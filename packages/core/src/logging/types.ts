@@ -1,4 +1,4 @@
-import { LLMMetadata } from '@/session/types';
+import { LLMMetadata, ToolExecutionMetrics } from '@/session/types';
 
 export interface AgentLogger {
   logUserMessage(content: string): void;
@@ -13,8 +13,21 @@ export interface AgentLogger {
     metadata?: LLMMetadata
   ): void;
   logToolExecution(agent: string, tool: string, toolId: string): void;
-  logToolResult(agent: string, tool: string, toolId: string, result: unknown): void;
+  logToolResult(
+    agent: string,
+    tool: string,
+    toolId: string,
+    result: unknown,
+    metrics?: ToolExecutionMetrics
+  ): void;
   logToolError(agent: string, tool: string, toolId: string, error: Error): void;
+  logToolProgress?(
+    agent: string,
+    tool: string,
+    toolId: string,
+    record: unknown,
+    index: number
+  ): void;
 
   logDelegation(parent: string, child: string, task: string): void;
   logDelegationComplete(parent: string, child: string, result: string): void;
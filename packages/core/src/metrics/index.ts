@@ -1,5 +1,7 @@
 // Metrics module exports
 export { LLMMetricsCollector } from './llm-metrics-collector';
+export { ToolMetricsCollector } from './tool-metrics-collector';
 
 // Export types
 export type { DetailedLLMMetrics, ModelPricing, LLMSessionSummary } from './llm-metrics-collector';
+export type { ToolMetricsSummary } from './tool-metrics-collector';
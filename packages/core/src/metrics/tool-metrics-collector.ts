@@ -0,0 +1,100 @@
+import type { ToolExecutionMetrics } from '@/session/types';
+
+export interface ToolMetricsSummary {
+  toolName: string;
+  calls: number;
+  errors: number;
+
+  // Timing (per call)
+  totalWallTimeMs: number;
+  avgWallTimeMs: number;
+  maxWallTimeMs: number;
+  totalQueueWaitMs: number;
+
+  // Process usage, summed over calls that reported it
+  totalCpuUserMs: number;
+  totalCpuSystemMs: number;
+  peakRssKb: number;
+
+  // I/O
+  totalStdinBytes: number;
+  totalStdoutBytes: number;
+}
+
+/**
+ * Aggregates per-invocation tool metrics by tool name
+ *
+ * Calls that shared one execution (a batch) report the same metrics with
+ * `batchSize` set; their time, CPU and bytes are split evenly between the
+ * calls so totals count the execution once.
+ */
+export class ToolMetricsCollector {
+  private readonly tools = new Map<string, ToolMetricsSummary>();
+
+  /**
+   * Record one tool call
+   * @param toolName The tool that was called
+   * @param metrics Measurements reported for the call
+   * @param failed Whether the call returned an error
+   */
+  recordExecution(toolName: string, metrics: ToolExecutionMetrics, failed = false): void {
+    const summary = this.tools.get(toolName) ?? this.createSummary(toolName);
+    const share = 1 / (metrics.batchSize ?? 1);
+
+    summary.calls++;
+    if (failed) summary.errors++;
+
+    const wallTimeMs = (metrics.wallTimeMs ?? 0) * share;
+    summary.totalWallTimeMs += wallTimeMs;
+    summary.avgWallTimeMs = summary.totalWallTimeMs / summary.calls;
+    summary.maxWallTimeMs = Math.max(summary.maxWallTimeMs, metrics.wallTimeMs ?? 0);
+    summary.totalQueueWaitMs += metrics.queueWaitMs ?? 0;
+
+    summary.totalCpuUserMs += (metrics.cpuUserMs ?? 0) * share;
+    summary.totalCpuSystemMs += (metrics.cpuSystemMs ?? 0) * share;
+    summary.peakRssKb = Math.max(summary.peakRssKb, metrics.maxRssKb ?? 0);
+
+    summary.totalStdinBytes += (metrics.stdinBytes ?? 0) * share;
+    summary.totalStdoutBytes += (metrics.stdoutBytes ?? 0) * share;
+
+    this.tools.set(toolName, summary);
+  }
+
+  /**
+   * Get the summary for every recorded tool, slowest (by total wall time) first
+   */
+  getToolSummaries(): ToolMetricsSummary[] {
+    return [...this.tools.values()]
+      .map((summary) => ({ ...summary }))
+      .sort((a, b) => b.totalWallTimeMs - a.totalWallTimeMs);
+  }
+
+  /**
+   * Get the summary for one tool
+   */
+  getToolSummary(toolName: string): ToolMetricsSummary | undefined {
+    const summary = this.tools.get(toolName);
+    return summary && { ...summary };
+  }
+
+  reset(): void {
+    this.tools.clear();
+  }
+
+  private createSummary(toolName: string): ToolMetricsSummary {
+    return {
+      toolName,
+      calls: 0,
+      errors: 0,
+      totalWallTimeMs: 0,
+      avgWallTimeMs: 0,
+      maxWallTimeMs: 0,
+      totalQueueWaitMs: 0,
+      totalCpuUserMs: 0,
+      totalCpuSystemMs: 0,
+      peakRssKb: 0,
+      totalStdinBytes: 0,
+      totalStdoutBytes: 0,
+    };
+  }
+}
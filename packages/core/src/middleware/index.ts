@@ -9,7 +9,9 @@ export { createSmartRetryMiddleware } from './smart-retry.middleware';
 export { createThinkingMiddleware } from './thinking.middleware';
 export { createToolExecutionMiddleware } from './tool-execution.middleware';
 export { MiddlewarePipeline } from './pipeline';
+export { TokenLedger, getTokenLedger } from './token-ledger';
 
 // Export types
 export type { MiddlewareContext, Middleware } from './middleware-types';
 export type { SmartRetryConfig } from './smart-retry.middleware';
+export type { Tokenizer } from './token-ledger';
@@ -1,5 +1,6 @@
 import { Middleware } from './middleware-types';
 import { LLMMetadata } from '@/session/types';
+import { getTokenLedger } from './token-ledger';
 
 /**
  * Calls the LLM and gets a response
@@ -39,6 +40,12 @@ export function createLLMCallMiddleware(): Middleware {
     const usageMetrics = ctx.provider.getLastUsageMetrics?.();
 
     if (usageMetrics) {
+      // The provider counted exactly what was sent; anchor the running estimate to it
+      getTokenLedger(ctx).reconcile(
+        ctx.messages,
+        usageMetrics.contextTokens ?? usageMetrics.promptTokens
+      );
+
       // Get provider name directly from the provider instance if available
       const providerName = ctx.provider.getProviderName?.() || 'unknown';
       const modelName = ctx.provider.getModelName?.() || ctx.agent?.model || 'unknown';
@@ -3,6 +3,7 @@ import { Agent, ModelConfig, NormalizedThinkingConfig } from '@/config/types';
 import { AgentLogger } from '@/logging';
 import { ILLMProvider } from '@/providers/llm-provider.interface';
 import { ProviderWithConfig } from '@/providers/provider-factory';
+import { TokenLedger } from './token-ledger';
 
 /**
  * Context object that flows through the middleware pipeline
@@ -31,6 +32,9 @@ export interface MiddlewareContext {
   // Conversation state
   messages: Message[];
 
+  // Running token count for messages, see getTokenLedger()
+  tokenLedger?: TokenLedger;
+
   // Current iteration (for the execution loop)
   iteration: number;
 
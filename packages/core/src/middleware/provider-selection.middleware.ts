@@ -2,17 +2,20 @@ import { Middleware } from './middleware-types';
 import { ProviderFactory } from '@/providers/provider-factory';
 import { AgentLogger } from '@/logging';
 import type { ProvidersConfig } from '@/config/types';
+import { ILLMProvider } from '@/providers/llm-provider.interface';
 
 /**
  * Selects the appropriate provider based on model name
- * Uses ProviderFactory to dynamically create the right provider
+ * Uses ProviderFactory to dynamically create the right provider, unless a
+ * provider instance was injected, which then serves every agent
  */
 export function createProviderSelectionMiddleware(
   defaultModelName: string,
   defaultBehaviorName: string,
   logger?: AgentLogger,
   providedConfig?: ProvidersConfig,
-  apiKeys?: Record<string, string>
+  apiKeys?: Record<string, string>,
+  injectedProvider?: ILLMProvider
 ): Middleware {
   return async (ctx, next) => {
     // Use agent's model preference if specified, otherwise use default
@@ -57,13 +60,15 @@ export function createProviderSelectionMiddleware(
       ctx.behaviorSettings = { temperature, top_p };
 
       // NOW create provider with the resolved behavior settings
-      const { provider, modelConfig } = ProviderFactory.createWithConfig(
-        modelName,
-        providersConfig,
-        logger,
-        ctx.behaviorSettings,
-        apiKeys
-      );
+      const { provider, modelConfig } = injectedProvider
+        ? { provider: injectedProvider, modelConfig: undefined }
+        : ProviderFactory.createWithConfig(
+            modelName,
+            providersConfig,
+            logger,
+            ctx.behaviorSettings,
+            apiKeys
+          );
       ctx.provider = provider;
       ctx.modelConfig = modelConfig;
       ctx.modelName = provider.getModelName();
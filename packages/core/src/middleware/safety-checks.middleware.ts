@@ -1,6 +1,7 @@
 import { Middleware } from './middleware-types';
 import { SafetyConfig } from '@/config/types';
 import { DEFAULTS } from '@/config/defaults';
+import { getTokenLedger } from './token-ledger';
 
 /**
  * Performs safety checks (depth, iterations, tokens)
@@ -40,8 +41,8 @@ export function createSafetyChecksMiddleware(safetyLimits: SafetyConfig): Middle
       console.warn(`⚠️ High iteration count: ${ctx.iteration} - possible complex task`);
     }
 
-    // Check token estimate
-    const estimatedTokens = JSON.stringify(ctx.messages).length / 4;
+    // Check token estimate (counted incrementally, reconciled with provider usage)
+    const estimatedTokens = getTokenLedger(ctx).total(ctx.messages);
     // Use model's context length if available, otherwise fall back to config or default
     const maxTokens =
       ctx.modelConfig?.contextLength ||
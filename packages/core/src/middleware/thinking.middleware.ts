@@ -2,7 +2,7 @@ import { readFileSync } from 'node:fs';
 import { join } from 'node:path';
 import { Agent, ModelConfig, NormalizedThinkingConfig, ThinkingConfig } from '@/config/types';
 import { Middleware, MiddlewareContext } from './middleware-types';
-import { Message } from '@/base-types';
+import { getTokenLedger } from './token-ledger';
 
 /**
  * ThinkingMiddleware - Configuration-driven thinking/reasoning support
@@ -310,7 +310,7 @@ export class ThinkingMiddleware {
    * @returns True if total tokens (messages + thinking) < 90% of context
    */
   private checkContextWindow(ctx: MiddlewareContext, modelConfig: ModelConfig | null): boolean {
-    const messageTokens = this.estimateMessageTokens(ctx.messages);
+    const messageTokens = getTokenLedger(ctx).total(ctx.messages);
     const thinkingBudget = ctx.thinkingConfig?.budgetTokens || 0;
     const totalTokens = messageTokens + thinkingBudget;
 
@@ -331,7 +331,7 @@ export class ThinkingMiddleware {
   private adjustBudget(ctx: MiddlewareContext, modelConfig: ModelConfig | null): void {
     if (!ctx.thinkingConfig) return;
 
-    const messageTokens = this.estimateMessageTokens(ctx.messages);
+    const messageTokens = getTokenLedger(ctx).total(ctx.messages);
     const contextLimit = modelConfig?.contextLength || THINKING_DEFAULTS.DEFAULT_CONTEXT_LENGTH;
     // CRITICAL: Use Math.max to prevent negative budget when messages exceed context limit
     const maxThinkingSpace = Math.floor(
@@ -369,56 +369,6 @@ export class ThinkingMiddleware {
       metrics.totalTokensUsed < this.globalBudgetLimit && metrics.totalCost < this.globalCostLimit
     );
   }
-
-  /**
-   * Estimate token count for messages
-   *
-   * Uses improved character-based estimation with:
-   * - Message formatting overhead (~4 tokens per message)
-   * - Different ratios for text vs JSON content
-   * - Tool call token counting
-   * - 10% safety margin for encoding variations
-   *
-   * @param messages Messages to estimate tokens for
-   * @returns Estimated token count
-   */
-  private estimateMessageTokens(messages: Message[]): number {
-    let totalTokens = 0;
-
-    for (const msg of messages) {
-      // Message formatting overhead (role markers, JSON structure)
-      // Anthropic/OpenAI: ~4 tokens per message
-      totalTokens += 4;
-
-      // Content tokens
-      if (msg.content) {
-        const content = typeof msg.content === 'string' ? msg.content : JSON.stringify(msg.content);
-        // More accurate: length / 3.5 for mixed content
-        // English text: ~4 chars/token, JSON: ~3 chars/token
-        totalTokens += Math.ceil(content.length / 3.5);
-      }
-
-      // Tool call tokens (name + JSON arguments)
-      if (msg.tool_calls) {
-        for (const tc of msg.tool_calls) {
-          // Tool name: usually short, ~4 chars/token
-          totalTokens += Math.ceil(tc.function.name.length / 4);
-          // Arguments: JSON, denser encoding ~3 chars/token
-          totalTokens += Math.ceil(tc.function.arguments.length / 3);
-          // Tool call structure overhead
-          totalTokens += 10;
-        }
-      }
-
-      // Tool result ID tokens
-      if (msg.role === 'tool' && msg.tool_call_id) {
-        totalTokens += Math.ceil(msg.tool_call_id.length / 4);
-      }
-    }
-
-    // Add 10% safety margin for encoding variations
-    return Math.ceil(totalTokens * 1.1);
-  }
 }
 
 /**
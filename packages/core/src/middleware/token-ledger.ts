@@ -0,0 +1,175 @@
+import { Message } from '@/base-types';
+import { ILLMProvider } from '@/providers/llm-provider.interface';
+import { MiddlewareContext } from './middleware-types';
+
+/**
+ * Counts tokens in a piece of text, e.g. with a provider's tokenizer
+ */
+export interface Tokenizer {
+  // Identifies the tokenizer, so a ledger is rebuilt when the model changes
+  id: string;
+  countTokens(text: string): number;
+}
+
+// Safety margin applied to character-based estimates for encoding variations
+const ESTIMATE_MARGIN = 1.1;
+
+/**
+ * Estimate token count for one message, before any safety margin
+ *
+ * Without a tokenizer this uses character-based estimation with:
+ * - Message formatting overhead (~4 tokens per message)
+ * - Different ratios for text vs JSON content
+ * - Tool call token counting
+ *
+ * @param msg Message to count
+ * @param tokenizer Optional tokenizer that replaces the character ratios
+ * @returns Estimated token count
+ */
+export function estimateMessageTokens(msg: Message, tokenizer?: Tokenizer): number {
+  const count = (text: string, charsPerToken: number) =>
+    tokenizer ? tokenizer.countTokens(text) : Math.ceil(text.length / charsPerToken);
+
+  // Message formatting overhead (role markers, JSON structure)
+  // Anthropic/OpenAI: ~4 tokens per message
+  let tokens = 4;
+
+  // Content tokens
+  if (msg.content) {
+    const content = typeof msg.content === 'string' ? msg.content : JSON.stringify(msg.content);
+    // More accurate: length / 3.5 for mixed content
+    // English text: ~4 chars/token, JSON: ~3 chars/token
+    tokens += count(content, 3.5);
+  }
+
+  // Tool call tokens (name + JSON arguments)
+  if (msg.tool_calls) {
+    for (const tc of msg.tool_calls) {
+      // Tool name: usually short, ~4 chars/token
+      tokens += count(tc.function.name, 4);
+      // Arguments: JSON, denser encoding ~3 chars/token
+      tokens += count(tc.function.arguments, 3);
+      // Tool call structure overhead
+      tokens += 10;
+    }
+  }
+
+  // Tool result ID tokens
+  if (msg.role === 'tool' && msg.tool_call_id) {
+    tokens += count(msg.tool_call_id, 4);
+  }
+
+  return tokens;
+}
+
+/**
+ * Running token count for a conversation
+ *
+ * Messages are counted once, when they are first seen at the end of the
+ * conversation, so reading the total costs O(1) per iteration instead of a
+ * walk over every message. After each LLM call the ledger is reconciled with
+ * the prompt tokens the provider reported: from then on the total is that
+ * exact number plus estimates for the messages appended since.
+ *
+ * Conversations are expected to grow by appending. If the messages array is
+ * replaced, shrinks, or its last counted message changes, the ledger recounts
+ * from scratch and drops the reconciled figure.
+ */
+export class TokenLedger {
+  private messages?: Message[];
+  private last?: Message;
+  private counted = 0;
+  private raw = 0;
+  // Provider-reported prompt size and the raw estimate it replaces
+  private reconciledCount = 0;
+  private reconciledTokens = 0;
+  private reconciledRaw = 0;
+
+  constructor(readonly tokenizer?: Tokenizer) {}
+
+  /**
+   * Estimated tokens the messages occupy in the context window
+   *
+   * @param messages The conversation, usually ctx.messages
+   * @returns Reconciled prompt tokens plus estimates for newer messages
+   */
+  total(messages: Message[]): number {
+    this.sync(messages);
+    // Tokenizer counts need no safety margin
+    const margin = this.tokenizer ? 1 : ESTIMATE_MARGIN;
+    return this.reconciledTokens + Math.ceil((this.raw - this.reconciledRaw) * margin);
+  }
+
+  /**
+   * Replace the estimate for the messages sent to the LLM with the real count
+   *
+   * @param messages The messages the LLM was called with
+   * @param promptTokens Prompt tokens the provider reported for that call
+   */
+  reconcile(messages: Message[], promptTokens: number): void {
+    this.sync(messages);
+    this.reconciledCount = this.counted;
+    this.reconciledTokens = promptTokens;
+    this.reconciledRaw = this.raw;
+  }
+
+  /**
+   * Whether the total is anchored to provider-reported usage
+   */
+  get reconciled(): boolean {
+    return this.reconciledCount > 0;
+  }
+
+  /**
+   * Count messages appended since the last call, or recount if the
+   * conversation changed in any other way
+   */
+  private sync(messages: Message[]): void {
+    if (
+      messages !== this.messages ||
+      messages.length < this.counted ||
+      (this.counted > 0 && messages[this.counted - 1] !== this.last)
+    ) {
+      this.messages = messages;
+      this.counted = 0;
+      this.raw = 0;
+      this.reconciledCount = 0;
+      this.reconciledTokens = 0;
+      this.reconciledRaw = 0;
+    }
+
+    for (; this.counted < messages.length; this.counted++) {
+      this.raw += estimateMessageTokens(messages[this.counted], this.tokenizer);
+    }
+    this.last = messages[this.counted - 1];
+  }
+}
+
+/**
+ * Tokenizer backed by the provider, if it can count tokens
+ */
+function providerTokenizer(provider?: ILLMProvider): Tokenizer | undefined {
+  if (!provider?.countTokens) {
+    return undefined;
+  }
+  const countTokens = provider.countTokens.bind(provider);
+  return {
+    id: `${provider.getProviderName()}/${provider.getModelName()}`,
+    countTokens,
+  };
+}
+
+/**
+ * The context's token ledger, created on first use
+ *
+ * The ledger uses the selected provider's tokenizer when it has one and is
+ * rebuilt when the tokenizer changes; before a provider is selected, or for
+ * providers without a tokenizer, it estimates from character counts.
+ */
+export function getTokenLedger(ctx: MiddlewareContext): TokenLedger {
+  const tokenizer = providerTokenizer(ctx.provider);
+  if (!ctx.tokenLedger || ctx.tokenLedger.tokenizer?.id !== tokenizer?.id) {
+    ctx.tokenLedger = new TokenLedger(tokenizer);
+  }
+  return ctx.tokenLedger;
+}
@@ -132,6 +132,11 @@ export class AnthropicProvider implements ILLMProvider {
           promptCacheHitTokens: response.usage.cache_read_input_tokens || undefined,
           promptCacheMissTokens: response.usage.cache_creation_input_tokens || undefined,
           thinkingTokens: usageWithThinking.thinking_tokens || undefined,
+          // input_tokens excludes cache reads and writes
+          contextTokens:
+            response.usage.input_tokens +
+            (response.usage.cache_read_input_tokens || 0) +
+            (response.usage.cache_creation_input_tokens || 0),
         };
 
         // Log traditional metrics and thinking metrics
@@ -12,6 +12,7 @@ export interface UsageMetrics {
   promptCacheMissTokens?: number; // Anthropic style
   cached_tokens?: number; // xAI/OpenRouter style
   thinkingTokens?: number; // Extended thinking tokens
+  contextTokens?: number; // Whole prompt size, when promptTokens leaves out cached input
 }
 
 /**
@@ -38,4 +39,6 @@ export interface ILLMProvider {
   supportsStreaming(): boolean;
   getLastUsageMetrics(): UsageMetrics | null;
   getLastStopReason(): string | null;
+  // Optional: count tokens with the model's own tokenizer
+  countTokens?(text: string): number;
 }
@@ -0,0 +1,155 @@
+import { promises as fs, readFileSync } from 'node:fs';
+import path from 'node:path';
+import { Message } from '@/base-types';
+import { lazyMessages } from './lazy-messages.js';
+import { SessionCheckpoint, isSessionCheckpoint } from './types.js';
+
+// checkpoint-{seq}.json files come from before checkpoints had a header line
+const CHECKPOINT_FILE = /^checkpoint-(\d+)\.jsonl?$/;
+const HEADER_CHUNK_BYTES = 64 * 1024;
+
+function isNodeError(error: unknown): error is NodeJS.ErrnoException {
+  return (
+    error instanceof Error &&
+    'code' in error &&
+    typeof (error as Record<string, unknown>).code === 'string'
+  );
+}
+
+/**
+ * First line of a checkpoint file: everything but the messages on the next line
+ */
+interface CheckpointHeader {
+  seq: number;
+  todos: SessionCheckpoint['todos'];
+  timestamp: number;
+  /** Number of messages on the second line */
+  count: number;
+}
+
+function isCheckpointHeader(value: unknown): value is CheckpointHeader {
+  const h = value as Record<string, unknown>;
+  return (
+    isSessionCheckpoint({ ...h, messages: [] }) &&
+    typeof h.count === 'number' &&
+    Number.isInteger(h.count) &&
+    h.count >= 0
+  );
+}
+
+/**
+ * Checkpoint files in a session directory, newest first
+ */
+async function listCheckpoints(dir: string): Promise<Array<{ seq: number; name: string }>> {
+  try {
+    const entries = await fs.readdir(dir);
+    return entries
+      .map((name) => ({ seq: CHECKPOINT_FILE.exec(name)?.[1], name }))
+      .filter((file): file is { seq: string; name: string } => file.seq !== undefined)
+      .map(({ seq, name }) => ({ seq: Number(seq), name }))
+      .sort((a, b) => b.seq - a.seq);
+  } catch (error) {
+    if (isNodeError(error) && error.code === 'ENOENT') {
+      return [];
+    }
+    throw error;
+  }
+}
+
+/**
+ * Write checkpoint-{seq}.jsonl atomically, then delete all but the newest `keep`
+ *
+ * The file holds a header line (seq, todos, timestamp and message count) and
+ * the messages as a JSON array on the second line, so a reader can take the
+ * header without parsing the messages.
+ */
+export async function writeCheckpointFile(
+  dir: string,
+  checkpoint: SessionCheckpoint,
+  keep: number
+): Promise<void> {
+  const file = path.join(dir, `checkpoint-${checkpoint.seq}.jsonl`);
+  const tmp = `${file}.${process.pid}.tmp`;
+  const header: CheckpointHeader = {
+    seq: checkpoint.seq,
+    todos: checkpoint.todos,
+    timestamp: checkpoint.timestamp,
+    count: checkpoint.messages.length,
+  };
+  await fs.mkdir(dir, { recursive: true });
+  await fs.writeFile(
+    tmp,
+    `${JSON.stringify(header)}\n${JSON.stringify(checkpoint.messages)}\n`,
+    'utf-8'
+  );
+  await fs.rename(tmp, file);
+
+  const stale = (await listCheckpoints(dir)).slice(keep);
+  await Promise.all(stale.map(({ name }) => fs.rm(path.join(dir, name), { force: true })));
+}
+
+/**
+ * First line of a file and the offset of the line after it
+ */
+async function readFirstLine(file: string): Promise<{ line: string; next?: number }> {
+  const handle = await fs.open(file, 'r');
+  try {
+    const chunks: Buffer[] = [];
+    for (let position = 0; ; ) {
+      const buffer = Buffer.alloc(HEADER_CHUNK_BYTES);
+      const { bytesRead } = await handle.read(buffer, 0, buffer.length, position);
+      const newline = buffer.subarray(0, bytesRead).indexOf('\n');
+      chunks.push(buffer.subarray(0, newline === -1 ? bytesRead : newline));
+      if (newline !== -1 || bytesRead === 0) {
+        const line = Buffer.concat(chunks).toString('utf-8');
+        return newline === -1 ? { line } : { line, next: position + newline + 1 };
+      }
+      position += bytesRead;
+    }
+  } finally {
+    await handle.close();
+  }
+}
+
+async function readCheckpoint(file: string, seq: number): Promise<SessionCheckpoint | undefined> {
+  if (file.endsWith('.json')) {
+    const checkpoint: unknown = JSON.parse(await fs.readFile(file, 'utf-8'));
+    return isSessionCheckpoint(checkpoint) && checkpoint.seq === seq ? checkpoint : undefined;
+  }
+
+  const { line, next } = await readFirstLine(file);
+  const header: unknown = JSON.parse(line);
+  if (!isCheckpointHeader(header) || header.seq !== seq || next === undefined) {
+    return undefined;
+  }
+  const load = (): Message[] => JSON.parse(readFileSync(file).toString('utf-8', next));
+  const { count, ...checkpoint } = header;
+  return { ...checkpoint, messages: lazyMessages(count, load) };
+}
+
+/**
+ * Newest readable checkpoint in a session directory; unreadable ones are
+ * skipped in favour of older ones
+ *
+ * Only the header line is read here. The messages are read and parsed when the
+ * returned checkpoint's message list is first read (see lazyMessages), so
+ * loading a checkpoint does not cost more as the session grows. A file whose
+ * messages turn out to be unreadable then makes that read throw instead of
+ * falling back to an older checkpoint.
+ */
+export async function readCheckpointFile(dir: string): Promise<SessionCheckpoint | undefined> {
+  for (const { seq, name } of await listCheckpoints(dir)) {
+    const file = path.join(dir, name);
+    try {
+      const checkpoint = await readCheckpoint(file, seq);
+      if (checkpoint) {
+        return checkpoint;
+      }
+    } catch (error) {
+      if (!isNodeError(error) || error.code !== 'ENOENT') {
+        console.error(`Failed to read checkpoint ${file}:`, error);
+      }
+    }
+  }
+  return undefined;
+}
@@ -0,0 +1,290 @@
+import { createReadStream, promises as fs } from 'node:fs';
+import type { ReadEventsOptions, SessionEventRecord } from './types.js';
+
+const NEWLINE = 0x0a;
+const QUOTE = 0x22;
+const BACKSLASH = 0x5c;
+const CHUNK_SIZE = 64 * 1024;
+const TYPE_PREFIX = Buffer.from('{"type":"');
+
+/**
+ * Sidecar index of byte offsets into an events.jsonl file
+ *
+ * offsets[k] is where event k * interval starts. The index is only ever
+ * extended, by readers that scan past its end, so appends stay untouched.
+ */
+interface EventLogIndex {
+  version: 1;
+  interval: number;
+  offsets: number[];
+}
+
+function isNodeError(error: unknown): error is NodeJS.ErrnoException {
+  return (
+    error instanceof Error &&
+    'code' in error &&
+    typeof (error as Record<string, unknown>).code === 'string'
+  );
+}
+
+/**
+ * Type of a line written as {"type":"...", ...}, read without parsing the line
+ *
+ * Returns undefined when the line does not start that way, and the caller
+ * has to parse it to find the type.
+ */
+function prefixedType(line: Buffer): string | undefined {
+  if (
+    line.length <= TYPE_PREFIX.length ||
+    line.compare(TYPE_PREFIX, 0, TYPE_PREFIX.length, 0, TYPE_PREFIX.length) !== 0
+  ) {
+    return undefined;
+  }
+  const end = line.indexOf(QUOTE, TYPE_PREFIX.length);
+  if (end === -1 || line.lastIndexOf(BACKSLASH, end) >= TYPE_PREFIX.length) {
+    return undefined;
+  }
+  return line.toString('utf-8', TYPE_PREFIX.length, end);
+}
+
+function isBlank(pieces: Buffer[]): boolean {
+  for (const piece of pieces) {
+    for (const byte of piece) {
+      if (byte !== 0x20 && byte !== 0x09 && byte !== 0x0d) {
+        return false;
+      }
+    }
+  }
+  return true;
+}
+
+function joinPieces(pieces: Buffer[]): Buffer {
+  return pieces.length === 1 ? pieces[0] : Buffer.concat(pieces);
+}
+
+/**
+ * Decode one log line into a record, or undefined if it is malformed or its
+ * type is filtered out
+ */
+function decodeLine(
+  line: Buffer,
+  seq: number,
+  types: Set<string> | undefined
+): SessionEventRecord | undefined {
+  if (types) {
+    const type = prefixedType(line);
+    if (type !== undefined && !types.has(type)) {
+      return undefined;
+    }
+  }
+  const text = line.toString('utf-8');
+  let event: unknown;
+  try {
+    event = JSON.parse(text);
+  } catch (error) {
+    console.error(`Failed to parse event line: ${text}`, error);
+    return undefined;
+  }
+  if (types) {
+    const type = (event as { type?: unknown } | null)?.type;
+    if (typeof type !== 'string' || !types.has(type)) {
+      return undefined;
+    }
+  }
+  return { seq, event };
+}
+
+async function loadIndex(file: string, indexFile: string, interval: number): Promise<number[]> {
+  try {
+    const index = JSON.parse(await fs.readFile(indexFile, 'utf-8')) as EventLogIndex;
+    const last = index.offsets[index.offsets.length - 1];
+    if (index.version !== 1 || index.interval !== interval || index.offsets[0] !== 0) {
+      return [];
+    }
+    // The last indexed event must still start right after a newline, or the
+    // log was rewritten and the index is stale
+    if (last > 0) {
+      const handle = await fs.open(file, 'r');
+      try {
+        const byte = Buffer.alloc(1);
+        const { bytesRead } = await handle.read(byte, 0, 1, last - 1);
+        if (bytesRead !== 1 || byte[0] !== NEWLINE) {
+          return [];
+        }
+      } finally {
+        await handle.close();
+      }
+    }
+    return index.offsets;
+  } catch {
+    return [];
+  }
+}
+
+async function saveIndex(indexFile: string, interval: number, offsets: number[]): Promise<void> {
+  const index: EventLogIndex = { version: 1, interval, offsets };
+  const tmp = `${indexFile}.${process.pid}.${Date.now()}.tmp`;
+  try {
+    await fs.writeFile(tmp, JSON.stringify(index), 'utf-8');
+    await fs.rename(tmp, indexFile);
+  } catch {
+    // The index is only a cache; the next full scan rebuilds it
+    await fs.rm(tmp, { force: true }).catch(() => undefined);
+  }
+}
+
+/**
+ * Stream the events of a JSONL session log with their sequence numbers
+ *
+ * Reads the file in fixed-size chunks, so memory is bounded by the largest
+ * single event rather than the file. An event's sequence number is its
+ * position among the non-blank lines of the log. Lines before fromSeq are
+ * skipped without decoding, starting from the nearest indexed offset, and
+ * lines whose leading "type" is filtered out are skipped without parsing.
+ * Malformed lines are reported and skipped but keep their sequence number.
+ *
+ * @param file - Path to events.jsonl
+ * @param indexFile - Path of the sidecar offset index
+ * @param options - Sequence number to start from and event types to return
+ * @param indexInterval - Events between consecutive index entries
+ */
+export async function* readEventLog(
+  file: string,
+  indexFile: string,
+  options: ReadEventsOptions = {},
+  indexInterval = 1000
+): AsyncGenerator<SessionEventRecord> {
+  const fromSeq = Math.max(0, options.fromSeq ?? 0);
+  const types = options.types ? new Set(options.types) : undefined;
+  const offsets = await loadIndex(file, indexFile, indexInterval);
+  const indexed = offsets.length;
+
+  const entry = Math.min(Math.floor(fromSeq / indexInterval), offsets.length - 1);
+  let seq = entry > 0 ? entry * indexInterval : 0;
+  // File position where the current line starts
+  let offset = entry > 0 ? offsets[entry] : 0;
+  let pieces: Buffer[] = [];
+
+  const stream = createReadStream(file, { start: offset, highWaterMark: CHUNK_SIZE });
+  try {
+    for await (const chunk of stream as AsyncIterable<Buffer>) {
+      let start = 0;
+      let newline: number;
+      while ((newline = chunk.indexOf(NEWLINE, start)) !== -1) {
+        pieces.push(chunk.subarray(start, newline));
+        const length = pieces.reduce((total, piece) => total + piece.length, 0);
+        if (!isBlank(pieces)) {
+          if (seq % indexInterval === 0 && seq / indexInterval === offsets.length) {
+            offsets.push(offset);
+          }
+          if (seq >= fromSeq) {
+            const record = decodeLine(joinPieces(pieces), seq, types);
+            if (record) {
+              yield record;
+            }
+          }
+          seq++;
+        }
+        offset += length + 1;
+        pieces = [];
+        start = newline + 1;
+      }
+      if (start < chunk.length) {
+        pieces.push(chunk.subarray(start));
+      }
+    }
+
+    // A final line without a newline may still be mid-write; it is returned
+    // if it parses but never indexed
+    if (pieces.length > 0 && !isBlank(pieces) && seq >= fromSeq) {
+      const record = decodeLine(joinPieces(pieces), seq, types);
+      if (record) {
+        yield record;
+      }
+    }
+  } catch (error) {
+    if (isNodeError(error) && error.code === 'ENOENT') {
+      return;
+    }
+    throw error;
+  } finally {
+    stream.destroy();
+    if (offsets.length > indexed && offsets.length > 1) {
+      await saveIndex(indexFile, indexInterval, offsets);
+    }
+  }
+}
+
+/**
+ * Stream the events of unindexed JSONL content, such as a decompressed segment
+ *
+ * Sequence numbers start at firstSeq and count the non-blank lines, as in
+ * readEventLog. Lines before fromSeq are counted without decoding.
+ *
+ * @param chunks - The content, in chunks of any size
+ * @param firstSeq - Sequence number of the first event in the content
+ * @param options - Sequence number to start from and event types to return
+ * @returns The number of events in the content, returned or not
+ */
+export async function* readEventLines(
+  chunks: AsyncIterable<Buffer>,
+  firstSeq: number,
+  options: ReadEventsOptions = {}
+): AsyncGenerator<SessionEventRecord, number> {
+  const fromSeq = Math.max(0, options.fromSeq ?? 0);
+  const types = options.types ? new Set(options.types) : undefined;
+  let seq = firstSeq;
+  let pieces: Buffer[] = [];
+
+  for await (const chunk of chunks) {
+    let start = 0;
+    let newline: number;
+    while ((newline = chunk.indexOf(NEWLINE, start)) !== -1) {
+      pieces.push(chunk.subarray(start, newline));
+      if (!isBlank(pieces)) {
+        if (seq >= fromSeq) {
+          const record = decodeLine(joinPieces(pieces), seq, types);
+          if (record) {
+            yield record;
+          }
+        }
+        seq++;
+      }
+      pieces = [];
+      start = newline + 1;
+    }
+    if (start < chunk.length) {
+      pieces.push(chunk.subarray(start));
+    }
+  }
+
+  if (pieces.length > 0 && !isBlank(pieces)) {
+    if (seq >= fromSeq) {
+      const record = decodeLine(joinPieces(pieces), seq, types);
+      if (record) {
+        yield record;
+      }
+    }
+    seq++;
+  }
+  return seq - firstSeq;
+}
+
+/**
+ * Number of events (non-blank lines) in JSONL content
+ */
+export function countEventLines(content: Buffer): number {
+  let count = 0;
+  let start = 0;
+  while (start < content.length) {
+    let end = content.indexOf(NEWLINE, start);
+    if (end === -1) {
+      end = content.length;
+    }
+    if (!isBlank([content.subarray(start, end)])) {
+      count++;
+    }
+    start = end + 1;
+  }
+  return count;
+}
@@ -0,0 +1,173 @@
+import { promises as fs } from 'node:fs';
+import type { FileHandle } from 'node:fs/promises';
+import path from 'node:path';
+
+/**
+ * When buffered event writes are forced to stable storage
+ *
+ * - none: leave it to the OS (the behaviour of plain appendFile)
+ * - interval: fsync at most once per interval while there are unsynced writes
+ * - batch: fsync after every batch, before its appendEvent promises resolve
+ */
+export type FsyncPolicy = 'none' | 'interval' | 'batch';
+
+/**
+ * Options for a session's write-behind event writer
+ */
+export interface SessionEventWriterOptions {
+  /** Most events written together in one batch */
+  maxBatchEvents: number;
+  /** How long a partial batch waits for more events; 0 writes once the writer is idle */
+  maxBatchDelayMs: number;
+  /** When written batches are fsynced */
+  fsync: FsyncPolicy;
+  /** Interval between fsyncs for the 'interval' policy */
+  fsyncIntervalMs: number;
+}
+
+interface PendingLine {
+  line: string;
+  resolve: () => void;
+  reject: (error: unknown) => void;
+}
+
+/**
+ * Group-commit writer for one session's events.jsonl
+ *
+ * Keeps a single append-mode handle open and writes queued lines in batches:
+ * events appended while a batch is being written form the next batch, so a
+ * burst of fire-and-forget appends costs one write instead of one
+ * open/write/close each. Lines are written in the order they were appended,
+ * and each append resolves once the batch containing it has been written
+ * (and synced, under the 'batch' policy).
+ */
+export class SessionEventWriter {
+  private handle?: FileHandle;
+  private pending: PendingLine[] = [];
+  private draining?: Promise<void>;
+  private delayTimer?: NodeJS.Timeout;
+  private syncTimer?: NodeJS.Timeout;
+  private unsynced = false;
+  private closed = false;
+
+  constructor(
+    private readonly file: string,
+    private readonly options: SessionEventWriterOptions
+  ) {}
+
+  append(line: string): Promise<void> {
+    if (this.closed) {
+      return Promise.reject(new Error(`Event writer for ${this.file} is closed`));
+    }
+    return new Promise((resolve, reject) => {
+      this.pending.push({ line, resolve, reject });
+      this.schedule();
+    });
+  }
+
+  /**
+   * True when no events are queued or being written
+   */
+  isIdle(): boolean {
+    return this.pending.length === 0 && !this.draining;
+  }
+
+  /**
+   * Write every queued event, then fsync unless the policy is 'none'
+   */
+  async flush(): Promise<void> {
+    while (this.pending.length > 0 || this.draining) {
+      await this.drain();
+    }
+    if (this.options.fsync !== 'none') {
+      await this.sync();
+    }
+  }
+
+  /**
+   * Flush and close the file handle; later appends are rejected
+   */
+  async close(): Promise<void> {
+    this.closed = true;
+    await this.flush();
+    clearTimeout(this.syncTimer);
+    this.syncTimer = undefined;
+    const handle = this.handle;
+    this.handle = undefined;
+    await handle?.close();
+  }
+
+  private schedule(): void {
+    // A running drain picks up new lines when its current batch completes
+    if (this.draining) {
+      return;
+    }
+    if (this.options.maxBatchDelayMs <= 0 || this.pending.length >= this.options.maxBatchEvents) {
+      void this.drain();
+    } else if (!this.delayTimer) {
+      this.delayTimer = setTimeout(() => void this.drain(), this.options.maxBatchDelayMs);
+    }
+  }
+
+  private drain(): Promise<void> {
+    clearTimeout(this.delayTimer);
+    this.delayTimer = undefined;
+    if (!this.draining) {
+      this.draining = this.writeBatches().finally(() => {
+        this.draining = undefined;
+        if (this.pending.length > 0) {
+          this.schedule();
+        }
+      });
+    }
+    return this.draining;
+  }
+
+  private async writeBatches(): Promise<void> {
+    while (this.pending.length > 0) {
+      const batch = this.pending.splice(0, this.options.maxBatchEvents);
+      try {
+        const handle = await this.open();
+        await handle.appendFile(batch.map((pending) => pending.line).join(''), 'utf-8');
+        if (this.options.fsync === 'batch') {
+          await handle.sync();
+        } else {
+          this.markUnsynced();
+        }
+        batch.forEach((pending) => pending.resolve());
+      } catch (error) {
+        // Drop the handle so the next batch reopens the file
+        const handle = this.handle;
+        this.handle = undefined;
+        await handle?.close().catch(() => undefined);
+        batch.forEach((pending) => pending.reject(error));
+      }
+    }
+  }
+
+  private async open(): Promise<FileHandle> {
+    if (!this.handle) {
+      await fs.mkdir(path.dirname(this.file), { recursive: true });
+      this.handle = await fs.open(this.file, 'a');
+    }
+    return this.handle;
+  }
+
+  private markUnsynced(): void {
+    this.unsynced = true;
+    if (this.options.fsync === 'interval' && !this.syncTimer) {
+      this.syncTimer = setTimeout(() => {
+        this.syncTimer = undefined;
+        this.sync().catch((error) => console.error(`Failed to fsync ${this.file}:`, error));
+      }, this.options.fsyncIntervalMs);
+      this.syncTimer.unref();
+    }
+  }
+
+  private async sync(): Promise<void> {
+    if (this.unsynced && this.handle) {
+      this.unsynced = false;
+      await this.handle.sync();
+    }
+  }
+}
@@ -1,6 +1,38 @@
 import { promises as fs } from 'node:fs';
 import path from 'node:path';
-import { SessionStorage } from './types.js';
+import { readCheckpointFile, writeCheckpointFile } from './checkpoint-files.js';
+import { readEventLog } from './event-reader.js';
+import { SessionEventWriter } from './event-writer.js';
+import type { FsyncPolicy, SessionEventWriterOptions } from './event-writer.js';
+import {
+  ReadEventsOptions,
+  SessionCheckpoint,
+  SessionEventRecord,
+  SessionStorage,
+} from './types.js';
+
+/**
+ * Options for buffered event writes
+ */
+export interface FilesystemStorageOptions {
+  /** Most events written in one batch (default: 256) */
+  maxBatchEvents?: number;
+  /**
+   * How long a partial batch waits for more events in milliseconds; 0 writes as
+   * soon as the previous batch completes (default: 0)
+   */
+  maxBatchDelayMs?: number;
+  /** When written batches are fsynced (default: 'none') */
+  fsync?: FsyncPolicy;
+  /** Interval between fsyncs for the 'interval' policy in milliseconds (default: 1000) */
+  fsyncIntervalMs?: number;
+  /** Idle session files kept open before the least recently used is closed (default: 64) */
+  maxOpenFiles?: number;
+  /** Events between entries of the byte offset index used by fromSeq reads (default: 1000) */
+  indexInterval?: number;
+  /** Recovery checkpoints kept per session; older ones are deleted (default: 2) */
+  checkpointsToKeep?: number;
+}
 
 /**
  * Type guard to check if an error is a Node.js system error with an error code
@@ -20,11 +52,49 @@ function isNodeError(error: unknown): error is NodeJS.ErrnoException {
  * Persists events to disk in JSONL format.
  * Provides actual persistence with crash recovery capability.
  *
+ * Each session's events go through a SessionEventWriter that keeps the file
+ * open and writes events in order, in batches. Reads of a session first wait
+ * for its queued events, and close() writes everything out and releases the
+ * file handles.
+ *
+ * Reads stream the log in chunks. Every indexInterval events, the byte offset
+ * of the event is recorded in events.idx.json, so a read from a sequence
+ * number seeks close to it instead of scanning the whole log.
+ *
  * Directory structure:
  * - {path}/{sessionId}/events.jsonl
+ * - {path}/{sessionId}/events.idx.json (offset index, rebuilt when missing or stale)
+ * - {path}/{sessionId}/checkpoint-{seq}.jsonl (recovery checkpoints, newest few kept)
+ * - {path}/.cache/ (caches owned by other components, not a session)
  */
 export class FilesystemStorage implements SessionStorage {
-  constructor(private readonly basePath: string = '.agent-sessions') {}
+  private readonly writers = new Map<string, SessionEventWriter>();
+  private readonly maxOpenFiles: number;
+  private readonly indexInterval: number;
+  private readonly checkpointsToKeep: number;
+  private readonly writerOptions: SessionEventWriterOptions;
+
+  constructor(
+    private readonly basePath: string = '.agent-sessions',
+    options: FilesystemStorageOptions = {}
+  ) {
+    this.maxOpenFiles = options.maxOpenFiles ?? 64;
+    this.indexInterval = options.indexInterval ?? 1000;
+    this.checkpointsToKeep = Math.max(1, options.checkpointsToKeep ?? 2);
+    this.writerOptions = {
+      maxBatchEvents: options.maxBatchEvents ?? 256,
+      maxBatchDelayMs: options.maxBatchDelayMs ?? 0,
+      fsync: options.fsync ?? 'none',
+      fsyncIntervalMs: options.fsyncIntervalMs ?? 1000,
+    };
+  }
+
+  /**
+   * Directory for caches kept alongside the sessions (e.g. the tool metadata index)
+   */
+  getCacheDir(): string {
+    return path.join(this.basePath, '.cache');
+  }
 
   private getSessionDir(sessionId: string): string {
     return path.join(this.basePath, sessionId);
@@ -34,61 +104,89 @@ export class FilesystemStorage implements SessionStorage {
     return path.join(this.getSessionDir(sessionId), 'events.jsonl');
   }
 
-  async appendEvent(sessionId: string, event: unknown): Promise<void> {
-    const dir = this.getSessionDir(sessionId);
+  private getIndexFile(sessionId: string): string {
+    return path.join(this.getSessionDir(sessionId), 'events.idx.json');
+  }
 
-    // Ensure directory exists - handle race conditions
-    try {
-      await fs.mkdir(dir, { recursive: true });
-    } catch (error: unknown) {
-      // If directory already exists or parent doesn't exist, try to handle it
-      const err = error as NodeJS.ErrnoException;
-      if (err.code !== 'EEXIST') {
-        // For ENOENT, try creating parent directory first
-        if (err.code === 'ENOENT') {
-          await fs.mkdir(this.basePath, { recursive: true });
-          await fs.mkdir(dir, { recursive: true });
-        } else {
-          throw error;
-        }
-      }
+  /**
+   * Writer for a session, kept at the most recently used end of the map
+   */
+  private getWriter(sessionId: string): SessionEventWriter {
+    let writer = this.writers.get(sessionId);
+    if (writer) {
+      this.writers.delete(sessionId);
+    } else {
+      writer = new SessionEventWriter(this.getEventsFile(sessionId), this.writerOptions);
+      this.evictIdleWriters();
     }
+    this.writers.set(sessionId, writer);
+    return writer;
+  }
 
-    // Append event as JSONL
-    const eventsFile = this.getEventsFile(sessionId);
-    const line = JSON.stringify(event) + '\n';
-    await fs.appendFile(eventsFile, line, 'utf-8');
+  /**
+   * Close least recently used idle writers once too many files are open
+   */
+  private evictIdleWriters(): void {
+    for (const [sessionId, writer] of this.writers) {
+      if (this.writers.size < this.maxOpenFiles) {
+        return;
+      }
+      if (writer.isIdle()) {
+        this.writers.delete(sessionId);
+        writer.close().catch((error) => {
+          console.error(`Failed to close event log for session ${sessionId}:`, error);
+        });
+      }
+    }
   }
 
-  async readEvents(sessionId: string): Promise<unknown[]> {
-    const eventsFile = this.getEventsFile(sessionId);
+  async appendEvent(sessionId: string, event: unknown): Promise<void> {
+    await this.getWriter(sessionId).append(JSON.stringify(event) + '\n');
+  }
 
-    try {
-      const content = await fs.readFile(eventsFile, 'utf-8');
-
-      // Parse JSONL format
-      return content
-        .split('\n')
-        .filter((line) => line.trim())
-        .map((line) => {
-          try {
-            return JSON.parse(line);
-          } catch (error) {
-            console.error(`Failed to parse event line: ${line}`, error);
-            return null;
-          }
-        })
-        .filter((event) => event !== null);
-    } catch (error) {
-      // File doesn't exist or other error
-      if (isNodeError(error) && error.code === 'ENOENT') {
-        return [];
-      }
-      throw error;
+  async readEvents(sessionId: string, options: ReadEventsOptions = {}): Promise<unknown[]> {
+    const events: unknown[] = [];
+    for await (const { event } of this.iterateEvents(sessionId, options)) {
+      events.push(event);
     }
+    return events;
+  }
+
+  /**
+   * Stream a session's events with bounded memory
+   *
+   * Waits for the session's queued events first, so the stream includes
+   * everything appended before the call.
+   */
+  async *iterateEvents(
+    sessionId: string,
+    options: ReadEventsOptions = {}
+  ): AsyncGenerator<SessionEventRecord> {
+    await this.writers.get(sessionId)?.flush();
+    yield* readEventLog(
+      this.getEventsFile(sessionId),
+      this.getIndexFile(sessionId),
+      options,
+      this.indexInterval
+    );
+  }
+
+  /**
+   * Write a checkpoint atomically, then delete all but the newest checkpointsToKeep
+   */
+  async writeCheckpoint(sessionId: string, checkpoint: SessionCheckpoint): Promise<void> {
+    await writeCheckpointFile(this.getSessionDir(sessionId), checkpoint, this.checkpointsToKeep);
+  }
+
+  /**
+   * Newest readable checkpoint; unreadable ones are skipped in favour of older ones
+   */
+  async readCheckpoint(sessionId: string): Promise<SessionCheckpoint | undefined> {
+    return readCheckpointFile(this.getSessionDir(sessionId));
   }
 
   async sessionExists(sessionId: string): Promise<boolean> {
+    await this.writers.get(sessionId)?.flush();
     const dir = this.getSessionDir(sessionId);
 
     try {
@@ -105,6 +203,11 @@ export class FilesystemStorage implements SessionStorage {
    */
   async deleteSession(sessionId: string): Promise<void> {
     const dir = this.getSessionDir(sessionId);
+    const writer = this.writers.get(sessionId);
+    if (writer) {
+      this.writers.delete(sessionId);
+      await writer.close();
+    }
 
     try {
       await fs.rm(dir, { recursive: true, force: true });
@@ -123,7 +226,9 @@ export class FilesystemStorage implements SessionStorage {
   async listSessions(): Promise<string[]> {
     try {
       const entries = await fs.readdir(this.basePath, { withFileTypes: true });
-      return entries.filter((entry) => entry.isDirectory()).map((entry) => entry.name);
+      return entries
+        .filter((entry) => entry.isDirectory() && !entry.name.startsWith('.'))
+        .map((entry) => entry.name);
     } catch (error) {
       // Directory doesn't exist
       if (isNodeError(error) && error.code === 'ENOENT') {
@@ -134,13 +239,21 @@ export class FilesystemStorage implements SessionStorage {
   }
 
   /**
-   * Flush pending writes - for FilesystemStorage this is a no-op
-   * since we use await on all writes, but we provide it for
-   * compatibility and future-proofing
+   * Wait until every event appended to the session so far is written, and
+   * fsynced unless the fsync policy is 'none'
+   */
+  async flush(sessionId: string): Promise<void> {
+    await this.writers.get(sessionId)?.flush();
+  }
+
+  /**
+   * Write out all queued events and close every open session file
+   *
+   * The storage stays usable: a later append reopens the session's file.
    */
-  async flush(_sessionId: string): Promise<void> {
-    // All writes are already awaited in appendEvent
-    // This is here for interface compatibility
-    return Promise.resolve();
+  async close(): Promise<void> {
+    const writers = [...this.writers.values()];
+    this.writers.clear();
+    await Promise.all(writers.map((writer) => writer.close()));
   }
 }
@@ -8,6 +8,7 @@
 
 // Session Manager - Core recovery logic
 export { SimpleSessionManager } from './manager';
+export type { SessionManagerOptions } from './manager';
 
 // Message Sanitizer - Guaranteed recovery from ANY state
 export {
@@ -21,6 +22,7 @@ export {
 // Storage Implementations
 export { InMemoryStorage } from './memory.storage';
 export { FilesystemStorage } from './filesystem.storage';
+export { SegmentedStorage } from './segmented.storage';
 export { NoOpStorage } from './noop.storage';
 
 // Types
@@ -30,6 +32,17 @@ export type {
   UserMessageEvent,
   AssistantMessageEvent,
   ToolCallEvent,
+  ToolExecutionMetrics,
   ToolResultEvent,
   AnySessionEvent,
+  ReadEventsOptions,
+  SessionCheckpoint,
+  SessionEventRecord,
 } from './types';
+export type { FilesystemStorageOptions } from './filesystem.storage';
+export type {
+  SegmentedStorageOptions,
+  SegmentRetentionPolicy,
+  RetentionResult,
+} from './segmented.storage';
+export type { FsyncPolicy } from './event-writer';
@@ -0,0 +1,108 @@
+import { Message } from '@/base-types';
+
+/**
+ * Checkpointed messages behind a lazy list, parsed at most once
+ */
+interface LazyPrefix {
+  count: number;
+  load: () => Message[];
+  loaded: () => boolean;
+}
+
+const prefixes = new WeakMap<Message[], LazyPrefix>();
+
+function once(load: () => Message[]): () => Message[] {
+  let messages: Message[] | undefined;
+  return () => (messages ??= load());
+}
+
+/**
+ * A message list whose first `count` messages are loaded on first use
+ *
+ * Recovering a session returns every message since the start of the
+ * session, but callers often only look at its length and last messages
+ * before the next LLM call reads the rest. Reading `length`, reading a message
+ * after the prefix or appending does not load the prefix; anything that reads
+ * or changes a prefix message (indexing, iteration, map, splice, JSON
+ * serialization) loads all of it first. After that the list behaves like a
+ * plain array.
+ *
+ * @param count - Number of messages `load` returns
+ * @param load - Parses the prefix messages; called at most once
+ * @param tail - Messages after the prefix
+ */
+export function lazyMessages(
+  count: number,
+  load: () => Message[],
+  tail: Message[] = []
+): Message[] {
+  let loaded = count === 0;
+  const prefix: LazyPrefix = { count, load: once(load), loaded: () => loaded };
+  const target: Message[] = new Array(count);
+  target.push(...tail);
+
+  const touches = (property: string | symbol): boolean => {
+    if (loaded || typeof property !== 'string') {
+      return false;
+    }
+    const index = Number(property);
+    return Number.isInteger(index) && index >= 0 && index < count;
+  };
+  const fill = (): void => {
+    const messages = prefix.load();
+    if (messages.length !== count) {
+      throw new Error(`Checkpoint holds ${messages.length} messages, expected ${count}`);
+    }
+    for (let i = 0; i < count; i++) {
+      target[i] = messages[i];
+    }
+    loaded = true;
+  };
+
+  const list = new Proxy(target, {
+    get(t, property, receiver) {
+      if (touches(property)) fill();
+      return Reflect.get(t, property, receiver);
+    },
+    has(t, property) {
+      if (touches(property)) fill();
+      return Reflect.has(t, property);
+    },
+    set(t, property, value, receiver) {
+      if (touches(property)) fill();
+      return Reflect.set(t, property, value, receiver);
+    },
+    deleteProperty(t, property) {
+      if (touches(property)) fill();
+      return Reflect.deleteProperty(t, property);
+    },
+    defineProperty(t, property, descriptor) {
+      if (touches(property)) fill();
+      return Reflect.defineProperty(t, property, descriptor);
+    },
+    getOwnPropertyDescriptor(t, property) {
+      if (touches(property)) fill();
+      return Reflect.getOwnPropertyDescriptor(t, property);
+    },
+    ownKeys(t) {
+      if (!loaded) fill();
+      return Reflect.ownKeys(t);
+    },
+  });
+  prefixes.set(list, prefix);
+  return list;
+}
+
+/**
+ * Messages of `head` followed by `tail`, keeping a lazy prefix of `head` unloaded
+ *
+ * Only an untouched lazy list with nothing after its prefix is reused; anything
+ * else is copied, which loads it.
+ */
+export function concatMessages(head: Message[], tail: Message[]): Message[] {
+  const prefix = prefixes.get(head);
+  if (prefix && !prefix.loaded() && head.length === prefix.count) {
+    return lazyMessages(prefix.count, prefix.load, tail);
+  }
+  return [...head, ...tail];
+}
@@ -1,4 +1,14 @@
-import { AnySessionEvent, SessionStorage, ToolCallEvent, isSessionEvent } from './types';
+import {
+  AnySessionEvent,
+  ReadEventsOptions,
+  SessionCheckpoint,
+  SessionEventRecord,
+  SessionStorage,
+  ToolCallEvent,
+  isSessionEvent,
+  matchesEventTypes,
+} from './types';
+import { concatMessages } from './lazy-messages';
 import { TodoItem } from '@/tools/todowrite.tool';
 import { Message, ToolCall } from '@/base-types';
 import { formatSanitizationIssues, sanitizeRecoveredMessages } from './message-sanitizer';
@@ -6,6 +16,44 @@ import { formatSanitizationIssues, sanitizeRecoveredMessages } from './message-s
 // Using Message type from base-types for consistency
 // This ensures compatibility with the rest of the system
 
+/**
+ * Event types that become messages on recovery; other events are never parsed
+ */
+const MESSAGE_EVENT_TYPES = ['user', 'assistant', 'tool_call', 'tool_result'];
+
+/**
+ * Options for session recovery
+ */
+export interface SessionManagerOptions {
+  /**
+   * Events between recovery checkpoints; 0 disables checkpoints (default: 1000).
+   * Only used with storages that implement readCheckpoint/writeCheckpoint.
+   */
+  checkpointInterval?: number;
+}
+
+/**
+ * Messages replayed from the events after the latest checkpoint
+ */
+interface Replay {
+  checkpoint?: SessionCheckpoint;
+  /** Unsanitized messages from the events after the checkpoint */
+  messages: Message[];
+  /** Sequence number of the event each message came from */
+  seqs: number[];
+  /** TodoWrite calls among the replayed events, in order */
+  todoWrites: Array<{ seq: number; todos: TodoItem[] }>;
+  /** Message events replayed */
+  events: number;
+}
+
+/**
+ * Minimal event source to count logged events on (e.g. EventLogger)
+ */
+interface EventSource {
+  on(event: string, handler: (event: unknown) => void): void;
+}
+
 /**
  * Simple session manager for recovery
  *
@@ -16,96 +64,199 @@ import { formatSanitizationIssues, sanitizeRecoveredMessages } from './message-s
  * CRITICAL: Session recovery now includes automatic sanitization
  * to ensure recovery works from ANY state, including incomplete
  * tool calls, corrupted messages, or other edge cases.
+ *
+ * With a storage that keeps checkpoints, recovery starts from the latest
+ * checkpoint and replays and sanitizes only the events after it, so resuming
+ * does not cost O(total events).
  */
 export class SimpleSessionManager {
-  constructor(private readonly storage: SessionStorage) {}
+  private readonly checkpointInterval: number;
+
+  constructor(
+    private readonly storage: SessionStorage,
+    options: SessionManagerOptions = {}
+  ) {
+    this.checkpointInterval = Math.max(0, options.checkpointInterval ?? 1000);
+  }
+
+  private checkpointsEnabled(): boolean {
+    return (
+      this.checkpointInterval > 0 &&
+      this.storage.readCheckpoint !== undefined &&
+      this.storage.writeCheckpoint !== undefined
+    );
+  }
+
+  private async loadCheckpoint(sessionId: string): Promise<SessionCheckpoint | undefined> {
+    return this.checkpointsEnabled() ? this.storage.readCheckpoint?.(sessionId) : undefined;
+  }
 
   /**
-   * Recover a session from storage
-   *
-   * Reads all events and converts them to base-types Message format.
-   * The messages represent the complete conversation history
-   * and can be sent to the LLM to continue execution.
-   *
-   * IMPORTANT: Messages are automatically sanitized to handle incomplete
-   * tool calls, corrupted data, and other edge cases. This guarantees
-   * that recovered sessions can ALWAYS be resumed, regardless of state.
+   * Stream stored events with their sequence numbers, falling back to
+   * readEvents for storages that cannot iterate
    */
-  async recoverSession(sessionId: string): Promise<Message[]> {
+  private async *records(
+    sessionId: string,
+    options: ReadEventsOptions
+  ): AsyncGenerator<SessionEventRecord> {
+    if (this.storage.iterateEvents) {
+      yield* this.storage.iterateEvents(sessionId, options);
+      return;
+    }
     const events = await this.storage.readEvents(sessionId);
-    const messages: Message[] = [];
-
-    for (const event of events) {
-      if (!isSessionEvent(event)) {
-        console.warn('Invalid event format:', event);
-        continue;
+    for (let seq = Math.max(0, options.fromSeq ?? 0); seq < events.length; seq++) {
+      if (matchesEventTypes(events[seq], options.types)) {
+        yield { seq, event: events[seq] };
       }
+    }
+  }
 
-      // Type guard ensures event matches expected structure
-      const typedEvent = event as AnySessionEvent;
+  /**
+   * Convert a stored event to an LLM message, if it is one
+   */
+  private toMessage(event: unknown): Message | undefined {
+    if (!isSessionEvent(event)) {
+      console.warn('Invalid event format:', event);
+      return undefined;
+    }
 
-      switch (typedEvent.type) {
-        case 'user': {
-          messages.push({
-            role: 'user',
-            content: typedEvent.data.content,
-          });
-          break;
-        }
+    // Type guard ensures event matches expected structure
+    const typedEvent = event as AnySessionEvent;
 
-        case 'assistant': {
-          // Skip system messages (metadata/logging) - they're not part of the LLM conversation
-          // System messages are persisted for audit trail but excluded from recovery
-          if (typedEvent.data.agent === 'system') {
-            break; // Skip system messages
-          }
+    switch (typedEvent.type) {
+      case 'user': {
+        return {
+          role: 'user',
+          content: typedEvent.data.content,
+        };
+      }
 
-          // Real assistant messages (LLM responses)
-          const content = typedEvent.data.content;
-          messages.push({
-            role: 'assistant',
-            content: content,
-          });
-          break;
+      case 'assistant': {
+        // Skip system messages (metadata/logging) - they're not part of the LLM conversation
+        // System messages are persisted for audit trail but excluded from recovery
+        if (typedEvent.data.agent === 'system') {
+          return undefined; // Skip system messages
         }
 
-        case 'tool_call': {
-          // Tool calls are assistant messages with tool_calls array
-          const toolCall: ToolCall = {
-            id: typedEvent.data.id,
-            type: 'function',
-            function: {
-              name: typedEvent.data.tool,
-              arguments: JSON.stringify(typedEvent.data.params),
-            },
-          };
-          messages.push({
-            role: 'assistant',
-            tool_calls: [toolCall],
-          });
-          break;
-        }
+        // Real assistant messages (LLM responses)
+        return {
+          role: 'assistant',
+          content: typedEvent.data.content,
+        };
+      }
 
-        case 'tool_result': {
-          // Tool results use the 'tool' role
-          messages.push({
-            role: 'tool',
-            content: JSON.stringify(typedEvent.data.result),
-            tool_call_id: typedEvent.data.toolCallId,
-          });
-          break;
-        }
+      case 'tool_call': {
+        // Tool calls are assistant messages with tool_calls array
+        const toolCall: ToolCall = {
+          id: typedEvent.data.id,
+          type: 'function',
+          function: {
+            name: typedEvent.data.tool,
+            arguments: JSON.stringify(typedEvent.data.params),
+          },
+        };
+        return {
+          role: 'assistant',
+          tool_calls: [toolCall],
+        };
+      }
 
-        default: {
-          // Silently skip other event types (agent_iteration, agent_start, etc.)
-          // These are metadata events that don't need to be converted to messages
-        }
+      case 'tool_result': {
+        // Tool results use the 'tool' role
+        return {
+          role: 'tool',
+          content: JSON.stringify(typedEvent.data.result),
+          tool_call_id: typedEvent.data.toolCallId,
+        };
+      }
+
+      default: {
+        // Silently skip other event types (agent_iteration, agent_start, etc.)
+        // These are metadata events that don't need to be converted to messages
+        return undefined;
+      }
+    }
+  }
+
+  /**
+   * Load the latest checkpoint and replay the message events after it
+   */
+  private async replay(sessionId: string): Promise<Replay> {
+    const checkpoint = await this.loadCheckpoint(sessionId);
+    const replay: Replay = { checkpoint, messages: [], seqs: [], todoWrites: [], events: 0 };
+    const options = { fromSeq: checkpoint?.seq ?? 0, types: MESSAGE_EVENT_TYPES };
+
+    for await (const { seq, event } of this.records(sessionId, options)) {
+      replay.events++;
+      const message = this.toMessage(event);
+      if (!message) {
+        continue;
+      }
+      replay.messages.push(message);
+      replay.seqs.push(seq);
+
+      const typedEvent = event as AnySessionEvent;
+      if (typedEvent.type === 'tool_call' && this.isTodoWriteCall(typedEvent)) {
+        replay.todoWrites.push({ seq, todos: typedEvent.data.params.todos });
       }
     }
 
+    return replay;
+  }
+
+  /**
+   * Write a checkpoint covering the replayed messages up to the last assistant
+   * message, where sanitizing the covered messages alone gives the same result
+   * as sanitizing them together with what follows
+   */
+  private async saveCheckpoint(
+    sessionId: string,
+    replay: Replay
+  ): Promise<SessionCheckpoint | undefined> {
+    let boundary = replay.messages.length - 1;
+    while (boundary > 0 && replay.messages[boundary].role !== 'assistant') {
+      boundary--;
+    }
+    if (boundary <= 0) {
+      return undefined;
+    }
+
+    const seq = replay.seqs[boundary];
+    const covered = sanitizeRecoveredMessages(replay.messages.slice(0, boundary)).messages;
+    const lastTodoWrite = replay.todoWrites.filter((write) => write.seq < seq).pop();
+    const checkpoint: SessionCheckpoint = {
+      seq,
+      messages: [...(replay.checkpoint?.messages ?? []), ...covered],
+      todos: lastTodoWrite?.todos ?? replay.checkpoint?.todos ?? [],
+      timestamp: Date.now(),
+    };
+    await this.storage.writeCheckpoint?.(sessionId, checkpoint);
+    return checkpoint;
+  }
+
+  /**
+   * Recover a session from storage
+   *
+   * Streams the message events and converts them to base-types Message format.
+   * The messages represent the complete conversation history
+   * and can be sent to the LLM to continue execution.
+   *
+   * IMPORTANT: Messages are automatically sanitized to handle incomplete
+   * tool calls, corrupted data, and other edge cases. This guarantees
+   * that recovered sessions can ALWAYS be resumed, regardless of state.
+   *
+   * When the storage keeps checkpoints, the checkpoint's messages are used
+   * as-is and only the events after it are replayed and sanitized. If that
+   * tail has grown past checkpointInterval events, a new checkpoint is written.
+   * The checkpointed messages at the front of the returned list are parsed
+   * when they are first read, so resuming costs what the tail costs.
+   */
+  async recoverSession(sessionId: string): Promise<Message[]> {
+    const replay = await this.replay(sessionId);
+
     // CRITICAL: Sanitize messages to handle incomplete tool calls,
     // corrupted data, and ensure API compatibility
-    const sanitizationResult = sanitizeRecoveredMessages(messages);
+    const sanitizationResult = sanitizeRecoveredMessages(replay.messages);
 
     // Log any issues that were found and fixed
     if (sanitizationResult.issues.length > 0) {
@@ -114,7 +265,75 @@ export class SimpleSessionManager {
       );
     }
 
-    return sanitizationResult.messages;
+    if (this.checkpointsEnabled() && replay.events >= this.checkpointInterval) {
+      try {
+        await this.saveCheckpoint(sessionId, replay);
+      } catch (error) {
+        console.error(`Failed to checkpoint session ${sessionId}:`, error);
+      }
+    }
+
+    if (!replay.checkpoint) {
+      return sanitizationResult.messages;
+    }
+    return concatMessages(replay.checkpoint.messages, sanitizationResult.messages);
+  }
+
+  /**
+   * Checkpoint a session now
+   *
+   * Replays the events since the latest checkpoint and writes a new one up to
+   * the last assistant message among them.
+   *
+   * @returns The checkpoint written, or undefined if the storage keeps no
+   * checkpoints or there was nothing new to cover
+   */
+  async checkpoint(sessionId: string): Promise<SessionCheckpoint | undefined> {
+    if (!this.checkpointsEnabled()) {
+      return undefined;
+    }
+    return this.saveCheckpoint(sessionId, await this.replay(sessionId));
+  }
+
+  /**
+   * Checkpoint a session in the background every checkpointInterval events
+   *
+   * Counts the events emitted by the source (typically the session's
+   * EventLogger). Checkpoints never overlap; a trigger during a running
+   * checkpoint starts another one when it completes.
+   */
+  checkpointPeriodically(source: EventSource, sessionId: string): void {
+    if (!this.checkpointsEnabled()) {
+      return;
+    }
+
+    let count = 0;
+    let running = false;
+    let again = false;
+    const run = (): void => {
+      running = true;
+      this.checkpoint(sessionId)
+        .catch((error) => console.error(`Failed to checkpoint session ${sessionId}:`, error))
+        .finally(() => {
+          running = false;
+          if (again) {
+            again = false;
+            run();
+          }
+        });
+    };
+
+    source.on('*', () => {
+      if (++count < this.checkpointInterval) {
+        return;
+      }
+      count = 0;
+      if (running) {
+        again = true;
+      } else {
+        run();
+      }
+    });
   }
 
   /**
@@ -180,11 +399,12 @@ export class SimpleSessionManager {
    * This allows todos to persist across sessions without a separate file.
    */
   async recoverTodos(sessionId: string): Promise<TodoItem[]> {
-    const events = await this.storage.readEvents(sessionId);
-
-    // Find the last TodoWrite tool call
-    for (let i = events.length - 1; i >= 0; i--) {
-      const event = events[i];
+    // Start from the checkpoint's todos and keep those of the last TodoWrite
+    // call after it; only tool calls are parsed
+    const checkpoint = await this.loadCheckpoint(sessionId);
+    const options = { fromSeq: checkpoint?.seq ?? 0, types: ['tool_call'] };
+    let todos: TodoItem[] = checkpoint?.todos ?? [];
+    for await (const { event } of this.records(sessionId, options)) {
       if (!isSessionEvent(event)) {
         continue;
       }
@@ -193,13 +413,12 @@ export class SimpleSessionManager {
       const typedEvent = event as AnySessionEvent;
 
       if (typedEvent.type === 'tool_call' && this.isTodoWriteCall(typedEvent)) {
-        // Found the last TodoWrite call, return its todos
-        return typedEvent.data.params.todos;
+        todos = typedEvent.data.params.todos;
       }
     }
 
-    // No TodoWrite calls found, return empty
-    return [];
+    // Empty when there were no TodoWrite calls
+    return todos;
   }
 
   /**
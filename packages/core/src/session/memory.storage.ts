@@ -1,4 +1,11 @@
-import { SessionStorage } from './types.js';
+import {
+  ReadEventsOptions,
+  SessionCheckpoint,
+  SessionEventRecord,
+  SessionStorage,
+  matchesEventTypes,
+} from './types.js';
+import { lazyMessages } from './lazy-messages.js';
 
 /**
  * In-memory storage implementation
@@ -13,6 +20,10 @@ import { SessionStorage } from './types.js';
  */
 export class InMemoryStorage implements SessionStorage {
   private readonly sessions = new Map<string, unknown[]>();
+  private readonly checkpoints = new Map<
+    string,
+    { header: string; messages: string; count: number }
+  >();
 
   async appendEvent(sessionId: string, event: unknown): Promise<void> {
     const events = this.sessions.get(sessionId) || [];
@@ -20,8 +31,47 @@ export class InMemoryStorage implements SessionStorage {
     this.sessions.set(sessionId, events);
   }
 
-  async readEvents(sessionId: string): Promise<unknown[]> {
-    return this.sessions.get(sessionId) || [];
+  async readEvents(sessionId: string, options: ReadEventsOptions = {}): Promise<unknown[]> {
+    const events = this.sessions.get(sessionId) || [];
+    if (options.fromSeq === undefined && !options.types) {
+      return events;
+    }
+    return events
+      .slice(Math.max(0, options.fromSeq ?? 0))
+      .filter((event) => matchesEventTypes(event, options.types));
+  }
+
+  async *iterateEvents(
+    sessionId: string,
+    options: ReadEventsOptions = {}
+  ): AsyncGenerator<SessionEventRecord> {
+    const events = this.sessions.get(sessionId) || [];
+    for (let seq = Math.max(0, options.fromSeq ?? 0); seq < events.length; seq++) {
+      if (matchesEventTypes(events[seq], options.types)) {
+        yield { seq, event: events[seq] };
+      }
+    }
+  }
+
+  async writeCheckpoint(sessionId: string, checkpoint: SessionCheckpoint): Promise<void> {
+    // Stored as JSON, like on disk, so later changes to the messages cannot leak in
+    const { messages, ...header } = checkpoint;
+    this.checkpoints.set(sessionId, {
+      header: JSON.stringify(header),
+      messages: JSON.stringify(messages),
+      count: messages.length,
+    });
+  }
+
+  async readCheckpoint(sessionId: string): Promise<SessionCheckpoint | undefined> {
+    const checkpoint = this.checkpoints.get(sessionId);
+    if (!checkpoint) {
+      return undefined;
+    }
+    return {
+      ...JSON.parse(checkpoint.header),
+      messages: lazyMessages(checkpoint.count, () => JSON.parse(checkpoint.messages)),
+    };
   }
 
   async sessionExists(sessionId: string): Promise<boolean> {
@@ -34,6 +84,7 @@ export class InMemoryStorage implements SessionStorage {
    */
   clear(): void {
     this.sessions.clear();
+    this.checkpoints.clear();
   }
 
   /**
@@ -42,6 +93,7 @@ export class InMemoryStorage implements SessionStorage {
    */
   clearSession(sessionId: string): void {
     this.sessions.delete(sessionId);
+    this.checkpoints.delete(sessionId);
   }
 
   /**
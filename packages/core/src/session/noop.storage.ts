@@ -1,4 +1,4 @@
-import { SessionStorage } from './types.js';
+import { ReadEventsOptions, SessionStorage } from './types.js';
 
 /**
  * No-operation storage implementation
@@ -14,7 +14,7 @@ export class NoOpStorage implements SessionStorage {
     // Do nothing - no storage overhead
   }
 
-  async readEvents(_sessionId: string): Promise<unknown[]> {
+  async readEvents(_sessionId: string, _options?: ReadEventsOptions): Promise<unknown[]> {
     return []; // No events to recover
   }
 
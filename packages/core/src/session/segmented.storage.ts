@@ -0,0 +1,788 @@
+import { createReadStream, promises as fs } from 'node:fs';
+import path from 'node:path';
+import { pipeline } from 'node:stream';
+import { promisify } from 'node:util';
+import { createGunzip, gzip } from 'node:zlib';
+import { readCheckpointFile, writeCheckpointFile } from './checkpoint-files.js';
+import { countEventLines, readEventLines } from './event-reader.js';
+import { SessionEventWriter } from './event-writer.js';
+import type { SessionEventWriterOptions } from './event-writer.js';
+import type { FilesystemStorageOptions } from './filesystem.storage.js';
+import {
+  ReadEventsOptions,
+  SessionCheckpoint,
+  SessionEventRecord,
+  SessionStorage,
+} from './types.js';
+
+const gzipAsync = promisify(gzip);
+
+const MANIFEST_FILE = 'manifest.json';
+const SEGMENT_FILE = /^segment-(\d+)\.jsonl(\.gz)?$/;
+
+/**
+ * When idle sessions are compressed, archived and deleted
+ *
+ * Idle time is measured from the last change to any of the session's files.
+ */
+export interface SegmentRetentionPolicy {
+  /** Idle time in milliseconds after which a session's open segment is sealed */
+  sealAfterMs?: number;
+  /** Idle time in milliseconds after which a session is moved to the archive */
+  archiveAfterMs?: number;
+  /** Time in milliseconds an archived session is kept before it is deleted */
+  deleteAfterMs?: number;
+  /** Directory for archived sessions (default: {basePath}/.archive) */
+  archivePath?: string;
+  /** Apply the policy every intervalMs until close(); 0 only applies it on request (default: 0) */
+  intervalMs?: number;
+}
+
+/**
+ * Options for segmented session storage
+ */
+export interface SegmentedStorageOptions extends Omit<FilesystemStorageOptions, 'indexInterval'> {
+  /** Size of the open segment, in characters of JSON, at which it is sealed (default: 4MiB) */
+  maxSegmentBytes?: number;
+  /** gzip level for sealed segments, from 1 (fastest) to 9 (smallest) (default: 6) */
+  compressionLevel?: number;
+  /** Seal every open segment on close(), leaving the sessions fully compressed (default: true) */
+  sealOnClose?: boolean;
+  /** When idle sessions are sealed, archived and deleted */
+  retention?: SegmentRetentionPolicy;
+}
+
+/**
+ * Sessions affected by one application of the retention policy
+ */
+export interface RetentionResult {
+  sealed: string[];
+  archived: string[];
+  deleted: string[];
+}
+
+/**
+ * One segment of a session's event log
+ */
+interface SegmentInfo {
+  /** Segment number; the file is segment-{id}.jsonl, or segment-{id}.jsonl.gz once sealed */
+  id: number;
+  sealed: boolean;
+  /** Events in the segment, known once sealed */
+  events?: number;
+  /** Uncompressed size in bytes, known once sealed */
+  bytes?: number;
+  /** Compressed size in bytes, known once sealed */
+  storedBytes?: number;
+}
+
+/**
+ * Contents of a session's manifest.json
+ */
+interface SegmentManifest {
+  version: 1;
+  /** Segments in log order; only the last one is written to */
+  segments: SegmentInfo[];
+  /** When the session was moved to the archive */
+  archivedAt?: number;
+}
+
+/**
+ * In-memory state of a session in use
+ */
+interface SessionSegments {
+  manifest: SegmentManifest;
+  /** Bytes appended to the open (last) segment */
+  openBytes: number;
+  /** Writers of rotated segments that have not finished writing */
+  retiring: Set<SessionEventWriter>;
+  /** Seals and manifest writes, run one at a time */
+  tasks: Promise<void>;
+}
+
+/**
+ * Type guard to check if an error is a Node.js system error with an error code
+ * Private helper - only used within this module
+ */
+function isNodeError(error: unknown): error is NodeJS.ErrnoException {
+  return (
+    error instanceof Error &&
+    'code' in error &&
+    typeof (error as Record<string, unknown>).code === 'string'
+  );
+}
+
+function segmentFileName(id: number, sealed: boolean): string {
+  return `segment-${String(id).padStart(6, '0')}.jsonl${sealed ? '.gz' : ''}`;
+}
+
+async function readManifest(dir: string): Promise<SegmentManifest | undefined> {
+  try {
+    const manifest = JSON.parse(
+      await fs.readFile(path.join(dir, MANIFEST_FILE), 'utf-8')
+    ) as SegmentManifest;
+    return manifest.version === 1 && Array.isArray(manifest.segments) ? manifest : undefined;
+  } catch {
+    // Missing or unreadable: rebuilt from the segment files
+    return undefined;
+  }
+}
+
+async function writeManifest(dir: string, manifest: SegmentManifest): Promise<void> {
+  const file = path.join(dir, MANIFEST_FILE);
+  const tmp = `${file}.${process.pid}.tmp`;
+  try {
+    await fs.writeFile(tmp, JSON.stringify(manifest), 'utf-8');
+    await fs.rename(tmp, file);
+  } catch (error) {
+    // A session that was never written has no directory, and needs no manifest
+    if (!isNodeError(error) || error.code !== 'ENOENT') {
+      throw error;
+    }
+  }
+}
+
+/**
+ * Segmented, compressed filesystem storage
+ *
+ * Stores each session's events as a series of JSONL segments. Events are
+ * appended to the open segment through a SessionEventWriter, exactly as
+ * FilesystemStorage appends to events.jsonl. Once the open segment reaches
+ * maxSegmentBytes, a new one is started and the full one is sealed in the
+ * background: gzip-compressed to segment-{id}.jsonl.gz and recorded in the
+ * manifest with its event count and sizes. Session logs are repetitive (tool
+ * lists, system prompts, tool results), so sealed segments are typically
+ * 5-10x smaller than the plain text.
+ *
+ * Reads stream across the segments in order, decompressing sealed ones on the
+ * fly. Sequence numbers run across segments, so fromSeq reads and checkpoints
+ * work as with FilesystemStorage; sealed segments entirely before fromSeq are
+ * skipped without being read.
+ *
+ * The retention policy seals the open segment of idle sessions, moves idle
+ * sessions to the archive directory and deletes archived sessions after a
+ * while. Run it with applyRetention(), or every retention.intervalMs.
+ *
+ * Directory structure:
+ * - {path}/{sessionId}/segment-{id}.jsonl (open segment)
+ * - {path}/{sessionId}/segment-{id}.jsonl.gz (sealed segments)
+ * - {path}/{sessionId}/manifest.json (segment list with event counts and sizes)
+ * - {path}/{sessionId}/checkpoint-{seq}.jsonl (recovery checkpoints, newest few kept)
+ * - {path}/.archive/{sessionId}/ (archived sessions, same layout)
+ * - {path}/.cache/ (caches owned by other components, not a session)
+ */
+export class SegmentedStorage implements SessionStorage {
+  private readonly sessions = new Map<string, Promise<SessionSegments>>();
+  private readonly writers = new Map<string, SessionEventWriter>();
+  /** Sessions being sealed, archived or deleted; their state is reloaded afterwards */
+  private readonly locks = new Map<string, Promise<void>>();
+  private readonly maxOpenFiles: number;
+  private readonly checkpointsToKeep: number;
+  private readonly maxSegmentBytes: number;
+  private readonly compressionLevel: number;
+  private readonly sealOnClose: boolean;
+  private readonly retention: SegmentRetentionPolicy;
+  private readonly writerOptions: SessionEventWriterOptions;
+  private retentionTimer?: NodeJS.Timeout;
+  private retaining = false;
+
+  constructor(
+    private readonly basePath: string = '.agent-sessions',
+    options: SegmentedStorageOptions = {}
+  ) {
+    this.maxOpenFiles = options.maxOpenFiles ?? 64;
+    this.checkpointsToKeep = Math.max(1, options.checkpointsToKeep ?? 2);
+    this.maxSegmentBytes = options.maxSegmentBytes ?? 4 * 1024 * 1024;
+    this.compressionLevel = options.compressionLevel ?? 6;
+    this.sealOnClose = options.sealOnClose ?? true;
+    this.retention = options.retention ?? {};
+    this.writerOptions = {
+      maxBatchEvents: options.maxBatchEvents ?? 256,
+      maxBatchDelayMs: options.maxBatchDelayMs ?? 0,
+      fsync: options.fsync ?? 'none',
+      fsyncIntervalMs: options.fsyncIntervalMs ?? 1000,
+    };
+
+    if (this.retention.intervalMs) {
+      this.retentionTimer = setInterval(() => {
+        if (this.retaining) {
+          return;
+        }
+        this.retaining = true;
+        this.applyRetention()
+          .catch((error) => console.error('Failed to apply session retention:', error))
+          .finally(() => {
+            this.retaining = false;
+          });
+      }, this.retention.intervalMs);
+      this.retentionTimer.unref();
+    }
+  }
+
+  /**
+   * Directory for caches kept alongside the sessions (e.g. the tool metadata index)
+   */
+  getCacheDir(): string {
+    return path.join(this.basePath, '.cache');
+  }
+
+  private getSessionDir(sessionId: string): string {
+    return path.join(this.basePath, sessionId);
+  }
+
+  private getArchiveDir(): string {
+    return this.retention.archivePath ?? path.join(this.basePath, '.archive');
+  }
+
+  private getSegmentFile(sessionId: string, segment: SegmentInfo, sealed = segment.sealed): string {
+    return path.join(this.getSessionDir(sessionId), segmentFileName(segment.id, sealed));
+  }
+
+  /**
+   * In-memory state of a session, loaded from disk on first use
+   */
+  private getSession(sessionId: string): Promise<SessionSegments> {
+    let session = this.sessions.get(sessionId);
+    if (!session) {
+      const lock = this.locks.get(sessionId);
+      session = lock ? lock.then(() => this.loadSession(sessionId)) : this.loadSession(sessionId);
+      this.sessions.set(sessionId, session);
+      // A failed load is retried on next use
+      const loaded = session;
+      loaded.catch(() => {
+        if (this.sessions.get(sessionId) === loaded) {
+          this.sessions.delete(sessionId);
+        }
+      });
+    }
+    return session;
+  }
+
+  /**
+   * Load a session's manifest and reconcile it with the segment files
+   *
+   * Segments started after the manifest was last written are added to it, and
+   * segments left unsealed by an interrupted rotation are sealed again.
+   */
+  private async loadSession(sessionId: string): Promise<SessionSegments> {
+    const dir = this.getSessionDir(sessionId);
+    const manifest: SegmentManifest = (await readManifest(dir)) ?? { version: 1, segments: [] };
+
+    const files = new Map<number, { plain: boolean; sealed: boolean }>();
+    try {
+      for (const name of await fs.readdir(dir)) {
+        const match = SEGMENT_FILE.exec(name);
+        if (match) {
+          const id = Number(match[1]);
+          const file = files.get(id) ?? { plain: false, sealed: false };
+          file[match[2] ? 'sealed' : 'plain'] = true;
+          files.set(id, file);
+        }
+      }
+    } catch (error) {
+      if (!isNodeError(error) || error.code !== 'ENOENT') {
+        throw error;
+      }
+    }
+
+    const lastId = manifest.segments[manifest.segments.length - 1]?.id ?? 0;
+    for (const [id, file] of [...files].sort(([a], [b]) => a - b)) {
+      if (id > lastId) {
+        manifest.segments.push({ id, sealed: file.sealed && !file.plain });
+      }
+    }
+    manifest.segments = manifest.segments.filter((segment) => {
+      if (segment.sealed && !files.get(segment.id)?.sealed) {
+        console.error(`Session ${sessionId} is missing sealed segment ${segment.id}`);
+        return false;
+      }
+      return true;
+    });
+
+    // Sealed segments whose plain file outlived the seal
+    await Promise.all(
+      manifest.segments
+        .filter((segment) => segment.sealed && files.get(segment.id)?.plain)
+        .map((segment) => fs.rm(this.getSegmentFile(sessionId, segment, false), { force: true }))
+    );
+
+    const last = manifest.segments[manifest.segments.length - 1];
+    if (!last || last.sealed) {
+      manifest.segments.push({ id: (last?.id ?? 0) + 1, sealed: false });
+    }
+    const open = manifest.segments[manifest.segments.length - 1];
+    let openBytes = 0;
+    if (files.get(open.id)?.plain) {
+      openBytes = (await fs.stat(this.getSegmentFile(sessionId, open))).size;
+    }
+
+    const session: SessionSegments = {
+      manifest,
+      openBytes,
+      retiring: new Set(),
+      tasks: Promise.resolve(),
+    };
+    for (const segment of manifest.segments.slice(0, -1)) {
+      if (!segment.sealed) {
+        this.enqueueSeal(sessionId, session, segment);
+      }
+    }
+    return session;
+  }
+
+  /**
+   * Writer for a session's open segment, kept at the most recently used end of the map
+   */
+  private getWriter(sessionId: string, session: SessionSegments): SessionEventWriter {
+    let writer = this.writers.get(sessionId);
+    if (writer) {
+      this.writers.delete(sessionId);
+    } else {
+      const segments = session.manifest.segments;
+      writer = new SessionEventWriter(
+        this.getSegmentFile(sessionId, segments[segments.length - 1]),
+        this.writerOptions
+      );
+      this.evictIdleWriters();
+    }
+    this.writers.set(sessionId, writer);
+    return writer;
+  }
+
+  /**
+   * Close least recently used idle writers once too many files are open
+   */
+  private evictIdleWriters(): void {
+    for (const [sessionId, writer] of this.writers) {
+      if (this.writers.size < this.maxOpenFiles) {
+        return;
+      }
+      if (writer.isIdle()) {
+        this.writers.delete(sessionId);
+        writer.close().catch((error) => {
+          console.error(`Failed to close event log for session ${sessionId}:`, error);
+        });
+      }
+    }
+  }
+
+  /**
+   * Start a new open segment and seal the full one in the background
+   */
+  private rotate(sessionId: string, session: SessionSegments): void {
+    const segments = session.manifest.segments;
+    const full = segments[segments.length - 1];
+    segments.push({ id: full.id + 1, sealed: false });
+    session.openBytes = 0;
+
+    const writer = this.writers.get(sessionId);
+    this.writers.delete(sessionId);
+    if (writer) {
+      session.retiring.add(writer);
+    }
+    this.enqueueSeal(sessionId, session, full, writer);
+  }
+
+  private enqueueSeal(
+    sessionId: string,
+    session: SessionSegments,
+    segment: SegmentInfo,
+    writer?: SessionEventWriter
+  ): void {
+    session.tasks = session.tasks
+      .then(() => this.seal(sessionId, session, segment, writer))
+      .catch((error) => {
+        console.error(`Failed to seal segment ${segment.id} of session ${sessionId}:`, error);
+      });
+  }
+
+  /**
+   * Compress a segment once its writer has written everything
+   *
+   * The compressed file is complete before the manifest marks the segment
+   * sealed, and the plain file is removed only after that, so readers always
+   * find one of the two.
+   */
+  private async seal(
+    sessionId: string,
+    session: SessionSegments,
+    segment: SegmentInfo,
+    writer?: SessionEventWriter
+  ): Promise<void> {
+    if (writer) {
+      await writer.close();
+      session.retiring.delete(writer);
+    }
+
+    const plain = this.getSegmentFile(sessionId, segment, false);
+    let content: Buffer;
+    try {
+      content = await fs.readFile(plain);
+    } catch (error) {
+      if (isNodeError(error) && error.code === 'ENOENT') {
+        // Nothing was ever written to the segment
+        session.manifest.segments = session.manifest.segments.filter((s) => s !== segment);
+        await writeManifest(this.getSessionDir(sessionId), session.manifest);
+        return;
+      }
+      throw error;
+    }
+
+    const compressed = await gzipAsync(content, { level: this.compressionLevel });
+    const file = this.getSegmentFile(sessionId, segment, true);
+    const tmp = `${file}.${process.pid}.tmp`;
+    await fs.writeFile(tmp, compressed);
+    await fs.rename(tmp, file);
+
+    Object.assign(segment, {
+      sealed: true,
+      events: countEventLines(content),
+      bytes: content.length,
+      storedBytes: compressed.length,
+    });
+    await writeManifest(this.getSessionDir(sessionId), session.manifest);
+    await fs.rm(plain, { force: true });
+  }
+
+  /**
+   * Write out a session's state that was dropped by exclusive()
+   *
+   * Closes its writers and waits for pending seals. With `seal`, the session
+   * is loaded if it was not in use and its open segment is sealed too.
+   *
+   * @returns Whether the open segment was sealed
+   */
+  private async detach(
+    sessionId: string,
+    state: Promise<SessionSegments> | undefined,
+    seal: boolean
+  ): Promise<boolean> {
+    const pending = state ?? (seal ? this.loadSession(sessionId) : undefined);
+    if (!pending) {
+      return false;
+    }
+    const session = await pending;
+    const writer = this.writers.get(sessionId);
+    this.writers.delete(sessionId);
+
+    const segments = session.manifest.segments;
+    const sealing = seal && session.openBytes > 0;
+    if (sealing) {
+      this.enqueueSeal(sessionId, session, segments[segments.length - 1], writer);
+    } else {
+      session.tasks = session.tasks
+        .then(async () => {
+          await writer?.close();
+          await writeManifest(this.getSessionDir(sessionId), session.manifest);
+        })
+        .catch((error) => {
+          console.error(`Failed to close event log for session ${sessionId}:`, error);
+        });
+    }
+    await session.tasks;
+    return sealing;
+  }
+
+  /**
+   * Run a task on a session while later uses of it wait
+   *
+   * The session's in-memory state is handed to the task and dropped, so uses
+   * after the task reload it from disk.
+   */
+  private async exclusive<T>(
+    sessionId: string,
+    task: (state: Promise<SessionSegments> | undefined) => Promise<T>
+  ): Promise<T> {
+    const state = this.sessions.get(sessionId);
+    this.sessions.delete(sessionId);
+    const run = (this.locks.get(sessionId) ?? Promise.resolve()).then(() => task(state));
+    const lock = run.then(
+      () => undefined,
+      () => undefined
+    );
+    this.locks.set(sessionId, lock);
+    try {
+      return await run;
+    } finally {
+      if (this.locks.get(sessionId) === lock) {
+        this.locks.delete(sessionId);
+      }
+    }
+  }
+
+  /**
+   * Wait until the session's appended events are all written
+   */
+  private async flushSession(sessionId: string, session: SessionSegments): Promise<void> {
+    await Promise.all(
+      [this.writers.get(sessionId), ...session.retiring].map((writer) => writer?.flush())
+    );
+  }
+
+  async appendEvent(sessionId: string, event: unknown): Promise<void> {
+    const line = JSON.stringify(event) + '\n';
+    const session = await this.getSession(sessionId);
+    const bytes = line.length;
+    if (session.openBytes > 0 && session.openBytes + bytes > this.maxSegmentBytes) {
+      this.rotate(sessionId, session);
+    }
+    session.openBytes += bytes;
+    await this.getWriter(sessionId, session).append(line);
+  }
+
+  async readEvents(sessionId: string, options: ReadEventsOptions = {}): Promise<unknown[]> {
+    const events: unknown[] = [];
+    for await (const { event } of this.iterateEvents(sessionId, options)) {
+      events.push(event);
+    }
+    return events;
+  }
+
+  /**
+   * Stream a session's events across its segments with bounded memory
+   *
+   * Waits for the session's queued events first, so the stream includes
+   * everything appended before the call.
+   */
+  async *iterateEvents(
+    sessionId: string,
+    options: ReadEventsOptions = {}
+  ): AsyncGenerator<SessionEventRecord> {
+    const session = await this.getSession(sessionId);
+    await this.flushSession(sessionId, session);
+
+    const fromSeq = Math.max(0, options.fromSeq ?? 0);
+    let firstSeq = 0;
+    for (const segment of [...session.manifest.segments]) {
+      if (segment.sealed && segment.events !== undefined && firstSeq + segment.events <= fromSeq) {
+        firstSeq += segment.events;
+        continue;
+      }
+      firstSeq += yield* readEventLines(this.readSegment(sessionId, segment), firstSeq, options);
+    }
+  }
+
+  /**
+   * Chunks of a segment's content, decompressed if it is sealed
+   */
+  private async *readSegment(sessionId: string, segment: SegmentInfo): AsyncGenerator<Buffer> {
+    if (!segment.sealed) {
+      const plain = createReadStream(this.getSegmentFile(sessionId, segment, false));
+      try {
+        yield* plain as AsyncIterable<Buffer>;
+        return;
+      } catch (error) {
+        // Sealed since the read started, or not written yet
+        if (!isNodeError(error) || error.code !== 'ENOENT') {
+          throw error;
+        }
+      }
+    }
+
+    const gunzip = createGunzip();
+    pipeline(createReadStream(this.getSegmentFile(sessionId, segment, true)), gunzip, () => {
+      // Errors surface through the iteration below
+    });
+    try {
+      yield* gunzip as AsyncIterable<Buffer>;
+    } catch (error) {
+      if (segment.sealed || !isNodeError(error) || error.code !== 'ENOENT') {
+        throw error;
+      }
+    }
+  }
+
+  /**
+   * Write a checkpoint atomically, then delete all but the newest checkpointsToKeep
+   */
+  async writeCheckpoint(sessionId: string, checkpoint: SessionCheckpoint): Promise<void> {
+    await writeCheckpointFile(this.getSessionDir(sessionId), checkpoint, this.checkpointsToKeep);
+  }
+
+  /**
+   * Newest readable checkpoint; unreadable ones are skipped in favour of older ones
+   */
+  async readCheckpoint(sessionId: string): Promise<SessionCheckpoint | undefined> {
+    return readCheckpointFile(this.getSessionDir(sessionId));
+  }
+
+  async sessionExists(sessionId: string): Promise<boolean> {
+    await this.flush(sessionId);
+    try {
+      await fs.access(this.getSessionDir(sessionId));
+      return true;
+    } catch {
+      return false;
+    }
+  }
+
+  /**
+   * Delete a session and all its data
+   */
+  async deleteSession(sessionId: string): Promise<void> {
+    await this.exclusive(sessionId, async (state) => {
+      await this.detach(sessionId, state, false);
+      await fs.rm(this.getSessionDir(sessionId), { recursive: true, force: true });
+    });
+  }
+
+  /**
+   * List all session IDs, not including archived sessions
+   */
+  async listSessions(): Promise<string[]> {
+    return this.listSessionDirs(this.basePath);
+  }
+
+  /**
+   * List the IDs of archived sessions
+   */
+  async listArchivedSessions(): Promise<string[]> {
+    return this.listSessionDirs(this.getArchiveDir());
+  }
+
+  private async listSessionDirs(dir: string): Promise<string[]> {
+    try {
+      const entries = await fs.readdir(dir, { withFileTypes: true });
+      return entries
+        .filter((entry) => entry.isDirectory() && !entry.name.startsWith('.'))
+        .map((entry) => entry.name);
+    } catch (error) {
+      // Directory doesn't exist
+      if (isNodeError(error) && error.code === 'ENOENT') {
+        return [];
+      }
+      throw error;
+    }
+  }
+
+  /**
+   * Seal a session's open segment now, so all of it is stored compressed
+   *
+   * Later appends start a new segment.
+   *
+   * @returns Whether there was anything to seal
+   */
+  async sealSession(sessionId: string): Promise<boolean> {
+    return this.exclusive(sessionId, (state) => this.detach(sessionId, state, true));
+  }
+
+  /**
+   * Seal a session and move it to the archive directory
+   *
+   * Archived sessions are not listed, read or resumed until restored.
+   */
+  async archiveSession(sessionId: string, now = Date.now()): Promise<void> {
+    await this.exclusive(sessionId, async (state) => {
+      await this.detach(sessionId, state, true);
+      const dir = this.getSessionDir(sessionId);
+      const manifest = (await readManifest(dir)) ?? { version: 1, segments: [] };
+      await writeManifest(dir, { ...manifest, archivedAt: now });
+      await fs.mkdir(this.getArchiveDir(), { recursive: true });
+      await fs.rename(dir, path.join(this.getArchiveDir(), sessionId));
+    });
+  }
+
+  /**
+   * Move an archived session back, so it can be read and resumed again
+   */
+  async restoreSession(sessionId: string): Promise<void> {
+    await this.exclusive(sessionId, async () => {
+      const dir = this.getSessionDir(sessionId);
+      await fs.rename(path.join(this.getArchiveDir(), sessionId), dir);
+      const manifest = await readManifest(dir);
+      if (manifest) {
+        delete manifest.archivedAt;
+        await writeManifest(dir, manifest);
+      }
+    });
+  }
+
+  /**
+   * Apply the retention policy to every session
+   *
+   * Sessions idle for archiveAfterMs are archived, and otherwise sealed once
+   * idle for sealAfterMs. Archived sessions are deleted deleteAfterMs after
+   * they were archived. A session that fails is logged and skipped.
+   */
+  async applyRetention(now = Date.now()): Promise<RetentionResult> {
+    const { sealAfterMs, archiveAfterMs, deleteAfterMs } = this.retention;
+    const result: RetentionResult = { sealed: [], archived: [], deleted: [] };
+
+    if (sealAfterMs !== undefined || archiveAfterMs !== undefined) {
+      for (const sessionId of await this.listSessions()) {
+        try {
+          const idle = now - (await this.lastModified(this.getSessionDir(sessionId)));
+          if (archiveAfterMs !== undefined && idle >= archiveAfterMs) {
+            await this.archiveSession(sessionId, now);
+            result.archived.push(sessionId);
+          } else if (
+            sealAfterMs !== undefined &&
+            idle >= sealAfterMs &&
+            (await this.sealSession(sessionId))
+          ) {
+            result.sealed.push(sessionId);
+          }
+        } catch (error) {
+          console.error(`Failed to apply retention to session ${sessionId}:`, error);
+        }
+      }
+    }
+
+    if (deleteAfterMs !== undefined) {
+      for (const sessionId of await this.listArchivedSessions()) {
+        const dir = path.join(this.getArchiveDir(), sessionId);
+        try {
+          const archivedAt =
+            (await readManifest(dir))?.archivedAt ?? (await this.lastModified(dir));
+          if (now - archivedAt >= deleteAfterMs) {
+            await fs.rm(dir, { recursive: true, force: true });
+            result.deleted.push(sessionId);
+          }
+        } catch (error) {
+          console.error(`Failed to apply retention to archived session ${sessionId}:`, error);
+        }
+      }
+    }
+    return result;
+  }
+
+  /**
+   * Latest modification time of the files in a session directory
+   */
+  private async lastModified(dir: string): Promise<number> {
+    let latest = (await fs.stat(dir)).mtimeMs;
+    for (const name of await fs.readdir(dir)) {
+      const stats = await fs.stat(path.join(dir, name)).catch(() => undefined);
+      latest = Math.max(latest, stats?.mtimeMs ?? 0);
+    }
+    return latest;
+  }
+
+  /**
+   * Wait until every event appended to the session so far is written, and
+   * fsynced unless the fsync policy is 'none'
+   */
+  async flush(sessionId: string): Promise<void> {
+    const session = this.sessions.get(sessionId);
+    if (session) {
+      await this.flushSession(sessionId, await session);
+    }
+  }
+
+  /**
+   * Write out all queued events, finish pending seals and close every open
+   * session file, sealing open segments if sealOnClose is set
+   *
+   * Stops the retention timer. The storage stays usable: a later append
+   * reloads the session and starts writing again.
+   */
+  async close(): Promise<void> {
+    clearInterval(this.retentionTimer);
+    this.retentionTimer = undefined;
+    await Promise.all(
+      [...this.sessions.keys()].map((sessionId) =>
+        this.exclusive(sessionId, (state) => this.detach(sessionId, state, this.sealOnClose))
+      )
+    );
+  }
+}
@@ -1,3 +1,6 @@
+import type { Message } from '@/base-types';
+import type { TodoItem } from '@/tools/todowrite.tool';
+
 /**
  * Storage abstraction for session persistence
  *
@@ -13,19 +16,77 @@ export interface SessionStorage {
   appendEvent(sessionId: string, event: unknown): Promise<void>;
 
   /**
-   * Read all events for a session (for recovery)
+   * Read all events for a session (for recovery), optionally from a sequence
+   * number and/or only of some types
+   */
+  readEvents(sessionId: string, options?: ReadEventsOptions): Promise<unknown[]>;
+
+  /**
+   * Stream events with their sequence numbers (optional - lets large sessions
+   * be read without loading every event at once)
    */
-  readEvents(sessionId: string): Promise<unknown[]>;
+  iterateEvents?(sessionId: string, options?: ReadEventsOptions): AsyncIterable<SessionEventRecord>;
 
   /**
    * Check if a session exists
    */
   sessionExists(sessionId: string): Promise<boolean>;
 
+  /**
+   * Save a recovery checkpoint (optional - lets recovery skip the events it covers)
+   */
+  writeCheckpoint?(sessionId: string, checkpoint: SessionCheckpoint): Promise<void>;
+
+  /**
+   * Latest recovery checkpoint of a session, if any
+   */
+  readCheckpoint?(sessionId: string): Promise<SessionCheckpoint | undefined>;
+
   /**
    * Flush any pending writes (optional - for ensuring writes complete)
    */
   flush?(sessionId: string): Promise<void>;
+
+  /**
+   * Write out pending events and release open resources (optional - called on system cleanup)
+   */
+  close?(): Promise<void>;
+}
+
+/**
+ * Selection of events to read from a session
+ */
+export interface ReadEventsOptions {
+  /** Skip events before this sequence number (the event's 0-based position in the log) */
+  fromSeq?: number;
+  /** Only return events whose type is one of these */
+  types?: readonly string[];
+}
+
+/**
+ * An event together with its position in the session log
+ */
+export interface SessionEventRecord {
+  seq: number;
+  event: unknown;
+}
+
+/**
+ * Recovered session state as of a point in the event log
+ *
+ * Recovery starts from the latest checkpoint and replays only the events from
+ * seq onwards. Checkpoints are cut right before an assistant message, so the
+ * covered messages sanitize the same on their own as with the events after them.
+ */
+export interface SessionCheckpoint {
+  /** Sequence number of the first event not covered by the checkpoint */
+  seq: number;
+  /** Sanitized messages recovered from the covered events */
+  messages: Message[];
+  /** Todos of the last TodoWrite call among the covered events */
+  todos: TodoItem[];
+  /** When the checkpoint was taken (Unix milliseconds) */
+  timestamp: number;
 }
 
 /**
@@ -113,6 +174,31 @@ export interface ToolCallEvent extends SessionEvent {
   };
 }
 
+/**
+ * Execution measurements recorded alongside a tool result
+ *
+ * CPU time and peak RSS are reported by the Python runtime from the tool
+ * process's own rusage; other scripts only report wall time and byte counts.
+ */
+export interface ToolExecutionMetrics {
+  /** Time spent waiting for a ToolScheduler slot before the tool started */
+  queueWaitMs?: number;
+  /** Wall-clock time from spawn (or dispatch to a worker) to the result */
+  wallTimeMs?: number;
+  /** User CPU time of the tool process (of the call, for resident workers) */
+  cpuUserMs?: number;
+  /** System CPU time of the tool process (of the call, for resident workers) */
+  cpuSystemMs?: number;
+  /** Peak resident set size of the tool process in kilobytes */
+  maxRssKb?: number;
+  /** Bytes written to the tool's stdin */
+  stdinBytes?: number;
+  /** Bytes read from the tool's stdout */
+  stdoutBytes?: number;
+  /** Number of calls that shared this execution, for batched calls */
+  batchSize?: number;
+}
+
 /**
  * Tool result event
  */
@@ -124,6 +210,7 @@ export interface ToolResultEvent extends SessionEvent {
     // Size tracking for token estimation
     resultSizeBytes?: number;
     estimatedTokens?: number;
+    metrics?: ToolExecutionMetrics;
   };
 }
 
@@ -146,3 +233,38 @@ export function isSessionEvent(event: unknown): event is SessionEvent {
   const e = event as Record<string, unknown>;
   return typeof e.type === 'string' && typeof e.timestamp === 'number' && e.data !== undefined;
 }
+
+/**
+ * Check whether an event is selected by the type filter of ReadEventsOptions
+ * @param event - The stored event
+ * @param types - Event types to accept; every event is accepted when omitted
+ * @returns True if the event should be returned
+ */
+export function matchesEventTypes(event: unknown, types?: readonly string[]): boolean {
+  if (!types) {
+    return true;
+  }
+  const type =
+    typeof event === 'object' && event !== null ? (event as { type?: unknown }).type : undefined;
+  return typeof type === 'string' && types.includes(type);
+}
+
+/**
+ * Type guard to check if a stored value is a usable session checkpoint
+ * @param value - The value to check
+ * @returns True if the value is a SessionCheckpoint
+ */
+export function isSessionCheckpoint(value: unknown): value is SessionCheckpoint {
+  if (typeof value !== 'object' || value === null) {
+    return false;
+  }
+
+  const c = value as Record<string, unknown>;
+  return (
+    typeof c.seq === 'number' &&
+    Number.isInteger(c.seq) &&
+    c.seq >= 0 &&
+    Array.isArray(c.messages) &&
+    Array.isArray(c.todos)
+  );
+}
@@ -1,6 +1,7 @@
 import { ExecutionContext, Message, ToolCall, ToolResult } from '@/base-types';
 import { ToolRegistry } from '@/tools';
 import { MiddlewareContext } from '@/middleware/middleware-types';
+import { ToolExecutionMetrics } from '@/session/types';
 
 /**
  * Represents a group of tools that can be executed together
@@ -95,6 +96,13 @@ export async function executeToolsSequentially(
 
 /**
  * Executes tools concurrently with batching
+ *
+ * Calls to a tool that implements `executeBatch` are combined into one unit
+ * and dispatched together (e.g. one Python process for 50 bank account
+ * validations). Every other call is its own unit. At most MAX_CONCURRENT units
+ * run at a time, and results are returned in the original call order. Tools
+ * that declare `metadata.schedule` additionally wait for a slot in the
+ * registry's ToolScheduler, which is shared across agents.
  */
 export async function executeToolsConcurrently(
   toolCalls: ToolCall[],
@@ -108,19 +116,166 @@ export async function executeToolsConcurrently(
     `[PARALLEL] Executing ${toolCalls.length} tool(s) in parallel (max ${MAX_CONCURRENT}): ${toolCalls.map((t) => t.function.name).join(', ')}`
   );
 
-  const results: Message[] = [];
+  // Group calls to batch-capable tools; preserve first-seen order of units
+  const units: number[][] = [];
+  const batchUnits = new Map<string, number[]>();
+  toolCalls.forEach((toolCall, index) => {
+    const name = toolCall.function.name;
+    if (!toolRegistry.getTool(name)?.executeBatch) {
+      units.push([index]);
+      return;
+    }
+    const unit = batchUnits.get(name);
+    if (unit) {
+      unit.push(index);
+    } else {
+      const newUnit = [index];
+      batchUnits.set(name, newUnit);
+      units.push(newUnit);
+    }
+  });
+
+  const results: Message[] = new Array(toolCalls.length);
 
   // Execute in batches to avoid overwhelming the system
-  for (let i = 0; i < toolCalls.length; i += MAX_CONCURRENT) {
-    const batch = toolCalls.slice(i, i + MAX_CONCURRENT);
-    const batchPromises = batch.map((toolCall) =>
-      executeSingleTool(toolCall, ctx, toolRegistry, executeDelegate)
+  for (let i = 0; i < units.length; i += MAX_CONCURRENT) {
+    const batch = units.slice(i, i + MAX_CONCURRENT);
+    const batchPromises = batch.map(async (indices) => {
+      const calls = indices.map((index) => toolCalls[index]);
+      const messages =
+        calls.length > 1
+          ? await executeToolBatch(calls, ctx, toolRegistry, executeDelegate)
+          : [await executeSingleTool(calls[0], ctx, toolRegistry, executeDelegate)];
+      messages.forEach((message, j) => (results[indices[j]] = message));
+    });
+
+    await Promise.all(batchPromises);
+  }
+
+  return results;
+}
+
+/**
+ * Executes several calls to the same tool with a single executeBatch call
+ *
+ * Each call is logged individually, exactly as executeSingleTool would log
+ * it, and cached results are served before the batch runs. Calls with
+ * malformed arguments are handled by executeSingleTool and left out of the
+ * batch. If the batch itself throws, every call in it receives the error.
+ *
+ * @param toolCalls - Calls to one tool that implements executeBatch
+ * @param ctx - Middleware context
+ * @param toolRegistry - Registry to lookup tool implementation
+ * @param executeDelegate - Function for recursive agent delegation
+ * @returns Tool result messages in the same order as toolCalls
+ */
+export async function executeToolBatch(
+  toolCalls: ToolCall[],
+  ctx: MiddlewareContext,
+  toolRegistry: ToolRegistry,
+  executeDelegate: ExecuteDelegate
+): Promise<Message[]> {
+  const tool = toolRegistry.getTool(toolCalls[0].function.name);
+  if (!tool?.executeBatch) {
+    return Promise.all(
+      toolCalls.map((toolCall) => executeSingleTool(toolCall, ctx, toolRegistry, executeDelegate))
+    );
+  }
+
+  const results: Message[] = new Array(toolCalls.length);
+  const batchIndices: number[] = [];
+  const argsList: Record<string, unknown>[] = [];
+  const invalid: Promise<void>[] = [];
+  const cachePolicy = tool.metadata?.cache;
+
+  toolCalls.forEach((toolCall, index) => {
+    let args: Record<string, unknown>;
+    try {
+      args = JSON.parse(toolCall.function.arguments);
+    } catch {
+      // Let the single-call path log and report the malformed arguments
+      invalid.push(
+        executeSingleTool(toolCall, ctx, toolRegistry, executeDelegate).then((message) => {
+          results[index] = message;
+        })
+      );
+      return;
+    }
+
+    const cached = cachePolicy && getCachedResult(tool.name, args, ctx, toolRegistry);
+    if (cached) {
+      ctx.logger.logToolCall(ctx.agentName, tool.name, toolCall.id, args, ctx.lastLLMMetadata);
+      ctx.logger.logToolResult(ctx.agentName, tool.name, toolCall.id, cached);
+      results[index] = {
+        role: 'tool',
+        tool_call_id: toolCall.id,
+        content: JSON.stringify(cached),
+      };
+      return;
+    }
+
+    argsList.push(args);
+    batchIndices.push(index);
+  });
+
+  if (batchIndices.length > 0) {
+    ctx.logger.logSystemMessage(
+      `[BATCH] Executing ${batchIndices.length} call(s) to ${tool.name} in one batch`
     );
 
-    const batchResults = await Promise.all(batchPromises);
-    results.push(...batchResults);
+    batchIndices.forEach((index, j) => {
+      ctx.logger.logToolCall(
+        ctx.agentName,
+        tool.name,
+        toolCalls[index].id,
+        argsList[j],
+        ctx.lastLLMMetadata
+      );
+    });
+
+    let batchResults: ToolResult[];
+    let queueWaitMs: number | undefined;
+    try {
+      const executeBatch = tool.executeBatch.bind(tool);
+      const schedule = tool.metadata?.schedule;
+      if (schedule) {
+        // The whole batch runs as one process, so it takes a single slot
+        const scheduled = await toolRegistry.scheduler.run(tool.name, schedule.maxConcurrency, () =>
+          executeBatch(argsList)
+        );
+        batchResults = scheduled.value;
+        queueWaitMs = scheduled.queueWaitMs;
+      } else {
+        batchResults = await executeBatch(argsList);
+      }
+      if (batchResults.length !== argsList.length) {
+        throw new Error(
+          `Batch returned ${batchResults.length} results for ${argsList.length} calls`
+        );
+      }
+    } catch (executionError) {
+      batchResults = argsList.map(() => ({
+        content: null,
+        error: String(executionError),
+      }));
+    }
+
+    batchIndices.forEach((index, j) => {
+      const toolCall = toolCalls[index];
+      const { result, metrics } = takeMetrics(batchResults[j], queueWaitMs);
+      if (cachePolicy) {
+        toolRegistry.resultCache.set(tool.name, argsList[j], result, cachePolicy);
+      }
+      logResult(ctx, toolRegistry, tool.name, toolCall.id, result, metrics);
+      results[index] = {
+        role: 'tool',
+        tool_call_id: toolCall.id,
+        content: JSON.stringify(result),
+      };
+    });
   }
 
+  await Promise.all(invalid);
   return results;
 }
 
@@ -189,31 +344,63 @@ export async function executeSingleTool(
     };
   }
 
+  // Serve tools that opted into result caching without executing them
+  const cachePolicy = tool.name === 'delegate' ? undefined : tool.metadata?.cache;
+  if (cachePolicy) {
+    const cached = getCachedResult(tool.name, parsedArgs, ctx, toolRegistry);
+    if (cached) {
+      ctx.logger.logToolResult(ctx.agentName, tool.name, toolCall.id, cached);
+      return {
+        role: 'tool',
+        tool_call_id: toolCall.id,
+        content: JSON.stringify(cached),
+      };
+    }
+  }
+
   // Execute the tool with parsed arguments
-  let result: ToolResult;
+  let executed: ToolResult;
+  let queueWaitMs: number | undefined;
   try {
+    const run = (): Promise<ToolResult> =>
+      tool.executeStream
+        ? // Streaming tools report records as they arrive
+          consumeToolStream(tool.executeStream(parsedArgs), tool.name, toolCall.id, ctx)
+        : // Regular tool execution
+          tool.execute(parsedArgs);
+    const schedule = tool.metadata?.schedule;
+
     if (tool.name === 'delegate') {
       // Handle delegation to sub-agents
-      result = await handleDelegation(
+      executed = await handleDelegation(
         parsedArgs as DelegateArgs,
         ctx,
         executeDelegate,
         toolCall.id
       );
+    } else if (schedule) {
+      // Process-spawning tools wait for a slot in the shared budget
+      const scheduled = await toolRegistry.scheduler.run(tool.name, schedule.maxConcurrency, run);
+      executed = scheduled.value;
+      queueWaitMs = scheduled.queueWaitMs;
     } else {
-      // Regular tool execution
-      result = await tool.execute(parsedArgs);
+      executed = await run();
     }
   } catch (executionError) {
     // Tool execution failed - create error result
-    result = {
+    executed = {
       content: null,
       error: String(executionError),
     };
   }
 
+  const { result, metrics } = takeMetrics(executed, queueWaitMs);
+  if (cachePolicy) {
+    toolRegistry.resultCache.set(tool.name, parsedArgs, result, cachePolicy);
+  }
+
   // Always log the result, whether success or failure
-  ctx.logger.logToolResult(ctx.agentName, tool.name, toolCall.id, result);
+  logResult(ctx, toolRegistry, tool.name, toolCall.id, result, metrics);
 
   return {
     role: 'tool',
@@ -222,6 +409,81 @@ export async function executeSingleTool(
   };
 }
 
+/**
+ * Drains a tool's record stream, forwarding each record to the logger
+ *
+ * Records are passed on one at a time and not retained, so memory does not
+ * grow with the size of the stream; the stream's final result is returned.
+ */
+async function consumeToolStream(
+  stream: AsyncGenerator<unknown, ToolResult, undefined>,
+  toolName: string,
+  toolCallId: string,
+  ctx: MiddlewareContext
+): Promise<ToolResult> {
+  let count = 0;
+  let next = await stream.next();
+  while (!next.done) {
+    ctx.logger.logToolProgress?.(ctx.agentName, toolName, toolCallId, next.value, count++);
+    next = await stream.next();
+  }
+
+  ctx.logger.logSystemMessage(`[STREAM] ${toolName} streamed ${count} record(s)`);
+  return next.value;
+}
+
+/**
+ * Separates the metrics a tool attached to its result, adding the time the
+ * call waited for a scheduler slot
+ *
+ * Metrics go to the tool_result event and the registry's per-tool totals; the
+ * returned result, which is cached and sent to the LLM, no longer has them.
+ */
+function takeMetrics(
+  executed: ToolResult,
+  queueWaitMs?: number
+): { result: ToolResult; metrics?: ToolExecutionMetrics } {
+  const { metrics: usage, ...result } = executed;
+  if (!usage && queueWaitMs === undefined) return { result };
+  return { result, metrics: { ...(queueWaitMs !== undefined && { queueWaitMs }), ...usage } };
+}
+
+/**
+ * Logs a tool result, recording its execution metrics when the call has any
+ */
+function logResult(
+  ctx: MiddlewareContext,
+  toolRegistry: ToolRegistry,
+  toolName: string,
+  toolCallId: string,
+  result: ToolResult,
+  metrics?: ToolExecutionMetrics
+): void {
+  if (metrics) {
+    toolRegistry.metrics.recordExecution(toolName, metrics, Boolean(result.error));
+    ctx.logger.logToolResult(ctx.agentName, toolName, toolCallId, result, metrics);
+  } else {
+    ctx.logger.logToolResult(ctx.agentName, toolName, toolCallId, result);
+  }
+}
+
+/**
+ * Looks up a cached tool result and logs the cache counters
+ */
+function getCachedResult(
+  toolName: string,
+  args: Record<string, unknown>,
+  ctx: MiddlewareContext,
+  toolRegistry: ToolRegistry
+): ToolResult | undefined {
+  const cached = toolRegistry.resultCache.get(toolName, args);
+  const { hits, misses, size } = toolRegistry.resultCache.getStats();
+  ctx.logger.logSystemMessage(
+    `[CACHE] ${cached ? 'Hit' : 'Miss'} for ${toolName} (hits: ${hits}, misses: ${misses}, entries: ${size})`
+  );
+  return cached;
+}
+
 /**
  * Delegate tool arguments interface
  */
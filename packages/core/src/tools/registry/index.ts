@@ -1,10 +1,16 @@
 // Tool infrastructure exports
 export { ToolRegistry } from './registry';
 export { ToolLoader } from './loader';
+export { ToolMetadataIndex } from './metadata-index';
 export { ToolExecutor } from './executor';
+export { PythonWorkerPool } from './python-worker-pool';
+export { PythonForkServer } from './python-fork-server';
+export { ToolScheduler } from './tool-scheduler';
+export { PythonWorkerError, runPythonEntrypoint } from './python-runtime';
 
 // Export service functions and types
 export {
+  executeToolBatch,
   executeToolsConcurrently,
   executeToolsSequentially,
   groupToolsByConcurrency,
@@ -13,3 +19,18 @@ export {
 // Export types - must use 'export type' for type-only exports
 export type { ExecuteDelegate, ToolGroup } from './executor-service';
 export type { ToolExecutorConfig } from './executor';
+export type {
+  LoadedTools,
+  ScriptExecutionMode,
+  ScriptOutputFormat,
+  ToolLoaderOptions,
+} from './loader';
+export type { ToolMetadataIndexStats } from './metadata-index';
+export type { PythonWorkerPoolOptions, PythonWorkerPoolStats } from './python-worker-pool';
+export type { PythonForkServerOptions, PythonForkServerStats } from './python-fork-server';
+export type { PythonEntrypointOptions } from './python-runtime';
+export type {
+  ScheduledResult,
+  ToolSchedulerOptions,
+  ToolSchedulerStats,
+} from './tool-scheduler';
@@ -1,15 +1,58 @@
 import * as fs from 'fs/promises';
 import * as path from 'node:path';
-import { BaseTool, ToolParameter, ToolResult } from '@/base-types';
+import { BaseTool, ToolCachePolicy, ToolParameter, ToolResult } from '@/base-types';
 import { AgentLogger } from '@/logging';
-import { createShellTool } from '@/tools/shell.tool';
+import { SHELL_LIMITS } from '@/tools/shell.tool';
+import type { Stats } from 'node:fs';
+import type { ToolExecutionMetrics } from '@/session/types';
+import { PythonForkServer } from './python-fork-server';
+import { PythonWorkerPool } from './python-worker-pool';
+import { ToolMetadataIndex } from './metadata-index';
+import { PYTHON_SCRIPT_SHIM, PYTHON_STREAM_SHIM, runPythonEntrypoint } from './python-runtime';
+import { runScript, streamScript } from './script-runner';
+
+/**
+ * How a script tool is executed
+ * - process: a fresh interpreter per call (default)
+ * - resident: a warm worker from the Python worker pool calls the tool function
+ * - fork: a child forked from the Python fork server's pre-imported zygote
+ *   calls the tool function, then exits
+ */
+export type ScriptExecutionMode = 'process' | 'resident' | 'fork';
+
+/**
+ * How a script tool writes its result
+ * - json: a single JSON document (default)
+ * - ndjson: one JSON record per line, closed by a `{"summary": ...}` record
+ */
+export type ScriptOutputFormat = 'json' | 'ndjson';
+
+/**
+ * Script extensions in lookup order; the first match wins when a tool exists
+ * with several extensions
+ */
+const SCRIPT_EXTENSIONS = ['.py', '.js', '.sh'];
+
+/**
+ * Interpreters for script tool extensions (.sh scripts get arguments as env vars)
+ */
+const SCRIPT_INTERPRETERS: Record<string, string> = {
+  '.py': 'python3',
+  '.js': 'node',
+};
 
 /**
  * Tool metadata extracted from script files
  */
-interface ToolMetadata {
+export interface ToolMetadata {
   name: string;
   description?: string;
+  execution?: ScriptExecutionMode;
+  entrypoint?: string;
+  batch?: boolean | string;
+  cache?: ToolCachePolicy;
+  output?: ScriptOutputFormat;
+  maxConcurrency?: number;
   parameters?: Record<
     string,
     {
@@ -21,54 +64,166 @@ interface ToolMetadata {
   returns?: string;
 }
 
+/**
+ * Optional runtime services for loaded script tools
+ */
+export interface ToolLoaderOptions {
+  /** Worker pool used by Python tools declaring `execution: resident` */
+  workerPool?: PythonWorkerPool;
+  /** Fork server used by Python tools declaring `execution: fork` */
+  forkServer?: PythonForkServer;
+  /** Persistent index of parsed metadata, reused while a script is unchanged */
+  metadataIndex?: ToolMetadataIndex;
+}
+
+/**
+ * Tools loaded from a directory, and the scripts that failed to load
+ */
+export interface LoadedTools {
+  tools: BaseTool[];
+  failures: Array<{ name: string; error: unknown }>;
+}
+
 /**
  * ToolLoader - Loads script files as tools
  *
  * Similar to AgentLoader, this class loads tool definitions from script files.
  * It parses metadata from script headers and creates BaseTool wrappers that
- * execute the scripts via the shell tool.
+ * spawn the script's interpreter directly, with the arguments as JSON on stdin
+ * (no intermediate shell, so payload size is not limited by ARG_MAX).
  *
  * Supported formats:
  * - Python (.py) with docstring metadata
  * - JavaScript (.js) with JSDoc comments
  * - Shell scripts (.sh) with comment metadata
+ *
+ * Python tools can declare `entrypoint: function_name` in their docstring. The
+ * module is then imported by a small runtime shim that calls the function with
+ * the arguments as keyword arguments and returns the result as a single
+ * length-prefixed JSON frame, so the script needs no stdin/stdout wrapper.
+ *
+ * Python tools can also opt into resident execution with `execution: resident`.
+ * The entry point (or the function named after the tool) is then called inside
+ * a warm worker process instead of starting a new interpreter for every call.
+ * Tools that keep state in module globals can declare `execution: fork`: each
+ * call then runs in a child forked from a zygote process that has already
+ * imported the tool, so it starts warm but still exits after the call.
+ *
+ * Python tools that declare `batch: true` (or `batch: function_name`) also get
+ * an `executeBatch` method. It passes a list of argument dicts to the batch
+ * function (default: the entry point name with a `_many` suffix) in a single
+ * call, so many calls to the same tool share one interpreter start.
+ *
+ * Tools whose output depends only on their arguments can declare
+ * `deterministic: true` or `cache: ttl=<seconds>`; their successful results
+ * are then memoized by the registry's result cache.
+ *
+ * Python tools with large result sets can declare `output: ndjson`. They get
+ * an `executeStream` method that yields each JSON line as it is written and
+ * returns the closing summary record as the result, so output is never
+ * buffered as a whole. With an entry point, a generator function streams its
+ * yielded items and its return value becomes the summary.
+ *
+ * Every script tool runs under the registry's ToolScheduler, which caps the
+ * number of script processes across all agents. Python tools can add a
+ * per-tool cap with `max_concurrency: <n>` (e.g. 1 for a payment tool).
+ *
+ * Results carry `metrics` with the call's wall time and stdin/stdout bytes.
+ * Python tools also report CPU time and peak RSS from the tool process's
+ * rusage: plain scripts are started through a small shim that writes it on
+ * fd 3, and the entry point runtime returns it with the result.
+ *
+ * With a `metadataIndex`, parsed metadata is cached by script path, mtime and
+ * size. An unchanged script then costs one `stat` at load time; its file is
+ * not read until the tool is first executed.
  */
 export class ToolLoader {
-  private readonly shellTool: BaseTool;
-
   constructor(
     private readonly toolsDir: string,
-    private readonly logger?: AgentLogger
-  ) {
-    this.shellTool = createShellTool();
-  }
+    private readonly logger?: AgentLogger,
+    private readonly options: ToolLoaderOptions = {}
+  ) {}
 
   /**
    * Load a tool from a script file
    */
   async loadTool(name: string): Promise<BaseTool> {
     // Try different extensions
-    const extensions = ['.py', '.js', '.sh'];
-    let scriptPath: string | null = null;
-    let scriptContent: string | null = null;
-
-    for (const ext of extensions) {
+    for (const ext of SCRIPT_EXTENSIONS) {
       const fullPath = path.join(this.toolsDir, name + ext);
+      let stat: Stats;
       try {
-        scriptContent = await fs.readFile(fullPath, 'utf-8');
-        scriptPath = fullPath;
-        break;
+        stat = await fs.stat(fullPath);
       } catch {
-        // Try next extension
+        continue; // Try next extension
       }
+      if (stat.isFile()) return this.loadScript(name, fullPath, stat);
     }
 
-    if (!scriptPath || !scriptContent) {
-      throw new Error(`Tool script not found: ${name} in ${this.toolsDir}`);
+    throw new Error(`Tool script not found: ${name} in ${this.toolsDir}`);
+  }
+
+  /**
+   * Load every tool in the directory from a single directory listing
+   *
+   * Scripts are loaded concurrently; a script that fails to load is reported
+   * in `failures` instead of failing the others. When a metadata index is
+   * configured, entries for deleted scripts are dropped from it.
+   */
+  async loadTools(): Promise<LoadedTools> {
+    let files: string[];
+    try {
+      files = await fs.readdir(this.toolsDir);
+    } catch (error) {
+      if ((error as NodeJS.ErrnoException).code === 'ENOENT') {
+        return { tools: [], failures: [] };
+      }
+      throw error;
+    }
+
+    const listed = new Set(files);
+    const scripts = new Map<string, string>();
+    for (const file of files) {
+      const name = file.replace(/\.(py|js|sh)$/, '');
+      const ext = SCRIPT_EXTENSIONS.find((e) => listed.has(name + e));
+      if (name !== file && ext && !scripts.has(name)) {
+        scripts.set(name, path.join(this.toolsDir, name + ext));
+      }
     }
 
-    // Parse metadata from script
-    const metadata = this.parseMetadata(scriptContent, path.extname(scriptPath));
+    const entries = [...scripts];
+    const results = await Promise.allSettled(
+      entries.map(async ([name, scriptPath]) =>
+        this.loadScript(name, scriptPath, await fs.stat(scriptPath))
+      )
+    );
+
+    const loaded: LoadedTools = { tools: [], failures: [] };
+    results.forEach((result, i) => {
+      if (result.status === 'fulfilled') {
+        loaded.tools.push(result.value);
+      } else {
+        loaded.failures.push({ name: entries[i][0], error: result.reason });
+      }
+    });
+
+    this.options.metadataIndex?.prune(this.toolsDir, scripts.values());
+    return loaded;
+  }
+
+  /**
+   * Create the tool for a script, parsing its metadata unless the index has it
+   */
+  private async loadScript(name: string, scriptPath: string, stat: Stats): Promise<BaseTool> {
+    const index = this.options.metadataIndex;
+    let metadata = index?.get(scriptPath, stat);
+
+    if (!metadata) {
+      // Parse metadata from script
+      const scriptContent = await fs.readFile(scriptPath, 'utf-8');
+      metadata = this.parseMetadata(scriptContent, path.extname(scriptPath));
+      index?.set(scriptPath, stat, metadata);
+    }
 
     // Use provided name or fallback to filename
     const toolName = metadata.name || name;
@@ -117,10 +272,17 @@ export class ToolLoader {
 
   /**
    * Parse Python docstring metadata
-   * Format:
+   * Format (settings start at column 0):
    * """
    * name: tool_name
    * description: Tool description
+   * entrypoint: function_name   (optional, must appear before parameters)
+   * execution: resident          (optional, or fork; must appear before parameters)
+   * batch: true                   (optional, must appear before parameters)
+   * cache: ttl=300                 (optional, must appear before parameters)
+   * deterministic: true           (optional, must appear before parameters)
+   * output: ndjson                 (optional, must appear before parameters)
+   * max_concurrency: 1             (optional, must appear before parameters)
    * parameters:
    *   param1: string
    *   param2: number
@@ -136,14 +298,86 @@ export class ToolLoader {
     }
 
     const docstring = docstringMatch[1];
+    // Settings are the top-level lines before parameters:, so a parameter
+    // named like one (output, cache, ...) is not read as a setting
+    const header = docstring.split(/^parameters:/m)[0];
 
     // Parse simple key: value pairs
-    const nameMatch = RegExp(/name:\s*(.+)/).exec(docstring);
+    const nameMatch = RegExp(/name:\s*(.+)/).exec(header);
     if (nameMatch) metadata.name = nameMatch[1].trim();
 
-    const descMatch = RegExp(/description:\s*(.+)/).exec(docstring);
+    const descMatch = RegExp(/description:\s*(.+)/).exec(header);
     if (descMatch) metadata.description = descMatch[1].trim();
 
+    const executionMatch = RegExp(/^execution:\s*(\w+)/m).exec(header);
+    if (executionMatch) {
+      const mode = executionMatch[1].trim();
+      if (mode === 'process' || mode === 'resident' || mode === 'fork') {
+        metadata.execution = mode;
+      } else {
+        this.logger?.logSystemMessage(`Unknown execution mode '${mode}', using 'process'`);
+      }
+    }
+
+    const entrypointMatch = RegExp(/^entrypoint:\s*(.+)/m).exec(header);
+    if (entrypointMatch) {
+      const entrypoint = entrypointMatch[1].trim();
+      if (/^[A-Za-z_]\w*$/.test(entrypoint)) {
+        metadata.entrypoint = entrypoint;
+      } else {
+        this.logger?.logSystemMessage(`Invalid entrypoint '${entrypoint}', ignoring`);
+      }
+    }
+
+    const batchMatch = RegExp(/^batch:\s*(.+)/m).exec(header);
+    if (batchMatch) {
+      const batch = batchMatch[1].trim();
+      if (batch === 'true') {
+        metadata.batch = true;
+      } else if (/^[A-Za-z_]\w*$/.test(batch) && batch !== 'false') {
+        metadata.batch = batch;
+      } else if (batch !== 'false') {
+        this.logger?.logSystemMessage(`Invalid batch function '${batch}', ignoring`);
+      }
+    }
+
+    const cacheMatch = RegExp(/^cache:\s*(.+)/m).exec(header);
+    if (cacheMatch) {
+      const cache = cacheMatch[1].trim();
+      const ttlMatch = RegExp(/^ttl=(\d+(?:\.\d+)?)s?$/).exec(cache);
+      if (ttlMatch) {
+        metadata.cache = { ttlMs: Number(ttlMatch[1]) * 1000 };
+      } else if (cache === 'true') {
+        metadata.cache = {};
+      } else if (cache !== 'false') {
+        this.logger?.logSystemMessage(`Invalid cache policy '${cache}', not caching`);
+      }
+    }
+
+    if (RegExp(/^deterministic:\s*true\s*$/m).test(header)) {
+      metadata.cache ??= {};
+    }
+
+    const outputMatch = RegExp(/^output:\s*(\w+)/m).exec(header);
+    if (outputMatch) {
+      const output = outputMatch[1].trim();
+      if (output === 'json' || output === 'ndjson') {
+        metadata.output = output;
+      } else {
+        this.logger?.logSystemMessage(`Unknown output format '${output}', using 'json'`);
+      }
+    }
+
+    const concurrencyMatch = RegExp(/^max_concurrency:\s*(.+)/m).exec(header);
+    if (concurrencyMatch) {
+      const limit = concurrencyMatch[1].trim();
+      if (/^[1-9]\d*$/.test(limit)) {
+        metadata.maxConcurrency = Number(limit);
+      } else {
+        this.logger?.logSystemMessage(`Invalid max_concurrency '${limit}', ignoring`);
+      }
+    }
+
     // Parse parameters (simplified - could be enhanced)
     const paramsMatch = RegExp(/parameters:\s*\n((?:\s+.+\n)*)/).exec(docstring);
     if (paramsMatch) {
@@ -294,6 +528,16 @@ export class ToolLoader {
       }
     }
 
+    const isPython = path.extname(scriptPath) === '.py';
+    const functionName = metadata.entrypoint ?? name;
+    let batchFunction: string | undefined;
+    if (isPython && metadata.batch) {
+      batchFunction = metadata.batch === true ? `${functionName}_many` : metadata.batch;
+    }
+
+    const streaming = isPython && metadata.output === 'ndjson';
+    const pooled = isPython && this.pythonRunner(metadata) !== undefined;
+
     return {
       name,
       description: metadata.description || `Execute ${name} script`,
@@ -306,35 +550,46 @@ export class ToolLoader {
       execute: async (args: Record<string, unknown>): Promise<ToolResult> => {
         // Determine how to run the script based on extension
         const ext = path.extname(scriptPath);
-        let command: string;
-
-        // Build command based on script type
-        // Pass JSON via stdin for all script types (most flexible)
-        const jsonArgs = JSON.stringify(args);
-
-        if (ext === '.py') {
-          command = `echo '${jsonArgs.replace(/'/g, "'\\''")}' | python3 "${scriptPath}"`;
-        } else if (ext === '.js') {
-          // Also pass via stdin for Node.js scripts
-          command = `echo '${jsonArgs.replace(/'/g, "'\\''")}' | node "${scriptPath}"`;
-        } else if (ext === '.sh') {
+
+        if (streaming) {
+          // Drain the stream, keeping only the summary
+          const stream = this.streamPythonTool(scriptPath, functionName, metadata, args);
+          let next = await stream.next();
+          while (!next.done) next = await stream.next();
+          return next.value;
+        }
+
+        if (isPython && (metadata.entrypoint || pooled)) {
+          return this.executePythonFunction((onMetrics) =>
+            this.callPythonFunction(scriptPath, functionName, metadata, args, undefined, onMetrics)
+          );
+        }
+
+        // Spawn the interpreter directly and stream the JSON arguments to stdin
+        let result: ToolResult;
+        if (ext === '.sh') {
           // For shell scripts, pass as environment variables (they typically don't read stdin)
-          const envVars = Object.entries(args)
-            .map(([key, value]) => `${key.toUpperCase()}="${value}"`)
-            .join(' ');
-          command = `${envVars} bash "${scriptPath}"`;
+          const env = Object.fromEntries(
+            Object.entries(args).map(([key, value]) => [key.toUpperCase(), String(value)])
+          );
+          result = await runScript('bash', [scriptPath], { env, parseJson: true });
+        } else if (isPython) {
+          // The script shim runs the script unchanged and reports its rusage on fd 3
+          result = await runScript('python3', ['-c', PYTHON_SCRIPT_SHIM, scriptPath], {
+            input: JSON.stringify(args),
+            parseJson: true,
+            label: `python3 ${scriptPath}`,
+            reportsUsage: true,
+          });
         } else {
-          // Default: pass JSON via stdin
-          command = `echo '${jsonArgs.replace(/'/g, "'\\''")}' | "${scriptPath}"`;
+          // Unknown extensions are executed directly
+          const interpreter = SCRIPT_INTERPRETERS[ext];
+          result = await runScript(interpreter ?? scriptPath, interpreter ? [scriptPath] : [], {
+            input: JSON.stringify(args),
+            parseJson: true, // Try to parse output as JSON
+          });
         }
 
-        // Execute via shell tool
-        const result = await this.shellTool.execute({
-          command,
-          timeout: 30000,
-          parseJson: true, // Try to parse output as JSON
-        });
-
         // Check if the tool returned a success/error response
         if (result.content && typeof result.content === 'object') {
           const toolResponse = result.content as { success?: boolean; error?: string };
@@ -344,6 +599,7 @@ export class ToolLoader {
             return {
               content: '',
               error: toolResponse.error || 'Tool execution failed',
+              metrics: result.metrics,
             };
           }
         }
@@ -351,7 +607,173 @@ export class ToolLoader {
         return result;
       },
 
+      metadata: {
+        ...(metadata.cache && { cache: metadata.cache }),
+        // Scripts spawn processes, so they always count against the global budget
+        schedule: { maxConcurrency: metadata.maxConcurrency },
+      },
+
+      ...(streaming && {
+        executeStream: (args: Record<string, unknown>) =>
+          this.streamPythonTool(scriptPath, functionName, metadata, args),
+      }),
+
+      ...(batchFunction && {
+        executeBatch: (argsList: Record<string, unknown>[]): Promise<ToolResult[]> =>
+          this.executePythonBatch(
+            (onMetrics) =>
+              this.callPythonFunction(
+                scriptPath,
+                batchFunction,
+                metadata,
+                {},
+                [argsList],
+                onMetrics
+              ),
+            argsList.length
+          ),
+      }),
+
       isConcurrencySafe: () => true, // Scripts can generally run in parallel
     };
   }
+
+  /**
+   * The worker pool or fork server serving a Python tool's calls, if the tool
+   * opted into one and the loader has it
+   */
+  private pythonRunner(metadata: ToolMetadata): PythonWorkerPool | PythonForkServer | undefined {
+    if (metadata.execution === 'resident') return this.options.workerPool;
+    if (metadata.execution === 'fork') return this.options.forkServer;
+    return undefined;
+  }
+
+  /**
+   * Call a function in a Python tool, in a resident worker or a forked child
+   * when the tool opted in and the loader has a runner, otherwise through the
+   * one-shot shim
+   */
+  private callPythonFunction(
+    scriptPath: string,
+    functionName: string,
+    metadata: ToolMetadata,
+    kwargs: Record<string, unknown>,
+    args?: unknown[],
+    onMetrics?: (metrics: ToolExecutionMetrics) => void
+  ): Promise<unknown> {
+    const script = path.resolve(scriptPath);
+    const runner = this.pythonRunner(metadata);
+
+    if (runner) {
+      if (metadata.execution === 'fork') {
+        // Registered on first use rather than at load, so the zygote only
+        // imports tools that are called; a replacement zygote imports them up front
+        this.options.forkServer?.preload(script);
+      }
+      const timeoutMs = SHELL_LIMITS.defaultTimeout;
+      return runner.call(script, functionName, kwargs, timeoutMs, args, onMetrics);
+    }
+    return runPythonEntrypoint(script, functionName, kwargs, {
+      timeoutMs: SHELL_LIMITS.defaultTimeout,
+      args,
+      onMetrics,
+    });
+  }
+
+  /**
+   * Stream the NDJSON records of a Python tool
+   *
+   * Tools with an entry point run under the stream shim, which turns a
+   * generator's items into records; others write the records themselves.
+   * Streaming always uses a fresh process, even for resident and fork tools.
+   */
+  private async *streamPythonTool(
+    scriptPath: string,
+    functionName: string,
+    metadata: ToolMetadata,
+    args: Record<string, unknown>
+  ): AsyncGenerator<unknown, ToolResult, undefined> {
+    const script = path.resolve(scriptPath);
+    const stream = metadata.entrypoint
+      ? streamScript('python3', ['-c', PYTHON_STREAM_SHIM], {
+          input: JSON.stringify({ script, function: functionName, kwargs: args }),
+          label: `python3 ${script}`,
+          reportsUsage: true,
+        })
+      : streamScript('python3', ['-c', PYTHON_SCRIPT_SHIM, script], {
+          input: JSON.stringify(args),
+          label: `python3 ${script}`,
+          reportsUsage: true,
+        });
+
+    const result = yield* stream;
+    return result.error ? result : this.toToolResult(result.content, result.metrics);
+  }
+
+  /**
+   * Run a Python tool function call and map its result to a ToolResult
+   */
+  private async executePythonFunction(
+    call: (onMetrics: (metrics: ToolExecutionMetrics) => void) => Promise<unknown>
+  ): Promise<ToolResult> {
+    let metrics: ToolExecutionMetrics | undefined;
+    try {
+      const content = await call((m) => (metrics = m));
+      return this.toToolResult(content, metrics);
+    } catch (error) {
+      return {
+        content: '',
+        error: error instanceof Error ? error.message : String(error),
+        ...(metrics && { metrics }),
+      };
+    }
+  }
+
+  /**
+   * Run a Python batch function call and map each item to a ToolResult
+   *
+   * A failure of the whole call, or a result list of the wrong length,
+   * becomes the error of every call in the batch. Every result carries the
+   * metrics of the shared call, with `batchSize` set.
+   */
+  private async executePythonBatch(
+    call: (onMetrics: (metrics: ToolExecutionMetrics) => void) => Promise<unknown>,
+    count: number
+  ): Promise<ToolResult[]> {
+    let metrics: ToolExecutionMetrics | undefined;
+    const record = (m: ToolExecutionMetrics) => (metrics = { ...m, batchSize: count });
+    try {
+      const content = await call(record);
+      if (!Array.isArray(content) || content.length !== count) {
+        const got = Array.isArray(content) ? `${content.length} results` : typeof content;
+        throw new Error(`Batch function returned ${got}, expected ${count} results`);
+      }
+      return content.map((item) => this.toToolResult(item, metrics));
+    } catch (error) {
+      const message = error instanceof Error ? error.message : String(error);
+      return Array.from({ length: count }, () => ({
+        content: '',
+        error: message,
+        ...(metrics && { metrics }),
+      }));
+    }
+  }
+
+  /**
+   * Mirror the success/error convention used by stdout-based tools
+   */
+  private toToolResult(content: unknown, metrics?: ToolExecutionMetrics): ToolResult {
+    if (content && typeof content === 'object') {
+      const toolResponse = content as { success?: boolean; error?: string };
+      if (toolResponse.success === false) {
+        return {
+          content: '',
+          error: toolResponse.error || 'Tool execution failed',
+          ...(metrics && { metrics }),
+        };
+      }
+    }
+
+    return { content, ...(metrics && { metrics }) };
+  }
 }
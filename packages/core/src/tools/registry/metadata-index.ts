@@ -0,0 +1,133 @@
+import * as fs from 'fs/promises';
+import * as path from 'node:path';
+import type { Stats } from 'node:fs';
+import type { ToolMetadata } from './loader';
+
+/**
+ * Bump when the shape of parsed ToolMetadata changes, so stale indexes are
+ * rebuilt instead of misread
+ */
+const INDEX_VERSION = 2;
+
+interface IndexEntry {
+  mtimeMs: number;
+  size: number;
+  metadata: ToolMetadata;
+}
+
+interface IndexFile {
+  version: number;
+  entries: Record<string, IndexEntry>;
+}
+
+/**
+ * Counters describing index activity
+ */
+export interface ToolMetadataIndexStats {
+  entries: number;
+  hits: number;
+  misses: number;
+}
+
+/**
+ * ToolMetadataIndex - Persistent cache of parsed script tool metadata
+ *
+ * Entries are keyed by the script's absolute path and are only valid while
+ * its mtime and size are unchanged, so a tool directory that has not changed
+ * since the last start is loaded with one `stat` per script instead of
+ * reading and parsing every file. The index is a single JSON file written
+ * with a temp file and rename; a missing, unreadable or outdated file simply
+ * starts an empty index.
+ *
+ * @example
+ * ```typescript
+ * const index = await ToolMetadataIndex.open('.agent-sessions/.cache/tools.json');
+ * const loader = new ToolLoader('./tools', logger, { metadataIndex: index });
+ * await loader.loadTools();
+ * await index.save();
+ * ```
+ */
+export class ToolMetadataIndex {
+  private readonly stats = { hits: 0, misses: 0 };
+  private dirty = false;
+
+  private constructor(
+    readonly filePath: string,
+    private readonly entries: Map<string, IndexEntry>
+  ) {}
+
+  /**
+   * Load the index from disk, starting empty if the file is missing or invalid
+   */
+  static async open(filePath: string): Promise<ToolMetadataIndex> {
+    const entries = new Map<string, IndexEntry>();
+    try {
+      const file = JSON.parse(await fs.readFile(filePath, 'utf-8')) as IndexFile;
+      if (file.version === INDEX_VERSION && file.entries) {
+        for (const [scriptPath, entry] of Object.entries(file.entries)) {
+          entries.set(scriptPath, entry);
+        }
+      }
+    } catch {
+      // No usable index yet; it is rebuilt as tools are parsed
+    }
+    return new ToolMetadataIndex(filePath, entries);
+  }
+
+  /**
+   * Return cached metadata if the script is unchanged, counting a hit or miss
+   */
+  get(scriptPath: string, stat: Stats): ToolMetadata | undefined {
+    const entry = this.entries.get(path.resolve(scriptPath));
+    if (entry && entry.mtimeMs === stat.mtimeMs && entry.size === stat.size) {
+      this.stats.hits++;
+      return entry.metadata;
+    }
+    this.stats.misses++;
+    return undefined;
+  }
+
+  /**
+   * Record freshly parsed metadata for a script
+   */
+  set(scriptPath: string, stat: Stats, metadata: ToolMetadata): void {
+    this.entries.set(path.resolve(scriptPath), {
+      mtimeMs: stat.mtimeMs,
+      size: stat.size,
+      metadata,
+    });
+    this.dirty = true;
+  }
+
+  /**
+   * Drop entries for scripts in a directory that no longer exist
+   */
+  prune(directory: string, scriptPaths: Iterable<string>): void {
+    const dir = path.resolve(directory);
+    const keep = new Set([...scriptPaths].map((p) => path.resolve(p)));
+    for (const scriptPath of this.entries.keys()) {
+      if (path.dirname(scriptPath) === dir && !keep.has(scriptPath)) {
+        this.entries.delete(scriptPath);
+        this.dirty = true;
+      }
+    }
+  }
+
+  /**
+   * Write the index if it changed since it was opened or last saved
+   */
+  async save(): Promise<void> {
+    if (!this.dirty) return;
+
+    const file: IndexFile = { version: INDEX_VERSION, entries: Object.fromEntries(this.entries) };
+    const tempPath = `${this.filePath}.${process.pid}.tmp`;
+    await fs.mkdir(path.dirname(this.filePath), { recursive: true });
+    await fs.writeFile(tempPath, JSON.stringify(file), 'utf-8');
+    await fs.rename(tempPath, this.filePath);
+    this.dirty = false;
+  }
+
+  getStats(): ToolMetadataIndexStats {
+    return { entries: this.entries.size, ...this.stats };
+  }
+}
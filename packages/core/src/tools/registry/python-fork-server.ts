@@ -0,0 +1,440 @@
+import { spawn } from 'node:child_process';
+import type { ChildProcessWithoutNullStreams } from 'node:child_process';
+import type { ToolExecutionMetrics } from '@/session/types';
+import {
+  encodeFrame,
+  FrameDecoder,
+  PYTHON_RUNTIME_HELPERS,
+  PythonWorkerError,
+  unwrapResponse,
+} from './python-runtime';
+import type { PythonResponse } from './python-runtime';
+
+/**
+ * Python source for the fork server's zygote process
+ *
+ * The zygote imports the standard modules tools commonly use and every tool
+ * module it is asked to preload, then serves length-prefixed JSON requests
+ * from stdin. It never calls a tool itself: for each call it imports the
+ * tool module (if it is new or changed) and forks a child, which calls the
+ * function, writes one response frame to a pipe of its own and exits. Module
+ * state a tool changes therefore dies with its child, exactly as with a
+ * fresh interpreter, but the child starts with everything already imported.
+ *
+ * Children run concurrently. The zygote relays each child's frame to stdout
+ * once the child has exited, with the child's CPU time and peak RSS from
+ * wait4, and kills children that outlive their call's timeout. Children are
+ * reaped without blocking when SIGCHLD wakes the select loop, so a child that
+ * closes its pipe but does not exit holds up only its own call. A request of
+ * the form `{"preload": [script, ...]}` imports modules without a call.
+ */
+export const PYTHON_FORK_SERVER_SOURCE = `${PYTHON_RUNTIME_HELPERS}
+import atexit, datetime, hashlib, random, selectors, signal, time
+
+_out = _frame_output()
+_selector = selectors.DefaultSelector()
+_children = {}
+# SIGCHLD writes to this pipe, which wakes the select loop to reap children
+_wakeup_read, _wakeup_write = os.pipe()
+
+def _preload(script):
+    try:
+        _load(script)
+    except Exception:
+        # Reported by the child that calls the tool
+        traceback.print_exc()
+
+def _child_usage(ru):
+    maxrss = ru.ru_maxrss // 1024 if sys.platform == 'darwin' else ru.ru_maxrss
+    return {
+        'cpuUserMs': round(ru.ru_utime * 1000, 1),
+        'cpuSystemMs': round(ru.ru_stime * 1000, 1),
+        'maxRssKb': maxrss,
+    }
+
+def _fork(request):
+    _preload(request['script'])
+    read_fd, write_fd = os.pipe()
+    pid = os.fork()
+    if pid == 0:
+        try:
+            signal.set_wakeup_fd(-1)
+            signal.signal(signal.SIGCHLD, signal.SIG_DFL)
+            os.close(read_fd)
+            os.close(_wakeup_read)
+            os.close(_wakeup_write)
+            for child in _children.values():
+                if child['fd'] is not None:
+                    os.close(child['fd'])
+            os.close(_out.fileno())
+            os.dup2(os.open(os.devnull, os.O_RDONLY), 0)
+            payload = json.dumps(_invoke(request), default=str).encode('utf-8')
+            with os.fdopen(write_fd, 'wb') as result:
+                result.write(struct.pack('>I', len(payload)) + payload)
+        finally:
+            # Exit handlers run as they would at the end of an interpreter
+            try:
+                atexit._run_exitfuncs()
+            finally:
+                os._exit(0)
+    os.close(write_fd)
+    _children[pid] = {
+        'fd': read_fd,
+        'id': request.get('id'),
+        'data': b'',
+        'failure': None,
+        'timeout_ms': request.get('timeout_ms') or 30000,
+        'deadline': time.monotonic() + (request.get('timeout_ms') or 30000) / 1000,
+    }
+    _selector.register(read_fd, selectors.EVENT_READ, pid)
+
+def _close(child):
+    if child['fd'] is not None:
+        _selector.unregister(child['fd'])
+        os.close(child['fd'])
+        child['fd'] = None
+
+def _reap(pid):
+    # Only called once the child's pipe is closed, so no output is lost
+    reaped, status, ru = os.wait4(pid, os.WNOHANG)
+    if not reaped:
+        return
+    child = _children.pop(pid)
+    data = child['data']
+    failure = child['failure']
+    response = None
+    if failure is None and len(data) >= 4 and len(data) == 4 + struct.unpack('>I', data[:4])[0]:
+        try:
+            response = json.loads(data[4:])
+        except ValueError:
+            failure = 'sent an invalid frame'
+    if response is None:
+        if failure is None and os.WIFSIGNALED(status):
+            failure = 'was killed by signal %d' % os.WTERMSIG(status)
+        elif failure is None:
+            failure = 'exited with code %d and no result' % os.WEXITSTATUS(status)
+        response = {'id': child['id'], 'ok': False, 'error': 'Python tool process %s' % failure}
+    response['usage'] = _child_usage(ru)
+    _write_frame(_out, response)
+
+def _handle(request):
+    if 'preload' in request:
+        for script in request['preload']:
+            _preload(script)
+    else:
+        _fork(request)
+
+def _serve():
+    pending = b''
+    reading = True
+    os.set_blocking(_wakeup_write, False)
+    signal.set_wakeup_fd(_wakeup_write)
+    signal.signal(signal.SIGCHLD, lambda signum, frame: None)
+    _selector.register(0, selectors.EVENT_READ)
+    _selector.register(_wakeup_read, selectors.EVENT_READ)
+    while reading or _children:
+        timeout = None
+        deadlines = [c['deadline'] for c in _children.values() if c['failure'] is None]
+        if deadlines:
+            timeout = max(0, min(deadlines) - time.monotonic())
+        for key, _ in _selector.select(timeout):
+            if key.fd == 0:
+                chunk = os.read(0, 65536)
+                if not chunk:
+                    _selector.unregister(0)
+                    reading = False
+                    continue
+                pending += chunk
+                while len(pending) >= 4:
+                    size = struct.unpack('>I', pending[:4])[0]
+                    if len(pending) < 4 + size:
+                        break
+                    _handle(json.loads(pending[4:4 + size]))
+                    pending = pending[4 + size:]
+            elif key.fd == _wakeup_read:
+                os.read(_wakeup_read, 4096)
+            else:
+                child = _children[key.data]
+                chunk = os.read(key.fd, 65536)
+                if chunk:
+                    child['data'] += chunk
+                else:
+                    _close(child)
+        now = time.monotonic()
+        for pid, child in list(_children.items()):
+            if child['failure'] is None and now >= child['deadline']:
+                os.kill(pid, signal.SIGKILL)
+                child['failure'] = 'timed out after %dms' % child['timeout_ms']
+                _close(child)
+            if child['fd'] is None:
+                _reap(pid)
+
+_serve()
+`;
+
+/**
+ * Options for the Python fork server
+ */
+export interface PythonForkServerOptions {
+  /** Python interpreter to launch (default: python3) */
+  pythonPath?: string;
+  /** Default per-call timeout in milliseconds (default: 30000) */
+  callTimeoutMs?: number;
+}
+
+/**
+ * Counters describing fork server activity
+ */
+export interface PythonForkServerStats {
+  /** Whether a zygote process is running */
+  running: boolean;
+  inFlight: number;
+  calls: number;
+  /** Zygote processes started, including replacements */
+  spawned: number;
+  /** Zygote processes that died with calls in flight */
+  crashes: number;
+  /** Tool scripts imported by the zygote before their first call */
+  preloaded: number;
+}
+
+interface PendingCall {
+  onMetrics?: (metrics: ToolExecutionMetrics) => void;
+  resolve: (value: unknown) => void;
+  reject: (error: Error) => void;
+  startedAt: number;
+  stdinBytes: number;
+  timer: NodeJS.Timeout;
+}
+
+/** Time the zygote gets to enforce a call's timeout before the call is abandoned */
+const TIMEOUT_GRACE_MS = 5000;
+const STDERR_TAIL_CHARS = 2000;
+
+/**
+ * PythonForkServer - Forks a fresh, pre-imported process for every tool call
+ *
+ * A single zygote Python process imports the tool modules once; each call
+ * then runs in a child forked from it. Calls get the isolation of a new
+ * interpreter (module globals a tool mutates are gone after the call) at a
+ * fraction of the cost of starting one, which suits tools that cannot share
+ * a resident worker. The zygote is started on the first call, imports every
+ * preloaded script, and is replaced on demand if it dies.
+ *
+ * Requires `os.fork`, so it is not available on Windows.
+ *
+ * @example
+ * ```typescript
+ * const server = new PythonForkServer();
+ * server.preload('tools/claim_id_generator.py');
+ * const result = await server.call('tools/claim_id_generator.py', 'run', {
+ *   policy_number: 'POL-1',
+ * });
+ * await server.shutdown();
+ * ```
+ */
+export class PythonForkServer {
+  private readonly pythonPath: string;
+  private readonly callTimeoutMs: number;
+  private readonly scripts = new Set<string>();
+  private readonly pending = new Map<number, PendingCall>();
+  private zygote?: ChildProcessWithoutNullStreams;
+  private decoder = new FrameDecoder();
+  private stderrTail = '';
+  private nextId = 1;
+  private closed = false;
+  private readonly stats = { calls: 0, spawned: 0, crashes: 0 };
+
+  constructor(options: PythonForkServerOptions = {}) {
+    this.pythonPath = options.pythonPath ?? 'python3';
+    this.callTimeoutMs = options.callTimeoutMs ?? 30000;
+  }
+
+  /**
+   * Have the zygote import a tool script before its first call
+   *
+   * Takes effect immediately when the zygote is running, otherwise when it starts.
+   */
+  preload(scriptPath: string): void {
+    if (this.scripts.has(scriptPath)) return;
+    this.scripts.add(scriptPath);
+    this.zygote?.stdin.write(encodeFrame({ preload: [scriptPath] }));
+  }
+
+  /**
+   * Call a function in a Python script in a child forked from the zygote
+   *
+   * @param scriptPath - Path to the tool script (imported as a module)
+   * @param functionName - Module-level function to call
+   * @param kwargs - Keyword arguments passed to the function
+   * @param timeoutMs - Optional per-call timeout (kills the child when exceeded)
+   * @param args - Optional positional arguments passed before the keyword arguments
+   * @param onMetrics - Optional callback receiving the call's wall time, byte counts and usage
+   * @returns The function's return value, decoded from JSON
+   */
+  call(
+    scriptPath: string,
+    functionName: string,
+    kwargs: Record<string, unknown>,
+    timeoutMs?: number,
+    args?: unknown[],
+    onMetrics?: (metrics: ToolExecutionMetrics) => void
+  ): Promise<unknown> {
+    if (this.closed) {
+      return Promise.reject(new PythonWorkerError('Python fork server has been shut down'));
+    }
+
+    const zygote = this.zygote ?? this.start();
+    const id = this.nextId++;
+    const timeout = timeoutMs ?? this.callTimeoutMs;
+    const frame = encodeFrame({
+      id,
+      script: scriptPath,
+      function: functionName,
+      args,
+      kwargs,
+      timeout_ms: timeout,
+    });
+
+    return new Promise((resolve, reject) => {
+      // The zygote kills children that time out; this only fires if it stops answering
+      const timer = setTimeout(
+        () => this.stop(zygote, `did not answer within ${timeout}ms`),
+        timeout + TIMEOUT_GRACE_MS
+      );
+      this.pending.set(id, {
+        onMetrics,
+        resolve,
+        reject,
+        startedAt: performance.now(),
+        stdinBytes: frame.length,
+        timer,
+      });
+      this.stats.calls++;
+      this.setIdle(false);
+      zygote.stdin.write(frame);
+    });
+  }
+
+  getStats(): PythonForkServerStats {
+    return {
+      running: this.zygote !== undefined,
+      inFlight: this.pending.size,
+      preloaded: this.scripts.size,
+      ...this.stats,
+    };
+  }
+
+  /**
+   * Stop the zygote once calls in flight have finished, and reject new calls
+   */
+  async shutdown(): Promise<void> {
+    this.closed = true;
+    const zygote = this.zygote;
+    if (!zygote) return;
+
+    await new Promise<void>((resolve) => {
+      zygote.once('close', () => resolve());
+      this.setIdle(false);
+      zygote.stdin.end();
+      setTimeout(() => this.stop(zygote, 'shut down'), this.callTimeoutMs).unref();
+    });
+  }
+
+  private start(): ChildProcessWithoutNullStreams {
+    const zygote = spawn(this.pythonPath, ['-u', '-c', PYTHON_FORK_SERVER_SOURCE], {
+      stdio: ['pipe', 'pipe', 'pipe'],
+    });
+    this.zygote = zygote;
+    this.decoder = new FrameDecoder();
+    this.stderrTail = '';
+    this.stats.spawned++;
+
+    zygote.stdout.on('data', (chunk: Buffer) => this.handleData(zygote, chunk));
+    zygote.stderr.on('data', (chunk: Buffer) => {
+      this.stderrTail = (this.stderrTail + chunk.toString('utf8')).slice(-STDERR_TAIL_CHARS);
+    });
+    // Writes to a dead zygote surface through the exit handler, not as unhandled errors
+    zygote.stdin.on('error', () => {});
+    zygote.on('error', (error) => this.handleExit(zygote, `failed to start: ${error.message}`));
+    zygote.on('close', (code, signal) =>
+      this.handleExit(zygote, `exited with ${signal ? `signal ${signal}` : `code ${code}`}`)
+    );
+
+    if (this.scripts.size > 0) {
+      zygote.stdin.write(encodeFrame({ preload: [...this.scripts] }));
+    }
+    return zygote;
+  }
+
+  private handleData(zygote: ChildProcessWithoutNullStreams, chunk: Buffer): void {
+    let frames: unknown[];
+    try {
+      frames = this.decoder.push(chunk);
+    } catch (error) {
+      this.stop(zygote, `sent an invalid frame: ${error}`);
+      return;
+    }
+
+    for (const frame of frames) {
+      const response = frame as PythonResponse;
+      const id = response.id ?? -1;
+      const call = this.pending.get(id);
+      if (!call) continue;
+      this.pending.delete(id);
+      clearTimeout(call.timer);
+
+      call.onMetrics?.({
+        wallTimeMs: Math.round(performance.now() - call.startedAt),
+        stdinBytes: call.stdinBytes,
+        // Concurrent calls share the zygote's stdout, so the frame is measured re-encoded
+        stdoutBytes: 4 + Buffer.byteLength(JSON.stringify(response)),
+        ...response.usage,
+      });
+      try {
+        call.resolve(unwrapResponse(response));
+      } catch (error) {
+        call.reject(error as Error);
+      }
+    }
+    if (this.pending.size === 0) this.setIdle(true);
+  }
+
+  private stop(zygote: ChildProcessWithoutNullStreams, reason: string): void {
+    this.handleExit(zygote, reason);
+    zygote.kill('SIGKILL');
+  }
+
+  private handleExit(zygote: ChildProcessWithoutNullStreams, reason: string): void {
+    if (this.zygote !== zygote) return;
+    this.zygote = undefined;
+    if (this.pending.size === 0) return;
+
+    this.stats.crashes++;
+    const stderr = this.stderrTail.trim();
+    const error = new PythonWorkerError(
+      `Python fork server ${reason}${stderr ? `, stderr: ${stderr}` : ''}`
+    );
+    for (const call of this.pending.values()) {
+      clearTimeout(call.timer);
+      call.reject(error);
+    }
+    this.pending.clear();
+  }
+
+  /**
+   * An idle zygote must not keep the Node.js event loop alive
+   */
+  private setIdle(idle: boolean): void {
+    const zygote = this.zygote;
+    if (!zygote) return;
+    const streams = [zygote.stdin, zygote.stdout, zygote.stderr];
+    if (idle) {
+      zygote.unref();
+      streams.forEach((s) => (s as unknown as { unref?: () => void }).unref?.());
+    } else {
+      zygote.ref();
+      streams.forEach((s) => (s as unknown as { ref?: () => void }).ref?.());
+    }
+  }
+}
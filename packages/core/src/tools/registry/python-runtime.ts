@@ -0,0 +1,376 @@
+import { spawn } from 'node:child_process';
+import type { ToolExecutionMetrics } from '@/session/types';
+
+/**
+ * Python helpers reporting the process's CPU time and peak RSS via getrusage
+ *
+ * Expects `os` and `sys` to be imported. `_write_usage` writes the usage as
+ * JSON to fd 3 without importing json, so light shims can use it.
+ */
+const PYTHON_USAGE_HELPERS = `
+try:
+    import resource
+except ImportError:
+    resource = None
+
+def _rusage():
+    return resource.getrusage(resource.RUSAGE_SELF) if resource else None
+
+def _usage(since=None):
+    ru = _rusage()
+    if ru is None:
+        return None
+    user, system = ru.ru_utime, ru.ru_stime
+    if since is not None:
+        user, system = user - since.ru_utime, system - since.ru_stime
+    # ru_maxrss is in bytes on macOS and kilobytes elsewhere
+    maxrss = ru.ru_maxrss // 1024 if sys.platform == 'darwin' else ru.ru_maxrss
+    return {
+        'cpuUserMs': round(user * 1000, 1),
+        'cpuSystemMs': round(system * 1000, 1),
+        'maxRssKb': maxrss,
+    }
+
+def _write_usage(fd=3):
+    usage = _usage()
+    data = 'null' if usage is None else (
+        '{"cpuUserMs": %(cpuUserMs)s, "cpuSystemMs": %(cpuSystemMs)s, "maxRssKb": %(maxRssKb)s}'
+        % usage
+    )
+    try:
+        os.write(fd, data.encode('ascii'))
+    except OSError:
+        pass
+`;
+
+/**
+ * Python helpers shared by the one-shot entrypoint shim and resident workers
+ *
+ * `_invoke` imports the tool module (cached by path and mtime, and registered in
+ * `sys.modules` so a process pool can pickle its functions), calls the
+ * requested function with the JSON arguments (`args` positionally, `kwargs` as
+ * keyword arguments) and returns a response dict. Keyword arguments the
+ * function does not accept are dropped unless it takes `**kwargs`, matching
+ * how tools used to read optional keys from stdin.
+ *
+ * Every response carries the process's `usage` (CPU time and peak RSS from
+ * getrusage); with `per_call`, CPU time is measured for that call only.
+ */
+export const PYTHON_RUNTIME_HELPERS = `
+import importlib.util, inspect, itertools, json, os, struct, sys, traceback
+${PYTHON_USAGE_HELPERS}
+_modules = {}
+_module_ids = itertools.count()
+
+def _load(path):
+    mtime = os.stat(path).st_mtime_ns
+    cached = _modules.get(path)
+    if cached and cached[0] == mtime:
+        return cached[1]
+    directory = os.path.dirname(path)
+    if directory not in sys.path:
+        sys.path.insert(0, directory)
+    if cached:
+        sys.modules.pop(cached[1].__name__, None)
+    spec = importlib.util.spec_from_file_location('_agent_tool_%d' % next(_module_ids), path)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[spec.name] = module
+    spec.loader.exec_module(module)
+    _modules[path] = (mtime, module)
+    return module
+
+def _call(fn, args, kwargs):
+    params = list(inspect.signature(fn).parameters.values())
+    if not any(p.kind == p.VAR_KEYWORD for p in params):
+        names = {p.name for p in params}
+        kwargs = {k: v for k, v in kwargs.items() if k in names}
+    return fn(*args, **kwargs)
+
+def _invoke(request, per_call=False):
+    since = _rusage() if per_call else None
+    try:
+        fn = getattr(_load(request['script']), request['function'])
+        result = _call(fn, request.get('args') or [], request.get('kwargs') or {})
+        response = {'id': request.get('id'), 'ok': True, 'result': result}
+    except Exception as e:
+        response = {
+            'id': request.get('id'),
+            'ok': False,
+            'error': '%s: %s' % (type(e).__name__, e),
+            'traceback': traceback.format_exc(),
+        }
+    response['usage'] = _usage(since)
+    return response
+
+def _write_frame(out, response):
+    payload = json.dumps(response, default=str).encode('utf-8')
+    out.write(struct.pack('>I', len(payload)) + payload)
+    out.flush()
+
+def _frame_output():
+    out = os.fdopen(os.dup(1), 'wb')
+    os.dup2(2, 1)
+    sys.stdout = sys.stderr
+    return out
+`;
+
+/**
+ * Python source that runs one tool call and exits
+ *
+ * Reads a single `{script, function, args, kwargs}` request from stdin and
+ * writes one length-prefixed JSON response frame. Anything the tool prints
+ * goes to stderr.
+ */
+export const PYTHON_ENTRYPOINT_SHIM = `${PYTHON_RUNTIME_HELPERS}
+_out = _frame_output()
+_write_frame(_out, _invoke(json.loads(sys.stdin.buffer.read() or b'{}')))
+`;
+
+/**
+ * Python source that runs one streaming tool call and exits
+ *
+ * Reads a single request like the entrypoint shim, but writes NDJSON: when
+ * the function returns a generator, each yielded item is written as one
+ * record as soon as it is produced, followed by `{"summary": <return value>}`.
+ * Any other return value is written as the summary, and an exception as an
+ * `{"error": ...}` record. The process's usage is written to fd 3 at the end.
+ */
+export const PYTHON_STREAM_SHIM = `${PYTHON_RUNTIME_HELPERS}
+_out = _frame_output()
+
+def _write_record(record):
+    _out.write(json.dumps(record, default=str).encode('utf-8') + b'\\n')
+    _out.flush()
+
+try:
+    _request = json.loads(sys.stdin.buffer.read() or b'{}')
+    _fn = getattr(_load(_request['script']), _request['function'])
+    _result = _call(_fn, _request.get('args') or [], _request.get('kwargs') or {})
+    if inspect.isgenerator(_result):
+        while True:
+            try:
+                _write_record(next(_result))
+            except StopIteration as stop:
+                _result = stop.value
+                break
+    _write_record({'summary': _result})
+except Exception as e:
+    traceback.print_exc()
+    _write_record({'error': '%s: %s' % (type(e).__name__, e)})
+_write_usage()
+`;
+
+/**
+ * Python source that runs a tool script as `__main__` and reports its usage
+ *
+ * Invoked as `python3 -c <shim> script.py`. The script runs with its own argv
+ * and directory on sys.path, exactly as `python3 script.py` would run it, and
+ * the process's usage is written to fd 3 when it finishes (also when it exits
+ * through SystemExit). The script is compiled and executed directly rather
+ * than through runpy, so the shim adds no imports to the script's startup.
+ */
+export const PYTHON_SCRIPT_SHIM = `import os, sys
+${PYTHON_USAGE_HELPERS}
+sys.argv = sys.argv[1:]
+sys.path[0] = os.path.dirname(os.path.abspath(sys.argv[0]))
+try:
+    with open(sys.argv[0], 'rb') as _f:
+        _code = compile(_f.read(), sys.argv[0], 'exec')
+    exec(_code, {'__name__': '__main__', '__file__': sys.argv[0], '__builtins__': __builtins__})
+finally:
+    _write_usage()
+`;
+
+/**
+ * Response frame written by the Python runtime
+ */
+export interface PythonResponse {
+  id?: number;
+  ok: boolean;
+  result?: unknown;
+  error?: string;
+  traceback?: string;
+  usage?: PythonUsage | null;
+}
+
+/**
+ * Resource usage reported by the Python runtime (null where getrusage is unavailable)
+ */
+export interface PythonUsage {
+  cpuUserMs: number;
+  cpuSystemMs: number;
+  maxRssKb: number;
+}
+
+/**
+ * Parse the usage a Python shim wrote to fd 3, ignoring anything malformed
+ */
+export function parseUsage(output: string): PythonUsage | undefined {
+  try {
+    const usage = JSON.parse(output) as PythonUsage | null;
+    return usage && typeof usage.cpuUserMs === 'number' ? usage : undefined;
+  } catch {
+    return undefined;
+  }
+}
+
+/**
+ * Error raised when a Python tool function fails or its process dies
+ */
+export class PythonWorkerError extends Error {
+  constructor(
+    message: string,
+    public readonly traceback?: string
+  ) {
+    super(message);
+    this.name = 'PythonWorkerError';
+    Object.setPrototypeOf(this, PythonWorkerError.prototype);
+  }
+}
+
+/**
+ * Encode a value as a 4-byte big-endian length followed by UTF-8 JSON
+ */
+export function encodeFrame(value: unknown): Buffer {
+  const payload = Buffer.from(JSON.stringify(value), 'utf8');
+  const header = Buffer.alloc(4);
+  header.writeUInt32BE(payload.length, 0);
+  return Buffer.concat([header, payload]);
+}
+
+/**
+ * Incrementally splits a byte stream into decoded JSON frames
+ */
+export class FrameDecoder {
+  private buffer = Buffer.alloc(0);
+
+  /**
+   * Add a chunk and return every frame it completes
+   * @throws {SyntaxError} When a complete frame is not valid JSON
+   */
+  push(chunk: Buffer): unknown[] {
+    this.buffer = this.buffer.length ? Buffer.concat([this.buffer, chunk]) : chunk;
+    const frames: unknown[] = [];
+
+    while (this.buffer.length >= 4) {
+      const length = this.buffer.readUInt32BE(0);
+      if (this.buffer.length < 4 + length) break;
+
+      const body = this.buffer.subarray(4, 4 + length).toString('utf8');
+      this.buffer = this.buffer.subarray(4 + length);
+      frames.push(JSON.parse(body));
+    }
+
+    return frames;
+  }
+}
+
+/**
+ * Return the result of a response frame, or throw its error
+ */
+export function unwrapResponse(response: PythonResponse): unknown {
+  if (!response.ok) {
+    throw new PythonWorkerError(response.error || 'Tool function failed', response.traceback);
+  }
+  return response.result;
+}
+
+export interface PythonEntrypointOptions {
+  /** Python interpreter to launch (default: python3) */
+  pythonPath?: string;
+  /** Kill the process after this many milliseconds (default: 30000) */
+  timeoutMs?: number;
+  /** Positional arguments passed before the keyword arguments */
+  args?: unknown[];
+  /** Receives the call's wall time, byte counts and process usage once it completes */
+  onMetrics?: (metrics: ToolExecutionMetrics) => void;
+}
+
+const STDERR_TAIL_CHARS = 2000;
+
+/**
+ * Call a function in a Python script in a fresh interpreter
+ *
+ * The script is imported as a module (its `__main__` block does not run) and
+ * the function receives the arguments as keyword arguments. The result comes
+ * back as a single JSON frame, so tool output printed to stdout cannot be
+ * mistaken for the result.
+ *
+ * @param scriptPath - Path to the tool script
+ * @param functionName - Module-level function to call
+ * @param kwargs - Keyword arguments passed to the function
+ * @param options - Interpreter and timeout options
+ * @returns The function's return value, decoded from JSON
+ * @throws {PythonWorkerError} When the function raises, times out or the process dies
+ */
+export function runPythonEntrypoint(
+  scriptPath: string,
+  functionName: string,
+  kwargs: Record<string, unknown>,
+  options: PythonEntrypointOptions = {}
+): Promise<unknown> {
+  const pythonPath = options.pythonPath ?? 'python3';
+  const timeoutMs = options.timeoutMs ?? 30000;
+  const request = Buffer.from(
+    JSON.stringify({ script: scriptPath, function: functionName, args: options.args, kwargs }),
+    'utf8'
+  );
+
+  return new Promise((resolve, reject) => {
+    const startedAt = performance.now();
+    const child = spawn(pythonPath, ['-c', PYTHON_ENTRYPOINT_SHIM], {
+      stdio: ['pipe', 'pipe', 'pipe'],
+    });
+    const decoder = new FrameDecoder();
+    let response: PythonResponse | undefined;
+    let failure: string | undefined;
+    let stderr = '';
+    let stdoutBytes = 0;
+
+    const timer = setTimeout(() => {
+      failure = `timed out after ${timeoutMs}ms`;
+      child.kill('SIGKILL');
+    }, timeoutMs);
+
+    child.stdout.on('data', (chunk: Buffer) => {
+      stdoutBytes += chunk.length;
+      try {
+        response ??= decoder.push(chunk)[0] as PythonResponse | undefined;
+      } catch (error) {
+        failure = `sent an invalid frame: ${error}`;
+        child.kill('SIGKILL');
+      }
+    });
+    child.stderr.on('data', (chunk: Buffer) => {
+      stderr = (stderr + chunk.toString('utf8')).slice(-STDERR_TAIL_CHARS);
+    });
+    child.stdin.on('error', () => {});
+    child.on('error', (error) => {
+      failure = `failed to start: ${error.message}`;
+    });
+    child.on('close', (code, signal) => {
+      clearTimeout(timer);
+      options.onMetrics?.({
+        wallTimeMs: Math.round(performance.now() - startedAt),
+        stdinBytes: request.length,
+        stdoutBytes,
+        ...response?.usage,
+      });
+      if (response && !failure) {
+        try {
+          resolve(unwrapResponse(response));
+        } catch (error) {
+          reject(error);
+        }
+        return;
+      }
+
+      const reason =
+        failure ?? `exited with ${signal ? `signal ${signal}` : `code ${code}`} and no result`;
+      const tail = stderr.trim();
+      reject(new PythonWorkerError(`Python tool ${reason}${tail ? `, stderr: ${tail}` : ''}`));
+    });
+
+    child.stdin.end(request);
+  });
+}
@@ -0,0 +1,394 @@
+import { spawn } from 'node:child_process';
+import type { ChildProcessWithoutNullStreams } from 'node:child_process';
+import * as os from 'node:os';
+import type { ToolExecutionMetrics } from '@/session/types';
+import {
+  encodeFrame,
+  FrameDecoder,
+  PYTHON_RUNTIME_HELPERS,
+  PythonWorkerError,
+  unwrapResponse,
+} from './python-runtime';
+import type { PythonResponse } from './python-runtime';
+
+/**
+ * Python source for a resident tool worker
+ *
+ * Reads length-prefixed JSON requests from stdin and answers each with one
+ * length-prefixed JSON response. Tool modules stay imported between calls and
+ * are re-imported only when the file changes. Each response reports the CPU
+ * time of that call and the worker's peak RSS.
+ */
+export const PYTHON_WORKER_SOURCE = `${PYTHON_RUNTIME_HELPERS}
+_in = sys.stdin.buffer
+_out = _frame_output()
+
+def _read_exact(size):
+    buf = b''
+    while len(buf) < size:
+        chunk = _in.read(size - len(buf))
+        if not chunk:
+            return None
+        buf += chunk
+    return buf
+
+while True:
+    header = _read_exact(4)
+    if header is None:
+        break
+    body = _read_exact(struct.unpack('>I', header)[0])
+    if body is None:
+        break
+    _write_frame(_out, _invoke(json.loads(body), per_call=True))
+`;
+
+/**
+ * Options for the resident Python worker pool
+ */
+export interface PythonWorkerPoolOptions {
+  /** Maximum number of worker processes (default: min(4, CPU count)) */
+  size?: number;
+  /** Calls a worker serves before it is replaced, bounding leaks in tool code (default: 1000) */
+  maxCallsPerWorker?: number;
+  /** Python interpreter to launch (default: python3) */
+  pythonPath?: string;
+  /** Default per-call timeout in milliseconds (default: 30000) */
+  callTimeoutMs?: number;
+}
+
+/**
+ * Counters describing pool activity
+ */
+export interface PythonWorkerPoolStats {
+  workers: number;
+  busy: number;
+  queued: number;
+  calls: number;
+  spawned: number;
+  crashes: number;
+  recycled: number;
+}
+
+interface PendingCall {
+  id: number;
+  script: string;
+  fn: string;
+  kwargs: Record<string, unknown>;
+  args?: unknown[];
+  timeoutMs: number;
+  onMetrics?: (metrics: ToolExecutionMetrics) => void;
+  resolve: (value: unknown) => void;
+  reject: (error: Error) => void;
+}
+
+const STDERR_TAIL_CHARS = 2000;
+
+/**
+ * A single long-lived Python process serving one call at a time
+ */
+class PythonWorker {
+  readonly process: ChildProcessWithoutNullStreams;
+  calls = 0;
+  current?: PendingCall;
+  /** Dispatch time and bytes exchanged for the current call */
+  usage = { startedAt: 0, stdinBytes: 0, stdoutBytes: 0 };
+  private readonly decoder = new FrameDecoder();
+  private stderrTail = '';
+  private timer?: NodeJS.Timeout;
+  private exited = false;
+
+  constructor(
+    pythonPath: string,
+    private readonly onResponse: (worker: PythonWorker, response: PythonResponse) => void,
+    private readonly onExit: (worker: PythonWorker, reason: string) => void
+  ) {
+    this.process = spawn(pythonPath, ['-u', '-c', PYTHON_WORKER_SOURCE], {
+      stdio: ['pipe', 'pipe', 'pipe'],
+    });
+
+    this.process.stdout.on('data', (chunk: Buffer) => this.handleData(chunk));
+    this.process.stderr.on('data', (chunk: Buffer) => {
+      this.stderrTail = (this.stderrTail + chunk.toString('utf8')).slice(-STDERR_TAIL_CHARS);
+    });
+    // Writes to a dead worker surface through the exit handler, not as unhandled errors
+    this.process.stdin.on('error', () => {});
+    this.process.on('error', (error) => this.handleExit(`failed to start: ${error.message}`));
+    this.process.on('close', (code, signal) =>
+      this.handleExit(`exited with ${signal ? `signal ${signal}` : `code ${code}`}`)
+    );
+
+    this.setIdle(true);
+  }
+
+  get alive(): boolean {
+    return !this.exited;
+  }
+
+  send(call: PendingCall): void {
+    this.current = call;
+    this.calls++;
+    this.setIdle(false);
+
+    const frame = encodeFrame({
+      id: call.id,
+      script: call.script,
+      function: call.fn,
+      args: call.args,
+      kwargs: call.kwargs,
+    });
+    this.usage = { startedAt: performance.now(), stdinBytes: frame.length, stdoutBytes: 0 };
+    this.process.stdin.write(frame);
+
+    this.timer = setTimeout(() => {
+      this.kill(`timed out after ${call.timeoutMs}ms`);
+    }, call.timeoutMs);
+  }
+
+  finishCall(): PendingCall | undefined {
+    const call = this.current;
+    this.current = undefined;
+    if (this.timer) {
+      clearTimeout(this.timer);
+      this.timer = undefined;
+    }
+    this.setIdle(true);
+    return call;
+  }
+
+  kill(reason: string): void {
+    if (this.exited) return;
+    this.handleExit(reason);
+    this.process.kill('SIGKILL');
+  }
+
+  /**
+   * Close stdin so the worker loop ends after its current call; the process
+   * stays referenced until it exits so callers can await its 'close' event
+   */
+  retire(): void {
+    this.setIdle(false);
+    this.process.stdin.end();
+  }
+
+  stderr(): string {
+    return this.stderrTail.trim();
+  }
+
+  private handleData(chunk: Buffer): void {
+    this.usage.stdoutBytes += chunk.length;
+    let frames: unknown[];
+    try {
+      frames = this.decoder.push(chunk);
+    } catch (error) {
+      this.kill(`sent an invalid frame: ${error}`);
+      return;
+    }
+    for (const frame of frames) {
+      this.onResponse(this, frame as PythonResponse);
+    }
+  }
+
+  private handleExit(reason: string): void {
+    if (this.exited) return;
+    this.exited = true;
+    if (this.timer) {
+      clearTimeout(this.timer);
+      this.timer = undefined;
+    }
+    this.onExit(this, reason);
+  }
+
+  /**
+   * Idle workers must not keep the Node.js event loop alive
+   */
+  private setIdle(idle: boolean): void {
+    const streams = [this.process.stdin, this.process.stdout, this.process.stderr];
+    if (idle) {
+      this.process.unref();
+      streams.forEach((s) => (s as unknown as { unref?: () => void }).unref?.());
+    } else {
+      this.process.ref();
+      streams.forEach((s) => (s as unknown as { ref?: () => void }).ref?.());
+    }
+  }
+}
+
+/**
+ * PythonWorkerPool - Long-lived Python processes for resident script tools
+ *
+ * Each worker imports a tool module the first time it is called and keeps it
+ * loaded, so repeated calls skip interpreter startup and module imports.
+ * Calls are queued when all workers are busy. Workers that crash or time out
+ * are replaced on demand, and workers are recycled after a configurable
+ * number of calls.
+ *
+ * @example
+ * ```typescript
+ * const pool = new PythonWorkerPool({ size: 2 });
+ * const result = await pool.call('tools/check_fraud_indicators.py', 'check_fraud_indicators', {
+ *   claim_id: 'CI-1',
+ *   policy_number: 'POL-1',
+ *   amount: 1000,
+ * });
+ * await pool.shutdown();
+ * ```
+ */
+export class PythonWorkerPool {
+  private readonly size: number;
+  private readonly maxCallsPerWorker: number;
+  private readonly pythonPath: string;
+  private readonly callTimeoutMs: number;
+  private readonly workers = new Set<PythonWorker>();
+  private readonly queue: PendingCall[] = [];
+  private nextId = 1;
+  private closed = false;
+  private readonly stats = { calls: 0, spawned: 0, crashes: 0, recycled: 0 };
+
+  constructor(options: PythonWorkerPoolOptions = {}) {
+    this.size = Math.max(1, options.size ?? Math.min(4, os.cpus().length || 1));
+    this.maxCallsPerWorker = Math.max(1, options.maxCallsPerWorker ?? 1000);
+    this.pythonPath = options.pythonPath ?? 'python3';
+    this.callTimeoutMs = options.callTimeoutMs ?? 30000;
+  }
+
+  /**
+   * Call a function in a Python script using a warm worker
+   *
+   * @param scriptPath - Path to the tool script (imported as a module)
+   * @param functionName - Module-level function to call
+   * @param kwargs - Keyword arguments passed to the function
+   * @param timeoutMs - Optional per-call timeout (kills the worker when exceeded)
+   * @param args - Optional positional arguments passed before the keyword arguments
+   * @param onMetrics - Optional callback receiving the call's wall time, byte counts and usage
+   * @returns The function's return value, decoded from JSON
+   */
+  call(
+    scriptPath: string,
+    functionName: string,
+    kwargs: Record<string, unknown>,
+    timeoutMs?: number,
+    args?: unknown[],
+    onMetrics?: (metrics: ToolExecutionMetrics) => void
+  ): Promise<unknown> {
+    if (this.closed) {
+      return Promise.reject(new PythonWorkerError('Python worker pool has been shut down'));
+    }
+
+    return new Promise((resolve, reject) => {
+      this.queue.push({
+        id: this.nextId++,
+        script: scriptPath,
+        fn: functionName,
+        kwargs,
+        args,
+        timeoutMs: timeoutMs ?? this.callTimeoutMs,
+        onMetrics,
+        resolve,
+        reject,
+      });
+      this.stats.calls++;
+      this.dispatch();
+    });
+  }
+
+  getStats(): PythonWorkerPoolStats {
+    const busy = [...this.workers].filter((w) => w.current).length;
+    return {
+      workers: this.workers.size,
+      busy,
+      queued: this.queue.length,
+      ...this.stats,
+    };
+  }
+
+  /**
+   * Stop all workers and reject queued calls
+   */
+  async shutdown(): Promise<void> {
+    this.closed = true;
+    for (const call of this.queue.splice(0)) {
+      call.reject(new PythonWorkerError('Python worker pool has been shut down'));
+    }
+
+    const exits = [...this.workers].map(
+      (worker) =>
+        new Promise<void>((resolve) => {
+          if (!worker.alive) return resolve();
+          worker.process.once('close', () => resolve());
+          worker.retire();
+          setTimeout(() => worker.kill('shut down'), 1000).unref();
+        })
+    );
+    await Promise.all(exits);
+  }
+
+  private dispatch(): void {
+    while (this.queue.length > 0) {
+      let worker = [...this.workers].find((w) => w.alive && !w.current);
+      if (!worker) {
+        if (this.workers.size >= this.size) return;
+        worker = this.spawnWorker();
+      }
+      const call = this.queue.shift();
+      if (call) worker.send(call);
+    }
+  }
+
+  private spawnWorker(): PythonWorker {
+    const worker = new PythonWorker(
+      this.pythonPath,
+      (w, response) => this.handleResponse(w, response),
+      (w, reason) => this.handleExit(w, reason)
+    );
+    this.workers.add(worker);
+    this.stats.spawned++;
+    return worker;
+  }
+
+  private handleResponse(worker: PythonWorker, response: PythonResponse): void {
+    const call = worker.finishCall();
+    if (!call || call.id !== response.id) {
+      worker.kill(`answered unknown call ${response.id}`);
+      return;
+    }
+
+    const { startedAt, stdinBytes, stdoutBytes } = worker.usage;
+    call.onMetrics?.({
+      wallTimeMs: Math.round(performance.now() - startedAt),
+      stdinBytes,
+      stdoutBytes,
+      ...response.usage,
+    });
+
+    try {
+      call.resolve(unwrapResponse(response));
+    } catch (error) {
+      call.reject(error as Error);
+    }
+
+    if (worker.calls >= this.maxCallsPerWorker) {
+      this.workers.delete(worker);
+      this.stats.recycled++;
+      worker.retire();
+    }
+    this.dispatch();
+  }
+
+  private handleExit(worker: PythonWorker, reason: string): void {
+    const wasActive = this.workers.delete(worker);
+    const call = worker.finishCall();
+
+    if (call) {
+      this.stats.crashes++;
+      const stderr = worker.stderr();
+      call.reject(
+        new PythonWorkerError(`Python worker ${reason}${stderr ? `, stderr: ${stderr}` : ''}`)
+      );
+    }
+
+    // Replace lost capacity for anything still waiting
+    if (wasActive && !this.closed) {
+      this.dispatch();
+    }
+  }
+}
@@ -6,6 +6,9 @@ import {
   InvalidToolNameError,
   InvalidToolSchemaError,
 } from '../errors';
+import { ToolResultCache } from './result-cache';
+import { ToolScheduler } from './tool-scheduler';
+import { ToolMetricsCollector } from '@/metrics/tool-metrics-collector';
 
 /**
  * Interface for tool registry implementations
@@ -21,6 +24,20 @@ export interface IToolRegistry {
 export class ToolRegistry implements IToolRegistry {
   private readonly tools = new Map<string, Tool>();
 
+  /** Per-tool totals of the metrics recorded with tool results */
+  readonly metrics = new ToolMetricsCollector();
+
+  /**
+   * @param resultCache - Results of tools that declare `metadata.cache`, shared
+   *   by every agent that executes tools through this registry
+   * @param scheduler - Budget for tools that declare `metadata.schedule`
+   *   (default: the process-wide ToolScheduler.shared)
+   */
+  constructor(
+    readonly resultCache: ToolResultCache = new ToolResultCache(),
+    readonly scheduler: ToolScheduler = ToolScheduler.shared
+  ) {}
+
   register(tool: Tool): void {
     // Validate tool
     const missingFields: string[] = [];
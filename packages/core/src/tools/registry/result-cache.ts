@@ -0,0 +1,128 @@
+import type { ToolCachePolicy, ToolResult } from '@/base-types';
+
+/**
+ * Options for the tool result cache
+ */
+export interface ToolResultCacheOptions {
+  /** Maximum number of cached results before the least recently used is evicted (default: 500) */
+  maxEntries?: number;
+}
+
+/**
+ * Counters describing cache activity
+ */
+export interface ToolResultCacheStats {
+  size: number;
+  hits: number;
+  misses: number;
+  evictions: number;
+  expirations: number;
+}
+
+interface CacheEntry {
+  result: ToolResult;
+  expiresAt: number;
+}
+
+/**
+ * Serialize arguments with object keys sorted, so that argument order does
+ * not change the cache key
+ */
+function canonicalize(value: unknown): string {
+  if (Array.isArray(value)) {
+    return `[${value.map(canonicalize).join(',')}]`;
+  }
+  if (value && typeof value === 'object') {
+    const record = value as Record<string, unknown>;
+    const entries = Object.keys(record)
+      .sort()
+      .filter((key) => record[key] !== undefined)
+      .map((key) => `${JSON.stringify(key)}:${canonicalize(record[key])}`);
+    return `{${entries.join(',')}}`;
+  }
+  return JSON.stringify(value) ?? 'null';
+}
+
+/**
+ * ToolResultCache - Memoizes results of tools that declare a cache policy
+ *
+ * Results are keyed by tool name and canonicalized arguments. Entries expire
+ * after the policy's TTL (deterministic tools have none) and the least
+ * recently used entry is evicted once the cache is full. Only successful
+ * results are stored.
+ *
+ * @example
+ * ```typescript
+ * const cache = new ToolResultCache({ maxEntries: 100 });
+ * cache.set('get_policy_details', { policy_number: 'POL-1' }, result, { ttlMs: 300000 });
+ * cache.get('get_policy_details', { policy_number: 'POL-1' }); // result
+ * ```
+ */
+export class ToolResultCache {
+  private readonly maxEntries: number;
+  private readonly entries = new Map<string, CacheEntry>();
+  private readonly stats = { hits: 0, misses: 0, evictions: 0, expirations: 0 };
+
+  constructor(options: ToolResultCacheOptions = {}) {
+    this.maxEntries = Math.max(1, options.maxEntries ?? 500);
+  }
+
+  /**
+   * Look up a cached result, counting a hit or miss
+   */
+  get(toolName: string, args: Record<string, unknown>): ToolResult | undefined {
+    const key = this.key(toolName, args);
+    const entry = this.entries.get(key);
+
+    if (entry && entry.expiresAt <= Date.now()) {
+      this.entries.delete(key);
+      this.stats.expirations++;
+    } else if (entry) {
+      // Re-insert to mark as most recently used
+      this.entries.delete(key);
+      this.entries.set(key, entry);
+      this.stats.hits++;
+      return entry.result;
+    }
+
+    this.stats.misses++;
+    return undefined;
+  }
+
+  /**
+   * Store a result; results with an error are not cached
+   */
+  set(
+    toolName: string,
+    args: Record<string, unknown>,
+    result: ToolResult,
+    policy: ToolCachePolicy
+  ): void {
+    if (result.error) return;
+
+    const key = this.key(toolName, args);
+    this.entries.delete(key);
+    this.entries.set(key, {
+      result,
+      expiresAt: policy.ttlMs === undefined ? Infinity : Date.now() + policy.ttlMs,
+    });
+
+    while (this.entries.size > this.maxEntries) {
+      const oldest = this.entries.keys().next().value as string;
+      this.entries.delete(oldest);
+      this.stats.evictions++;
+    }
+  }
+
+  getStats(): ToolResultCacheStats {
+    return { size: this.entries.size, ...this.stats };
+  }
+
+  clear(): void {
+    this.entries.clear();
+  }
+
+  private key(toolName: string, args: Record<string, unknown>): string {
+    return `${toolName}:${canonicalize(args)}`;
+  }
+}
@@ -0,0 +1,330 @@
+import { spawn } from 'node:child_process';
+import type { ChildProcessByStdio } from 'node:child_process';
+import type { Readable, Writable } from 'node:stream';
+import { ToolResult } from '@/base-types';
+import { SHELL_LIMITS } from '@/tools/shell.tool';
+import { parseUsage } from './python-runtime';
+
+/**
+ * Options for running a script process
+ */
+export interface ScriptRunOptions {
+  /** Written to the script's stdin, then stdin is closed */
+  input?: string;
+  /** Extra environment variables, merged over process.env */
+  env?: Record<string, string>;
+  /** Working directory (default: process.cwd()) */
+  cwd?: string;
+  /** Kill the script after this many milliseconds (default: SHELL_LIMITS.defaultTimeout) */
+  timeout?: number;
+  /** Attempt to parse stdout as JSON (default: false) */
+  parseJson?: boolean;
+  /** Name used in error messages instead of the full command line */
+  label?: string;
+  /** The script writes its resource usage as JSON to fd 3 (see PYTHON_SCRIPT_SHIM) */
+  reportsUsage?: boolean;
+}
+
+type ScriptProcess = ChildProcessByStdio<Writable, Readable, Readable>;
+
+/**
+ * Spawn a script, opening fd 3 for its usage report when it writes one
+ *
+ * @returns The child and a promise for the usage it reported (undefined if none)
+ */
+function spawnScript(
+  command: string,
+  args: string[],
+  options: { env?: Record<string, string>; cwd?: string; reportsUsage?: boolean }
+): { child: ScriptProcess; usage: Promise<ReturnType<typeof parseUsage>> } {
+  const child = spawn(command, args, {
+    cwd: options.cwd || process.cwd(),
+    env: options.env ? { ...process.env, ...options.env } : process.env,
+    stdio: options.reportsUsage ? ['pipe', 'pipe', 'pipe', 'pipe'] : ['pipe', 'pipe', 'pipe'],
+  }) as ScriptProcess;
+
+  const usageStream = options.reportsUsage ? (child.stdio[3] as Readable | null) : null;
+  if (!usageStream) return { child, usage: Promise.resolve(undefined) };
+
+  const usage = new Promise<ReturnType<typeof parseUsage>>((resolve) => {
+    let output = '';
+    usageStream.on('data', (chunk: Buffer) => (output += chunk.toString('utf8')));
+    usageStream.on('error', () => resolve(undefined));
+    usageStream.on('close', () => resolve(parseUsage(output)));
+  });
+  return { child, usage };
+}
+
+/**
+ * Run a script with argv directly, without an intermediate shell
+ *
+ * The input is streamed to stdin instead of being embedded in a command
+ * line, so payloads are not limited by ARG_MAX and need no quoting. Output
+ * is collected incrementally and follows the same limits and result shape
+ * as the shell tool: stdout is trimmed, truncated at SHELL_LIMITS.maxOutput
+ * and optionally parsed as JSON; stderr, a non-zero exit code or a timeout
+ * is reported in `error`.
+ *
+ * The result's `metrics` record wall time and stdin/stdout bytes, plus CPU
+ * time and peak RSS when the script reports its usage on fd 3.
+ *
+ * @param command - Executable to launch (e.g. python3, node, bash, or the script itself)
+ * @param args - Arguments passed to the executable
+ * @param options - Input, environment and limits
+ * @returns ToolResult mirroring the shell tool's output format
+ */
+export function runScript(
+  command: string,
+  args: string[],
+  options: ScriptRunOptions = {}
+): Promise<ToolResult> {
+  const timeout = options.timeout ?? SHELL_LIMITS.defaultTimeout;
+  const label = options.label ?? [command, ...args].join(' ');
+  const input = Buffer.from(options.input ?? '', 'utf8');
+
+  return new Promise((resolve) => {
+    const startedAt = performance.now();
+    const { child, usage } = spawnScript(command, args, options);
+
+    const stdoutChunks: Buffer[] = [];
+    const stderrChunks: Buffer[] = [];
+    let bufferedBytes = 0;
+    let stdoutBytes = 0;
+    let failure: string | undefined;
+
+    // Stop collecting (but keep draining) once the raw output limit is reached
+    const collect = (chunks: Buffer[]) => (chunk: Buffer) => {
+      if (chunks === stdoutChunks) stdoutBytes += chunk.length;
+      if (bufferedBytes >= SHELL_LIMITS.maxBuffer) return;
+      bufferedBytes += chunk.length;
+      chunks.push(chunk);
+    };
+
+    const timer = setTimeout(() => {
+      failure = `Script timed out after ${timeout}ms`;
+      child.kill('SIGTERM');
+    }, timeout);
+
+    child.stdout.on('data', collect(stdoutChunks));
+    child.stderr.on('data', collect(stderrChunks));
+    // Scripts that never read stdin may close it early
+    child.stdin.on('error', () => {});
+    child.on('error', (error) => {
+      failure = `Failed to start script: ${error.message}`;
+    });
+
+    child.on('close', async (code, signal) => {
+      clearTimeout(timer);
+      const metrics = {
+        wallTimeMs: Math.round(performance.now() - startedAt),
+        stdinBytes: input.length,
+        stdoutBytes,
+        ...(await usage),
+      };
+
+      let stdout = Buffer.concat(stdoutChunks).toString('utf8').trim();
+      const stderr = Buffer.concat(stderrChunks).toString('utf8');
+      if (stdout.length > SHELL_LIMITS.maxOutput) {
+        stdout = stdout.slice(0, SHELL_LIMITS.maxOutput) + SHELL_LIMITS.truncateMessage;
+      }
+
+      const stderrInfo = stderr ? `, stderr: ${stderr}` : '';
+      if (!failure && code !== 0) {
+        failure = `Script failed: ${label}. Exit code: ${code ?? signal}`;
+      }
+      if (failure) {
+        resolve({ content: stdout, error: `${failure}${stderrInfo}`, metrics });
+        return;
+      }
+
+      let content: unknown = stdout;
+      if (options.parseJson && stdout) {
+        try {
+          content = JSON.parse(stdout);
+        } catch {
+          // If JSON parsing fails, return raw output
+        }
+      }
+
+      resolve({
+        content,
+        // Include stderr in error field if present
+        error: stderr ? `stderr: ${stderr}` : undefined,
+        metrics,
+      });
+    });
+
+    child.stdin.end(input);
+  });
+}
+
+/**
+ * Options for streaming a script's NDJSON output
+ */
+export interface ScriptStreamOptions {
+  /** Written to the script's stdin, then stdin is closed */
+  input?: string;
+  /** Extra environment variables, merged over process.env */
+  env?: Record<string, string>;
+  /** Working directory (default: process.cwd()) */
+  cwd?: string;
+  /** Kill the script after this many milliseconds (default: SHELL_LIMITS.defaultTimeout) */
+  timeout?: number;
+  /** Name used in error messages instead of the full command line */
+  label?: string;
+  /** The script writes its resource usage as JSON to fd 3 (see PYTHON_SCRIPT_SHIM) */
+  reportsUsage?: boolean;
+}
+
+const STDERR_TAIL_CHARS = 2000;
+
+/**
+ * Return the final record's result, or undefined for a partial record
+ *
+ * A stream is closed by a record whose only key is `summary` (the tool's
+ * result) or `error` (a failure message).
+ */
+function finalRecord(record: unknown): ToolResult | undefined {
+  if (!record || typeof record !== 'object' || Array.isArray(record)) return undefined;
+  const keys = Object.keys(record);
+  if (keys.length !== 1) return undefined;
+
+  const { summary, error } = record as { summary?: unknown; error?: unknown };
+  if (keys[0] === 'summary') return { content: summary };
+  if (keys[0] === 'error') return { content: '', error: String(error) };
+  return undefined;
+}
+
+/**
+ * Split a byte stream into lines, pulling chunks only as lines are consumed
+ *
+ * Yields undefined (and stops) when a line grows beyond SHELL_LIMITS.maxBuffer.
+ */
+async function* readLines(
+  stream: AsyncIterable<Buffer>,
+  onChunk?: (chunk: Buffer) => void
+): AsyncGenerator<string | undefined> {
+  let pending = '';
+  for await (const chunk of stream) {
+    onChunk?.(chunk);
+    pending += chunk.toString('utf8');
+
+    let newline: number;
+    while ((newline = pending.indexOf('\n')) !== -1) {
+      yield pending.slice(0, newline);
+      pending = pending.slice(newline + 1);
+    }
+    if (pending.length > SHELL_LIMITS.maxBuffer) {
+      yield undefined;
+      return;
+    }
+  }
+  if (pending) yield pending;
+}
+
+/**
+ * Run a script that writes newline-delimited JSON records and yield them as
+ * they arrive
+ *
+ * stdout is read only as fast as the consumer pulls records, so a slow
+ * consumer pauses the pipe and the script blocks on write instead of the
+ * output piling up in memory. Only the current line is buffered; a single
+ * record larger than SHELL_LIMITS.maxBuffer fails the stream.
+ *
+ * The stream must end with a `{"summary": ...}` record, whose value becomes
+ * the returned result, or an `{"error": "..."}` record. Invalid JSON, a
+ * missing final record, a non-zero exit code or a timeout is returned as an
+ * error result. Stopping the iteration early kills the script. The returned
+ * result carries `metrics` like runScript's.
+ *
+ * @param command - Executable to launch
+ * @param args - Arguments passed to the executable
+ * @param options - Input, environment and limits
+ * @returns Generator yielding each partial record and returning the final ToolResult
+ */
+export async function* streamScript(
+  command: string,
+  args: string[],
+  options: ScriptStreamOptions = {}
+): AsyncGenerator<unknown, ToolResult, undefined> {
+  const timeout = options.timeout ?? SHELL_LIMITS.defaultTimeout;
+  const label = options.label ?? [command, ...args].join(' ');
+  const input = Buffer.from(options.input ?? '', 'utf8');
+
+  const startedAt = performance.now();
+  const { child, usage } = spawnScript(command, args, options);
+  let stdoutBytes = 0;
+  const withMetrics = async (result: ToolResult): Promise<ToolResult> => ({
+    ...result,
+    metrics: {
+      wallTimeMs: Math.round(performance.now() - startedAt),
+      stdinBytes: input.length,
+      stdoutBytes,
+      ...(await usage),
+    },
+  });
+
+  let stderr = '';
+  let failure: string | undefined;
+  const closed = new Promise<number | string | null>((resolve) => {
+    child.on('close', (code, signal) => resolve(code ?? signal));
+  });
+
+  const timer = setTimeout(() => {
+    failure = `Script timed out after ${timeout}ms`;
+    child.kill('SIGTERM');
+  }, timeout);
+
+  child.stderr.on('data', (chunk: Buffer) => {
+    stderr = (stderr + chunk.toString('utf8')).slice(-STDERR_TAIL_CHARS);
+  });
+  child.stdin.on('error', () => {});
+  child.on('error', (error) => {
+    failure = `Failed to start script: ${error.message}`;
+  });
+  child.stdin.end(input);
+
+  const fail = async (message: string): Promise<ToolResult> => {
+    child.kill('SIGTERM');
+    await closed;
+    const tail = stderr.trim();
+    return withMetrics({ content: '', error: `${message}${tail ? `, stderr: ${tail}` : ''}` });
+  };
+
+  let result: ToolResult | undefined;
+  let lineNumber = 0;
+
+  try {
+    for await (const line of readLines(child.stdout, (chunk) => (stdoutBytes += chunk.length))) {
+      lineNumber++;
+      if (line === undefined) {
+        return await fail(`Script record on line ${lineNumber} exceeds the output limit`);
+      }
+      if (!line.trim()) continue;
+      if (result) {
+        return await fail(`Script wrote output after its final record (line ${lineNumber})`);
+      }
+
+      let record: unknown;
+      try {
+        record = JSON.parse(line);
+      } catch {
+        return await fail(`Script wrote invalid JSON on line ${lineNumber}`);
+      }
+
+      result = finalRecord(record);
+      if (!result) yield record;
+    }
+
+    const code = await closed;
+    if (failure) return await fail(failure);
+    if (result?.error) return await fail(result.error);
+    if (code !== 0) return await fail(`Script failed: ${label}. Exit code: ${code}`);
+    if (!result) return await fail('Script output ended without a summary record');
+    return await withMetrics(result);
+  } finally {
+    clearTimeout(timer);
+    // Stops the script if the consumer returned early
+    if (child.exitCode === null && child.signalCode === null) child.kill('SIGTERM');
+  }
+}
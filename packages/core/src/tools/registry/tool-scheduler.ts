@@ -0,0 +1,152 @@
+import * as os from 'node:os';
+
+/**
+ * Options for the tool scheduler
+ */
+export interface ToolSchedulerOptions {
+  /** Maximum number of scheduled tool calls running at once (default: number of CPU cores) */
+  maxConcurrent?: number;
+}
+
+/**
+ * Counters describing scheduler activity
+ */
+export interface ToolSchedulerStats {
+  maxConcurrent: number;
+  running: number;
+  queued: number;
+  /** Calls that have been started */
+  started: number;
+  /** Started calls that had to wait for a slot */
+  waited: number;
+  totalWaitMs: number;
+}
+
+/**
+ * Result of a scheduled call and how long it waited for a slot
+ */
+export interface ScheduledResult<T> {
+  value: T;
+  queueWaitMs: number;
+}
+
+interface Waiter {
+  toolName: string;
+  limit?: number;
+  start: () => void;
+}
+
+/**
+ * ToolScheduler - Limits how many tool processes run at once
+ *
+ * Every scheduled call takes a slot from a global budget, sized to the core
+ * count by default, and counts against its tool's own limit when one is given
+ * (e.g. 1 for a tool that must not run twice at once). Calls beyond either
+ * limit wait in FIFO order; a call held back only by its tool's limit does
+ * not block calls to other tools queued behind it.
+ *
+ * `ToolScheduler.shared` is used by every ToolRegistry unless another
+ * scheduler is passed in, so nested agents and separate systems in the same
+ * process draw from one budget.
+ *
+ * @example
+ * ```typescript
+ * const scheduler = new ToolScheduler({ maxConcurrent: 4 });
+ * const { value, queueWaitMs } = await scheduler.run('process_payment', 1, () =>
+ *   tool.execute(args)
+ * );
+ * ```
+ */
+export class ToolScheduler {
+  static readonly shared = new ToolScheduler();
+
+  private readonly maxConcurrent: number;
+  private readonly queue: Waiter[] = [];
+  private readonly runningByTool = new Map<string, number>();
+  private running = 0;
+  private readonly stats = { started: 0, waited: 0, totalWaitMs: 0 };
+
+  constructor(options: ToolSchedulerOptions = {}) {
+    this.maxConcurrent = Math.max(1, options.maxConcurrent ?? os.availableParallelism());
+  }
+
+  /**
+   * Run a task once a slot is free for it, releasing the slot when it settles
+   *
+   * @param toolName - Tool the per-tool limit applies to
+   * @param limit - Maximum concurrent calls of this tool (omit for the global budget only)
+   * @param task - Work to run while holding the slot
+   */
+  async run<T>(
+    toolName: string,
+    limit: number | undefined,
+    task: () => Promise<T>
+  ): Promise<ScheduledResult<T>> {
+    const queueWaitMs = await this.acquire(toolName, limit);
+    try {
+      return { value: await task(), queueWaitMs };
+    } finally {
+      this.release(toolName);
+    }
+  }
+
+  getStats(): ToolSchedulerStats {
+    return {
+      maxConcurrent: this.maxConcurrent,
+      running: this.running,
+      queued: this.queue.length,
+      ...this.stats,
+    };
+  }
+
+  private acquire(toolName: string, limit?: number): Promise<number> {
+    const queuedAt = performance.now();
+    return new Promise((resolve) => {
+      this.queue.push({
+        toolName,
+        limit,
+        start: () => {
+          const queueWaitMs = Math.round(performance.now() - queuedAt);
+          this.stats.started++;
+          if (queueWaitMs > 0) {
+            this.stats.waited++;
+            this.stats.totalWaitMs += queueWaitMs;
+          }
+          resolve(queueWaitMs);
+        },
+      });
+      this.drain();
+    });
+  }
+
+  private release(toolName: string): void {
+    this.running--;
+    const count = (this.runningByTool.get(toolName) ?? 1) - 1;
+    if (count > 0) {
+      this.runningByTool.set(toolName, count);
+    } else {
+      this.runningByTool.delete(toolName);
+    }
+    this.drain();
+  }
+
+  /**
+   * Start queued calls in order while the global budget allows, skipping
+   * calls whose tool is at its own limit
+   */
+  private drain(): void {
+    for (let i = 0; i < this.queue.length && this.running < this.maxConcurrent; ) {
+      const waiter = this.queue[i];
+      const toolRunning = this.runningByTool.get(waiter.toolName) ?? 0;
+      if (waiter.limit !== undefined && toolRunning >= waiter.limit) {
+        i++;
+        continue;
+      }
+
+      this.queue.splice(i, 1);
+      this.running++;
+      this.runningByTool.set(waiter.toolName, toolRunning + 1);
+      waiter.start();
+    }
+  }
+}
@@ -15,8 +15,10 @@ const CATASTROPHIC_PATTERNS = [
   /chmod\s+-R\s+000\s+\//, // Remove all permissions
 ];
 
-// Output limits to prevent memory exhaustion
-const SHELL_LIMITS = {
+// Output limits to prevent memory exhaustion (shared with the script tool runner)
+export const SHELL_LIMITS = {
+  defaultTimeout: 30000, // 30s per command
+  maxBuffer: 1024 * 1024 * 10, // 10MB of raw output
   maxOutput: 500000, // 500K chars (generous for build output)
   truncateMessage: '\n... [Output truncated - exceeded 500K chars]',
 };
@@ -81,7 +83,8 @@ export function createShellTool(): BaseTool {
       }
       const command = args.command;
 
-      const timeout = typeof args.timeout === 'number' ? args.timeout : 30000;
+      const timeout =
+        typeof args.timeout === 'number' ? args.timeout : SHELL_LIMITS.defaultTimeout;
       const cwd = typeof args.cwd === 'string' ? args.cwd : undefined;
       const parseJson = typeof args.parseJson === 'boolean' ? args.parseJson : false;
 
@@ -94,7 +97,7 @@ export function createShellTool(): BaseTool {
           timeout,
           cwd: cwd || process.cwd(),
           encoding: 'utf8',
-          maxBuffer: 1024 * 1024 * 10, // 10MB buffer
+          maxBuffer: SHELL_LIMITS.maxBuffer,
         });
 
         // Truncate output if too large
@@ -1,5 +1,6 @@
 import { afterEach, describe, expect, test } from 'vitest';
 import { AgentSystemBuilder } from '@/config/system-builder';
+import { MockLLMProvider } from '../../mocks/mock-llm-provider';
 import * as fs from 'fs/promises';
 
 describe('AgentSystemBuilder Tests', () => {
@@ -225,6 +226,21 @@ describe('AgentSystemBuilder Tests', () => {
       expect(result.config.apiKeys).toBeDefined();
     });
 
+    test('withProvider() should answer every LLM call from the given provider', async () => {
+      const provider = new MockLLMProvider().mockTextResponse('Hello from the mock');
+
+      const result = await AgentSystemBuilder.minimal()
+        .withProvider(provider)
+        .withAgents({ name: 'greeter', prompt: 'Say hello' })
+        .withStorage({ type: 'none' })
+        .withConsole(false)
+        .build();
+      cleanup = result.cleanup;
+
+      await expect(result.executor.execute('greeter', 'Hi')).resolves.toBe('Hello from the mock');
+      expect(provider.getCallCount()).toBe(1);
+    });
+
     test('code-first configuration should not require any files', async () => {
       // This test demonstrates that the system can work without any config files
       const result = await AgentSystemBuilder.minimal()
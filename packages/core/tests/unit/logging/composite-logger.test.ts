@@ -122,7 +122,8 @@ describe('CompositeLogger', () => {
         'agent',
         'read',
         'tool-id-1',
-        'file contents'
+        'file contents',
+        undefined
       );
       expect(logger.logToolError).toHaveBeenCalledWith(
         'agent',
@@ -0,0 +1,49 @@
+import { describe, expect, it } from 'vitest';
+import { ToolMetricsCollector } from '@/metrics/tool-metrics-collector';
+
+describe('ToolMetricsCollector', () => {
+  it('should aggregate calls per tool, slowest first', () => {
+    const collector = new ToolMetricsCollector();
+    collector.recordExecution('lookup', { wallTimeMs: 10, maxRssKb: 8000 });
+    collector.recordExecution('score', { wallTimeMs: 50, cpuUserMs: 30, queueWaitMs: 5 });
+    collector.recordExecution('score', { wallTimeMs: 30, cpuUserMs: 20, maxRssKb: 12000 }, true);
+
+    const [score, lookup] = collector.getToolSummaries();
+    expect(score).toMatchObject({
+      toolName: 'score',
+      calls: 2,
+      errors: 1,
+      totalWallTimeMs: 80,
+      avgWallTimeMs: 40,
+      maxWallTimeMs: 50,
+      totalQueueWaitMs: 5,
+      totalCpuUserMs: 50,
+      peakRssKb: 12000,
+    });
+    expect(lookup).toMatchObject({ toolName: 'lookup', calls: 1, peakRssKb: 8000 });
+  });
+
+  it('should count a shared batch execution once across its calls', () => {
+    const collector = new ToolMetricsCollector();
+    const metrics = { wallTimeMs: 90, cpuUserMs: 60, stdoutBytes: 300, batchSize: 3 };
+    for (let i = 0; i < 3; i++) collector.recordExecution('check_account', metrics);
+
+    expect(collector.getToolSummary('check_account')).toMatchObject({
+      calls: 3,
+      totalWallTimeMs: 90,
+      avgWallTimeMs: 30,
+      totalCpuUserMs: 60,
+      totalStdoutBytes: 300,
+    });
+  });
+
+  it('should return copies and clear on reset', () => {
+    const collector = new ToolMetricsCollector();
+    collector.recordExecution('lookup', { wallTimeMs: 10 });
+    collector.getToolSummary('lookup')!.calls = 99;
+    expect(collector.getToolSummary('lookup')?.calls).toBe(1);
+
+    collector.reset();
+    expect(collector.getToolSummaries()).toEqual([]);
+  });
+});
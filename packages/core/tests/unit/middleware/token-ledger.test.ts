@@ -0,0 +1,194 @@
+import { describe, expect, test } from 'vitest';
+import { TokenLedger, estimateMessageTokens, getTokenLedger } from '@/middleware/token-ledger';
+import { createLLMCallMiddleware } from '@/middleware/llm-call.middleware';
+import { createSafetyChecksMiddleware } from '@/middleware/safety-checks.middleware';
+import { MiddlewareContext } from '@/middleware/middleware-types';
+import { Message } from '@/base-types';
+import { ILLMProvider, UsageMetrics } from '@/providers/llm-provider.interface';
+
+// 35 chars of content: 4 overhead + 10 content tokens
+const message = (n: number): Message => ({ role: 'user', content: `message ${n}`.padEnd(35, '.') });
+
+function createProvider(usage: UsageMetrics, countTokens?: (text: string) => number): ILLMProvider {
+  return {
+    complete: async () => ({ role: 'assistant', content: 'Done' }),
+    getModelName: () => 'test-model',
+    getProviderName: () => 'test',
+    supportsStreaming: () => false,
+    getLastUsageMetrics: () => usage,
+    getLastStopReason: () => 'end_turn',
+    ...(countTokens && { countTokens }),
+  };
+}
+
+function createContext(overrides: Partial<MiddlewareContext> = {}): MiddlewareContext {
+  return {
+    agentName: 'test-agent',
+    prompt: 'test prompt',
+    executionContext: {
+      depth: 0,
+      startTime: Date.now(),
+      maxDepth: 5,
+      isSidechain: false,
+      traceId: 'test-trace',
+    },
+    messages: [],
+    iteration: 1,
+    tools: [],
+    logger: {
+      logAgentIteration: () => {},
+      logAssistantMessage: () => {},
+      logSafetyLimit: () => {},
+    } as unknown as MiddlewareContext['logger'],
+    modelName: 'test-model',
+    shouldContinue: true,
+    ...overrides,
+  };
+}
+
+describe('TokenLedger', () => {
+  test('estimates with the character heuristic and a 10% margin', () => {
+    const toolCall: Message = {
+      role: 'assistant',
+      content: '',
+      tool_calls: [
+        { id: 'call-1', type: 'function', function: { name: 'Read', arguments: '{"a":1}' } },
+      ],
+    };
+    const toolResult: Message = { role: 'tool', content: 'ok', tool_call_id: 'call-1' };
+
+    expect(estimateMessageTokens(message(1))).toBe(14);
+    // 4 overhead + 1 name + 3 arguments + 10 structure
+    expect(estimateMessageTokens(toolCall)).toBe(18);
+    // 4 overhead + 1 content + 2 id
+    expect(estimateMessageTokens(toolResult)).toBe(7);
+    expect(new TokenLedger().total([message(1), toolCall, toolResult])).toBe(
+      Math.ceil((14 + 18 + 7) * 1.1)
+    );
+  });
+
+  test('counts each appended message once', () => {
+    const counted: string[] = [];
+    const ledger = new TokenLedger({
+      id: 'test',
+      countTokens: (text) => {
+        counted.push(text);
+        return 1;
+      },
+    });
+    const messages = [message(1), message(2)];
+
+    expect(ledger.total(messages)).toBe(10);
+    expect(ledger.total(messages)).toBe(10);
+    messages.push(message(3));
+    expect(ledger.total(messages)).toBe(15);
+    expect(counted).toHaveLength(3);
+  });
+
+  test('recounts when the conversation is replaced or truncated', () => {
+    const ledger = new TokenLedger();
+    const messages = [message(1), message(2), message(3)];
+    const full = ledger.total(messages);
+
+    messages.splice(1);
+    expect(ledger.total(messages)).toBe(Math.ceil(14 * 1.1));
+
+    messages[0] = { role: 'user', content: 'x'.repeat(70) };
+    expect(ledger.total(messages)).toBe(Math.ceil(24 * 1.1));
+
+    expect(ledger.total([message(1), message(2), message(3)])).toBe(full);
+  });
+
+  test('anchors the total to reconciled prompt tokens', () => {
+    const ledger = new TokenLedger();
+    const messages = [message(1), message(2)];
+
+    ledger.reconcile(messages, 500);
+    expect(ledger.reconciled).toBe(true);
+    expect(ledger.total(messages)).toBe(500);
+
+    messages.push(message(3));
+    expect(ledger.total(messages)).toBe(500 + Math.ceil(14 * 1.1));
+
+    // Truncating below the reconciled messages falls back to estimates
+    messages.splice(1);
+    expect(ledger.total(messages)).toBe(Math.ceil(14 * 1.1));
+    expect(ledger.reconciled).toBe(false);
+  });
+});
+
+describe('getTokenLedger', () => {
+  test('keeps one ledger on the context', () => {
+    const ctx = createContext();
+    expect(getTokenLedger(ctx)).toBe(getTokenLedger(ctx));
+    expect(ctx.tokenLedger?.tokenizer).toBeUndefined();
+  });
+
+  test('uses the provider tokenizer and rebuilds when it changes', () => {
+    const usage = { promptTokens: 0, completionTokens: 0, totalTokens: 0 };
+    const ctx = createContext({ messages: [message(1)] });
+    const estimated = getTokenLedger(ctx);
+    expect(estimated.total(ctx.messages)).toBe(16);
+
+    ctx.provider = createProvider(usage, () => 2);
+    const counted = getTokenLedger(ctx);
+    expect(counted).not.toBe(estimated);
+    expect(counted.tokenizer?.id).toBe('test/test-model');
+    // 4 overhead + 2 content, no margin
+    expect(counted.total(ctx.messages)).toBe(6);
+
+    ctx.provider = createProvider(usage, () => 3);
+    expect(getTokenLedger(ctx)).toBe(counted);
+  });
+});
+
+describe('token ledger in the pipeline', () => {
+  test('LLM call reconciles the ledger with provider usage', async () => {
+    const ctx = createContext({
+      messages: [message(1)],
+      provider: createProvider({ promptTokens: 120, completionTokens: 5, totalTokens: 125 }),
+    });
+
+    await createLLMCallMiddleware()(ctx, async () => {});
+
+    expect(ctx.tokenLedger?.total(ctx.messages)).toBe(120);
+  });
+
+  test('LLM call prefers contextTokens when prompt tokens exclude cached input', async () => {
+    const ctx = createContext({
+      messages: [message(1)],
+      provider: createProvider({
+        promptTokens: 20,
+        completionTokens: 5,
+        totalTokens: 25,
+        promptCacheHitTokens: 900,
+        contextTokens: 920,
+      }),
+    });
+
+    await createLLMCallMiddleware()(ctx, async () => {});
+
+    expect(ctx.tokenLedger?.total(ctx.messages)).toBe(920);
+  });
+
+  test('safety checks use the reconciled count', async () => {
+    const middleware = createSafetyChecksMiddleware({
+      maxIterations: 10,
+      warnAtIteration: 5,
+      maxDepth: 5,
+      maxTokensEstimate: 1000,
+    });
+    const ctx = createContext({ messages: [message(1)] });
+    let nextCalled = false;
+
+    await middleware(ctx, async () => {
+      nextCalled = true;
+    });
+    expect(nextCalled).toBe(true);
+
+    getTokenLedger(ctx).reconcile(ctx.messages, 5000);
+    await expect(middleware(ctx, async () => {})).rejects.toThrow(
+      /Token estimate \(~5000\) exceeds limit \(1000\)/
+    );
+  });
+});
@@ -0,0 +1,57 @@
+import { describe, expect, it, vi } from 'vitest';
+import { concatMessages, lazyMessages } from '@/session/lazy-messages';
+import { Message } from '@/base-types';
+
+const message = (content: string): Message => ({ role: 'user', content });
+
+describe('lazyMessages', () => {
+  const prefix = [message('a'), message('b')];
+  const tail = [message('c')];
+
+  it('should not load the prefix for length, tail reads or appends', () => {
+    const load = vi.fn(() => prefix);
+    const list = lazyMessages(2, load, tail);
+
+    expect(list.length).toBe(3);
+    expect(list[2]).toEqual(message('c'));
+    expect(list[list.length - 1]).toEqual(message('c'));
+    list.push(message('d'));
+    expect(Array.isArray(list)).toBe(true);
+    expect(load).not.toHaveBeenCalled();
+  });
+
+  it('should load the prefix once when it is read', () => {
+    const load = vi.fn(() => prefix);
+    const list = lazyMessages(2, load, tail);
+
+    expect(list[0]).toEqual(message('a'));
+    expect([...list]).toEqual([...prefix, ...tail]);
+    expect(JSON.stringify(list)).toBe(JSON.stringify([...prefix, ...tail]));
+    expect(list.map((m) => m.content)).toEqual(['a', 'b', 'c']);
+    expect(load).toHaveBeenCalledTimes(1);
+  });
+
+  it('should fail when the prefix does not have the expected length', () => {
+    const list = lazyMessages(3, () => prefix);
+
+    expect(() => list[0]).toThrow('Checkpoint holds 2 messages, expected 3');
+  });
+
+  it('should append to a lazy prefix without loading it', () => {
+    const load = vi.fn(() => prefix);
+    const list = concatMessages(lazyMessages(2, load), tail);
+
+    expect(list.length).toBe(3);
+    expect(list[2]).toEqual(message('c'));
+    expect(load).not.toHaveBeenCalled();
+    expect(list).toEqual([...prefix, ...tail]);
+  });
+
+  it('should copy a lazy list that was already changed', () => {
+    const head = lazyMessages(2, () => prefix);
+    head[0] = message('x');
+
+    expect(concatMessages(head, tail).map((m) => m.content)).toEqual(['x', 'b', 'c']);
+    expect(concatMessages([message('a')], tail)).toEqual([message('a'), ...tail]);
+  });
+});
@@ -1,4 +1,5 @@
-import { beforeEach, describe, expect, it } from 'vitest';
+import { beforeEach, describe, expect, it, vi } from 'vitest';
+import { EventLogger } from '@/logging/event.logger';
 import { SimpleSessionManager } from '@/session/manager';
 import { InMemoryStorage } from '@/session/memory.storage';
 import {
@@ -501,4 +502,152 @@ describe('SimpleSessionManager - Session Recovery', () => {
       expect(sessionManager.getLastToolCall(messages)).toBeNull();
     });
   });
+
+  describe('checkpoints', () => {
+    const todos = (label: string) => [
+      { id: label, content: label, status: 'pending', priority: 'high', activeForm: label },
+    ];
+
+    /** Append conversation rounds: user, system note, tool call/result, TodoWrite, reply */
+    const appendRounds = async (from: number, to: number) => {
+      for (let i = from; i < to; i++) {
+        await storage.appendEvent(sessionId, {
+          type: 'user',
+          timestamp: i,
+          data: { role: 'user', content: `question ${i}` },
+        });
+        await storage.appendEvent(sessionId, {
+          type: 'assistant',
+          timestamp: i,
+          data: { role: 'assistant', content: `loaded tools ${i}`, agent: 'system' },
+        });
+        await storage.appendEvent(sessionId, {
+          type: 'tool_call',
+          timestamp: i,
+          data: { id: `call-${i}`, tool: 'read', params: { i }, agent: 'default' },
+        });
+        await storage.appendEvent(sessionId, {
+          type: 'tool_result',
+          timestamp: i,
+          data: { toolCallId: `call-${i}`, result: { i } },
+        });
+        if (i % 7 === 0) {
+          await storage.appendEvent(sessionId, {
+            type: 'tool_call',
+            timestamp: i,
+            data: { id: `todo-${i}`, tool: 'todowrite', params: { todos: todos(`t${i}`) } },
+          });
+          await storage.appendEvent(sessionId, {
+            type: 'tool_result',
+            timestamp: i,
+            data: { toolCallId: `todo-${i}`, result: 'ok' },
+          });
+        }
+        await storage.appendEvent(sessionId, {
+          type: 'assistant',
+          timestamp: i,
+          data: { role: 'assistant', content: `answer ${i}`, agent: 'default' },
+        });
+      }
+    };
+
+    it('should recover the same messages and todos as a full replay', async () => {
+      const checkpointed = new SimpleSessionManager(storage, { checkpointInterval: 20 });
+
+      await appendRounds(0, 30);
+      const first = await checkpointed.recoverSession(sessionId);
+      expect(await storage.readCheckpoint(sessionId)).toBeDefined();
+
+      await appendRounds(30, 45);
+      await storage.appendEvent(sessionId, {
+        type: 'tool_call',
+        timestamp: 45,
+        data: { id: 'interrupted', tool: 'read', params: {}, agent: 'default' },
+      });
+
+      const events = await storage.readEvents(sessionId);
+      const fullStorage = new InMemoryStorage();
+      for (const event of events) {
+        await fullStorage.appendEvent(sessionId, event);
+      }
+      const fullManager = new SimpleSessionManager(fullStorage, { checkpointInterval: 0 });
+
+      // Four messages per round, two more for each of the 5 TodoWrite rounds
+      expect(first).toHaveLength(30 * 4 + 5 * 2);
+      expect(await checkpointed.recoverSession(sessionId)).toEqual(
+        await fullManager.recoverSession(sessionId)
+      );
+      expect(await checkpointed.recoverTodos(sessionId)).toEqual(todos('t42'));
+      expect(await fullManager.recoverTodos(sessionId)).toEqual(todos('t42'));
+    });
+
+    it('should replay only the events after the latest checkpoint', async () => {
+      const manager = new SimpleSessionManager(storage, { checkpointInterval: 10 });
+      await appendRounds(0, 10);
+      const checkpoint = await manager.checkpoint(sessionId);
+      expect(checkpoint?.seq).toBeGreaterThan(0);
+      await appendRounds(10, 12);
+
+      const iterate = vi.spyOn(storage, 'iterateEvents');
+      const messages = await manager.recoverSession(sessionId);
+
+      expect(iterate).toHaveBeenCalledWith(
+        sessionId,
+        expect.objectContaining({ fromSeq: checkpoint?.seq })
+      );
+      expect(messages.at(-1)).toEqual({ role: 'assistant', content: 'answer 11' });
+      expect(messages.filter((m) => m.role === 'user')).toHaveLength(12);
+    });
+
+    it('should keep a tool call whose result arrives after the checkpoint', async () => {
+      const manager = new SimpleSessionManager(storage, { checkpointInterval: 10 });
+      await storage.appendEvent(sessionId, {
+        type: 'user',
+        timestamp: 1,
+        data: { role: 'user', content: 'Read the file' },
+      });
+      await storage.appendEvent(sessionId, {
+        type: 'tool_call',
+        timestamp: 2,
+        data: { id: 'pending-call', tool: 'read', params: {}, agent: 'default' },
+      });
+
+      await manager.checkpoint(sessionId);
+      await storage.appendEvent(sessionId, {
+        type: 'tool_result',
+        timestamp: 3,
+        data: { toolCallId: 'pending-call', result: 'contents' },
+      });
+
+      const messages = await manager.recoverSession(sessionId);
+      expect(messages.map((m) => m.role)).toEqual(['user', 'assistant', 'tool']);
+      expect(messages[1].tool_calls?.[0].id).toBe('pending-call');
+    });
+
+    it('should checkpoint periodically while events are logged', async () => {
+      const manager = new SimpleSessionManager(storage, { checkpointInterval: 4 });
+      const logger = new EventLogger(storage, sessionId);
+      manager.checkpointPeriodically(logger, sessionId);
+
+      for (let i = 0; i < 6; i++) {
+        logger.logUserMessage(`question ${i}`);
+        logger.logAssistantMessage('default', `answer ${i}`);
+      }
+      await vi.waitFor(async () => {
+        expect((await storage.readCheckpoint(sessionId))?.seq).toBeGreaterThanOrEqual(8);
+      });
+
+      const messages = await manager.recoverSession(sessionId);
+      expect(messages).toHaveLength(12);
+    });
+
+    it('should not checkpoint when disabled', async () => {
+      const manager = new SimpleSessionManager(storage, { checkpointInterval: 0 });
+      await appendRounds(0, 5);
+
+      expect(await manager.checkpoint(sessionId)).toBeUndefined();
+      await manager.recoverSession(sessionId);
+      expect(await storage.readCheckpoint(sessionId)).toBeUndefined();
+    });
+  });
 });
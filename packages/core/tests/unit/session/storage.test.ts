@@ -1,6 +1,7 @@
 import { afterEach, beforeEach, describe, expect, it } from 'vitest';
 import { InMemoryStorage } from '@/session/memory.storage';
 import { FilesystemStorage } from '@/session/filesystem.storage';
+import { SegmentedStorage } from '@/session/segmented.storage';
 import { SessionStorage } from '@/session/types';
 import * as fs from 'fs/promises';
 import * as path from 'node:path';
@@ -22,6 +23,28 @@ describe('Storage Implementations', () => {
       expect(events).toEqual([event]);
     });
 
+    it('should read from a sequence number and filter by type', async () => {
+      for (const type of ['user', 'assistant', 'tool_call', 'tool_result', 'assistant']) {
+        await storage.appendEvent('session1', { type });
+      }
+
+      expect(await storage.readEvents('session1', { fromSeq: 3 })).toEqual([
+        { type: 'tool_result' },
+        { type: 'assistant' },
+      ]);
+      expect(await storage.readEvents('session1', { types: ['assistant'] })).toHaveLength(2);
+
+      const records = [];
+      const options = { fromSeq: 1, types: ['assistant'] };
+      for await (const record of storage.iterateEvents('session1', options)) {
+        records.push(record);
+      }
+      expect(records).toEqual([
+        { seq: 1, event: { type: 'assistant' } },
+        { seq: 4, event: { type: 'assistant' } },
+      ]);
+    });
+
     it('should maintain separate sessions', async () => {
       await storage.appendEvent('session1', { id: 1 });
       await storage.appendEvent('session2', { id: 2 });
@@ -134,6 +157,7 @@ describe('Storage Implementations', () => {
     });
 
     afterEach(async () => {
+      await storage.close();
       // Clean up after each test
       if (existsSync(testBasePath)) {
         await fs.rm(testBasePath, { recursive: true, force: true });
@@ -258,6 +282,14 @@ describe('Storage Implementations', () => {
       expect(sessions.sort()).toEqual(['session-a', 'session-b', 'session-c']);
     });
 
+    it('should not list the cache directory as a session', async () => {
+      await storage.appendEvent('session-a', { id: 1 });
+      await fs.mkdir(storage.getCacheDir(), { recursive: true });
+
+      expect(storage.getCacheDir()).toBe(path.join(testBasePath, '.cache'));
+      expect(await storage.listSessions()).toEqual(['session-a']);
+    });
+
     it('should delete a session', async () => {
       await storage.appendEvent('to-delete', { id: 1 });
       expect(await storage.sessionExists('to-delete')).toBe(true);
@@ -271,6 +303,432 @@ describe('Storage Implementations', () => {
       // Should not throw
       await expect(storage.deleteSession('non-existent')).resolves.toBeUndefined();
     });
+
+    describe('streaming reads', () => {
+      const collect = async (sessionId: string, options = {}) => {
+        const records = [];
+        for await (const record of storage.iterateEvents(sessionId, options)) {
+          records.push(record);
+        }
+        return records;
+      };
+      const indexFile = (sessionId: string) =>
+        path.join(testBasePath, sessionId, 'events.idx.json');
+
+      beforeEach(() => {
+        storage = new FilesystemStorage(testBasePath, { indexInterval: 10 });
+      });
+
+      it('should number events by their position in the log', async () => {
+        for (let i = 0; i < 25; i++) {
+          await storage.appendEvent('numbered', { type: i % 2 ? 'tool_call' : 'assistant', i });
+        }
+
+        const records = await collect('numbered', { fromSeq: 17, types: ['tool_call'] });
+        expect(records.map((r) => r.seq)).toEqual([17, 19, 21, 23]);
+        expect(records.map((r) => (r.event as { i: number }).i)).toEqual([17, 19, 21, 23]);
+        expect(await storage.readEvents('numbered', { fromSeq: 24 })).toEqual([
+          { type: 'assistant', i: 24 },
+        ]);
+      });
+
+      it('should record byte offsets in a sidecar index and seek with it', async () => {
+        for (let i = 0; i < 35; i++) {
+          await storage.appendEvent('indexed', { i });
+        }
+        await storage.readEvents('indexed');
+
+        const index = JSON.parse(await fs.readFile(indexFile('indexed'), 'utf-8'));
+        expect(index.offsets).toHaveLength(4);
+        const content = await fs.readFile(path.join(testBasePath, 'indexed', 'events.jsonl'));
+        expect(content.subarray(index.offsets[3]).toString().split('\n')[0]).toBe('{"i":30}');
+
+        // Events before the indexed offset are never read again
+        const records = await collect('indexed', { fromSeq: 31 });
+        expect(records.map((r) => r.seq)).toEqual([31, 32, 33, 34]);
+      });
+
+      it('should rebuild a stale index after the log is rewritten', async () => {
+        for (let i = 0; i < 30; i++) {
+          await storage.appendEvent('rewritten', { i });
+        }
+        await storage.readEvents('rewritten');
+        await storage.close();
+
+        const lines = Array.from({ length: 15 }, (_, i) => JSON.stringify({ i, padded: 'x' }));
+        await fs.writeFile(
+          path.join(testBasePath, 'rewritten', 'events.jsonl'),
+          lines.join('\n') + '\n'
+        );
+
+        const records = await collect('rewritten', { fromSeq: 12 });
+        expect(records.map((r) => (r.event as { i: number }).i)).toEqual([12, 13, 14]);
+      });
+
+      it('should read events larger than a read chunk', async () => {
+        const big = 'x'.repeat(200 * 1024);
+        await storage.appendEvent('big', { type: 'tool_result', big });
+        await storage.appendEvent('big', { type: 'assistant', small: true });
+
+        expect(await storage.readEvents('big')).toEqual([
+          { type: 'tool_result', big },
+          { type: 'assistant', small: true },
+        ]);
+        expect(await storage.readEvents('big', { types: ['assistant'] })).toEqual([
+          { type: 'assistant', small: true },
+        ]);
+      });
+
+      it('should filter events whose type is not the first key', async () => {
+        await storage.appendEvent('unordered', { data: { type: 'assistant' }, type: 'user' });
+
+        expect(await storage.readEvents('unordered', { types: ['assistant'] })).toEqual([]);
+        expect(await storage.readEvents('unordered', { types: ['user'] })).toHaveLength(1);
+      });
+
+      it('should return an unterminated last line that parses', async () => {
+        const sessionPath = path.join(testBasePath, 'partial');
+        await fs.mkdir(sessionPath, { recursive: true });
+        await fs.writeFile(path.join(sessionPath, 'events.jsonl'), '{"a":1}\n\n{"b":2}');
+
+        expect(await collect('partial')).toEqual([
+          { seq: 0, event: { a: 1 } },
+          { seq: 1, event: { b: 2 } },
+        ]);
+      });
+
+      it('should stop reading when the consumer stops', async () => {
+        for (let i = 0; i < 20; i++) {
+          await storage.appendEvent('early', { i });
+        }
+
+        let first: unknown;
+        for await (const record of storage.iterateEvents('early')) {
+          first = record.event;
+          break;
+        }
+        expect(first).toEqual({ i: 0 });
+      });
+    });
+
+    describe('checkpoints', () => {
+      const checkpoint = (seq: number) => ({
+        seq,
+        messages: [{ role: 'user' as const, content: `up to ${seq}` }],
+        todos: [],
+        timestamp: seq,
+      });
+
+      it('should return the newest checkpoint and delete all but the newest two', async () => {
+        for (const seq of [10, 30, 20]) {
+          await storage.writeCheckpoint('checkpointed', checkpoint(seq));
+        }
+
+        expect(await storage.readCheckpoint('checkpointed')).toEqual(checkpoint(30));
+        const files = await fs.readdir(path.join(testBasePath, 'checkpointed'));
+        expect(files.sort()).toEqual(['checkpoint-20.jsonl', 'checkpoint-30.jsonl']);
+        expect(await storage.listSessions()).toEqual(['checkpointed']);
+      });
+
+      it('should fall back to an older checkpoint when the newest is unreadable', async () => {
+        await storage.writeCheckpoint('checkpointed', checkpoint(10));
+        await storage.writeCheckpoint('checkpointed', checkpoint(20));
+        await fs.writeFile(
+          path.join(testBasePath, 'checkpointed', 'checkpoint-20.jsonl'),
+          '{"seq"'
+        );
+
+        expect(await storage.readCheckpoint('checkpointed')).toEqual(checkpoint(10));
+      });
+
+      it('should read a checkpoint written before checkpoints had a header line', async () => {
+        await fs.mkdir(path.join(testBasePath, 'checkpointed'), { recursive: true });
+        await fs.writeFile(
+          path.join(testBasePath, 'checkpointed', 'checkpoint-10.json'),
+          JSON.stringify(checkpoint(10))
+        );
+
+        expect(await storage.readCheckpoint('checkpointed')).toEqual(checkpoint(10));
+      });
+
+      it('should parse the checkpointed messages only when they are read', async () => {
+        await storage.writeCheckpoint('checkpointed', checkpoint(10));
+        const file = path.join(testBasePath, 'checkpointed', 'checkpoint-10.jsonl');
+        const [header] = (await fs.readFile(file, 'utf-8')).split('\n');
+        await fs.writeFile(file, `${header}\n[{"role"\n`);
+
+        const read = await storage.readCheckpoint('checkpointed');
+        expect(read?.seq).toBe(10);
+        expect(read?.messages).toHaveLength(1);
+        expect(() => read?.messages[0]).toThrow();
+      });
+
+      it('should have no checkpoint for a new session', async () => {
+        expect(await storage.readCheckpoint('fresh')).toBeUndefined();
+      });
+    });
+
+    describe('buffered writes', () => {
+      const eventsFile = (sessionId: string) =>
+        path.join(testBasePath, sessionId, 'events.jsonl');
+
+      it('should keep fire-and-forget appends in order', async () => {
+        for (let i = 0; i < 200; i++) {
+          void storage.appendEvent('ordered', { id: i });
+        }
+
+        const events = await storage.readEvents('ordered');
+        expect(events.map((e: any) => e.id)).toEqual(Array.from({ length: 200 }, (_, i) => i));
+      });
+
+      it('should hold a partial batch until flush when batching by time', async () => {
+        storage = new FilesystemStorage(testBasePath, { maxBatchDelayMs: 60_000 });
+        const appended = storage.appendEvent('delayed', { id: 1 });
+        void storage.appendEvent('delayed', { id: 2 });
+
+        await new Promise((resolve) => setTimeout(resolve, 20));
+        expect(existsSync(eventsFile('delayed'))).toBe(false);
+
+        await storage.flush('delayed');
+        await appended;
+        const content = await fs.readFile(eventsFile('delayed'), 'utf-8');
+        expect(content).toBe('{"id":1}\n{"id":2}\n');
+      });
+
+      it('should write a batch as soon as it is full', async () => {
+        storage = new FilesystemStorage(testBasePath, {
+          maxBatchDelayMs: 60_000,
+          maxBatchEvents: 3,
+        });
+        await Promise.all([1, 2, 3].map((id) => storage.appendEvent('full', { id })));
+
+        const content = await fs.readFile(eventsFile('full'), 'utf-8');
+        expect(content.trim().split('\n')).toHaveLength(3);
+      });
+
+      it.each(['batch', 'interval'] as const)(
+        'should persist events with fsync=%s',
+        async (fsync) => {
+          storage = new FilesystemStorage(testBasePath, { fsync, fsyncIntervalMs: 10 });
+          await storage.appendEvent('synced', { id: 1 });
+          await storage.appendEvent('synced', { id: 2 });
+          await storage.flush('synced');
+
+          expect(await storage.readEvents('synced')).toEqual([{ id: 1 }, { id: 2 }]);
+        }
+      );
+
+      it('should reopen session files after close', async () => {
+        await storage.appendEvent('reopened', { id: 1 });
+        await storage.close();
+        await storage.appendEvent('reopened', { id: 2 });
+
+        expect(await storage.readEvents('reopened')).toEqual([{ id: 1 }, { id: 2 }]);
+      });
+
+      it('should close idle files beyond maxOpenFiles without losing events', async () => {
+        storage = new FilesystemStorage(testBasePath, { maxOpenFiles: 2 });
+        for (let round = 0; round < 3; round++) {
+          for (const sessionId of ['a', 'b', 'c', 'd']) {
+            await storage.appendEvent(sessionId, { round });
+          }
+        }
+
+        for (const sessionId of ['a', 'b', 'c', 'd']) {
+          expect(await storage.readEvents(sessionId)).toEqual([
+            { round: 0 },
+            { round: 1 },
+            { round: 2 },
+          ]);
+        }
+      });
+    });
+  });
+
+  describe('SegmentedStorage', () => {
+    const testBasePath = './test-segmented-temp';
+    const sessionDir = path.join(testBasePath, 'session1');
+    let storage: SegmentedStorage;
+
+    const event = (i: number) => ({
+      type: i % 2 === 0 ? 'user' : 'assistant',
+      timestamp: i,
+      data: { i, content: `message ${i} `.repeat(10) },
+    });
+
+    const appendAll = (sessionId: string, count: number, first = 0) =>
+      Promise.all(
+        Array.from({ length: count }, (_, i) => storage.appendEvent(sessionId, event(first + i)))
+      );
+
+    const readManifest = async (dir = sessionDir) =>
+      JSON.parse(await fs.readFile(path.join(dir, 'manifest.json'), 'utf-8'));
+
+    beforeEach(async () => {
+      await fs.rm(testBasePath, { recursive: true, force: true });
+      storage = new SegmentedStorage(testBasePath, { maxSegmentBytes: 2000 });
+    });
+
+    afterEach(async () => {
+      await storage.close();
+      await fs.rm(testBasePath, { recursive: true, force: true });
+    });
+
+    it('should read events in order across rotated segments', async () => {
+      await appendAll('session1', 100);
+
+      const events = await storage.readEvents('session1');
+      expect(events).toEqual(Array.from({ length: 100 }, (_, i) => event(i)));
+
+      const tail = [];
+      for await (const record of storage.iterateEvents('session1', {
+        fromSeq: 90,
+        types: ['user'],
+      })) {
+        tail.push(record);
+      }
+      expect(tail).toEqual([90, 92, 94, 96, 98].map((seq) => ({ seq, event: event(seq) })));
+    });
+
+    it('should seal segments with gzip and record them in the manifest', async () => {
+      await appendAll('session1', 100);
+      await storage.close();
+
+      const files = await fs.readdir(sessionDir);
+      expect(files.filter((name) => name.endsWith('.jsonl'))).toEqual([]);
+      expect(files.filter((name) => name.endsWith('.jsonl.gz')).length).toBeGreaterThan(1);
+
+      const { segments } = (await readManifest()) as {
+        segments: Array<{ sealed: boolean; events: number; bytes: number; storedBytes: number }>;
+      };
+      expect(segments.every((segment) => segment.sealed)).toBe(true);
+      expect(segments.reduce((total, segment) => total + segment.events, 0)).toBe(100);
+      expect(segments.every((segment) => segment.storedBytes < segment.bytes)).toBe(true);
+
+      // Still readable, and appends continue in a new segment
+      await appendAll('session1', 1, 100);
+      expect(await storage.readEvents('session1', { fromSeq: 99 })).toEqual([
+        event(99),
+        event(100),
+      ]);
+    });
+
+    it('should store a recorded session at least 5x smaller', async () => {
+      const fixture = path.join(
+        __dirname,
+        '../../integration/critical-illness-claim/fixtures/claim-003/events.jsonl'
+      );
+      const content = await fs.readFile(fixture, 'utf-8');
+      const events = content
+        .split('\n')
+        .filter((line) => line.trim())
+        .map((line) => JSON.parse(line));
+      storage = new SegmentedStorage(testBasePath);
+
+      await Promise.all(events.map((e) => storage.appendEvent('session1', e)));
+      await storage.close();
+
+      let stored = 0;
+      for (const name of await fs.readdir(sessionDir)) {
+        stored += (await fs.stat(path.join(sessionDir, name))).size;
+      }
+      expect(Buffer.byteLength(content) / stored).toBeGreaterThanOrEqual(5);
+      expect(await storage.readEvents('session1')).toEqual(events);
+    });
+
+    it('should seal segments left unsealed by an interrupted run', async () => {
+      await fs.mkdir(sessionDir, { recursive: true });
+      const lines = (from: number, to: number) =>
+        Array.from({ length: to - from }, (_, i) => event(from + i))
+          .map((e) => JSON.stringify(e) + '\n')
+          .join('');
+      await fs.writeFile(path.join(sessionDir, 'segment-000001.jsonl'), lines(0, 5));
+      await fs.writeFile(path.join(sessionDir, 'segment-000002.jsonl'), lines(5, 8));
+
+      storage = new SegmentedStorage(testBasePath, { sealOnClose: false });
+      expect(await storage.readEvents('session1', { fromSeq: 4 })).toEqual(
+        [4, 5, 6, 7].map(event)
+      );
+      await storage.close();
+
+      expect((await fs.readdir(sessionDir)).sort()).toEqual([
+        'manifest.json',
+        'segment-000001.jsonl.gz',
+        'segment-000002.jsonl',
+      ]);
+      expect((await readManifest()).segments[0]).toMatchObject({ sealed: true, events: 5 });
+    });
+
+    it('should keep checkpoints and delete sessions', async () => {
+      await appendAll('session1', 10);
+      await storage.writeCheckpoint('session1', {
+        seq: 4,
+        messages: [],
+        todos: [],
+        timestamp: 1,
+      });
+
+      expect(await storage.readCheckpoint('session1')).toMatchObject({ seq: 4 });
+      expect(await storage.listSessions()).toEqual(['session1']);
+
+      await storage.deleteSession('session1');
+      expect(await storage.sessionExists('session1')).toBe(false);
+      expect(await storage.readEvents('session1')).toEqual([]);
+    });
+
+    describe('retention', () => {
+      const hour = 60 * 60 * 1000;
+
+      beforeEach(() => {
+        storage = new SegmentedStorage(testBasePath, {
+          maxSegmentBytes: 2000,
+          sealOnClose: false,
+          retention: { sealAfterMs: hour, archiveAfterMs: 24 * hour, deleteAfterMs: 48 * hour },
+        });
+      });
+
+      it('should leave recently active sessions alone', async () => {
+        await appendAll('session1', 10);
+
+        expect(await storage.applyRetention()).toEqual({ sealed: [], archived: [], deleted: [] });
+        expect(await storage.readEvents('session1')).toHaveLength(10);
+      });
+
+      it('should seal idle sessions', async () => {
+        await appendAll('session1', 10);
+
+        const result = await storage.applyRetention(Date.now() + 2 * hour);
+
+        expect(result.sealed).toEqual(['session1']);
+        expect((await fs.readdir(sessionDir)).filter((name) => name.endsWith('.jsonl'))).toEqual(
+          []
+        );
+        expect(await storage.readEvents('session1')).toHaveLength(10);
+      });
+
+      it('should archive, restore and finally delete old sessions', async () => {
+        await appendAll('session1', 10);
+        await appendAll('session2', 10);
+        const now = Date.now();
+
+        const archived = await storage.applyRetention(now + 25 * hour);
+        expect(archived.archived.sort()).toEqual(['session1', 'session2']);
+        expect(await storage.listSessions()).toEqual([]);
+        expect((await storage.listArchivedSessions()).sort()).toEqual(['session1', 'session2']);
+        expect(await storage.sessionExists('session1')).toBe(false);
+        expect(
+          (await readManifest(path.join(testBasePath, '.archive', 'session1'))).archivedAt
+        ).toBe(now + 25 * hour);
+
+        await storage.restoreSession('session2');
+        expect(await storage.readEvents('session2')).toHaveLength(10);
+
+        // Restoring counts as activity, so session2 is only archived again
+        const deleted = await storage.applyRetention(now + 74 * hour);
+        expect(deleted).toEqual({ sealed: [], archived: ['session2'], deleted: ['session1'] });
+        expect(await storage.listArchivedSessions()).toEqual(['session2']);
+      });
+    });
   });
 
   describe('Storage Interface Compliance', () => {
@@ -278,6 +736,7 @@ describe('Storage Implementations', () => {
     const implementations: Array<[string, () => SessionStorage]> = [
       ['InMemoryStorage', () => new InMemoryStorage()],
       ['FilesystemStorage', () => new FilesystemStorage('./test-compliance-temp')],
+      ['SegmentedStorage', () => new SegmentedStorage('./test-compliance-temp/segmented')],
     ];
 
     afterEach(async () => {
@@ -306,7 +765,7 @@ describe('Storage Implementations', () => {
           const event = { type: 'test', data: 'value' };
 
           // Should not exist initially (except NoOp always returns false)
-          if (name === 'InMemoryStorage' || name === 'FilesystemStorage') {
+          if (name !== 'NoOpStorage') {
             expect(await storage.sessionExists(sessionId)).toBe(false);
           }
 
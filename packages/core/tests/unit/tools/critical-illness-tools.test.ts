@@ -0,0 +1,228 @@
+import { afterEach, beforeEach, describe, expect, it } from 'vitest';
+import * as fs from 'fs/promises';
+import * as path from 'node:path';
+import { ToolLoader } from '@/tools/registry/loader';
+import { runPythonEntrypoint } from '@/tools/registry/python-runtime';
+
+const TOOLS_DIR = path.resolve(__dirname, '../../../../examples/critical-illness-claim/tools');
+const tool = (name: string) => path.join(TOOLS_DIR, `${name}.py`);
+
+describe('critical-illness-claim tools', () => {
+  const testDir = path.resolve('test-critical-illness-tools-temp');
+  const savedEnv = { ...process.env };
+
+  beforeEach(async () => {
+    await fs.mkdir(testDir, { recursive: true });
+  });
+
+  afterEach(async () => {
+    process.env = { ...savedEnv };
+    await fs.rm(testDir, { recursive: true, force: true });
+  });
+
+  describe('check_fraud_indicators', () => {
+    it('should fail only the claim whose policy has no sum assured', async () => {
+      const exportPath = path.join(testDir, 'policies.ndjson');
+      const storePath = path.join(testDir, 'policies.db');
+      const policy = (policyNumber: string, sumAssured: number) =>
+        JSON.stringify({ policyNumber, sumAssured, coverageStartDate: '2020-01-01' });
+      await fs.writeFile(exportPath, `${policy('POL-1', 0)}\n${policy('POL-2', 100000)}\n`);
+      await runPythonEntrypoint(tool('get_policy_details'), 'build_index', {
+        source: exportPath,
+        store_path: storePath,
+      });
+      process.env.POLICY_STORE_PATH = storePath;
+
+      const results = (await runPythonEntrypoint(tool('check_fraud_indicators'), 'score_many', {
+        claims: [
+          { claim_id: 'CI-1', policy_number: 'POL-1', amount: 5000 },
+          { claim_id: 'CI-2', policy_number: 'POL-2', amount: 5000 },
+        ],
+      })) as Record<string, unknown>[];
+
+      expect(results[0]).toEqual({ success: false, error: 'Invalid claim CI-1: no sum assured' });
+      expect(results[1]).toMatchObject({ claimId: 'CI-2', fraudRisk: 'low' });
+    });
+
+    it('should only read claims books inside CLAIMS_BOOK_DIR', async () => {
+      await fs.writeFile(
+        path.join(testDir, 'book.ndjson'),
+        `${JSON.stringify({ claim_id: 'CI-1', policy_number: 'POL-12', amount: 100 })}\n`
+      );
+      process.env.CLAIMS_BOOK_DIR = testDir;
+
+      const results = (await runPythonEntrypoint(tool('check_fraud_indicators'), 'score_many', {
+        claims: 'book.ndjson',
+      })) as Record<string, unknown>[];
+      expect(results[0]).toMatchObject({ claimId: 'CI-1' });
+
+      await expect(
+        runPythonEntrypoint(tool('check_fraud_indicators'), 'score_many', {
+          claims: '../outside.ndjson',
+        })
+      ).rejects.toThrow('Claims book must be inside');
+    });
+
+    it('should fail only the rows of a mixed book that are not claims', async () => {
+      const claim = { claim_id: 'CI-1', policy_number: 'POL-12', amount: 100 };
+      await fs.writeFile(
+        path.join(testDir, 'mixed.ndjson'),
+        `${JSON.stringify(claim)}\n"CI-2"\n42\n`
+      );
+      process.env.CLAIMS_BOOK_DIR = testDir;
+      const notAClaim = { success: false, error: 'Each claim must be an object' };
+
+      const fromList = (await runPythonEntrypoint(tool('check_fraud_indicators'), 'score_many', {
+        claims: [claim, 'CI-2'],
+      })) as Record<string, unknown>[];
+      expect(fromList[0]).toMatchObject({ claimId: 'CI-1' });
+      expect(fromList[1]).toEqual(notAClaim);
+
+      const fromBook = (await runPythonEntrypoint(tool('check_fraud_indicators'), 'score_many', {
+        claims: 'mixed.ndjson',
+      })) as Record<string, unknown>[];
+      expect(fromBook[0]).toMatchObject({ claimId: 'CI-1' });
+      expect(fromBook.slice(1)).toEqual([notAClaim, notAClaim]);
+    });
+  });
+
+  describe('claim_id_generator', () => {
+    it('should reject invalid rows without failing the batch or leaving INDEX_DIR', async () => {
+      const indexDir = path.join(testDir, 'index');
+      process.env.CLAIM_ID_INDEX_DIR = indexDir;
+      const valid = { policy_number: 'POL-1', timestamp: '2024-01-02T10:00:00' };
+
+      const results = (await runPythonEntrypoint(tool('claim_id_generator'), 'allocate_many', {
+        requests: [
+          { policy_number: 'POL-1', timestamp: 123 },
+          { ...valid, claim_type: '../../x' },
+          { policy_number: 'POL-1', timestamp: '../../x' },
+          valid,
+          valid,
+        ],
+      })) as Record<string, unknown>[];
+
+      expect(results.slice(0, 3).map((result) => result.success)).toEqual([false, false, false]);
+      expect(results[0].error).toBe('policy_number and timestamp must be strings');
+      expect(results[1].error).toContain('Invalid claim_type');
+      expect(results[2].error).toContain('Invalid timestamp');
+      expect(results[3]).toMatchObject({ success: true, ...valid, claim_type: 'CI' });
+      expect(results[3].claim_id).toMatch(/^CI-20240102-[0-9A-F]{5}$/);
+      expect(results[4].claim_id).toBe(results[3].claim_id);
+      expect(await fs.readdir(testDir)).toEqual(['index']);
+      expect(await fs.readdir(indexDir)).toEqual(['CI-20240102.idx64']);
+    });
+
+    it('should default the timestamp to now and not be cached', async () => {
+      process.env.CLAIM_ID_INDEX_DIR = path.join(testDir, 'index');
+
+      const result = (await runPythonEntrypoint(tool('claim_id_generator'), 'run', {
+        policy_number: 'POL-1',
+      })) as Record<string, unknown>;
+
+      expect(result).toMatchObject({ success: true, policy_number: 'POL-1', claim_type: 'CI' });
+      const date = String(result.timestamp).slice(0, 10).replace(/-/g, '');
+      expect(result.claim_id).toMatch(new RegExp(`^CI-${date}-[0-9A-F]{5}$`));
+      const loaded = await new ToolLoader(TOOLS_DIR).loadTool('claim_id_generator');
+      expect(loaded.metadata?.cache).toBeUndefined();
+    });
+  });
+
+  describe('process_payment', () => {
+    it('should reject a bad amount without aborting the settlement', async () => {
+      process.env.PAYMENT_LEDGER_PATH = path.join(testDir, 'payments.db');
+      process.env.PAYMENT_SETTLEMENT_DIR = path.join(testDir, 'settlements');
+      const call = { account_name: 'A', account_number: '12345678', bank_name: 'Bank' };
+
+      const results = (await runPythonEntrypoint(tool('process_payment'), 'settle_many', {
+        calls: [
+          { ...call, claim_id: 'CI-1', amount: 'lots' },
+          { ...call, claim_id: 'CI-2', amount: -5 },
+          { ...call, claim_id: 'CI-3', amount: 250 },
+        ],
+      })) as Record<string, unknown>[];
+
+      expect(results[0]).toEqual({ success: false, error: "Invalid amount: 'lots'" });
+      expect(results[1]).toEqual({ success: false, error: 'Invalid amount: -5' });
+      expect(results[2]).toMatchObject({ success: true, status: 'success', processedAmount: 250 });
+      expect(await fs.readdir(path.join(testDir, 'settlements'))).toHaveLength(1);
+    });
+
+    it('should report failed payments as errors and not open the ledger for none', async () => {
+      process.env.PAYMENT_LEDGER_PATH = path.join(testDir, 'payments.db');
+      const call = { claim_id: 'CI-1', amount: 250, account_number: 'INVALID' };
+      const reason = 'Payment could not be processed - Invalid account details';
+
+      const [failed] = (await runPythonEntrypoint(tool('process_payment'), 'settle_many', {
+        calls: [call],
+      })) as Record<string, unknown>[];
+      expect(failed).toMatchObject({ success: false, status: 'failed', error: reason });
+      await expect(runPythonEntrypoint(tool('process_payment'), 'run', call)).rejects.toThrow(
+        reason
+      );
+
+      await fs.rm(process.env.PAYMENT_LEDGER_PATH, { force: true });
+      const invalid = await runPythonEntrypoint(tool('process_payment'), 'settle_many', {
+        calls: [{ claim_id: 'CI-2' }],
+      });
+      expect(invalid).toEqual([{ success: false, error: 'claim_id and amount are required' }]);
+      expect(await fs.readdir(testDir)).not.toContain('payments.db');
+    });
+  });
+
+  describe('send_notification', () => {
+    it('should reject malformed calls without failing the batch', async () => {
+      process.env.NOTIFICATION_OUTBOX_PATH = path.join(testDir, 'notifications.db');
+      const enqueue = (calls: unknown[]) =>
+        runPythonEntrypoint(tool('send_notification'), 'enqueue_many', { calls }) as Promise<
+          Record<string, unknown>[]
+        >;
+
+      const results = await enqueue([
+        'jo@example.com',
+        { recipient_email: 42, content: 'Hi' },
+        { recipient_email: 'jo@example.com', content: { text: 'Hi' } },
+        { recipient_email: 'jo@example.com', content: 'Hi' },
+      ]);
+
+      expect(results[0]).toEqual({ success: false, error: 'Each call must be an object' });
+      const notStrings = {
+        success: false,
+        error: 'recipient, message_type and content must be strings',
+      };
+      expect(results[1]).toEqual(notStrings);
+      expect(results[2]).toEqual(notStrings);
+      expect(results[3]).toMatchObject({ recipient: 'jo@example.com', deliveryStatus: 'queued' });
+      expect(await enqueue([null])).toEqual([
+        { success: false, error: 'Each call must be an object' },
+      ]);
+    });
+  });
+
+  describe('validate_bank_account', () => {
+    it('should reject non-ASCII digits and remember accounts it verifies', async () => {
+      process.env.VERIFIED_ACCOUNTS_PATH = path.join(testDir, 'verified_accounts.db');
+      const validate = (calls: Record<string, unknown>[]) =>
+        runPythonEntrypoint(tool('validate_bank_account'), 'validate_many', { calls }) as Promise<
+          Record<string, unknown>[]
+        >;
+      const account = { account_number: '12345678', account_name: 'Jo', bank_code: '200000' };
+
+      const first = await validate([
+        { account_number: '1234567²', account_name: 'Jo' },
+        { ...account, bank_code: '20000²' },
+        account,
+      ]);
+      expect(first[0]).toMatchObject({
+        valid: false,
+        reason: 'Account number must be digits or an IBAN',
+      });
+      expect(first[1]).toMatchObject({ valid: false, reason: 'Bank code must be digits' });
+      expect(first[2]).toMatchObject({ valid: true, bankName: 'Barclays' });
+      expect(first[2].previouslyVerified).toBeUndefined();
+
+      const [again] = await validate([account]);
+      expect(again).toEqual({ ...first[2], previouslyVerified: true });
+    });
+  });
+});
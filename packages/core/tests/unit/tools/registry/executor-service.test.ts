@@ -1,6 +1,11 @@
 import { beforeEach, describe, expect, it, vi } from 'vitest';
-import { executeSingleTool, groupToolsByConcurrency } from '@/tools/registry/executor-service';
+import {
+  executeSingleTool,
+  executeToolsConcurrently,
+  groupToolsByConcurrency,
+} from '@/tools/registry/executor-service';
 import { ToolRegistry } from '@/tools/registry/registry';
+import { ToolScheduler } from '@/tools/registry/tool-scheduler';
 import { ToolCall } from '@/base-types';
 
 describe('ExecutorService - Critical Path (Minimal MVP Tests)', () => {
@@ -197,6 +202,261 @@ describe('ExecutorService - Critical Path (Minimal MVP Tests)', () => {
     });
   });
 
+  describe('executeToolsConcurrently - Batch Tools', () => {
+    const call = (id: string, name: string, args: string): ToolCall => ({
+      id,
+      type: 'function',
+      function: { name, arguments: args },
+    });
+
+    it('should send same-tool calls to executeBatch once, keeping call order', async () => {
+      const execute = vi.fn();
+      const executeBatch = vi.fn(async (argsList: Record<string, unknown>[]) =>
+        argsList.map((args) => ({ content: `checked ${args.n}` }))
+      );
+      registry.register({
+        name: 'validate',
+        description: 'Batch tool',
+        parameters: { type: 'object', properties: {}, required: [] },
+        execute,
+        executeBatch,
+        isConcurrencySafe: () => true,
+      });
+      registry.register({
+        name: 'read',
+        description: 'Read file',
+        parameters: { type: 'object', properties: {}, required: [] },
+        execute: vi.fn().mockResolvedValue({ content: 'file' }),
+        isConcurrencySafe: () => true,
+      });
+
+      const results = await executeToolsConcurrently(
+        [
+          call('1', 'validate', '{"n": 1}'),
+          call('2', 'read', '{}'),
+          call('3', 'validate', '{"n": 3}'),
+        ],
+        mockContext,
+        registry,
+        vi.fn()
+      );
+
+      expect(executeBatch).toHaveBeenCalledTimes(1);
+      expect(executeBatch).toHaveBeenCalledWith([{ n: 1 }, { n: 3 }]);
+      expect(execute).not.toHaveBeenCalled();
+      expect(results.map((r) => r.tool_call_id)).toEqual(['1', '2', '3']);
+      expect(results[0].content).toContain('checked 1');
+      expect(results[2].content).toContain('checked 3');
+      // Every call is still logged on its own
+      expect(mockLogger.logToolCall).toHaveBeenCalledTimes(3);
+      expect(mockLogger.logToolResult).toHaveBeenCalledTimes(3);
+    });
+
+    it('should report malformed arguments and batch failures per call', async () => {
+      registry.register({
+        name: 'validate',
+        description: 'Batch tool',
+        parameters: { type: 'object', properties: {}, required: [] },
+        execute: vi.fn(),
+        executeBatch: async () => {
+          throw new Error('interpreter crashed');
+        },
+        isConcurrencySafe: () => true,
+      });
+
+      const results = await executeToolsConcurrently(
+        [
+          call('1', 'validate', '{"n": 1}'),
+          call('2', 'validate', 'not json'),
+          call('3', 'validate', '{"n": 3}'),
+        ],
+        mockContext,
+        registry,
+        vi.fn()
+      );
+
+      expect(results[0].content).toContain('interpreter crashed');
+      expect(results[1].content).toContain('Invalid arguments');
+      expect(results[2].content).toContain('interpreter crashed');
+    });
+
+    it('should use execute for a single call to a batch tool', async () => {
+      const execute = vi.fn().mockResolvedValue({ content: 'single' });
+      const executeBatch = vi.fn();
+      registry.register({
+        name: 'validate',
+        description: 'Batch tool',
+        parameters: { type: 'object', properties: {}, required: [] },
+        execute,
+        executeBatch,
+        isConcurrencySafe: () => true,
+      });
+
+      await executeToolsConcurrently([call('1', 'validate', '{}')], mockContext, registry, vi.fn());
+
+      expect(execute).toHaveBeenCalledTimes(1);
+      expect(executeBatch).not.toHaveBeenCalled();
+    });
+  });
+
+  describe('Result Cache', () => {
+    const call = (id: string, args: string): ToolCall => ({
+      id,
+      type: 'function',
+      function: { name: 'lookup', arguments: args },
+    });
+
+    it('should skip execution for cached results of tools with a cache policy', async () => {
+      const execute = vi.fn().mockResolvedValue({ content: 'policy' });
+      registry.register({
+        name: 'lookup',
+        description: 'Cached tool',
+        parameters: { type: 'object', properties: {}, required: [] },
+        execute,
+        isConcurrencySafe: () => true,
+        metadata: { cache: { ttlMs: 60000 } },
+      });
+
+      await executeSingleTool(call('1', '{"a": 1, "b": 2}'), mockContext, registry, vi.fn());
+      const second = await executeSingleTool(
+        call('2', '{"b": 2, "a": 1}'),
+        mockContext,
+        registry,
+        vi.fn()
+      );
+
+      expect(execute).toHaveBeenCalledTimes(1);
+      expect(second.tool_call_id).toBe('2');
+      expect(second.content).toContain('policy');
+      expect(registry.resultCache.getStats()).toMatchObject({ hits: 1, misses: 1 });
+      expect(mockLogger.logToolResult).toHaveBeenCalledTimes(2);
+    });
+
+    it('should not cache tools without a cache policy or failed results', async () => {
+      const execute = vi.fn().mockResolvedValue({ content: '', error: 'not found' });
+      registry.register({
+        name: 'lookup',
+        description: 'Cached tool',
+        parameters: { type: 'object', properties: {}, required: [] },
+        execute,
+        isConcurrencySafe: () => true,
+        metadata: { cache: {} },
+      });
+
+      await executeSingleTool(call('1', '{}'), mockContext, registry, vi.fn());
+      await executeSingleTool(call('2', '{}'), mockContext, registry, vi.fn());
+
+      expect(execute).toHaveBeenCalledTimes(2);
+      expect(registry.resultCache.getStats().size).toBe(0);
+    });
+  });
+
+  describe('Scheduled Tools', () => {
+    it('should run calls through the scheduler and log their queue wait', async () => {
+      registry = new ToolRegistry(undefined, new ToolScheduler({ maxConcurrent: 4 }));
+      let running = 0;
+      let peak = 0;
+      registry.register({
+        name: 'process_payment',
+        description: 'Serialized tool',
+        parameters: { type: 'object', properties: {}, required: [] },
+        execute: async () => {
+          peak = Math.max(peak, ++running);
+          await new Promise((resolve) => setTimeout(resolve, 10));
+          running--;
+          return { content: 'paid' };
+        },
+        isConcurrencySafe: () => true,
+        metadata: { schedule: { maxConcurrency: 1 } },
+      });
+
+      const calls: ToolCall[] = ['1', '2', '3'].map((id) => ({
+        id,
+        type: 'function',
+        function: { name: 'process_payment', arguments: '{}' },
+      }));
+      await executeToolsConcurrently(calls, mockContext, registry, vi.fn());
+
+      expect(peak).toBe(1);
+      expect(registry.scheduler.getStats()).toMatchObject({ started: 3, running: 0 });
+      expect(mockLogger.logToolResult).toHaveBeenCalledWith(
+        'test-agent',
+        'process_payment',
+        '3',
+        { content: 'paid' },
+        { queueWaitMs: expect.any(Number) }
+      );
+    });
+  });
+
+  describe('Tool Metrics', () => {
+    it('should log and record metrics without sending them to the LLM', async () => {
+      const metrics = { wallTimeMs: 40, cpuUserMs: 12, maxRssKb: 9000, stdoutBytes: 20 };
+      registry.register({
+        name: 'score',
+        description: 'Measured tool',
+        parameters: { type: 'object', properties: {}, required: [] },
+        execute: async () => ({ content: { score: 7 }, metrics }),
+        isConcurrencySafe: () => true,
+      });
+
+      const result = await executeSingleTool(
+        { id: 'm1', type: 'function', function: { name: 'score', arguments: '{}' } },
+        mockContext,
+        registry,
+        vi.fn()
+      );
+
+      expect(JSON.parse(result.content!)).toEqual({ content: { score: 7 } });
+      expect(mockLogger.logToolResult).toHaveBeenCalledWith(
+        'test-agent',
+        'score',
+        'm1',
+        { content: { score: 7 } },
+        metrics
+      );
+      expect(registry.metrics.getToolSummary('score')).toMatchObject({
+        calls: 1,
+        totalWallTimeMs: 40,
+        totalCpuUserMs: 12,
+        peakRssKb: 9000,
+      });
+    });
+  });
+
+  describe('Streaming Tools', () => {
+    it('should forward each record to the logger and return the summary', async () => {
+      const execute = vi.fn();
+      registry.register({
+        name: 'bulk',
+        description: 'Streaming tool',
+        parameters: { type: 'object', properties: {}, required: [] },
+        execute,
+        executeStream: async function* (args) {
+          for (let i = 0; i < (args.n as number); i++) yield { i };
+          return { content: { scored: args.n } };
+        },
+        isConcurrencySafe: () => true,
+      });
+      mockLogger.logToolProgress = vi.fn();
+
+      const result = await executeSingleTool(
+        { id: 's1', type: 'function', function: { name: 'bulk', arguments: '{"n": 3}' } },
+        mockContext,
+        registry,
+        vi.fn()
+      );
+
+      expect(execute).not.toHaveBeenCalled();
+      expect(mockLogger.logToolProgress).toHaveBeenCalledTimes(3);
+      expect(mockLogger.logToolProgress).toHaveBeenCalledWith('test-agent', 'bulk', 's1', { i: 2 }, 2);
+      expect(JSON.parse(result.content!)).toEqual({ content: { scored: 3 } });
+      expect(mockLogger.logSystemMessage).toHaveBeenCalledWith(
+        '[STREAM] bulk streamed 3 record(s)'
+      );
+    });
+  });
+
   describe('Task Delegation - The Special Case', () => {
     it('should handle Delegate tool delegation', async () => {
       const mockDelegate = vi.fn().mockResolvedValue('delegation result');
@@ -141,6 +141,333 @@ print("test")`;
     });
   });
 
+  describe('loadTools', () => {
+    it('should load every script once, preferring .py over .js and .sh', async () => {
+      await fs.writeFile(path.join(testDir, 'dup.py'), '"""\nname: dup\ndescription: Python\n"""');
+      await fs.writeFile(path.join(testDir, 'dup.sh'), '#!/bin/bash\n# Tool: dup');
+      await fs.writeFile(path.join(testDir, 'other.js'), '/**\n * @tool other\n */');
+      await fs.writeFile(path.join(testDir, 'notes.txt'), 'not a tool');
+
+      const { tools, failures } = await new ToolLoader(testDir).loadTools();
+
+      expect(failures).toEqual([]);
+      expect(tools.map((t) => t.name).sort()).toEqual(['dup', 'other']);
+      expect(tools.find((t) => t.name === 'dup')?.description).toBe('Python');
+    });
+
+    it('should return no tools for a missing directory', async () => {
+      const loader = new ToolLoader(path.join(testDir, 'missing'));
+      expect(await loader.loadTools()).toEqual({ tools: [], failures: [] });
+    });
+  });
+
+  describe('entrypoint', () => {
+    it('should call the declared function without a main wrapper', async () => {
+      await fs.writeFile(
+        path.join(testDir, 'policy_lookup.py'),
+        `#!/usr/bin/env python3
+"""
+name: policy_lookup
+description: Look up a policy
+entrypoint: lookup
+parameters:
+  policy_number: string
+"""
+
+
+def lookup(policy_number):
+    print("not part of the result")
+    return {"policyNumber": policy_number, "status": "active"}
+`
+      );
+
+      const loader = new ToolLoader(testDir);
+      const tool = await loader.loadTool('policy_lookup');
+      const result = await tool.execute({ policy_number: 'POL-7' });
+
+      expect(result.error).toBeUndefined();
+      expect(result.content).toEqual({ policyNumber: 'POL-7', status: 'active' });
+      expect(tool.parameters.required).toEqual(['policy_number']);
+      // Usage is measured around the call in the Python process
+      expect(result.metrics?.cpuUserMs).toBeGreaterThanOrEqual(0);
+      expect(result.metrics?.maxRssKb).toBeGreaterThan(0);
+      expect(result.metrics?.stdinBytes).toBeGreaterThan(0);
+    });
+
+    it('should map exceptions and success:false to errors', async () => {
+      await fs.writeFile(
+        path.join(testDir, 'strict_tool.py'),
+        `"""
+name: strict_tool
+description: Rejects bad input
+entrypoint: run
+parameters:
+  value: number
+"""
+
+
+def run(value):
+    if value < 0:
+        raise ValueError("value must be positive")
+    return {"success": value > 0, "error": "zero is not allowed"}
+`
+      );
+
+      const loader = new ToolLoader(testDir);
+      const tool = await loader.loadTool('strict_tool');
+
+      expect((await tool.execute({ value: -1 })).error).toBe('ValueError: value must be positive');
+      expect((await tool.execute({ value: 0 })).error).toBe('zero is not allowed');
+      expect((await tool.execute({ value: 2 })).content).toEqual({
+        success: true,
+        error: 'zero is not allowed',
+      });
+    });
+  });
+
+  describe('batch', () => {
+    it('should pass all argument dicts to the _many function in one call', async () => {
+      await fs.writeFile(
+        path.join(testDir, 'check_account.py'),
+        `"""
+name: check_account
+description: Check an account
+entrypoint: check_account
+batch: true
+parameters:
+  account: string
+"""
+import os
+
+
+def check_account(account):
+    return {"account": account}
+
+
+def check_account_many(calls):
+    pid = os.getpid()
+    return [
+        {"success": False, "error": "empty account"} if not c["account"]
+        else {"account": c["account"], "pid": pid}
+        for c in calls
+    ]
+`
+      );
+
+      const loader = new ToolLoader(testDir);
+      const tool = await loader.loadTool('check_account');
+      const results = await tool.executeBatch!([
+        { account: 'A' },
+        { account: '' },
+        { account: 'C' },
+      ]);
+
+      expect(results).toHaveLength(3);
+      expect(results[0].content).toMatchObject({ account: 'A' });
+      expect(results[1]).toMatchObject({ content: '', error: 'empty account' });
+      // One process served the whole batch
+      const pid = (results[0].content as { pid: number }).pid;
+      expect((results[2].content as { pid: number }).pid).toBe(pid);
+      // Every call carries the shared execution's metrics
+      expect(results.map((r) => r.metrics?.batchSize)).toEqual([3, 3, 3]);
+    });
+
+    it('should fail every call when the batch result has the wrong length', async () => {
+      await fs.writeFile(
+        path.join(testDir, 'short_batch.py'),
+        `"""
+name: short_batch
+description: Returns too few results
+batch: run_all
+parameters:
+  value: string
+"""
+
+
+def run_all(calls):
+    return []
+`
+      );
+
+      const loader = new ToolLoader(testDir);
+      const tool = await loader.loadTool('short_batch');
+      const results = await tool.executeBatch!([{ value: 'a' }, { value: 'b' }]);
+
+      expect(results.map((r) => r.error)).toEqual([
+        'Batch function returned 0 results, expected 2 results',
+        'Batch function returned 0 results, expected 2 results',
+      ]);
+    });
+
+    it('should not add executeBatch without batch metadata', async () => {
+      await fs.writeFile(
+        path.join(testDir, 'plain.py'),
+        '"""\nname: plain\nentrypoint: run\n"""\n\ndef run():\n    return 1\n'
+      );
+
+      const tool = await new ToolLoader(testDir).loadTool('plain');
+      expect(tool.executeBatch).toBeUndefined();
+    });
+  });
+
+  describe('cache metadata', () => {
+    const writeTool = (name: string, header: string) =>
+      fs.writeFile(
+        path.join(testDir, `${name}.py`),
+        `"""\nname: ${name}\n${header}\nentrypoint: run\n"""\n\ndef run():\n    return 1\n`
+      );
+
+    it('should read cache ttl and deterministic declarations', async () => {
+      await writeTool('ttl_tool', 'cache: ttl=300');
+      await writeTool('pure_tool', 'deterministic: true');
+      await writeTool('plain_tool', 'description: Not cached');
+
+      const loader = new ToolLoader(testDir);
+      expect((await loader.loadTool('ttl_tool')).metadata?.cache).toEqual({ ttlMs: 300000 });
+      expect((await loader.loadTool('pure_tool')).metadata?.cache).toEqual({});
+      expect((await loader.loadTool('plain_tool')).metadata?.cache).toBeUndefined();
+    });
+  });
+
+  describe('metadata header', () => {
+    it('should not read parameters named like settings as settings', async () => {
+      const pythonScript = `"""
+name: report
+description: Build a report
+parameters:
+  entrypoint: string
+  batch: string
+  cache: string
+  output: string
+"""
+import json, sys
+print(json.dumps({"output": json.load(sys.stdin)["output"]}))`;
+
+      await fs.writeFile(path.join(testDir, 'report.py'), pythonScript);
+
+      const tool = await new ToolLoader(testDir).loadTool('report');
+      expect(tool.metadata?.cache).toBeUndefined();
+      expect(tool.executeBatch).toBeUndefined();
+      expect(tool.executeStream).toBeUndefined();
+      expect(Object.keys(tool.parameters.properties)).toEqual([
+        'entrypoint',
+        'batch',
+        'cache',
+        'output',
+      ]);
+
+      // Run as a script, not through an entry point named "string"
+      const result = await tool.execute({
+        entrypoint: 'a',
+        batch: 'b',
+        cache: 'true',
+        output: 'ndjson',
+      });
+      expect(result.error).toBeUndefined();
+      expect(result.content).toEqual({ output: 'ndjson' });
+    });
+  });
+
+  describe('max_concurrency', () => {
+    it('should schedule every script tool and read its per-tool limit', async () => {
+      await fs.writeFile(
+        path.join(testDir, 'pay.py'),
+        '"""\nname: pay\nmax_concurrency: 1\nparameters:\n  id: string\n"""'
+      );
+      await fs.writeFile(path.join(testDir, 'plain.sh'), '#!/bin/bash\n# Tool: plain');
+
+      const loader = new ToolLoader(testDir);
+      expect((await loader.loadTool('pay')).metadata?.schedule).toEqual({ maxConcurrency: 1 });
+      expect((await loader.loadTool('plain')).metadata?.schedule).toEqual({});
+    });
+  });
+
+  describe('ndjson output', () => {
+    const drain = async (stream: AsyncGenerator<unknown, unknown>) => {
+      const records: unknown[] = [];
+      let next = await stream.next();
+      while (!next.done) {
+        records.push(next.value);
+        next = await stream.next();
+      }
+      return { records, result: next.value };
+    };
+
+    it('should stream a generator entry point and return its value as summary', async () => {
+      await fs.writeFile(
+        path.join(testDir, 'bulk_score.py'),
+        `"""
+name: bulk_score
+output: ndjson
+entrypoint: score_portfolio
+parameters:
+  claims: array
+"""
+
+def score_portfolio(claims):
+    print("progress goes to stderr")
+    for claim in claims:
+        yield {"claim": claim, "score": len(claim)}
+    return {"scored": len(claims)}
+`
+      );
+
+      const tool = await new ToolLoader(testDir).loadTool('bulk_score');
+      expect(tool.executeStream).toBeDefined();
+
+      const { records, result } = await drain(tool.executeStream!({ claims: ['a', 'bbb'] }));
+      expect(records).toEqual([
+        { claim: 'a', score: 1 },
+        { claim: 'bbb', score: 3 },
+      ]);
+      expect(result).toMatchObject({ content: { scored: 2 } });
+
+      // execute drains the stream and keeps only the summary
+      expect(await tool.execute({ claims: ['a'] })).toMatchObject({ content: { scored: 1 } });
+    });
+
+    it('should report entry point exceptions as errors', async () => {
+      await fs.writeFile(
+        path.join(testDir, 'bad_stream.py'),
+        `"""
+name: bad_stream
+output: ndjson
+entrypoint: run
+"""
+
+def run():
+    yield 1
+    raise ValueError("no portfolio")
+`
+      );
+
+      const tool = await new ToolLoader(testDir).loadTool('bad_stream');
+      const { records, result } = await drain(tool.executeStream!({}));
+      expect(records).toEqual([1]);
+      expect((result as { error: string }).error).toContain('ValueError: no portfolio');
+    });
+
+    it('should stream records written by a script without an entry point', async () => {
+      await fs.writeFile(
+        path.join(testDir, 'lines.py'),
+        `"""
+name: lines
+output: ndjson
+"""
+import json, sys
+for i in range(json.load(sys.stdin)["n"]):
+    print(json.dumps(i))
+print(json.dumps({"summary": {"success": False, "error": "partial portfolio"}}))
+`
+      );
+
+      const tool = await new ToolLoader(testDir).loadTool('lines');
+      const { records, result } = await drain(tool.executeStream!({ n: 2 }));
+      expect(records).toEqual([0, 1]);
+      expect(result).toMatchObject({ content: '', error: 'partial portfolio' });
+    });
+  });
+
   describe('tool execution', () => {
     it('should execute Python script with JSON input/output', async () => {
       const pythonScript = `#!/usr/bin/env python3
@@ -163,6 +490,7 @@ print(json.dumps({"echo": data.get("message", "")}))`;
 
       expect(result.content).toEqual({ echo: 'Hello' });
       expect(result.error).toBeUndefined();
+      expect(result.metrics?.maxRssKb).toBeGreaterThan(0);
     });
 
     it('should handle tool execution errors', async () => {
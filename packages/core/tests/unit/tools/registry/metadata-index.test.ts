@@ -0,0 +1,72 @@
+import { afterEach, beforeEach, describe, expect, it } from 'vitest';
+import * as fs from 'fs/promises';
+import * as path from 'node:path';
+import { ToolMetadataIndex } from '@/tools/registry/metadata-index';
+import { ToolLoader } from '@/tools/registry/loader';
+
+describe('ToolMetadataIndex', () => {
+  const testDir = path.join(process.cwd(), 'test-metadata-index');
+  const toolsDir = path.join(testDir, 'tools');
+  const indexPath = path.join(testDir, 'cache', 'tools.json');
+
+  const writeTool = (name: string, description: string) =>
+    fs.writeFile(
+      path.join(toolsDir, `${name}.py`),
+      `"""\nname: ${name}\ndescription: ${description}\nparameters:\n  id: string\n"""\n`
+    );
+
+  beforeEach(async () => {
+    await fs.mkdir(toolsDir, { recursive: true });
+  });
+
+  afterEach(async () => {
+    await fs.rm(testDir, { recursive: true, force: true });
+  });
+
+  it('should reuse parsed metadata across loads until a script changes', async () => {
+    await writeTool('lookup', 'Look up a policy');
+    await writeTool('score', 'Score a claim');
+
+    const first = await ToolMetadataIndex.open(indexPath);
+    await new ToolLoader(toolsDir, undefined, { metadataIndex: first }).loadTools();
+    await first.save();
+    expect(first.getStats()).toEqual({ entries: 2, hits: 0, misses: 2 });
+
+    // Same size, new mtime: the script must be parsed again
+    await writeTool('score', 'Score a CLAIM');
+    const later = new Date(Date.now() + 5000);
+    await fs.utimes(path.join(toolsDir, 'score.py'), later, later);
+
+    const second = await ToolMetadataIndex.open(indexPath);
+    const { tools } = await new ToolLoader(toolsDir, undefined, {
+      metadataIndex: second,
+    }).loadTools();
+
+    expect(second.getStats()).toMatchObject({ hits: 1, misses: 1 });
+    expect(tools.find((t) => t.name === 'lookup')?.parameters.required).toEqual(['id']);
+    expect(tools.find((t) => t.name === 'score')?.description).toBe('Score a CLAIM');
+  });
+
+  it('should drop entries for deleted scripts', async () => {
+    await writeTool('lookup', 'Look up a policy');
+    await writeTool('score', 'Score a claim');
+    const index = await ToolMetadataIndex.open(indexPath);
+    const loader = new ToolLoader(toolsDir, undefined, { metadataIndex: index });
+    await loader.loadTools();
+
+    await fs.rm(path.join(toolsDir, 'score.py'));
+    await loader.loadTools();
+    await index.save();
+
+    const saved = JSON.parse(await fs.readFile(indexPath, 'utf-8'));
+    expect(Object.keys(saved.entries)).toEqual([path.join(toolsDir, 'lookup.py')]);
+  });
+
+  it('should start empty when the index file is corrupt', async () => {
+    await fs.mkdir(path.dirname(indexPath), { recursive: true });
+    await fs.writeFile(indexPath, '{not json');
+
+    const index = await ToolMetadataIndex.open(indexPath);
+    expect(index.getStats().entries).toBe(0);
+  });
+});
@@ -0,0 +1,248 @@
+import { afterEach, beforeEach, describe, expect, it } from 'vitest';
+import * as fs from 'fs/promises';
+import * as path from 'node:path';
+import { PythonForkServer } from '@/tools/registry/python-fork-server';
+import { ToolLoader } from '@/tools/registry/loader';
+
+describe('PythonForkServer', () => {
+  const testDir = 'test-fork-server-temp';
+  let server: PythonForkServer;
+  let scriptPath: string;
+
+  beforeEach(async () => {
+    await fs.mkdir(testDir, { recursive: true });
+    scriptPath = path.resolve(testDir, 'fork_tool.py');
+    await fs.writeFile(
+      scriptPath,
+      `import atexit
+import os
+import random
+import time
+
+IMPORTED_BY = os.getpid()
+SEEN = []
+
+def whoami():
+    return {"pid": os.getpid(), "parent": os.getppid(), "imported_by": IMPORTED_BY}
+
+def remember(value):
+    SEEN.append(value)
+    return {"seen": SEEN}
+
+def roll():
+    return random.random()
+
+def add(a, b):
+    print("noise on stdout must not break framing")
+    return {"sum": a + b}
+
+def fail():
+    raise ValueError("bad input")
+
+def crash():
+    os._exit(3)
+
+def slow(seconds):
+    time.sleep(seconds)
+    return {"slept": seconds}
+
+def linger(seconds):
+    atexit.register(time.sleep, seconds)
+    return {"lingering": seconds}
+`
+    );
+  });
+
+  afterEach(async () => {
+    await server?.shutdown();
+    await fs.rm(testDir, { recursive: true, force: true });
+  });
+
+  it('should call a module function with keyword arguments', async () => {
+    server = new PythonForkServer();
+    const result = await server.call(scriptPath, 'add', { a: 2, b: 3 });
+    expect(result).toEqual({ sum: 5 });
+  });
+
+  it('should run each call in a new child of the zygote that imported the tool', async () => {
+    server = new PythonForkServer();
+    server.preload(scriptPath);
+    const first = (await server.call(scriptPath, 'whoami', {})) as Record<string, number>;
+    const second = (await server.call(scriptPath, 'whoami', {})) as Record<string, number>;
+
+    expect(second.pid).not.toBe(first.pid);
+    expect(first.parent).toBe(first.imported_by);
+    expect(second.parent).toBe(first.parent);
+    expect(server.getStats()).toMatchObject({ spawned: 1, calls: 2, preloaded: 1 });
+  });
+
+  it('should not carry module state from one call to the next', async () => {
+    server = new PythonForkServer();
+    const results = [];
+    for (const value of ['a', 'b', 'c']) {
+      results.push(await server.call(scriptPath, 'remember', { value }));
+    }
+
+    expect(results).toEqual([{ seen: ['a'] }, { seen: ['b'] }, { seen: ['c'] }]);
+  });
+
+  it('should give every child its own random state', async () => {
+    server = new PythonForkServer();
+    const rolls = await Promise.all(
+      Array.from({ length: 4 }, () => server.call(scriptPath, 'roll', {}))
+    );
+    expect(new Set(rolls).size).toBe(4);
+  });
+
+  it('should run calls concurrently and report child usage', async () => {
+    server = new PythonForkServer();
+    const metrics: Array<Record<string, unknown>> = [];
+    const results = await Promise.all(
+      Array.from({ length: 6 }, (_, i) =>
+        server.call(scriptPath, 'add', { a: i, b: 1 }, undefined, undefined, (m) =>
+          metrics.push(m as Record<string, unknown>)
+        )
+      )
+    );
+
+    expect(results).toEqual([1, 2, 3, 4, 5, 6].map((sum) => ({ sum })));
+    expect(metrics).toHaveLength(6);
+    expect(metrics[0]).toHaveProperty('cpuUserMs');
+    expect(metrics[0]).toHaveProperty('maxRssKb');
+  });
+
+  it('should surface Python exceptions and crashes as errors', async () => {
+    server = new PythonForkServer();
+    await expect(server.call(scriptPath, 'fail', {})).rejects.toThrow('ValueError: bad input');
+    await expect(server.call(scriptPath, 'crash', {})).rejects.toThrow(
+      'exited with code 3 and no result'
+    );
+
+    // The zygote survives its children failing
+    expect(await server.call(scriptPath, 'add', { a: 1, b: 1 })).toEqual({ sum: 2 });
+    expect(server.getStats()).toMatchObject({ spawned: 1, crashes: 0 });
+  });
+
+  it('should kill a child that exceeds the call timeout', async () => {
+    server = new PythonForkServer();
+    const [slow, fast] = await Promise.allSettled([
+      server.call(scriptPath, 'slow', { seconds: 5 }, 200),
+      server.call(scriptPath, 'slow', { seconds: 0.05 }),
+    ]);
+
+    expect(slow.status).toBe('rejected');
+    expect((slow as PromiseRejectedResult).reason.message).toContain('timed out after 200ms');
+    expect(fast).toEqual({ status: 'fulfilled', value: { slept: 0.05 } });
+  });
+
+  it('should not let a child that has closed its pipe hold up other calls', async () => {
+    server = new PythonForkServer();
+    const start = performance.now();
+    const [lingering, fast] = await Promise.allSettled([
+      server.call(scriptPath, 'linger', { seconds: 5 }, 1000),
+      server
+        .call(scriptPath, 'slow', { seconds: 0.05 })
+        .then((value) => ({ value, ms: performance.now() - start })),
+    ]);
+
+    expect(fast).toMatchObject({ status: 'fulfilled', value: { value: { slept: 0.05 } } });
+    expect((fast as PromiseFulfilledResult<{ ms: number }>).value.ms).toBeLessThan(1000);
+    expect((lingering as PromiseRejectedResult).reason.message).toContain(
+      'timed out after 1000ms'
+    );
+  });
+
+  it('should reject calls after shutdown', async () => {
+    server = new PythonForkServer();
+    await server.call(scriptPath, 'add', { a: 1, b: 1 });
+    await server.shutdown();
+
+    expect(server.getStats().running).toBe(false);
+    await expect(server.call(scriptPath, 'add', { a: 1, b: 1 })).rejects.toThrow('shut down');
+  });
+});
+
+describe('ToolLoader fork execution', () => {
+  const testDir = 'test-fork-tools-temp';
+  let server: PythonForkServer;
+
+  beforeEach(async () => {
+    await fs.mkdir(testDir, { recursive: true });
+    server = new PythonForkServer();
+  });
+
+  afterEach(async () => {
+    await server.shutdown();
+    await fs.rm(testDir, { recursive: true, force: true });
+  });
+
+  it('should call the tool function in a forked child when execution is fork', async () => {
+    await fs.writeFile(
+      path.join(testDir, 'tally.py'),
+      `#!/usr/bin/env python3
+"""
+name: tally
+description: Count calls in a module global
+execution: fork
+parameters:
+  label: string
+"""
+import os
+
+CALLS = 0
+
+def tally(label):
+    global CALLS
+    CALLS += 1
+    return {"label": label, "calls": CALLS, "pid": os.getpid()}
+
+if __name__ == "__main__":
+    raise SystemExit("main must not run in fork mode")
+`
+    );
+
+    const loader = new ToolLoader(testDir, undefined, { forkServer: server });
+    const tool = await loader.loadTool('tally');
+    expect(server.getStats().preloaded).toBe(0);
+    const first = await tool.execute({ label: 'a' });
+    const second = await tool.execute({ label: 'b' });
+
+    expect(first.error).toBeUndefined();
+    expect(first.content).toMatchObject({ label: 'a', calls: 1 });
+    expect(second.content).toMatchObject({ label: 'b', calls: 1 });
+    expect((second.content as { pid: number }).pid).not.toBe(
+      (first.content as { pid: number }).pid
+    );
+    expect(first.metrics?.wallTimeMs).toBeGreaterThanOrEqual(0);
+    expect(server.getStats().preloaded).toBe(1);
+  });
+
+  it('should fall back to process execution without a fork server', async () => {
+    await fs.writeFile(
+      path.join(testDir, 'echo.py'),
+      `"""
+name: echo
+description: Echo input
+execution: fork
+parameters:
+  message: string
+"""
+import json
+import sys
+
+def echo(message):
+    return {"echo": message, "mode": "fork"}
+
+if __name__ == "__main__":
+    data = json.load(sys.stdin)
+    print(json.dumps({"echo": data["message"], "mode": "process"}))
+`
+    );
+
+    const loader = new ToolLoader(testDir);
+    const tool = await loader.loadTool('echo');
+    const result = await tool.execute({ message: 'hi' });
+
+    expect(result.content).toEqual({ echo: 'hi', mode: 'process' });
+  });
+});
@@ -0,0 +1,112 @@
+import { afterEach, beforeEach, describe, expect, it } from 'vitest';
+import * as fs from 'fs/promises';
+import * as path from 'node:path';
+import {
+  encodeFrame,
+  FrameDecoder,
+  PythonWorkerError,
+  runPythonEntrypoint,
+} from '@/tools/registry/python-runtime';
+
+describe('FrameDecoder', () => {
+  it('should decode frames split across chunks', () => {
+    const bytes = Buffer.concat([encodeFrame({ a: 1 }), encodeFrame({ b: 'é' })]);
+    const decoder = new FrameDecoder();
+
+    expect(decoder.push(bytes.subarray(0, 3))).toEqual([]);
+    expect(decoder.push(bytes.subarray(3, 12))).toEqual([{ a: 1 }]);
+    expect(decoder.push(bytes.subarray(12))).toEqual([{ b: 'é' }]);
+  });
+
+  it('should throw on a frame that is not JSON', () => {
+    const header = Buffer.alloc(4);
+    header.writeUInt32BE(3, 0);
+    expect(() => new FrameDecoder().push(Buffer.concat([header, Buffer.from('nop')]))).toThrow();
+  });
+});
+
+describe('runPythonEntrypoint', () => {
+  const testDir = 'test-python-runtime-temp';
+  let scriptPath: string;
+
+  beforeEach(async () => {
+    await fs.mkdir(testDir, { recursive: true });
+    scriptPath = path.resolve(testDir, 'entry_tool.py');
+    await fs.writeFile(
+      scriptPath,
+      `import time
+
+def lookup(policy_number, include_history=False):
+    print("debug output goes to stderr")
+    return {"policy": policy_number, "history": include_history}
+
+def flexible(**kwargs):
+    return sorted(kwargs)
+
+def fail(reason):
+    raise KeyError(reason)
+
+def slow():
+    time.sleep(5)
+
+def pickled():
+    import pickle
+    return pickle.loads(pickle.dumps(lookup))("P")
+
+if __name__ == "__main__":
+    raise SystemExit("main must not run")
+`
+    );
+  });
+
+  afterEach(async () => {
+    await fs.rm(testDir, { recursive: true, force: true });
+  });
+
+  it('should call the function with keyword arguments and decode the frame', async () => {
+    const result = await runPythonEntrypoint(scriptPath, 'lookup', {
+      policy_number: 'POL-1',
+      include_history: true,
+    });
+    expect(result).toEqual({ policy: 'POL-1', history: true });
+  });
+
+  it('should drop arguments the function does not accept', async () => {
+    const kwargs = { policy_number: 'P', extra: 1 };
+    const result = await runPythonEntrypoint(scriptPath, 'lookup', kwargs);
+    expect(result).toEqual({ policy: 'P', history: false });
+    expect(await runPythonEntrypoint(scriptPath, 'flexible', { b: 1, a: 2 })).toEqual(['a', 'b']);
+  });
+
+  it('should raise PythonWorkerError with the traceback when the function fails', async () => {
+    const error = await runPythonEntrypoint(scriptPath, 'fail', { reason: 'missing' }).catch(
+      (e: unknown) => e
+    );
+    expect(error).toBeInstanceOf(PythonWorkerError);
+    expect((error as PythonWorkerError).message).toBe("KeyError: 'missing'");
+    expect((error as PythonWorkerError).traceback).toContain('raise KeyError(reason)');
+  });
+
+  it('should register the module so its functions can be pickled', async () => {
+    expect(await runPythonEntrypoint(scriptPath, 'pickled', {})).toEqual({
+      policy: 'P',
+      history: false,
+    });
+  });
+
+  it('should report a missing function', async () => {
+    await expect(runPythonEntrypoint(scriptPath, 'nope', {})).rejects.toThrow('AttributeError');
+  });
+
+  it('should kill the process after the timeout', async () => {
+    await expect(runPythonEntrypoint(scriptPath, 'slow', {}, { timeoutMs: 200 })).rejects.toThrow(
+      'timed out after 200ms'
+    );
+  });
+
+  it('should report an interpreter that cannot be started', async () => {
+    await expect(
+      runPythonEntrypoint(scriptPath, 'lookup', {}, { pythonPath: 'no-such-python-binary' })
+    ).rejects.toThrow('failed to start');
+  });
+});
@@ -0,0 +1,239 @@
+import { afterEach, beforeEach, describe, expect, it } from 'vitest';
+import * as fs from 'fs/promises';
+import * as path from 'node:path';
+import { PythonWorkerPool } from '@/tools/registry/python-worker-pool';
+import { ToolLoader } from '@/tools/registry/loader';
+
+describe('PythonWorkerPool', () => {
+  const testDir = 'test-worker-pool-temp';
+  let pool: PythonWorkerPool;
+  let scriptPath: string;
+
+  beforeEach(async () => {
+    await fs.mkdir(testDir, { recursive: true });
+    scriptPath = path.resolve(testDir, 'worker_tool.py');
+    await fs.writeFile(
+      scriptPath,
+      `import os
+import sys
+import time
+
+def whoami():
+    return {"pid": os.getpid()}
+
+def add(a, b):
+    print("noise on stdout must not break framing")
+    return {"sum": a + b}
+
+def fail():
+    raise ValueError("bad input")
+
+def crash():
+    os._exit(3)
+
+def slow(seconds):
+    time.sleep(seconds)
+    return {"slept": seconds}
+`
+    );
+  });
+
+  afterEach(async () => {
+    await pool?.shutdown();
+    await fs.rm(testDir, { recursive: true, force: true });
+  });
+
+  it('should call a module function with keyword arguments', async () => {
+    pool = new PythonWorkerPool({ size: 1 });
+    const result = await pool.call(scriptPath, 'add', { a: 2, b: 3 });
+    expect(result).toEqual({ sum: 5 });
+  });
+
+  it('should reuse a warm worker across calls', async () => {
+    pool = new PythonWorkerPool({ size: 1 });
+    const first = (await pool.call(scriptPath, 'whoami', {})) as { pid: number };
+    const second = (await pool.call(scriptPath, 'whoami', {})) as { pid: number };
+
+    expect(second.pid).toBe(first.pid);
+    expect(pool.getStats().spawned).toBe(1);
+  });
+
+  it('should queue calls beyond the pool size', async () => {
+    pool = new PythonWorkerPool({ size: 2 });
+    const results = await Promise.all(
+      Array.from({ length: 6 }, (_, i) => pool.call(scriptPath, 'add', { a: i, b: 1 }))
+    );
+
+    expect(results).toEqual([1, 2, 3, 4, 5, 6].map((sum) => ({ sum })));
+    expect(pool.getStats().spawned).toBeLessThanOrEqual(2);
+  });
+
+  it('should surface Python exceptions as errors', async () => {
+    pool = new PythonWorkerPool({ size: 1 });
+    await expect(pool.call(scriptPath, 'fail', {})).rejects.toThrow('ValueError: bad input');
+
+    // The worker survives a tool exception
+    expect(await pool.call(scriptPath, 'add', { a: 1, b: 1 })).toEqual({ sum: 2 });
+    expect(pool.getStats().crashes).toBe(0);
+  });
+
+  it('should replace a worker that crashes', async () => {
+    pool = new PythonWorkerPool({ size: 1 });
+    await expect(pool.call(scriptPath, 'crash', {})).rejects.toThrow('exited with code 3');
+
+    expect(await pool.call(scriptPath, 'add', { a: 1, b: 2 })).toEqual({ sum: 3 });
+    expect(pool.getStats().crashes).toBe(1);
+    expect(pool.getStats().spawned).toBe(2);
+  });
+
+  it('should recycle workers after maxCallsPerWorker calls', async () => {
+    pool = new PythonWorkerPool({ size: 1, maxCallsPerWorker: 2 });
+    const pids: number[] = [];
+    for (let i = 0; i < 3; i++) {
+      pids.push(((await pool.call(scriptPath, 'whoami', {})) as { pid: number }).pid);
+    }
+
+    expect(pids[1]).toBe(pids[0]);
+    expect(pids[2]).not.toBe(pids[0]);
+    expect(pool.getStats().recycled).toBe(1);
+  });
+
+  it('should kill a worker that exceeds the call timeout', async () => {
+    pool = new PythonWorkerPool({ size: 1 });
+    await expect(pool.call(scriptPath, 'slow', { seconds: 5 }, 200)).rejects.toThrow(
+      'timed out after 200ms'
+    );
+    expect(await pool.call(scriptPath, 'add', { a: 0, b: 0 })).toEqual({ sum: 0 });
+  });
+
+  it('should keep module names unique when a changed tool is reloaded', async () => {
+    const pickler = path.resolve(testDir, 'pickler_tool.py');
+    await fs.writeFile(
+      pickler,
+      `import pickle
+
+def pickled():
+    return pickle.loads(pickle.dumps(pickled)).__module__
+`
+    );
+    pool = new PythonWorkerPool({ size: 1 });
+    const loaded = await pool.call(pickler, 'pickled', {});
+
+    // Reload the pickler, then load another tool into the same worker
+    const later = new Date(Date.now() + 10_000);
+    await fs.utimes(pickler, later, later);
+    const reloaded = await pool.call(pickler, 'pickled', {});
+    await pool.call(scriptPath, 'add', { a: 1, b: 1 });
+
+    expect(reloaded).not.toBe(loaded);
+    expect(await pool.call(pickler, 'pickled', {})).toBe(reloaded);
+  });
+
+  it('should reject calls after shutdown', async () => {
+    pool = new PythonWorkerPool({ size: 1 });
+    await pool.shutdown();
+    await expect(pool.call(scriptPath, 'add', { a: 1, b: 1 })).rejects.toThrow('shut down');
+  });
+});
+
+describe('ToolLoader resident execution', () => {
+  const testDir = 'test-resident-tools-temp';
+  let pool: PythonWorkerPool;
+
+  beforeEach(async () => {
+    await fs.mkdir(testDir, { recursive: true });
+    pool = new PythonWorkerPool({ size: 1 });
+  });
+
+  afterEach(async () => {
+    await pool.shutdown();
+    await fs.rm(testDir, { recursive: true, force: true });
+  });
+
+  it('should call the tool function in a worker when execution is resident', async () => {
+    await fs.writeFile(
+      path.join(testDir, 'greet.py'),
+      `#!/usr/bin/env python3
+"""
+name: greet
+description: Greet someone
+execution: resident
+parameters:
+  who: string
+"""
+import os
+
+def greet(who):
+    return {"greeting": "Hello " + who, "pid": os.getpid()}
+
+if __name__ == "__main__":
+    raise SystemExit("main must not run in resident mode")
+`
+    );
+
+    const loader = new ToolLoader(testDir, undefined, { workerPool: pool });
+    const tool = await loader.loadTool('greet');
+    const first = await tool.execute({ who: 'Ada' });
+    const second = await tool.execute({ who: 'Bob' });
+
+    expect(first.error).toBeUndefined();
+    expect((first.content as { greeting: string }).greeting).toBe('Hello Ada');
+    expect((second.content as { pid: number }).pid).toBe((first.content as { pid: number }).pid);
+    expect(tool.parameters.properties).toHaveProperty('who');
+  });
+
+  it('should convert success:false and exceptions to errors', async () => {
+    await fs.writeFile(
+      path.join(testDir, 'checker.py'),
+      `"""
+name: checker
+description: Check a value
+execution: resident
+parameters:
+  value: number
+"""
+
+def checker(value):
+    if value < 0:
+        raise ValueError("negative")
+    return {"success": value > 0, "error": "zero is not allowed"}
+`
+    );
+
+    const loader = new ToolLoader(testDir, undefined, { workerPool: pool });
+    const tool = await loader.loadTool('checker');
+
+    expect((await tool.execute({ value: 0 })).error).toBe('zero is not allowed');
+    expect((await tool.execute({ value: -1 })).error).toContain('ValueError: negative');
+    expect((await tool.execute({ value: 1 })).error).toBeUndefined();
+  });
+
+  it('should fall back to process execution without a worker pool', async () => {
+    await fs.writeFile(
+      path.join(testDir, 'echo.py'),
+      `"""
+name: echo
+description: Echo input
+execution: resident
+parameters:
+  message: string
+"""
+import json
+import sys
+
+def echo(message):
+    return {"echo": message, "mode": "resident"}
+
+if __name__ == "__main__":
+    data = json.load(sys.stdin)
+    print(json.dumps({"echo": data["message"], "mode": "process"}))
+`
+    );
+
+    const loader = new ToolLoader(testDir);
+    const tool = await loader.loadTool('echo');
+    const result = await tool.execute({ message: 'hi' });
+
+    expect(result.content).toEqual({ echo: 'hi', mode: 'process' });
+  });
+});
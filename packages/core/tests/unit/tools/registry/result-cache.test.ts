@@ -0,0 +1,56 @@
+import { afterEach, beforeEach, describe, expect, it, vi } from 'vitest';
+import { ToolResultCache } from '@/tools/registry/result-cache';
+
+describe('ToolResultCache', () => {
+  let cache: ToolResultCache;
+
+  beforeEach(() => {
+    cache = new ToolResultCache({ maxEntries: 2 });
+  });
+
+  afterEach(() => {
+    vi.restoreAllMocks();
+  });
+
+  it('should return stored results and count hits and misses', () => {
+    expect(cache.get('lookup', { id: 1 })).toBeUndefined();
+    cache.set('lookup', { id: 1 }, { content: 'one' }, {});
+
+    expect(cache.get('lookup', { id: 1 })).toEqual({ content: 'one' });
+    expect(cache.get('other', { id: 1 })).toBeUndefined();
+    expect(cache.getStats()).toMatchObject({ size: 1, hits: 1, misses: 2 });
+  });
+
+  it('should ignore argument key order', () => {
+    cache.set('lookup', { a: 1, b: { y: 2, x: 1 } }, { content: 'ok' }, {});
+    expect(cache.get('lookup', { b: { x: 1, y: 2 }, a: 1 })).toEqual({ content: 'ok' });
+  });
+
+  it('should not store results with an error', () => {
+    cache.set('lookup', { id: 1 }, { content: '', error: 'failed' }, {});
+    expect(cache.getStats().size).toBe(0);
+  });
+
+  it('should evict the least recently used entry', () => {
+    cache.set('lookup', { id: 1 }, { content: 'one' }, {});
+    cache.set('lookup', { id: 2 }, { content: 'two' }, {});
+    cache.get('lookup', { id: 1 });
+    cache.set('lookup', { id: 3 }, { content: 'three' }, {});
+
+    expect(cache.get('lookup', { id: 2 })).toBeUndefined();
+    expect(cache.get('lookup', { id: 1 })).toEqual({ content: 'one' });
+    expect(cache.getStats().evictions).toBe(1);
+  });
+
+  it('should expire entries after their TTL', () => {
+    const now = vi.spyOn(Date, 'now').mockReturnValue(10_000);
+    cache.set('lookup', { id: 1 }, { content: 'one' }, { ttlMs: 1000 });
+
+    now.mockReturnValue(10_999);
+    expect(cache.get('lookup', { id: 1 })).toEqual({ content: 'one' });
+
+    now.mockReturnValue(11_000);
+    expect(cache.get('lookup', { id: 1 })).toBeUndefined();
+    expect(cache.getStats()).toMatchObject({ size: 0, expirations: 1 });
+  });
+});
@@ -0,0 +1,163 @@
+import { describe, expect, it } from 'vitest';
+import * as fs from 'fs/promises';
+import * as os from 'node:os';
+import * as path from 'node:path';
+import { PYTHON_SCRIPT_SHIM } from '@/tools/registry/python-runtime';
+import { runScript, streamScript } from '@/tools/registry/script-runner';
+import { SHELL_LIMITS } from '@/tools/shell.tool';
+
+describe('runScript', () => {
+  const python = (code: string) => ['-c', code];
+
+  it('should stream input to stdin and parse JSON output', async () => {
+    const result = await runScript(
+      'python3',
+      python('import json, sys; print(json.dumps({"n": len(json.load(sys.stdin)["data"])}))'),
+      { input: JSON.stringify({ data: 'x'.repeat(4 * 1024 * 1024) }), parseJson: true }
+    );
+
+    expect(result.error).toBeUndefined();
+    expect(result.content).toEqual({ n: 4 * 1024 * 1024 });
+  });
+
+  it('should not interpret shell syntax in arguments or input', async () => {
+    const input = `'; echo injected; '$(whoami)`;
+    const result = await runScript('python3', python('import sys; print(sys.stdin.read())'), {
+      input,
+    });
+
+    expect(result.content).toBe(input);
+  });
+
+  it('should pass environment variables', async () => {
+    const result = await runScript('bash', ['-c', 'echo "$GREETING"'], {
+      env: { GREETING: 'hello world' },
+    });
+    expect(result.content).toBe('hello world');
+  });
+
+  it('should report the exit code and stderr of a failing script', async () => {
+    const result = await runScript(
+      'python3',
+      python('import sys; print("partial"); sys.stderr.write("boom"); sys.exit(3)')
+    );
+
+    expect(result.content).toBe('partial');
+    expect(result.error).toContain('Exit code: 3');
+    expect(result.error).toContain('stderr: boom');
+  });
+
+  it('should kill a script that exceeds the timeout', async () => {
+    const result = await runScript('python3', python('import time; time.sleep(5)'), {
+      timeout: 200,
+    });
+    expect(result.error).toContain('timed out after 200ms');
+  });
+
+  it('should truncate output beyond the shared shell limit', async () => {
+    const code = `print("a" * ${SHELL_LIMITS.maxOutput + 10})`;
+    const result = await runScript('python3', python(code));
+
+    expect(result.content).toBe('a'.repeat(SHELL_LIMITS.maxOutput) + SHELL_LIMITS.truncateMessage);
+  });
+
+  it('should report a missing executable', async () => {
+    const result = await runScript('no-such-interpreter', []);
+    expect(result.error).toContain('Failed to start script');
+  });
+
+  it('should record wall time and I/O bytes, plus usage from the Python shim', async () => {
+    const plain = await runScript('python3', python('print("x" * 99)'), { input: 'abc' });
+    expect(plain.metrics).toMatchObject({ stdinBytes: 3, stdoutBytes: 100 });
+    expect(plain.metrics?.wallTimeMs).toBeGreaterThanOrEqual(0);
+    expect(plain.metrics?.cpuUserMs).toBeUndefined();
+
+    const scriptPath = path.join(os.tmpdir(), `usage-${process.pid}.py`);
+    await fs.writeFile(scriptPath, 'import sys\nprint(sys.argv[1:], __name__)\nsys.exit(4)\n');
+    try {
+      const shimmed = await runScript('python3', ['-c', PYTHON_SCRIPT_SHIM, scriptPath, 'a'], {
+        reportsUsage: true,
+      });
+      expect(shimmed.content).toBe("['a'] __main__");
+      expect(shimmed.error).toContain('Exit code: 4');
+      expect(shimmed.metrics?.cpuUserMs).toBeGreaterThanOrEqual(0);
+      expect(shimmed.metrics?.maxRssKb).toBeGreaterThan(0);
+    } finally {
+      await fs.rm(scriptPath, { force: true });
+    }
+  });
+});
+
+describe('streamScript', () => {
+  const python = (code: string) => ['-c', code];
+
+  const drain = async (stream: ReturnType<typeof streamScript>) => {
+    const records: unknown[] = [];
+    let next = await stream.next();
+    while (!next.done) {
+      records.push(next.value);
+      next = await stream.next();
+    }
+    return { records, result: next.value };
+  };
+
+  it('should yield records and return the summary', async () => {
+    const code = [
+      'import json, sys',
+      'n = json.load(sys.stdin)["n"]',
+      'for i in range(n): print(json.dumps({"i": i}))',
+      'print(json.dumps({"summary": {"count": n}}))',
+    ].join('\n');
+    const { records, result } = await drain(
+      streamScript('python3', python(code), { input: JSON.stringify({ n: 3 }) })
+    );
+
+    expect(records).toEqual([{ i: 0 }, { i: 1 }, { i: 2 }]);
+    expect(result).toMatchObject({ content: { count: 3 } });
+  });
+
+  it('should yield a record before the script finishes', async () => {
+    const code = [
+      'import json, time',
+      'print(json.dumps({"first": True}), flush=True)',
+      'time.sleep(1)',
+      'print(json.dumps({"summary": "done"}))',
+    ].join('\n');
+    const stream = streamScript('python3', python(code), { timeout: 5000 });
+
+    const start = Date.now();
+    expect(await stream.next()).toEqual({ done: false, value: { first: true } });
+    expect(Date.now() - start).toBeLessThan(800);
+    expect(await stream.next()).toMatchObject({ done: true, value: { content: 'done' } });
+  });
+
+  it('should return an error record as the result error', async () => {
+    const code = 'import json; print(json.dumps({"error": "portfolio not found"}))';
+    const { result } = await drain(streamScript('python3', python(code)));
+    expect(result.error).toBe('portfolio not found');
+  });
+
+  it('should fail on invalid JSON or a missing summary', async () => {
+    const invalid = await drain(streamScript('python3', python('print("{}"); print("oops")')));
+    expect(invalid.result.error).toContain('invalid JSON on line 2');
+
+    const missing = await drain(streamScript('python3', python('print("{}")')));
+    expect(missing.records).toEqual([{}]);
+    expect(missing.result.error).toContain('without a summary record');
+  });
+
+  it('should report a non-zero exit code with stderr', async () => {
+    const code = 'import sys; sys.stderr.write("boom"); sys.exit(2)';
+    const { result } = await drain(streamScript('python3', python(code), { label: 'bulk' }));
+    expect(result.error).toBe('Script failed: bulk. Exit code: 2, stderr: boom');
+  });
+
+  it('should stop the script when the consumer returns early', async () => {
+    const code = 'import json, itertools\nfor i in itertools.count(): print(json.dumps(i))';
+    const stream = streamScript('python3', python(code), { timeout: 5000 });
+
+    expect((await stream.next()).value).toBe(0);
+    await stream.return({ content: 'stopped' });
+    expect((await stream.next()).done).toBe(true);
+  });
+});
@@ -0,0 +1,79 @@
+import { describe, expect, it } from 'vitest';
+import { ToolScheduler } from '@/tools/registry/tool-scheduler';
+
+/**
+ * A task that stays running until release() is called
+ */
+function deferred() {
+  let release!: () => void;
+  const done = new Promise<void>((resolve) => (release = resolve));
+  return { task: () => done, release };
+}
+
+const tick = () => new Promise((resolve) => setImmediate(resolve));
+
+describe('ToolScheduler', () => {
+  it('should not run more calls than the global budget', async () => {
+    const scheduler = new ToolScheduler({ maxConcurrent: 2 });
+    const calls = [deferred(), deferred(), deferred()];
+
+    const runs = calls.map((call, i) => scheduler.run(`tool_${i}`, undefined, call.task));
+    await tick();
+    expect(scheduler.getStats()).toMatchObject({ running: 2, queued: 1 });
+
+    calls[0].release();
+    await tick();
+    expect(scheduler.getStats()).toMatchObject({ running: 2, queued: 0 });
+
+    calls[1].release();
+    calls[2].release();
+    await Promise.all(runs);
+    expect(scheduler.getStats()).toMatchObject({ running: 0, started: 3 });
+  });
+
+  it('should apply per-tool limits without blocking other tools', async () => {
+    const scheduler = new ToolScheduler({ maxConcurrent: 4 });
+    const first = deferred();
+    const second = deferred();
+    const other = deferred();
+
+    const runs = [
+      scheduler.run('process_payment', 1, first.task),
+      scheduler.run('process_payment', 1, second.task),
+      scheduler.run('lookup', undefined, other.task),
+    ];
+    await tick();
+    // The second payment waits for the first; lookup is queued behind it but starts
+    expect(scheduler.getStats()).toMatchObject({ running: 2, queued: 1 });
+
+    first.release();
+    other.release();
+    await tick();
+    expect(scheduler.getStats()).toMatchObject({ running: 1, queued: 0 });
+
+    second.release();
+    await Promise.all(runs);
+  });
+
+  it('should report queue wait time and release the slot when a task fails', async () => {
+    const scheduler = new ToolScheduler({ maxConcurrent: 1 });
+    const blocker = deferred();
+
+    const running = scheduler.run('slow', undefined, blocker.task);
+    const waiting = scheduler.run('fast', undefined, async () => 'done');
+    setTimeout(blocker.release, 30);
+
+    await running;
+    const { value, queueWaitMs } = await waiting;
+    expect(value).toBe('done');
+    expect(queueWaitMs).toBeGreaterThanOrEqual(20);
+    expect(scheduler.getStats()).toMatchObject({ waited: 1 });
+
+    await expect(
+      scheduler.run('broken', undefined, async () => {
+        throw new Error('boom');
+      })
+    ).rejects.toThrow('boom');
+    expect(scheduler.getStats().running).toBe(0);
+  });
+});
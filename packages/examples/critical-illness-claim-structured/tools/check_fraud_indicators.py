@@ -2,6 +2,9 @@
 """
 name: check_fraud_indicators
 description: Check for fraud indicators in insurance claims
+execution: resident
+entrypoint: check_fraud_indicators
+batch: score_many
 parameters:
   claim_id: string
   policy_number: string
@@ -9,63 +12,213 @@ parameters:
 """
 
 import json
-import sys
-from datetime import datetime
+import operator
+import os
+from collections import Counter
+from datetime import date, datetime
 
+from get_policy_details import find_policies
 
-def check_fraud_indicators(claim_id, policy_number, amount):
+try:
+    import numpy as np
+except ImportError:  # Rules are evaluated with plain Python instead
+    np = None
+
+# Directory claims books may be read from; paths outside it are rejected
+CLAIMS_BOOK_DIR = os.environ.get(
+    "CLAIMS_BOOK_DIR",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "claims"),
+)
+
+# Score of a claim that trips no rule (0-1 scale)
+BASE_SCORE = 0.05
+
+# (flag, weight, feature, comparison, threshold); each rule is evaluated over
+# the whole feature column at once and adds its weight to the claims it flags
+RULES = [
+    ("WAITING_PERIOD_CLAIM", 0.35, "policy_age_days", operator.lt, 90),
+    ("NEW_POLICY", 0.10, "policy_age_days", operator.lt, 365),
+    ("AMOUNT_EXCEEDS_SUM_ASSURED", 0.35, "amount_ratio", operator.gt, 1.0),
+    ("HIGH_AMOUNT_RATIO", 0.15, "amount_ratio", operator.gt, 0.8),
+    ("FREQUENT_CLAIMS", 0.20, "claim_frequency", operator.ge, 3),
+    ("HIGH_AMOUNT", 0.10, "amount", operator.gt, 250000),
+]
+
+# Lowest score of each risk level, highest first
+RISK_LEVELS = [(0.6, "high"), (0.3, "medium"), (0.0, "low")]
+
+
+def policy_profiles(policy_numbers):
+    """Sum assured and policy age in days of each policy known to get_policy_details"""
+    today = date.today()
+    return {
+        number: (
+            float(policy.get("sumAssured") or 0),
+            (today - date.fromisoformat(policy["coverageStartDate"][:10])).days,
+        )
+        for number, policy in find_policies(policy_numbers).items()
+    }
+
+
+def load_claims(claims):
+    """
+    Return the claims as a list, reading them from an NDJSON file if given a path.
+
+    Paths are resolved against CLAIMS_BOOK_DIR and must stay inside it.
+    """
+    if not isinstance(claims, str):
+        return list(claims)
+    root = os.path.realpath(CLAIMS_BOOK_DIR)
+    path = os.path.realpath(os.path.join(root, claims))
+    if os.path.commonpath([root, path]) != root:
+        raise ValueError(f"Claims book must be inside {CLAIMS_BOOK_DIR}: {claims}")
+    with open(path, encoding='utf-8') as book:
+        return [json.loads(line) for line in book if line.strip()]
+
+
+def build_features(claims):
+    """
+    Build one feature column per rule input for the valid claims.
+
+    A claim may carry `sum_assured`, `policy_start_date` (ISO date) and
+    `prior_claims`; otherwise they come from the policy. Claim frequency counts
+    the claims per policy in this book plus any prior claims.
+
+    Returns:
+        (indices of the valid claims, feature columns, errors by claim index)
+    """
+    today = date.today()
+    profiles = policy_profiles(
+        {
+            claim["policy_number"]
+            for claim in claims
+            if isinstance(claim, dict) and isinstance(claim.get("policy_number"), str)
+        }
+    )
+    valid, errors = [], {}
+    amounts, sums_assured, ages, prior = [], [], [], []
+
+    for index, claim in enumerate(claims):
+        if not isinstance(claim, dict):
+            errors[index] = "Each claim must be an object"
+            continue
+        policy_number = claim.get("policy_number")
+        if not claim.get("claim_id") or not policy_number:
+            errors[index] = "Claim ID and policy number are required"
+            continue
+        if policy_number not in profiles:
+            errors[index] = f"Policy not found: {policy_number}"
+            continue
+        try:
+            sum_assured, age_days = profiles[policy_number]
+            if claim.get("policy_start_date"):
+                start = date.fromisoformat(claim["policy_start_date"][:10])
+                age_days = (today - start).days
+            amount = float(claim.get("amount") or 0)
+            cover = float(claim.get("sum_assured") or sum_assured or 0)
+            prior_claims = int(claim.get("prior_claims") or 0)
+        except (TypeError, ValueError) as error:
+            errors[index] = f"Invalid claim {claim.get('claim_id')}: {error}"
+            continue
+        # Without a positive sum assured there is no amount ratio to score
+        if not cover > 0:
+            errors[index] = f"Invalid claim {claim.get('claim_id')}: no sum assured"
+            continue
+        valid.append(index)
+        amounts.append(amount)
+        sums_assured.append(cover)
+        ages.append(age_days)
+        prior.append(prior_claims)
+
+    per_policy = Counter(claims[index]["policy_number"] for index in valid)
+    features = {
+        "amount": amounts,
+        "amount_ratio": [amount / cover for amount, cover in zip(amounts, sums_assured)],
+        "policy_age_days": ages,
+        "claim_frequency": [
+            per_policy[claims[index]["policy_number"]] + count
+            for index, count in zip(valid, prior)
+        ],
+    }
+    return valid, features, errors
+
+
+def evaluate_rules(features, count):
     """
-    Mock fraud detection service.
-    
+    Evaluate every rule over its feature column.
+
+    Returns:
+        (score per claim, flags per claim)
+    """
+    flags = [[] for _ in range(count)]
+
+    if np is not None:
+        columns = {name: np.asarray(values, dtype=float) for name, values in features.items()}
+        hits = np.array(
+            [compare(columns[feature], threshold) for _, _, feature, compare, threshold in RULES]
+        ).reshape(len(RULES), count)
+        weights = np.array([weight for _, weight, *_ in RULES])
+        scores = np.minimum(1.0, BASE_SCORE + weights @ hits).tolist()
+        for (flag, *_), rule_hits in zip(RULES, hits):
+            for index in np.flatnonzero(rule_hits).tolist():
+                flags[index].append(flag)
+        return scores, flags
+
+    scores = [BASE_SCORE] * count
+    for flag, weight, feature, compare, threshold in RULES:
+        for index, value in enumerate(features[feature]):
+            if compare(value, threshold):
+                scores[index] += weight
+                flags[index].append(flag)
+    return [min(1.0, score) for score in scores], flags
+
+
+def score_many(claims):
+    """
+    Score a book of claims for fraud risk in one pass.
+
+    Args:
+        claims: List of claim dicts (claim_id, policy_number, amount and the
+            optional fields described in build_features), or the path of an
+            NDJSON file with one claim per line
+
+    Returns:
+        One assessment per claim, in order; invalid claims get
+        {"success": False, "error": ...}
+    """
+    claims = load_claims(claims)
+    valid, features, errors = build_features(claims)
+    scores, flags = evaluate_rules(features, len(valid))
+    timestamp = datetime.now().isoformat() + 'Z'
+
+    results = [{"success": False, "error": errors.get(index)} for index in range(len(claims))]
+    for position, index in enumerate(valid):
+        score = round(scores[position], 2)
+        results[index] = {
+            "claimId": claims[index]["claim_id"],
+            "fraudRisk": next(level for floor, level in RISK_LEVELS if score >= floor),
+            "riskScore": score,
+            "flags": flags[position],
+            "requiresInvestigation": score >= RISK_LEVELS[0][0],
+            "assessmentTimestamp": timestamp,
+        }
+    return results
+
+
+def check_fraud_indicators(claim_id, policy_number, amount=0):
+    """
+    Fraud risk assessment for a single claim.
+
     Args:
         claim_id: The claim ID
         policy_number: Policy number
         amount: Claim amount
-    
+
     Returns:
         Dictionary with fraud risk assessment
     """
-    # Mock fraud check - always returns low risk for testing
-    return {
-        "claimId": claim_id,
-        "fraudRisk": "low",
-        "riskScore": 0.15,  # 0-1 scale
-        "flags": [],
-        "requiresInvestigation": False,
-        "assessmentTimestamp": datetime.now().isoformat() + 'Z'
-    }
-
-def main():
-    """Main entry point - reads JSON from stdin, outputs JSON to stdout"""
-    try:
-        # Read JSON input from stdin
-        input_data = json.load(sys.stdin)
-        
-        # Extract parameters
-        claim_id = input_data.get('claim_id', '')
-        policy_number = input_data.get('policy_number', '')
-        amount = input_data.get('amount', 0)
-        
-        if not claim_id or not policy_number:
-            raise ValueError("Claim ID and policy number are required")
-        
-        # Check fraud indicators
-        result = check_fraud_indicators(claim_id, policy_number, amount)
-        
-        # Add success flag
-        result['success'] = True
-        
-        print(json.dumps(result))
-        return 0
-        
-    except Exception as e:
-        # Return error response as JSON
-        error = {
-            'success': False,
-            'error': str(e)
-        }
-        print(json.dumps(error))
-        return 1
-
-if __name__ == "__main__":
-    sys.exit(main())
\ No newline at end of file
+    claim = {"claim_id": claim_id, "policy_number": policy_number, "amount": amount}
+    result = score_many([claim])[0]
+    if result.get("success") is False:
+        raise ValueError(result["error"])
+    return result
@@ -2,6 +2,8 @@
 """
 name: claim_id_generator
 description: Generate deterministic claim IDs for insurance claims
+entrypoint: run
+batch: allocate_many
 parameters:
   policy_number: string
   timestamp: string
@@ -9,73 +11,178 @@ parameters:
 """
 
 import hashlib
-import json
-import sys
+import mmap
+import os
+import re
+from collections import defaultdict
 from datetime import datetime
 
+try:
+    import fcntl
+except ImportError:  # No advisory locking (Windows); single-process use only
+    fcntl = None
+
+# Directory of the issued-ID indexes, one file per claim type and day
+INDEX_DIR = os.environ.get(
+    "CLAIM_ID_INDEX_DIR",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), ".claim-index"),
+)
+
+# One slot per 5-hex-digit suffix, holding the 64-bit fingerprint of the
+# request that owns it (0 = free); files are sparse, so unused pages take no
+# disk space
+SLOT_COUNT = 16 ** 5
+INDEX_BYTES = SLOT_COUNT * 8
+
+# Claim types and dates name the index files, so only these shapes are accepted
+CLAIM_TYPE = re.compile(r"[A-Z]{1,8}")
+DATE = re.compile(r"[0-9]{8}")
+
 
 def generate_claim_id(policy_number, timestamp, claim_type="CI"):
     """
     Generate a unique claim ID.
-    
+
     Args:
         policy_number: The policy number (e.g., "POL-12345")
         timestamp: ISO format timestamp string
         claim_type: Type of claim (default "CI" for Critical Illness)
-    
+
     Returns:
         String claim ID in format: CI-YYYYMMDD-XXXXX
     """
     # Extract date from timestamp
     date_str = timestamp.split('T')[0].replace('-', '')
-    
+
     # Create hash from policy number and timestamp for uniqueness
     hash_input = f"{policy_number}-{timestamp}"
     hash_obj = hashlib.sha256(hash_input.encode())
     hash_hex = hash_obj.hexdigest()
-    
+
     # Take first 5 characters of hash for ID suffix
     hash_suffix = hash_hex[:5].upper()
-    
+
     # Format: CI-YYYYMMDD-XXXXX
     claim_id = f"{claim_type}-{date_str}-{hash_suffix}"
-    
+
     return claim_id
 
-def main():
-    """Main entry point - reads JSON from stdin, outputs JSON to stdout"""
-    try:
-        # Read JSON input from stdin
-        input_data = json.load(sys.stdin)
-        
-        # Extract parameters
-        policy_number = input_data.get('policy_number', '')
-        timestamp = input_data.get('timestamp', datetime.now().isoformat())
-        claim_type = input_data.get('claim_type', 'CI')
-        
-        # Generate the claim ID
-        claim_id = generate_claim_id(policy_number, timestamp, claim_type)
-        
-        # Return success response as JSON
-        result = {
-            'success': True,
-            'claim_id': claim_id,
-            'policy_number': policy_number,
-            'timestamp': timestamp,
-            'claim_type': claim_type
-        }
-        
-        print(json.dumps(result))
-        return 0
-        
-    except Exception as e:
-        # Return error response as JSON
-        error = {
-            'success': False,
-            'error': str(e)
-        }
-        print(json.dumps(error))
-        return 1
-
-if __name__ == "__main__":
-    sys.exit(main())
\ No newline at end of file
+
+class ClaimIndex:
+    """
+    Memory-mapped table of the suffixes issued for one claim type and day.
+
+    The file is locked for as long as the index is open, so concurrent tool
+    processes allocate one after another, and flushed once when it is closed.
+    """
+
+    def __init__(self, path):
+        self.file = os.fdopen(os.open(path, os.O_RDWR | os.O_CREAT, 0o644), "r+b")
+        if fcntl:
+            fcntl.flock(self.file, fcntl.LOCK_EX)
+        if os.fstat(self.file.fileno()).st_size < INDEX_BYTES:
+            os.ftruncate(self.file.fileno(), INDEX_BYTES)
+        self.map = mmap.mmap(self.file.fileno(), INDEX_BYTES)
+        self.slots = memoryview(self.map).cast("Q")
+
+    def claim(self, suffix, fingerprint):
+        """
+        Return the suffix issued to the request with this fingerprint.
+
+        A request seen before gets its earlier suffix back. A new request gets
+        its preferred suffix, or on a collision the next free one after it.
+        """
+        for probe in range(SLOT_COUNT):
+            slot = (suffix + probe) % SLOT_COUNT
+            owner = self.slots[slot]
+            if owner == fingerprint:
+                return slot
+            if owner == 0:
+                self.slots[slot] = fingerprint
+                return slot
+        raise RuntimeError(f"All {SLOT_COUNT} claim IDs of the day have been issued")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.slots.release()
+        self.map.flush()
+        self.map.close()
+        self.file.close()  # Also releases the lock
+
+
+def allocate_many(requests):
+    """
+    Allocate collision-checked claim IDs for many requests at once.
+
+    Each ID starts from the hash suffix of generate_claim_id; a suffix already
+    issued to another request that day moves to the next free one. Requests
+    are allocated in order, so the same sequence always yields the same IDs,
+    and repeating a request returns the ID it was given before. Each day's
+    index is opened and flushed once per call.
+
+    Args:
+        requests: List of dicts with policy_number, timestamp (default: now)
+            and claim_type
+
+    Returns:
+        One result per request, as returned by run, in order
+    """
+    results = [None] * len(requests)
+    by_index = defaultdict(list)
+    for position, request in enumerate(requests):
+        if not isinstance(request, dict):
+            results[position] = {"success": False, "error": "Each request must be an object"}
+            continue
+        error = None
+        policy_number = request.get("policy_number")
+        timestamp = request.get("timestamp") or datetime.now().isoformat()
+        claim_type = request.get("claim_type") or "CI"
+        if not policy_number:
+            error = "policy_number is required"
+        elif not isinstance(policy_number, str) or not isinstance(timestamp, str):
+            error = "policy_number and timestamp must be strings"
+        elif not isinstance(claim_type, str) or not CLAIM_TYPE.fullmatch(claim_type):
+            error = f"Invalid claim_type: {claim_type!r} (1-8 capital letters)"
+        else:
+            date_str = timestamp.split('T')[0].replace('-', '')
+            if not DATE.fullmatch(date_str):
+                error = f"Invalid timestamp: {timestamp!r} (expected an ISO date)"
+        if error:
+            results[position] = {"success": False, "error": error}
+            continue
+        by_index[f"{claim_type}-{date_str}"].append((position, policy_number, timestamp))
+
+    os.makedirs(INDEX_DIR, exist_ok=True)
+    for prefix, pending in by_index.items():
+        with ClaimIndex(os.path.join(INDEX_DIR, f"{prefix}.idx64")) as index:
+            for position, policy_number, timestamp in pending:
+                # Same hash as generate_claim_id: the first 20 bits are the
+                # preferred suffix, the next 64 identify the request
+                digest = hashlib.sha256(f"{policy_number}-{timestamp}".encode()).digest()
+                preferred = int.from_bytes(digest[:3], "big") >> 4
+                fingerprint = int.from_bytes(digest[3:11], "big") or 1
+                suffix = index.claim(preferred, fingerprint)
+                results[position] = {
+                    'success': True,
+                    'claim_id': f"{prefix}-{suffix:05X}",
+                    'policy_number': policy_number,
+                    'timestamp': timestamp,
+                    'claim_type': prefix.rsplit("-", 1)[0]
+                }
+    return results
+
+
+def run(policy_number, timestamp=None, claim_type="CI"):
+    """
+    Tool entry point - allocate a claim ID and echo its inputs.
+
+    Not declared deterministic: allocating records the ID in the index, which
+    a cached result would skip.
+    """
+    request = {"policy_number": policy_number, "timestamp": timestamp, "claim_type": claim_type}
+    result = allocate_many([request])[0]
+    if result.get("success") is False:
+        raise ValueError(result["error"])
+    return result
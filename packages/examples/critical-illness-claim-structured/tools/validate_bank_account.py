@@ -2,69 +2,320 @@
 """
 name: validate_bank_account
 description: Validate bank account details for payment processing
+execution: resident
+entrypoint: validate_bank_account
+batch: validate_many
 parameters:
-  account_number: string
+  account_number: string - Domestic account number or IBAN
   account_name: string
+  bank_code?: string - UK sort code (6 digits) or US routing number (9 digits)
 """
 
+import hashlib
 import json
+import os
+import sqlite3
 import sys
+from array import array
+from bisect import bisect_right
 from datetime import datetime
 
+# Index of previously verified accounts; seeded by build_index and extended
+# with every account validate_many verifies
+INDEX_PATH = os.environ.get(
+    "VERIFIED_ACCOUNTS_PATH",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "verified_accounts.db"),
+)
 
-def validate_bank_account(account_number, account_name):
+DEFAULT_BANK = "Mock National Bank"
+
+# IBAN length by country (ISO 13616 registry)
+IBAN_LENGTHS = {
+    "AD": 24, "AE": 23, "AL": 28, "AT": 20, "AZ": 28, "BA": 20, "BE": 16, "BG": 22,
+    "BH": 22, "BR": 29, "CH": 21, "CR": 22, "CY": 28, "CZ": 24, "DE": 22, "DK": 18,
+    "DO": 28, "EE": 20, "EG": 29, "ES": 24, "FI": 18, "FO": 18, "FR": 27, "GB": 22,
+    "GE": 22, "GI": 23, "GL": 18, "GR": 27, "GT": 28, "HR": 21, "HU": 28, "IE": 22,
+    "IL": 23, "IQ": 23, "IS": 26, "IT": 27, "JO": 30, "KW": 30, "KZ": 20, "LB": 28,
+    "LC": 32, "LI": 21, "LT": 20, "LU": 20, "LV": 21, "MC": 27, "MD": 24, "ME": 22,
+    "MK": 19, "MR": 27, "MT": 31, "MU": 30, "NL": 18, "NO": 15, "PK": 24, "PL": 28,
+    "PS": 29, "PT": 25, "QA": 29, "RO": 24, "RS": 22, "SA": 24, "SC": 31, "SE": 24,
+    "SI": 19, "SK": 24, "SM": 27, "TN": 24, "TR": 26, "UA": 29, "VA": 22, "VG": 24,
+    "XK": 20,
+}
+
+# (first, last, bank) UK sort code ranges, sorted and non-overlapping
+SORT_CODE_RANGES = [
+    (10000, 19999, "NatWest"),
+    (70000, 79999, "Nationwide"),
+    (80000, 89999, "Co-operative Bank"),
+    (90000, 91999, "Santander"),
+    (110000, 119999, "Halifax"),
+    (200000, 299999, "Barclays"),
+    (300000, 309999, "Lloyds Bank"),
+    (400000, 409999, "HSBC"),
+    (500000, 609999, "NatWest"),
+    (720000, 729999, "Santander"),
+    (770000, 779999, "Lloyds Bank"),
+    (800000, 809999, "Bank of Scotland"),
+    (820000, 829999, "Clydesdale Bank"),
+    (830000, 839999, "Royal Bank of Scotland"),
+]
+
+# Sort code ranges as parallel arrays, searched with bisect
+_RANGE_FIRST = array("I", (first for first, _, _ in SORT_CODE_RANGES))
+_RANGE_LAST = array("I", (last for _, last, _ in SORT_CODE_RANGES))
+_RANGE_BANK = [bank for _, _, bank in SORT_CODE_RANGES]
+
+# Letters of an IBAN as the numbers mod-97 works on (A=10 ... Z=35)
+_IBAN_DIGITS = str.maketrans({chr(code): str(code - 55) for code in range(65, 91)})
+
+# Weights of the ABA routing number checksum
+ABA_WEIGHTS = (3, 7, 1, 3, 7, 1, 3, 7, 1)
+
+
+def is_digits(text):
+    """Whether text is ASCII digits only; str.isdigit also accepts e.g. '²'"""
+    return text.isascii() and text.isdigit()
+
+
+def sort_code_bank(sort_code):
+    """Bank of a 6-digit sort code, or None if it is in no known range"""
+    value = int(sort_code)
+    position = bisect_right(_RANGE_FIRST, value) - 1
+    if position >= 0 and value <= _RANGE_LAST[position]:
+        return _RANGE_BANK[position]
+    return None
+
+
+def check_iban(iban):
+    """Return (bank, reason); reason is None if the IBAN is valid"""
+    country = iban[:2]
+    if country not in IBAN_LENGTHS:
+        return None, f"Unknown IBAN country: {country}"
+    if len(iban) != IBAN_LENGTHS[country]:
+        return None, f"{country} IBANs have {IBAN_LENGTHS[country]} characters"
+    if not is_digits(iban[2:4]) or not (iban[4:].isascii() and iban[4:].isalnum()):
+        return None, "Malformed IBAN"
+    if int((iban[4:] + iban[:4]).translate(_IBAN_DIGITS)) % 97 != 1:
+        return None, "IBAN check digits do not match"
+    if country == "GB" and is_digits(iban[8:14]):
+        return sort_code_bank(iban[8:14]) or DEFAULT_BANK, None
+    return DEFAULT_BANK, None
+
+
+def check_domestic(account_number, bank_code):
+    """Return (bank, reason) for a domestic account, with an optional bank code"""
+    if not is_digits(account_number):
+        return None, "Account number must be digits or an IBAN"
+    if not bank_code:
+        if not 8 <= len(account_number) <= 17:
+            return None, "Account number must have 8 to 17 digits"
+        return DEFAULT_BANK, None
+    if not is_digits(bank_code):
+        return None, "Bank code must be digits"
+
+    if len(bank_code) == 6:  # UK sort code
+        if len(account_number) != 8:
+            return None, "UK account numbers have 8 digits"
+        bank = sort_code_bank(bank_code)
+        if bank is None:
+            return None, f"Unknown sort code: {bank_code[:2]}-{bank_code[2:4]}-{bank_code[4:]}"
+        return bank, None
+    if len(bank_code) == 9:  # US ABA routing number
+        if not 4 <= len(account_number) <= 17:
+            return None, "US account numbers have 4 to 17 digits"
+        if sum(int(digit) * weight for digit, weight in zip(bank_code, ABA_WEIGHTS)) % 10:
+            return None, "Routing number check digit does not match"
+        return DEFAULT_BANK, None
+    return None, "Bank code must be a 6-digit sort code or a 9-digit routing number"
+
+
+def normalize(account_number, bank_code):
+    """Account number and bank code without spaces or dashes, IBANs uppercased"""
+    account = str(account_number or "").replace(" ", "").replace("-", "").upper()
+    code = str(bank_code or "").replace(" ", "").replace("-", "")
+    return account, code
+
+
+def account_key(account, code, account_name):
+    """Key of an account in the verified index; holds no account details in clear"""
+    text = f"{account}|{code}|{account_name.strip().casefold()}"
+    return hashlib.sha256(text.encode()).hexdigest()
+
+
+def check_account(account, code, account_name):
+    """Validate one normalized account and build its verdict"""
+    if account[:2].isalpha():
+        bank, reason = check_iban(account)
+    else:
+        bank, reason = check_domestic(account, code)
+    verdict = {
+        "valid": reason is None,
+        "accountStatus": "active" if reason is None else "invalid",
+        "accountName": account_name,
+        "bankName": bank or DEFAULT_BANK,
+        "accountType": "Checking",
+        "verificationTimestamp": datetime.now().isoformat() + 'Z'
+    }
+    if reason:
+        verdict["reason"] = reason
+    return verdict
+
+
+def create_index_table(connection):
+    """Create the table of verified accounts, keyed by account_key"""
+    connection.execute(
+        "CREATE TABLE IF NOT EXISTS verified (account_key TEXT PRIMARY KEY, verdict TEXT NOT NULL)"
+    )
+
+
+def open_index():
+    """Return a connection to the verified-account index, or None if there is none yet"""
+    if not os.path.exists(INDEX_PATH):
+        return None
+    return sqlite3.connect(INDEX_PATH, timeout=30)
+
+
+def record_verified(rows):
+    """Add verdicts of newly verified accounts to the index, creating it if needed"""
+    connection = sqlite3.connect(INDEX_PATH, timeout=30)
+    try:
+        with connection:
+            create_index_table(connection)
+            connection.executemany("INSERT OR IGNORE INTO verified VALUES (?, ?)", rows.items())
+    finally:
+        connection.close()
+
+
+def validate_many(calls):
+    """
+    Validate many bank accounts in one call.
+
+    Accounts found in the verified-account index return their earlier
+    verdict (with previouslyVerified set) instead of being checked again.
+    Accounts found valid here are added to the index.
+
+    Args:
+        calls: List of dicts with account_number, account_name and optional
+            bank_code
+
+    Returns:
+        One verdict per call, in order; calls missing the account number or
+        name get {"success": False, "error": ...}
+    """
+    results = [None] * len(calls)
+    pending = {}
+    for position, call in enumerate(calls):
+        if not isinstance(call, dict):
+            results[position] = {"success": False, "error": "Each call must be an object"}
+            continue
+        account, code = normalize(call.get("account_number"), call.get("bank_code"))
+        account_name = call.get("account_name") or ""
+        if not account or not account_name:
+            error = "Both account number and account name are required"
+            results[position] = {"success": False, "error": error}
+            continue
+        if not isinstance(account_name, str):
+            results[position] = {"success": False, "error": "Account name must be a string"}
+            continue
+        pending[position] = (account, code, account_name)
+
+    index = open_index()
+    if index is not None:
+        keys = {position: account_key(*details) for position, details in pending.items()}
+        known = {}
+        unique = list(set(keys.values()))
+        with index:
+            for start in range(0, len(unique), 500):
+                chunk = unique[start:start + 500]
+                rows = index.execute(
+                    "SELECT account_key, verdict FROM verified WHERE account_key IN (%s)"
+                    % ",".join("?" * len(chunk)),
+                    chunk,
+                )
+                known.update((key, text) for key, text in rows)
+        index.close()
+        for position, key in keys.items():
+            if key in known:
+                results[position] = dict(json.loads(known[key]), previouslyVerified=True)
+                del pending[position]
+
+    verified = {}
+    for position, details in pending.items():
+        results[position] = check_account(*details)
+        if results[position]["valid"]:
+            verified[account_key(*details)] = json.dumps(results[position])
+    if verified:
+        record_verified(verified)
+    return results
+
+
+def validate_bank_account(account_number, account_name, bank_code=""):
     """
-    Mock bank account validation.
-    
+    Validate the structure of a bank account.
+
+    IBANs are checked against their country's length and mod-97 check
+    digits; domestic accounts against the UK sort code table or the US
+    routing number checksum when a bank code is given.
+
     Args:
-        account_number: Bank account number
+        account_number: Bank account number or IBAN
         account_name: Account holder name
-    
+        bank_code: UK sort code or US routing number
+
     Returns:
         Dictionary with validation result
     """
-    # Simple mock validation - accepts all valid-looking account numbers
-    is_valid = len(account_number) >= 8 and len(account_name) > 0
-    
-    return {
-        "valid": is_valid,
-        "accountStatus": "active" if is_valid else "invalid",
-        "accountName": account_name,
-        "bankName": "Mock National Bank",
-        "accountType": "Checking",
-        "verificationTimestamp": datetime.now().isoformat() + 'Z'
-    }
+    call = {"account_number": account_number, "account_name": account_name, "bank_code": bank_code}
+    result = validate_many([call])[0]
+    if result.get("success") is False:
+        raise ValueError(result["error"])
+    return result
+
+
+def build_index(source, index_path=None):
+    """
+    Build the verified-account index from an NDJSON export of accounts.
+
+    Every account is validated and the valid ones are recorded, so later
+    validations of those accounts are answered from the index. The index is
+    written beside its final path and moved into place when complete.
+
+    Args:
+        source: NDJSON file with account_number, account_name and optional
+            bank_code per line
+        index_path: Where to write the index (default: INDEX_PATH)
+
+    Returns:
+        (accounts read, accounts indexed)
+    """
+    index_path = index_path or INDEX_PATH
+    with open(source, encoding="utf-8") as export:
+        calls = [json.loads(line) for line in export if line.strip()]
+
+    rows = {}
+    for call in calls:
+        account, code = normalize(call.get("account_number"), call.get("bank_code"))
+        account_name = call.get("account_name") or ""
+        if account and account_name:
+            verdict = check_account(account, code, account_name)
+            if verdict["valid"]:
+                rows[account_key(account, code, account_name)] = json.dumps(verdict)
+
+    building = index_path + ".building"
+    if os.path.exists(building):
+        os.remove(building)
+    connection = sqlite3.connect(building)
+    with connection:
+        create_index_table(connection)
+        connection.executemany("INSERT INTO verified VALUES (?, ?)", rows.items())
+    connection.close()
+    os.replace(building, index_path)
+    return len(calls), len(rows)
 
-def main():
-    """Main entry point - reads JSON from stdin, outputs JSON to stdout"""
-    try:
-        # Read JSON input from stdin
-        input_data = json.load(sys.stdin)
-        
-        # Extract parameters
-        account_number = input_data.get('account_number', '')
-        account_name = input_data.get('account_name', '')
-        
-        if not account_number or not account_name:
-            raise ValueError("Both account number and account name are required")
-        
-        # Validate bank account
-        result = validate_bank_account(account_number, account_name)
-        
-        # Add success flag
-        result['success'] = True
-        
-        print(json.dumps(result))
-        return 0
-        
-    except Exception as e:
-        # Return error response as JSON
-        error = {
-            'success': False,
-            'error': str(e)
-        }
-        print(json.dumps(error))
-        return 1
 
 if __name__ == "__main__":
-    sys.exit(main())
\ No newline at end of file
+    if len(sys.argv) not in (3, 4) or sys.argv[1] != "build_index":
+        sys.exit("usage: validate_bank_account.py build_index <accounts.ndjson> [index.db]")
+    read, indexed = build_index(*sys.argv[2:])
+    print(f"Indexed {indexed} of {read} accounts")
@@ -2,30 +2,96 @@
 """
 name: get_policy_details
 description: Retrieve insurance policy details from database
+execution: resident
+entrypoint: get_policy_details
+batch: get_many
+cache: ttl=300
 parameters:
   policy_number: string
 """
 
+import csv
 import json
+import os
+import sqlite3
 import sys
+from collections import OrderedDict
 from datetime import datetime, timedelta
+from pathlib import Path
 
+# Indexed policy store written by build_index; policies are synthesized without it
+STORE_PATH = os.environ.get(
+    "POLICY_STORE_PATH", os.path.join(os.path.dirname(os.path.abspath(__file__)), "policies.db")
+)
 
-def get_policy_details(policy_number):
+# Decoded policy records kept in memory by each worker process
+CACHE_SIZE = 100000
+
+# Fields converted from text when building the store from a CSV export
+NUMERIC_FIELDS = {
+    "sumAssured": float,
+    "premiumAmount": float,
+    "waitingPeriod": int,
+    "remainingCoverage": float,
+}
+
+# Policy numbers per query, below SQLite's limit on bound parameters
+LOOKUP_CHUNK = 500
+
+
+class PolicyCache:
+    """Least recently used policy records, cleared when the store is rebuilt"""
+
+    def __init__(self, size):
+        self.size = size
+        self.records = OrderedDict()
+
+    def get(self, policy_number):
+        record = self.records.get(policy_number)
+        if record is not None:
+            self.records.move_to_end(policy_number)
+        return record
+
+    def put(self, policy_number, record):
+        self.records[policy_number] = record
+        self.records.move_to_end(policy_number)
+        if len(self.records) > self.size:
+            self.records.popitem(last=False)
+
+
+_cache = PolicyCache(CACHE_SIZE)
+_store = None  # (connection, (inode, mtime)) of the open store
+
+
+def open_store():
     """
-    Mock policy database lookup.
-    
-    Args:
-        policy_number: The policy number to look up
-    
-    Returns:
-        Dictionary with policy details
+    Return a read-only connection to the policy store, or None without one.
+
+    A store replaced by build_index is reopened on the next lookup, and the
+    cached records of the old one are dropped.
     """
-    # Generate consistent mock data based on policy number
+    global _store
+    try:
+        stat = os.stat(STORE_PATH)
+    except FileNotFoundError:
+        return None
+
+    signature = (stat.st_ino, stat.st_mtime_ns)
+    if _store is None or _store[1] != signature:
+        if _store is not None:
+            _store[0].close()
+        uri = Path(STORE_PATH).resolve().as_uri() + "?mode=ro"
+        _store = (sqlite3.connect(uri, uri=True), signature)
+        _cache.records.clear()
+    return _store[0]
+
+
+def synthesize_policy(policy_number):
+    """Generate consistent mock policy data from the policy number"""
     policy_seed = int(policy_number.split('-')[1]) if '-' in policy_number else 12345
-    
+
     base_coverage = 100000 + (policy_seed * 1000)
-    
+
     # Special case for testing waiting period rejection
     if policy_number == "POL-99999":
         # Michael Brown's policy - started only 30 days ago
@@ -33,7 +99,7 @@ def get_policy_details(policy_number):
     else:
         # Default calculation for other policies
         start_date = datetime.now() - timedelta(days=365 + (policy_seed % 365))
-    
+
     return {
         "policyNumber": policy_number,
         "type": "Critical Illness Premium",
@@ -66,35 +132,165 @@ def get_policy_details(policy_number):
         ]
     }
 
-def main():
-    """Main entry point - reads JSON from stdin, outputs JSON to stdout"""
+
+def find_policies(policy_numbers):
+    """
+    Look up several policies, querying the store only for uncached ones.
+
+    Returns:
+        Dictionary of policy number to record; numbers not in the store are
+        left out. Records are shared with the cache and must not be modified.
+    """
+    store = open_store()
+    if store is None:
+        found = {}
+        for number in policy_numbers:
+            try:
+                found[number] = synthesize_policy(number)
+            except ValueError:
+                pass  # Not a synthesizable policy number
+        return found
+
+    found, missing = {}, []
+    for number in dict.fromkeys(policy_numbers):
+        record = _cache.get(number)
+        if record is None:
+            missing.append(number)
+        else:
+            found[number] = record
+
+    for start in range(0, len(missing), LOOKUP_CHUNK):
+        chunk = missing[start:start + LOOKUP_CHUNK]
+        rows = store.execute(
+            "SELECT policy_number, record FROM policies WHERE policy_number IN (%s)"
+            % ",".join("?" * len(chunk)),
+            chunk,
+        )
+        for number, text in rows:
+            found[number] = json.loads(text)
+            _cache.put(number, found[number])
+    return found
+
+
+def find_policy(policy_number):
+    """
+    Look up one policy.
+
+    Raises:
+        ValueError: If the store has no policy with this number
+    """
+    record = find_policies([policy_number]).get(policy_number)
+    if record is None:
+        raise ValueError(f"Policy not found: {policy_number}")
+    return record
+
+
+def get_policy_details(policy_number):
+    """
+    Policy database lookup.
+
+    Args:
+        policy_number: The policy number to look up
+
+    Returns:
+        Dictionary with policy details
+    """
+    if not policy_number:
+        raise ValueError("Policy number is required")
+    return find_policy(policy_number)
+
+
+def get_many(calls):
+    """Look up the policies of many calls with one query per chunk of uncached numbers"""
+    numbers = [call.get("policy_number") for call in calls]
+    found = find_policies([number for number in numbers if number])
+
+    results = []
+    for number in numbers:
+        if not number:
+            results.append({"success": False, "error": "Policy number is required"})
+        elif number not in found:
+            results.append({"success": False, "error": f"Policy not found: {number}"})
+        else:
+            results.append(found[number])
+    return results
+
+
+def read_export(source):
+    """Yield the policy records of a JSON array, NDJSON or CSV export"""
+    extension = os.path.splitext(source)[1].lower()
+    with open(source, encoding="utf-8", newline="") as export:
+        if extension == ".json":
+            yield from json.load(export)
+        elif extension == ".csv":
+            for row in csv.DictReader(export):
+                for field, value in row.items():
+                    if field in NUMERIC_FIELDS and value != "":
+                        row[field] = NUMERIC_FIELDS[field](value)
+                    elif isinstance(value, str) and value[:1] in ("[", "{"):
+                        row[field] = json.loads(value)
+                yield row
+        else:
+            for line in export:
+                if line.strip():
+                    yield json.loads(line)
+
+
+def build_index(source, store_path=None):
+    """
+    Build the policy store from a policy export.
+
+    The store is written beside its final path and moved into place when
+    complete, so running workers keep reading the previous store until then.
+
+    Args:
+        source: Path of a .json (array), .csv or NDJSON export whose records
+            have a policyNumber
+        store_path: Where to write the store (default: STORE_PATH)
+
+    Returns:
+        Number of policies indexed
+    """
+    store_path = store_path or STORE_PATH
+    building = store_path + ".building"
+    if os.path.exists(building):
+        os.remove(building)
+
+    def rows():
+        for record in read_export(source):
+            number = record.get("policyNumber")
+            if not number:
+                raise ValueError(f"Policy record without policyNumber: {record}")
+            yield number, json.dumps(record, separators=(",", ":"))
+
+    connection = sqlite3.connect(building)
     try:
-        # Read JSON input from stdin
-        input_data = json.load(sys.stdin)
-        
-        # Extract parameters
-        policy_number = input_data.get('policy_number', '')
-        
-        if not policy_number:
-            raise ValueError("Policy number is required")
-        
-        # Get policy details
-        result = get_policy_details(policy_number)
-        
-        # Add success flag
-        result['success'] = True
-        
-        print(json.dumps(result))
-        return 0
-        
-    except Exception as e:
-        # Return error response as JSON
-        error = {
-            'success': False,
-            'error': str(e)
-        }
-        print(json.dumps(error))
-        return 1
+        connection.execute("PRAGMA journal_mode = OFF")
+        connection.execute("PRAGMA synchronous = OFF")
+        connection.execute("PRAGMA cache_size = -262144")  # 256 MB for sorting the index
+        connection.execute(
+            "CREATE TABLE policies (policy_number TEXT NOT NULL, record TEXT NOT NULL)"
+        )
+        # Append in export order, then build the index in one sorted pass
+        with connection:
+            connection.executemany("INSERT INTO policies VALUES (?, ?)", rows())
+            connection.execute("CREATE UNIQUE INDEX policies_by_number ON policies (policy_number)")
+        count = connection.execute("SELECT COUNT(*) FROM policies").fetchone()[0]
+    except sqlite3.IntegrityError:
+        connection.close()
+        os.remove(building)
+        raise ValueError(f"Duplicate policy numbers in {source}") from None
+    except BaseException:
+        connection.close()
+        os.remove(building)
+        raise
+    connection.close()
+    os.replace(building, store_path)
+    return count
+
 
 if __name__ == "__main__":
-    sys.exit(main())
\ No newline at end of file
+    if len(sys.argv) not in (3, 4) or sys.argv[1] != "build_index":
+        sys.exit("usage: get_policy_details.py build_index <export.json|.ndjson|.csv> [store.db]")
+    indexed = build_index(*sys.argv[2:])
+    print(f"Indexed {indexed} policies into {sys.argv[3] if len(sys.argv) == 4 else STORE_PATH}")
@@ -2,6 +2,10 @@
 """
 name: process_payment
 description: Process payment for approved insurance claims
+execution: resident
+entrypoint: run
+batch: settle_many
+max_concurrency: 1
 parameters:
   claim_id: string
   amount: number
@@ -11,9 +15,23 @@ parameters:
 """
 
 import json
-import sys
+import math
+import os
+import sqlite3
 from datetime import datetime, timedelta
 
+TOOLS_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Append-only ledger of completed payments, keyed by idempotency key
+LEDGER_PATH = os.environ.get("PAYMENT_LEDGER_PATH", os.path.join(TOOLS_DIR, "payments.db"))
+
+# Directory of the settlement files written by settle_many
+SETTLEMENT_DIR = os.environ.get(
+    "PAYMENT_SETTLEMENT_DIR", os.path.join(TOOLS_DIR, "settlements")
+)
+
+_ledger = None  # Connection kept open by resident workers
+
 
 def process_payment(claim_id, amount, bank_details):
     """
@@ -65,44 +83,196 @@ def process_payment(claim_id, amount, bank_details):
         }
     }
 
-def main():
-    """Main entry point - reads JSON from stdin, outputs JSON to stdout"""
+
+def open_ledger():
+    """Return the connection to the payment ledger, creating the ledger if needed"""
+    global _ledger
+    if _ledger is None:
+        connection = sqlite3.connect(LEDGER_PATH, timeout=30, isolation_level=None)
+        connection.execute("PRAGMA journal_mode = WAL")
+        connection.execute("PRAGMA synchronous = FULL")  # Every commit is fsync'd
+        connection.execute(
+            "CREATE TABLE IF NOT EXISTS payments ("
+            " idempotency_key TEXT PRIMARY KEY,"
+            " claim_id TEXT NOT NULL,"
+            " settlement_id TEXT,"
+            " recorded_at TEXT NOT NULL,"
+            " record TEXT NOT NULL)"
+        )
+        _ledger = connection
+    return _ledger
+
+
+def idempotency_key(claim_id, amount, account_number):
+    """Key under which a payment is recorded; repeats of a payment share it"""
+    return f"{claim_id}|{float(amount):.2f}|{account_number}"
+
+
+def parse_amount(amount):
+    """
+    Payment amount of a call as a float.
+
+    Raises:
+        ValueError: If the amount is not a positive, finite number
+    """
     try:
-        # Read JSON input from stdin
-        input_data = json.load(sys.stdin)
-        
-        # Extract parameters
-        claim_id = input_data.get('claim_id', '')
-        amount = input_data.get('amount', 0)
-        
-        # Build bank details from individual parameters
-        bank_details = {
-            'accountName': input_data.get('account_name', ''),
-            'accountNumber': input_data.get('account_number', ''),
-            'bankName': input_data.get('bank_name', '')
-        }
-        
-        # Check for trigger failure flag
-        if input_data.get('trigger_failure'):
-            bank_details['triggerFailure'] = True
-        
-        # Process the payment
-        result = process_payment(claim_id, amount, bank_details)
-        
-        # Add success flag for consistency
-        result['success'] = result['status'] == 'success'
-        
-        print(json.dumps(result))
-        return 0
-        
-    except Exception as e:
-        # Return error response as JSON
-        error = {
-            'success': False,
-            'error': str(e)
-        }
-        print(json.dumps(error))
-        return 1
+        value = float(amount)
+    except (TypeError, ValueError):
+        raise ValueError(f"Invalid amount: {amount!r}") from None
+    if isinstance(amount, bool) or not math.isfinite(value) or value <= 0:
+        raise ValueError(f"Invalid amount: {amount!r}")
+    return value
+
+
+def bank_details_of(call):
+    """Bank details of a call with the flat tool parameters"""
+    bank_details = {
+        'accountName': call.get('account_name', ''),
+        'accountNumber': call.get('account_number', ''),
+        'bankName': call.get('bank_name', '')
+    }
+    if call.get('trigger_failure'):
+        bank_details['triggerFailure'] = True
+    return bank_details
+
+
+def write_settlement(settlement_id, records):
+    """Write a settlement file with one payment per line and fsync it into place"""
+    os.makedirs(SETTLEMENT_DIR, exist_ok=True)
+    path = os.path.join(SETTLEMENT_DIR, f"{settlement_id}.jsonl")
+    with open(path + ".tmp", "w", encoding="utf-8") as settlement:
+        for record in records:
+            settlement.write(json.dumps(record, separators=(",", ":")) + "\n")
+        settlement.flush()
+        os.fsync(settlement.fileno())
+    os.replace(path + ".tmp", path)
+    directory = os.open(SETTLEMENT_DIR, os.O_RDONLY)
+    try:
+        os.fsync(directory)
+    finally:
+        os.close(directory)
+    return path
+
 
-if __name__ == "__main__":
-    sys.exit(main())
\ No newline at end of file
+def settle(calls, settlement=True):
+    """
+    Pay many claims in one ledger transaction.
+
+    A call whose claim, amount and account were paid before returns the
+    original payment instead of paying again; failed payments are not
+    recorded, so they can be retried. The new payments are committed
+    together, and with settlement also written to one settlement file before
+    the commit.
+
+    Args:
+        calls: List of dicts with the tool parameters of run
+        settlement: Whether to write a settlement file for the new payments
+
+    Returns:
+        One result per call, in order; invalid calls and failed payments
+        have success False and an error
+    """
+    results = [None] * len(calls)
+    keys = {}
+    for position, call in enumerate(calls):
+        if not isinstance(call, dict):
+            results[position] = {'success': False, 'error': 'Each call must be an object'}
+            continue
+        if not call.get('claim_id') or call.get('amount') is None:
+            results[position] = {'success': False, 'error': 'claim_id and amount are required'}
+            continue
+        if not isinstance(call.get('account_number', ''), str):
+            results[position] = {'success': False, 'error': 'account_number must be a string'}
+            continue
+        try:
+            amount = parse_amount(call['amount'])
+        except ValueError as error:
+            results[position] = {'success': False, 'error': str(error)}
+            continue
+        key = idempotency_key(call['claim_id'], amount, call.get('account_number', ''))
+        keys.setdefault(key, []).append(position)
+    if not keys:
+        return results
+
+    ledger = open_ledger()
+    ledger.execute("BEGIN IMMEDIATE")  # Blocks other writers until the commit
+    try:
+        recorded = {}
+        key_list = list(keys)
+        for start in range(0, len(key_list), 500):
+            chunk = key_list[start:start + 500]
+            rows = ledger.execute(
+                "SELECT idempotency_key, record FROM payments WHERE idempotency_key IN (%s)"
+                % ",".join("?" * len(chunk)),
+                chunk,
+            )
+            recorded.update((key, json.loads(record)) for key, record in rows)
+
+        now = datetime.now().isoformat() + 'Z'
+        settlement_id = f"SET-{datetime.now().strftime('%Y%m%d%H%M%S%f')}" if settlement else None
+        new_rows, new_records = [], []
+        for key, positions in keys.items():
+            if key not in recorded:
+                call = calls[positions[0]]
+                result = process_payment(call['claim_id'], call['amount'], bank_details_of(call))
+                result['success'] = result['status'] == 'success'
+                if not result['success']:
+                    result['error'] = result['errorMessage']
+                    for position in positions:
+                        results[position] = result
+                    continue
+                if settlement_id:
+                    result['settlementId'] = settlement_id
+                recorded[key] = result
+                new_records.append(result)
+                new_rows.append((
+                    key, call['claim_id'], settlement_id, now,
+                    json.dumps(result, separators=(",", ":")),
+                ))
+            for position in positions:
+                results[position] = recorded[key]
+
+        ledger.executemany("INSERT INTO payments VALUES (?, ?, ?, ?, ?)", new_rows)
+        path = write_settlement(settlement_id, new_records) if settlement_id and new_rows else None
+        try:
+            ledger.execute("COMMIT")
+        except BaseException:
+            if path:
+                os.remove(path)
+            raise
+    except BaseException:
+        if ledger.in_transaction:
+            ledger.execute("ROLLBACK")
+        raise
+    return results
+
+
+def settle_many(calls):
+    """Settle many approved payments at once, writing one settlement file"""
+    return settle(calls, settlement=True)
+
+
+def run(claim_id, amount, account_name="", account_number="", bank_name="",
+        trigger_failure=False):
+    """
+    Tool entry point - pay a claim once.
+
+    A repeated call for the same claim, amount and account returns the
+    payment reference of the first one.
+
+    Raises:
+        ValueError: If the call is invalid or the payment failed
+    """
+    call = {
+        'claim_id': claim_id,
+        'amount': amount,
+        'account_name': account_name,
+        'account_number': account_number,
+        'bank_name': bank_name,
+        'trigger_failure': trigger_failure
+    }
+    result = settle([call], settlement=False)[0]
+    if not result['success']:
+        # Invalid calls and failed payments both reach the agent as tool errors
+        raise ValueError(result['error'])
+    return result
@@ -2,6 +2,9 @@
 """
 name: send_notification
 description: Send notifications to claimants via email or phone
+execution: resident
+entrypoint: run
+batch: enqueue_many
 parameters:
   recipient_email: string
   recipient_phone: string
@@ -9,67 +12,287 @@ parameters:
   content: string
 """
 
+import asyncio
+import importlib
 import json
+import os
+import sqlite3
 import sys
+import time
+import uuid
+from collections import defaultdict
 from datetime import datetime
 
+TOOLS_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Durable queue of notifications waiting for the delivery worker
+OUTBOX_PATH = os.environ.get(
+    "NOTIFICATION_OUTBOX_PATH", os.path.join(TOOLS_DIR, "notifications.db")
+)
+
+# Transport used by the delivery worker, as "module:Class" (default: MailboxTransport)
+TRANSPORT = os.environ.get("NOTIFICATION_TRANSPORT", "")
+
+# Directory the MailboxTransport delivers into, one file per recipient
+MAILBOX_DIR = os.environ.get("NOTIFICATION_MAILBOX_DIR", os.path.join(TOOLS_DIR, "mailbox"))
+
+BATCH_SIZE = 500  # Notifications claimed from the outbox at a time
+MAX_SENDS = 16  # Recipients sent to concurrently
+LEASE_SECONDS = 60  # A claimed notification is retried after this if its worker dies
+MAX_ATTEMPTS = 5  # Sends before a notification is marked failed
+BACKOFF_SECONDS = 2  # Delay before the first retry, doubled after each failure
+
+_outbox = None  # Connection kept open by resident workers
+
+
+def open_outbox():
+    """Return the connection to the outbox, creating the outbox if needed"""
+    global _outbox
+    if _outbox is None:
+        connection = sqlite3.connect(OUTBOX_PATH, timeout=30, isolation_level=None)
+        connection.execute("PRAGMA journal_mode = WAL")
+        connection.execute("PRAGMA synchronous = FULL")
+        connection.execute(
+            "CREATE TABLE IF NOT EXISTS notifications ("
+            " id INTEGER PRIMARY KEY,"
+            " notification_id TEXT NOT NULL UNIQUE,"
+            " recipient TEXT NOT NULL,"
+            " message_type TEXT NOT NULL,"
+            " content TEXT NOT NULL,"
+            " status TEXT NOT NULL DEFAULT 'queued',"
+            " attempts INTEGER NOT NULL DEFAULT 0,"
+            " available_at REAL NOT NULL,"
+            " queued_at TEXT NOT NULL,"
+            " delivered_at TEXT,"
+            " last_error TEXT)"
+        )
+        connection.execute(
+            "CREATE INDEX IF NOT EXISTS pending ON notifications (available_at)"
+            " WHERE status = 'queued'"
+        )
+        _outbox = connection
+    return _outbox
+
 
 def send_notification(recipient, message_type, content):
     """
-    Mock notification service.
-    
+    Queue a notification for delivery.
+
     Args:
         recipient: Dictionary with contact details
         message_type: Type of notification
         content: Message content
-    
+
     Returns:
-        Dictionary with delivery status
+        Dictionary with the notification ID and its queued status
     """
-    notification_id = f"NOTIF-{datetime.now().strftime('%Y%m%d%H%M%S')}"
-    
-    return {
-        "notificationId": notification_id,
-        "recipient": recipient.get("email", recipient.get("phone")),
-        "messageType": message_type,
-        "deliveryStatus": "delivered",
-        "sentAt": datetime.now().isoformat() + 'Z',
-        "readReceipt": False
-    }
+    return enqueue_many([
+        {
+            'recipient_email': recipient.get('email'),
+            'recipient_phone': recipient.get('phone'),
+            'message_type': message_type,
+            'content': content
+        }
+    ])[0]
+
+
+def enqueue_many(calls):
+    """
+    Queue many notifications in one transaction.
+
+    Returns:
+        One result per call, in order; calls that are not objects or lack a
+        string recipient get {"success": False, "error": ...}
+    """
+    results, rows = [], []
+    queued_at = datetime.now().isoformat() + 'Z'
+    for call in calls:
+        if not isinstance(call, dict):
+            results.append({'success': False, 'error': 'Each call must be an object'})
+            continue
+        recipient = call.get('recipient_email') or call.get('recipient_phone')
+        if not recipient:
+            error = 'recipient_email or recipient_phone is required'
+            results.append({'success': False, 'error': error})
+            continue
+        message_type = call.get('message_type') or 'general'
+        content = call.get('content') or ''
+        if not all(isinstance(value, str) for value in (recipient, message_type, content)):
+            error = 'recipient, message_type and content must be strings'
+            results.append({'success': False, 'error': error})
+            continue
+        # The random suffix keeps IDs unique within the same second
+        suffix = uuid.uuid4().hex[:8].upper()
+        notification_id = f"NOTIF-{datetime.now().strftime('%Y%m%d%H%M%S')}-{suffix}"
+        rows.append((notification_id, recipient, message_type, content, time.time(), queued_at))
+        results.append({
+            "notificationId": notification_id,
+            "recipient": recipient,
+            "messageType": message_type,
+            "deliveryStatus": "queued",
+            "queuedAt": queued_at,
+            "readReceipt": False
+        })
+
+    if not rows:
+        return results
+    with open_outbox() as outbox:
+        outbox.execute("BEGIN IMMEDIATE")
+        outbox.executemany(
+            "INSERT INTO notifications"
+            " (notification_id, recipient, message_type, content, available_at, queued_at)"
+            " VALUES (?, ?, ?, ?, ?, ?)",
+            rows,
+        )
+    return results
+
+
+class MailboxTransport:
+    """Local stand-in for an email/SMS gateway that appends to one file per recipient"""
+
+    def __init__(self, directory=MAILBOX_DIR, latency=0.0):
+        self.directory = directory
+        self.latency = latency
+        os.makedirs(directory, exist_ok=True)
+
+    async def send(self, recipient, messages):
+        """Deliver a recipient's messages in one exchange; raises if delivery fails"""
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        name = "".join(char if char.isalnum() or char in "@.+-_" else "_" for char in recipient)
+        with open(os.path.join(self.directory, name + ".jsonl"), "a", encoding="utf-8") as box:
+            for message in messages:
+                box.write(json.dumps(message, separators=(",", ":")) + "\n")
+
+
+def load_transport(spec=TRANSPORT):
+    """Instantiate the transport named by a "module:Class" spec"""
+    if not spec:
+        return MailboxTransport()
+    module, _, name = spec.partition(":")
+    return getattr(importlib.import_module(module), name)()
 
-def main():
-    """Main entry point - reads JSON from stdin, outputs JSON to stdout"""
+
+def claim_batch(outbox, limit=BATCH_SIZE):
+    """Lease the next due notifications to this worker and return them"""
+    now = time.time()
+    outbox.execute("BEGIN IMMEDIATE")
     try:
-        # Read JSON input from stdin
-        input_data = json.load(sys.stdin)
-        
-        # Extract parameters
-        recipient = {}
-        if input_data.get('recipient_email'):
-            recipient['email'] = input_data['recipient_email']
-        if input_data.get('recipient_phone'):
-            recipient['phone'] = input_data['recipient_phone']
-            
-        message_type = input_data.get('message_type', 'general')
-        content = input_data.get('content', '')
-        
-        # Send the notification
-        result = send_notification(recipient, message_type, content)
-        
-        # Add success flag
-        result['success'] = True
-        
-        print(json.dumps(result))
-        return 0
-        
-    except Exception as e:
-        # Return error response as JSON
-        error = {
-            'success': False,
-            'error': str(e)
-        }
-        print(json.dumps(error))
-        return 1
+        rows = outbox.execute(
+            "SELECT id, notification_id, recipient, message_type, content, attempts"
+            " FROM notifications WHERE status = 'queued' AND available_at <= ?"
+            " ORDER BY available_at LIMIT ?",
+            (now, limit),
+        ).fetchall()
+        outbox.executemany(
+            "UPDATE notifications SET available_at = ? WHERE id = ?",
+            [(now + LEASE_SECONDS, row[0]) for row in rows],
+        )
+        outbox.execute("COMMIT")
+    except BaseException:
+        outbox.execute("ROLLBACK")
+        raise
+    return rows
+
+
+async def deliver_batch(outbox, transport, rows):
+    """
+    Send claimed notifications, one exchange per recipient.
+
+    A recipient's notifications succeed or fail together. Failures are
+    retried with exponential backoff until MAX_ATTEMPTS, then marked failed.
+    """
+    by_recipient = defaultdict(list)
+    for row in rows:
+        by_recipient[row[2]].append(row)
+    limit = asyncio.Semaphore(MAX_SENDS)
+
+    async def send(recipient, group):
+        messages = [
+            {'notificationId': notification_id, 'messageType': message_type, 'content': content}
+            for _, notification_id, _, message_type, content, _ in group
+        ]
+        async with limit:
+            try:
+                await transport.send(recipient, messages)
+                return group, None
+            except Exception as error:  # Any transport failure is retried
+                return group, f"{type(error).__name__}: {error}"
+
+    outcomes = await asyncio.gather(*(send(*item) for item in by_recipient.items()))
+
+    now, delivered_at = time.time(), datetime.now().isoformat() + 'Z'
+    delivered, retried = [], []
+    for group, error in outcomes:
+        for row_id, *_, attempts in group:
+            if error is None:
+                delivered.append((delivered_at, row_id))
+            else:
+                status = 'failed' if attempts + 1 >= MAX_ATTEMPTS else 'queued'
+                retry_at = now + BACKOFF_SECONDS * 2 ** attempts
+                retried.append((status, retry_at, error, row_id))
+    with outbox:
+        outbox.execute("BEGIN IMMEDIATE")
+        outbox.executemany(
+            "UPDATE notifications SET status = 'delivered', attempts = attempts + 1,"
+            " delivered_at = ?, last_error = NULL WHERE id = ?",
+            delivered,
+        )
+        outbox.executemany(
+            "UPDATE notifications SET status = ?, attempts = attempts + 1,"
+            " available_at = ?, last_error = ? WHERE id = ?",
+            retried,
+        )
+    return len(delivered), len(retried)
+
+
+async def deliver(transport=None, once=False, poll_interval=1.0):
+    """
+    Drain the outbox to a transport in batches.
+
+    Args:
+        transport: Object with an async send(recipient, messages) method
+            (default: the NOTIFICATION_TRANSPORT transport)
+        once: Return when no notification is due instead of polling
+        poll_interval: Seconds between polls of an empty outbox
+
+    Returns:
+        (delivered, failed sends) counts
+    """
+    transport = transport or load_transport()
+    outbox = open_outbox()
+    totals = [0, 0]
+    while True:
+        rows = claim_batch(outbox)
+        if not rows:
+            if once:
+                return tuple(totals)
+            await asyncio.sleep(poll_interval)
+            continue
+        delivered, failed = await deliver_batch(outbox, transport, rows)
+        totals[0] += delivered
+        totals[1] += failed
+
+
+def run(message_type="general", content="", recipient_email=None, recipient_phone=None):
+    """
+    Tool entry point - queue a notification and return without waiting for
+    delivery, which is left to the delivery worker (`deliver`).
+    """
+    call = {
+        'recipient_email': recipient_email,
+        'recipient_phone': recipient_phone,
+        'message_type': message_type,
+        'content': content
+    }
+    result = enqueue_many([call])[0]
+    if result.get('success') is False:
+        raise ValueError(result['error'])
+    return result
+
 
 if __name__ == "__main__":
-    sys.exit(main())
\ No newline at end of file
+    if sys.argv[1:] not in (["deliver"], ["deliver", "--once"]):
+        sys.exit("usage: send_notification.py deliver [--once]")
+    sent, failed = asyncio.run(deliver(once=sys.argv[2:] == ["--once"]))
+    print(f"Delivered {sent} notifications ({failed} sends failed)")
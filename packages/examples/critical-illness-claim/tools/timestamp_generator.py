@@ -1,131 +1,259 @@
 #!/usr/bin/env python3
 """
 name: timestamp_generator
-description: Generate and format timestamps in ISO 8601 format. Operations: 'generate' (create current timestamp), 'format' (format existing timestamp), 'difference' (calculate days between dates)
+description: Generate and format timestamps in ISO 8601 format. Operations: 'generate' (create current timestamp), 'format' (format existing timestamp), 'difference' (calculate days between dates), 'batch_format' and 'batch_difference' (the same for arrays of dates)
+entrypoint: run
 parameters:
-  operation: string - The operation to perform ('generate', 'format', or 'difference')
+  operation: string - The operation to perform ('generate', 'format', 'difference', 'batch_format' or 'batch_difference')
   timestamp?: string - Timestamp to format (used with 'format' operation)
   date1?: string - First date for difference calculation (used with 'difference' operation)
-  date2?: string - Second date for difference calculation (used with 'difference' operation)
+  date2?: string - Second date for difference calculation (used with 'difference' operation, and with 'batch_difference' in place of dates2)
+  timestamps?: array<string> - Timestamps to format (used with 'batch_format' operation)
+  dates1?: array<string> - First dates (used with 'batch_difference' operation)
+  dates2?: array<string> - Second dates, one per first date (used with 'batch_difference' operation)
 """
 
-import json
-import sys
+from collections import defaultdict
 from datetime import datetime, timezone
 
+try:
+    import numpy as np
+except ImportError:  # Batches are parsed element by element instead
+    np = None
+
+# Parsed with datetime.fromisoformat rather than strptime
+ISO_FORMAT = "iso"
+
+# Formats tried in order for a timestamp of a new shape
+FORMATS = [
+    "%Y-%m-%dT%H:%M:%SZ",
+    "%Y-%m-%dT%H:%M:%S",
+    "%Y-%m-%d %H:%M:%S",
+    "%Y/%m/%d %H:%M:%S",
+    "%Y-%m-%d",
+    ISO_FORMAT,  # Fractional seconds and UTC offsets
+]
+
+# Rewrites a string in a naive (UTC) format as the ISO 8601 that datetime64 parses
+TO_ISO = {
+    "%Y-%m-%dT%H:%M:%SZ": lambda text: text[:-1],
+    "%Y-%m-%dT%H:%M:%S": lambda text: text,
+    "%Y-%m-%d %H:%M:%S": lambda text: text.replace(" ", "T"),
+    "%Y/%m/%d %H:%M:%S": lambda text: text.replace("/", "-").replace(" ", "T"),
+    "%Y-%m-%d": lambda text: text,
+}
+
+# Shapes of timestamps (digits masked) mapped to the format that parsed them
+SHAPE_CACHE_SIZE = 1024
+_DIGITS = str.maketrans("0123456789", "9999999999")
+_format_by_shape = {}
+
 
 def generate_timestamp():
     """
     Generate current timestamp in ISO 8601 format.
-    
+
     Returns:
         String timestamp in ISO format: YYYY-MM-DDTHH:MM:SSZ
     """
     return datetime.now(timezone.utc).isoformat().replace('+00:00', 'Z')
 
+
+def parse_timestamp(timestamp_str):
+    """
+    Parse a timestamp in any supported format to a naive UTC datetime.
+
+    The format that parses a string is cached by the string's shape, so a
+    string shaped like an earlier one takes a single parse attempt.
+
+    Raises:
+        ValueError: If no format parses the string
+    """
+    if not isinstance(timestamp_str, str):
+        raise ValueError(f"Unrecognized timestamp: {timestamp_str!r}")
+
+    shape = timestamp_str.translate(_DIGITS)
+    cached = _format_by_shape.get(shape)
+    for fmt in ([cached] if cached else []) + [fmt for fmt in FORMATS if fmt != cached]:
+        try:
+            if fmt == ISO_FORMAT:
+                parsed = datetime.fromisoformat(timestamp_str.replace('Z', '+00:00'))
+            else:
+                parsed = datetime.strptime(timestamp_str, fmt)
+        except ValueError:
+            continue
+        if cached != fmt and len(_format_by_shape) < SHAPE_CACHE_SIZE:
+            _format_by_shape[shape] = fmt
+        if parsed.tzinfo is not None:
+            parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+        return parsed
+
+    raise ValueError(f"Unrecognized timestamp: {timestamp_str!r}")
+
+
 def format_timestamp(timestamp_str):
     """
     Ensure timestamp is in consistent ISO format.
-    
+
     Args:
         timestamp_str: Timestamp string in various formats
-    
+
     Returns:
         String timestamp in ISO format: YYYY-MM-DDTHH:MM:SSZ
+
+    Raises:
+        ValueError: If the timestamp is in no supported format
     """
-    # Parse various timestamp formats
-    formats = [
-        "%Y-%m-%dT%H:%M:%SZ",
-        "%Y-%m-%dT%H:%M:%S",
-        "%Y-%m-%d %H:%M:%S",
-        "%Y/%m/%d %H:%M:%S",
-        "%Y-%m-%d"
-    ]
-    
-    for fmt in formats:
-        try:
-            dt = datetime.strptime(timestamp_str, fmt)
-            # Ensure UTC timezone
-            if dt.tzinfo is None:
-                dt = dt.replace(tzinfo=timezone.utc)
-            return dt.isoformat().replace('+00:00', 'Z')
-        except ValueError:
-            continue
-    
-    # If no format matches, return current timestamp
-    return generate_timestamp()
+    return parse_timestamp(timestamp_str).isoformat() + 'Z'
+
 
 def calculate_date_difference(date1_str, date2_str):
     """
     Calculate days between two dates.
-    
+
     Args:
         date1_str: First date string
         date2_str: Second date string
-    
+
     Returns:
         Integer number of days (date2 - date1)
     """
-    date1 = datetime.fromisoformat(date1_str.replace('Z', '+00:00'))
-    date2 = datetime.fromisoformat(date2_str.replace('Z', '+00:00'))
-    return (date2 - date1).days
-
-def main():
-    """Main entry point - reads JSON from stdin, outputs JSON to stdout"""
-    try:
-        # Read JSON input from stdin
-        input_data = json.load(sys.stdin)
-        
-        # Extract parameters
-        operation = input_data.get('operation', 'generate')
-        
-        if operation == 'generate':
-            # Generate current timestamp
-            timestamp = generate_timestamp()
-            result = {
-                'success': True,
-                'timestamp': timestamp,
-                'formatted': timestamp
-            }
-            
-        elif operation == 'format':
-            # Format provided timestamp
-            timestamp_str = input_data.get('timestamp', '')
-            formatted = format_timestamp(timestamp_str)
-            result = {
-                'success': True,
-                'original': timestamp_str,
-                'formatted': formatted
-            }
-            
-        elif operation == 'difference':
-            # Calculate date difference
-            date1 = input_data.get('date1', '')
-            date2 = input_data.get('date2', '')
-            days = calculate_date_difference(date1, date2)
-            result = {
-                'success': True,
-                'date1': date1,
-                'date2': date2,
-                'days_difference': days
-            }
+    return (parse_timestamp(date2_str) - parse_timestamp(date1_str)).days
+
+
+def parse_many(timestamps):
+    """
+    Parse an array of timestamps.
+
+    With NumPy, timestamps whose shape has a cached naive format are rewritten
+    as ISO 8601 and converted with one datetime64 call per format; the rest,
+    and any group with an element that fails to convert, are parsed one by one.
+
+    Returns:
+        (parsed timestamps, errors by index); parsed values are datetime64[us]
+        (NaT on error) with NumPy, naive datetimes (None on error) without
+    """
+    errors = {}
+
+    def parse_one(index):
+        try:
+            return parse_timestamp(timestamps[index])
+        except ValueError as error:
+            errors[index] = str(error)
+            return None
+
+    if np is None:
+        return [parse_one(index) for index in range(len(timestamps))], errors
+
+    values = np.full(len(timestamps), np.datetime64('NaT'), dtype='datetime64[us]')
+    groups = defaultdict(list)
+    for index, text in enumerate(timestamps):
+        fmt = _format_by_shape.get(text.translate(_DIGITS)) if isinstance(text, str) else None
+        if fmt in TO_ISO:
+            groups[fmt].append(index)
         else:
-            result = {
-                'success': False,
-                'error': f'Unknown operation: {operation}'
-            }
-            
-        print(json.dumps(result))
-        return 0
-        
-    except Exception as e:
-        # Return error response as JSON
-        error = {
-            'success': False,
-            'error': str(e)
+            parsed = parse_one(index)
+            if parsed is not None:
+                values[index] = parsed
+
+    for fmt, indices in groups.items():
+        rewrite = TO_ISO[fmt]
+        try:
+            values[indices] = np.array(
+                [rewrite(timestamps[index]) for index in indices], dtype='datetime64[us]'
+            )
+        except ValueError:
+            for index in indices:
+                parsed = parse_one(index)
+                if parsed is not None:
+                    values[index] = parsed
+    return values, errors
+
+
+def error_list(errors, values):
+    """Per-element errors as a list, in input order"""
+    return [
+        {'index': index, 'value': values[index], 'error': errors[index]}
+        for index in sorted(errors)
+    ]
+
+
+def batch_format(timestamps):
+    """
+    Format an array of timestamps in ISO format.
+
+    Returns:
+        Dictionary with the formatted timestamps (None where a timestamp could
+        not be parsed) and the errors of those elements
+    """
+    parsed, errors = parse_many(timestamps)
+    if np is None:
+        formatted = [None if value is None else value.isoformat() + 'Z' for value in parsed]
+    else:
+        formatted = [
+            None if index in errors else (text[:-7] if text.endswith('.000000') else text) + 'Z'
+            for index, text in enumerate(np.datetime_as_string(parsed, unit='us').tolist())
+        ]
+    return {'formatted': formatted, 'errors': error_list(errors, timestamps)}
+
+
+def batch_difference(dates1, dates2):
+    """
+    Calculate days between pairs of dates.
+
+    Args:
+        dates1: First dates
+        dates2: Second dates, one per first date, or a single date for all
+
+    Returns:
+        Dictionary with the days (date2 - date1) per pair (None where either
+        date could not be parsed) and the errors of those elements
+    """
+    if isinstance(dates2, str):
+        dates2 = [dates2] * len(dates1)
+    if len(dates1) != len(dates2):
+        raise ValueError(f"dates1 has {len(dates1)} dates but dates2 has {len(dates2)}")
+
+    parsed1, errors1 = parse_many(dates1)
+    parsed2, errors2 = parse_many(dates2)
+    failed = set(errors1) | set(errors2)
+
+    if np is None:
+        days = [
+            None if index in failed else (parsed2[index] - parsed1[index]).days
+            for index in range(len(dates1))
+        ]
+    else:
+        # Floor division matches timedelta.days for negative differences
+        with np.errstate(invalid='ignore'):  # NaT where a date failed to parse
+            whole_days = ((parsed2 - parsed1) // np.timedelta64(1, 'D')).tolist()
+        days = [None if index in failed else value for index, value in enumerate(whole_days)]
+
+    errors = error_list(errors1, dates1) + error_list(errors2, dates2)
+    return {'days_difference': days, 'errors': sorted(errors, key=lambda error: error['index'])}
+
+
+def run(operation="generate", timestamp="", date1="", date2="", timestamps=None,
+        dates1=None, dates2=None):
+    """Tool entry point - dispatch on the requested operation"""
+    if operation == 'generate':
+        generated = generate_timestamp()
+        return {'timestamp': generated, 'formatted': generated}
+
+    if operation == 'format':
+        return {'original': timestamp, 'formatted': format_timestamp(timestamp)}
+
+    if operation == 'difference':
+        return {
+            'date1': date1,
+            'date2': date2,
+            'days_difference': calculate_date_difference(date1, date2)
         }
-        print(json.dumps(error))
-        return 1
 
-if __name__ == "__main__":
-    sys.exit(main())
\ No newline at end of file
+    if operation == 'batch_format':
+        return batch_format(timestamps or [])
+
+    if operation == 'batch_difference':
+        return batch_difference(dates1 or [], dates2 if dates2 is not None else date2)
+
+    return {'success': False, 'error': f'Unknown operation: {operation}'}
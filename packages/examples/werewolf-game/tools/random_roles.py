@@ -2,40 +2,39 @@
 """
 name: random_roles
 description: Randomly assign werewolf game roles to players
+entrypoint: random_roles
 parameters:
-  players: array - List of player names
+  players: array - List of player names (at least 3)
+  seed?: number - Seed for the shuffle, so the same seed deals the same roles
 """
-import json
 import random
-import sys
-
-# Read input from stdin
-data = json.load(sys.stdin)
-players = data.get('players', [])
-
-# Validate input
-if len(players) != 3:
-    print(json.dumps({
-        'error': 'Exactly 3 players required',
-        'provided': len(players)
-    }))
-    sys.exit(1)
-
-# Define roles
-roles = ['werewolf', 'seer', 'villager']
-
-# Randomly shuffle roles
-random.shuffle(roles)
-
-# Assign roles to players
-role_assignments = {}
-for i, player in enumerate(players):
-    role_assignments[player.lower()] = roles[i]
-
-# Return the assignments
-result = {
-    'roles': role_assignments,
-    'summary': f"{players[0]} is {role_assignments[players[0].lower()]}, {players[1]} is {role_assignments[players[1].lower()]}, {players[2]} is {role_assignments[players[2].lower()]}"
-}
-
-print(json.dumps(result))
\ No newline at end of file
+
+
+def deal_roles(count):
+    """Roles for a game of count players: one werewolf per four players, one seer"""
+    werewolves = max(1, count // 4)
+    return ['werewolf'] * werewolves + ['seer'] + ['villager'] * (count - werewolves - 1)
+
+
+def random_roles(players, seed=None):
+    """
+    Randomly assign roles to players.
+
+    Args:
+        players: List of player names
+        seed: Seed for the shuffle (default: a fresh random seed)
+
+    Returns:
+        Dictionary with roles by lowercase player name and a summary
+    """
+    if len(players) < 3:
+        raise ValueError(f'At least 3 players required, got {len(players)}')
+
+    roles = deal_roles(len(players))
+    random.Random(seed).shuffle(roles)
+
+    role_assignments = {player.lower(): role for player, role in zip(players, roles)}
+    return {
+        'roles': role_assignments,
+        'summary': ', '.join(f'{player} is {role}' for player, role in zip(players, roles)),
+    }